@@ -3,8 +3,12 @@ from flask import Flask
 from app.database import db
 from config import config
 
-def create_app(config_name=None):
-    """Application factory pattern."""
+def create_app(config_name=None, test_config=None):
+    """Application factory pattern.
+    
+    ``test_config`` overrides individual settings (e.g. a temporary database
+    for tests and benchmarks) after the named configuration is loaded.
+    """
     if config_name is None:
         config_name = os.environ.get('FLASK_ENV', 'development')
     
@@ -12,14 +16,15 @@ def create_app(config_name=None):
     
     # Load configuration
     app.config.from_object(config.get(config_name, config['default']))
+    if test_config:
+        app.config.update(test_config)
     
     # Initialize extensions
     db.init_app(app)
     
     # Set up logging
-    from app.logging_config import setup_logging, log_request_info
+    from app.logging_config import setup_logging
     setup_logging(app)
-    log_request_info(app)
     
     # Register error handlers
     from app.errors import register_error_handlers
@@ -31,10 +36,36 @@ def create_app(config_name=None):
     
     # Import models (needed for database creation)
     from app.models.mission import Mission, Annotation, NoFlyZone
+    from app.models.version import MissionVersion, WaypointBlock, KmlBlob
+    from app.models.summary import MissionSummary
+    from app.models.search import SEARCH_DDL  # FTS5 index and triggers, created by db.create_all()
+    
+    # Count and time SQL statements per request
+    from app.query_stats import register_query_instrumentation
+    register_query_instrumentation(app)
+    
+    # Read-through cache for serialized mission payloads
+    from app.payload_cache import register_payload_cache
+    register_payload_cache(app)
+    
+    # Bound concurrent KML parses on the upload path
+    from app.admission import register_admission_control
+    register_admission_control(app)
+    
+    # Vacuum, ANALYZE, WAL checkpoints and orphan purges in quiet windows
+    from app.maintenance import register_maintenance
+    register_maintenance(app)
     
     # Register blueprints
-    from app.routes import missions
+    from app.routes import missions, search, export, deconfliction
     app.register_blueprint(missions.bp)
+    app.register_blueprint(search.bp)
+    app.register_blueprint(export.bp)
+    app.register_blueprint(deconfliction.bp)
+    
+    # Register CLI commands
+    from app.cli import register_commands
+    register_commands(app)
     
     app.logger.info(f"Application created with config: {config_name}")
     
@@ -0,0 +1,98 @@
+"""
+Admission control for CPU-heavy KML uploads.
+
+Uploads are checked against ``UPLOAD_MAX_BYTES`` before any of the body is
+read, then wait for a slot in a bounded parse gate. At most
+``PARSE_MAX_CONCURRENCY`` parses run at once, at most ``PARSE_QUEUE_SIZE``
+requests wait for a slot, and none waits longer than ``PARSE_QUEUE_TIMEOUT``
+seconds. Requests that cannot be admitted get ``503`` with ``Retry-After``
+instead of piling up behind the parser and starving the read endpoints.
+Upload views are wrapped in ``upload_limit`` and take ``parse_slot()`` only
+around the parse, so retried uploads and renames answer without a slot.
+"""
+
+import functools
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+from flask import current_app, request
+from app.errors import PayloadTooLargeError, ServiceUnavailableError
+from app.metrics import metrics
+
+PARSES_IN_PROGRESS = metrics.gauge('kml_parse_in_progress', 'KML parses currently admitted', ())
+PARSES_QUEUED = metrics.gauge('kml_parse_queued', 'Requests waiting for a parse slot', ())
+PARSE_WAIT = metrics.histogram(
+    'kml_parse_wait_seconds', 'Time spent waiting for a parse slot', (),
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+PARSES_REJECTED = metrics.counter('kml_parse_rejected_total', 'Requests refused by admission control', ('reason',))
+
+class ParseGate:
+    """Bounded concurrency with a bounded, time-limited queue."""
+    
+    def __init__(self, max_concurrency: int, max_queue: int, timeout: float, retry_after: int):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._waiting = 0
+    
+    @contextmanager
+    def admit(self):
+        """Hold a parse slot for the duration of the block, or raise ServiceUnavailableError."""
+        if not self._slots.acquire(blocking=False):
+            self._wait_for_slot()
+        PARSES_IN_PROGRESS.inc()
+        try:
+            yield
+        finally:
+            PARSES_IN_PROGRESS.dec()
+            self._slots.release()
+    
+    def _wait_for_slot(self):
+        with self._lock:
+            if self._waiting >= self.max_queue:
+                PARSES_REJECTED.inc(('queue_full',))
+                raise ServiceUnavailableError("Too many uploads in progress, retry later", retry_after=self.retry_after)
+            self._waiting += 1
+        PARSES_QUEUED.inc()
+        start = perf_counter()
+        try:
+            admitted = self._slots.acquire(timeout=self.timeout)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+            PARSES_QUEUED.dec()
+        PARSE_WAIT.observe(perf_counter() - start)
+        if not admitted:
+            PARSES_REJECTED.inc(('timeout',))
+            raise ServiceUnavailableError("Timed out waiting for an upload slot, retry later", retry_after=self.retry_after)
+
+def upload_limit(view):
+    """Enforce the upload size limit before any of the body is read."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        limit = current_app.config.get('UPLOAD_MAX_BYTES')
+        if limit:
+            if request.content_length is not None and request.content_length > limit:
+                PARSES_REJECTED.inc(('too_large',))
+                raise PayloadTooLargeError(f"Upload exceeds the {limit} byte limit")
+            # Bodies without a Content-Length are cut off while being read
+            request.max_content_length = limit
+        return view(*args, **kwargs)
+    return wrapper
+
+def parse_slot():
+    """Hold one of the app's parse slots for the duration of a ``with`` block."""
+    return current_app.extensions['parse_gate'].admit()
+
+def register_admission_control(app):
+    """Create the app's parse gate from configuration."""
+    app.extensions['parse_gate'] = ParseGate(
+        max_concurrency=app.config.get('PARSE_MAX_CONCURRENCY', 2),
+        max_queue=app.config.get('PARSE_QUEUE_SIZE', 8),
+        timeout=app.config.get('PARSE_QUEUE_TIMEOUT', 10.0),
+        retry_after=app.config.get('PARSE_RETRY_AFTER', 5)
+    )
@@ -0,0 +1,58 @@
+"""Flask CLI commands (run with ``flask <command>`` from ``backend/``)."""
+
+import click
+
+def register_commands(app):
+    """Register maintenance commands with the Flask CLI."""
+    
+    @app.cli.command('rebuild-summaries')
+    def rebuild_summaries():
+        """Recreate the mission_summary read model from the source tables."""
+        from app.services.summary_service import SummaryService
+        count = SummaryService.rebuild()
+        click.echo(f"Rebuilt {count} mission summaries")
+    
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index():
+        """Create and repopulate the full-text search index."""
+        from app.services.search_service import SearchService
+        count = SearchService.rebuild()
+        click.echo(f"Indexed {count} search entries")
+    
+    @app.cli.command('normalize-no-fly-zones')
+    def normalize_no_fly_zones():
+        """Canonicalize no-fly zones stored without vertex count, area and bounding box."""
+        from app.services.mission_service import MissionService
+        result = MissionService.normalize_no_fly_zones()
+        click.echo(f"Normalized {result['normalized']} no-fly zones")
+        for zone in result['invalid']:
+            click.echo(f"Zone {zone['id']}: {zone['error']}", err=True)
+    
+    @app.cli.command('export')
+    @click.argument('directory', type=click.Path(file_okay=False, writable=True))
+    @click.option('--format', 'format', type=click.Choice(['parquet', 'arrow']), default='parquet')
+    @click.option('--mission-id', 'mission_ids', type=int, multiple=True, help='Export only these missions')
+    @click.option('--batch-size', type=int, default=65536, show_default=True, help='Rows per row group / batch')
+    def export(directory, format, mission_ids, batch_size):
+        """Write missions, waypoints, annotations and no-fly zones as columnar files."""
+        import os
+        from app.services.export_service import ExportService
+        os.makedirs(directory, exist_ok=True)
+        written = ExportService.export_to_directory(directory, format, list(mission_ids) or None, batch_size)
+        for path, size in written.items():
+            click.echo(f"{path}: {size} bytes")
+    
+    @app.cli.command('maintenance')
+    @click.option('--task', 'tasks', type=click.Choice(['purge_orphans', 'analyze', 'vacuum', 'checkpoint']),
+                  multiple=True, help='Run only these tasks (default: all)')
+    @click.option('--full-vacuum', is_flag=True, help='Rebuild the file in incremental auto-vacuum mode first (blocks writers)')
+    def maintenance(tasks, full_vacuum):
+        """Purge orphaned rows, ANALYZE, vacuum and checkpoint the database once."""
+        from app.maintenance import get_maintenance_scheduler, full_vacuum as run_full_vacuum, TASKS
+        if full_vacuum:
+            click.echo(f"Full vacuum reclaimed {run_full_vacuum(app)} bytes")
+        report = get_maintenance_scheduler(app).run(tasks or TASKS, yield_to_requests=False)
+        for task, result in report['tasks'].items():
+            details = ', '.join(f"{key}={value}" for key, value in result.items() if key != 'duration_s')
+            click.echo(f"{task}: {result['duration_s']}s ({details})")
+        click.echo(f"Reclaimed {report['bytes_reclaimed']} bytes in {report['duration_s']}s")
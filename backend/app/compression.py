@@ -0,0 +1,154 @@
+"""
+Response compression negotiated from ``Accept-Encoding``.
+
+Compressible responses above ``COMPRESSION_MIN_SIZE`` bytes are gzip- or
+brotli-encoded in an ``after_request`` hook. Responses that carry an ETag
+have their compressed bytes kept in a per-app LRU keyed by (ETag, encoding),
+and ``cached_response`` lets a view answer from that cache (or with a 304)
+before it loads anything from the database.
+"""
+
+import gzip
+import threading
+from collections import OrderedDict
+from typing import Optional
+from flask import current_app, request
+from app.metrics import metrics
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/xml',
+    'application/vnd.google-earth.kml+xml',
+    'text/plain',
+    'text/html',
+    'text/csv',
+    'application/vnd.mission-dashboard.waypoints',
+}
+
+COMPRESSED_RESPONSES = metrics.counter(
+    'http_responses_compressed_total', 'Responses sent with a content coding', ('encoding',)
+)
+COMPRESSION_CACHE = metrics.counter(
+    'http_compression_cache_total', 'Compressed body cache lookups and evictions', ('result',)
+)
+
+class CompressedBodyCache:
+    """Thread-safe LRU of compressed bodies, bounded by their total size in bytes."""
+    
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+    
+    def get(self, key) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+        COMPRESSION_CACHE.inc(('hit' if body is not None else 'miss',))
+        return body
+    
+    def put(self, key, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        evicted = 0
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, oldest = self._entries.popitem(last=False)
+                self._size -= len(oldest)
+                evicted += 1
+        if evicted:
+            COMPRESSION_CACHE.inc(('eviction',), evicted)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+    
+    def __len__(self):
+        return len(self._entries)
+
+def available_encodings():
+    """Supported content codings in server preference order."""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+def negotiate_encoding() -> Optional[str]:
+    """Pick the best coding the client accepts, or None for identity."""
+    return request.accept_encodings.best_match(available_encodings())
+
+def compress(data: bytes, encoding: str) -> bytes:
+    config = current_app.config
+    if encoding == 'br':
+        return brotli.compress(data, quality=config.get('COMPRESSION_BROTLI_QUALITY', 5))
+    return gzip.compress(data, compresslevel=config.get('COMPRESSION_GZIP_LEVEL', 6), mtime=0)
+
+def get_cache() -> CompressedBodyCache:
+    return current_app.extensions['compression_cache']
+
+def cached_response(etag: str, mimetype: str = 'application/json'):
+    """
+    Answer a GET for a representation identified by ``etag`` without running the view.
+    
+    Returns a 304 when the client already has it, the cached compressed body
+    when one exists for the negotiated encoding, or None so the view renders
+    it (the ``after_request`` hook then compresses and caches the result).
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        encoding = negotiate_encoding() if current_app.config.get('COMPRESSION_ENABLED', True) else None
+        body = get_cache().get((etag, encoding)) if encoding else None
+        if body is None:
+            return None
+        response = current_app.response_class(body, mimetype=mimetype)
+        response.headers['Content-Encoding'] = encoding
+        COMPRESSED_RESPONSES.inc((encoding,))
+    response.set_etag(etag, weak=True)
+    response.vary.add('Accept-Encoding')
+    return response
+
+def register_response_compression(app):
+    """Compress eligible responses and cache compressed bodies of ETagged GET responses."""
+    enabled = app.config.get('COMPRESSION_ENABLED', True)
+    min_size = app.config.get('COMPRESSION_MIN_SIZE', 1024)
+    app.extensions['compression_cache'] = CompressedBodyCache(
+        app.config.get('COMPRESSION_CACHE_MAX_BYTES', 32 * 1024 * 1024)
+    )
+    
+    @app.after_request
+    def compress_response(response):
+        if (not enabled
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES
+                or not 200 <= response.status_code < 300 or response.status_code in (204, 206)
+                or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers):
+            return response
+        
+        response.vary.add('Accept-Encoding')
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+        encoding = negotiate_encoding()
+        if encoding is None:
+            return response
+        
+        body = compress(data, encoding)
+        etag, _ = response.get_etag()
+        if etag and request.method == 'GET':
+            get_cache().put((etag, encoding), body)
+        
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        COMPRESSED_RESPONSES.inc((encoding,))
+        return response
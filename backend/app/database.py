@@ -1,3 +1,17 @@
 from flask_sqlalchemy import SQLAlchemy
 
 db = SQLAlchemy()
+
+def fetch_tuples(statement) -> list:
+    """
+    Run a Core select on the session's connection and return plain DB-API tuples
+    
+    Skips building SQLAlchemy ``Row`` objects and their result processing, so
+    values come back exactly as the driver returns them (SQLite booleans as 0/1).
+    """
+    # Executed through Core so engine events (query stats, slow query logging) still see it
+    result = db.session.connection().execute(statement)
+    try:
+        return result.cursor.fetchall()
+    finally:
+        result.close()
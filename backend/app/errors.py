@@ -39,6 +39,20 @@ class ConflictError(APIError):
     status_code = 409
     message = "Conflict with current state"
 
+class PayloadTooLargeError(APIError):
+    """Raised when a request body exceeds the configured limit."""
+    status_code = 413
+    message = "Payload too large"
+
+class ServiceUnavailableError(APIError):
+    """Raised when the server is saturated; clients should retry after ``retry_after`` seconds."""
+    status_code = 503
+    message = "Service temporarily unavailable"
+    
+    def __init__(self, message=None, retry_after=None, payload=None):
+        super().__init__(message, payload=payload)
+        self.retry_after = retry_after
+
 def register_error_handlers(app):
     """Register error handlers with the Flask app."""
     
@@ -48,6 +62,8 @@ def register_error_handlers(app):
         logger.error(f"API Error: {error.message}", exc_info=True)
         response = jsonify(error.to_dict())
         response.status_code = error.status_code
+        if getattr(error, 'retry_after', None):
+            response.headers['Retry-After'] = str(error.retry_after)
         return response
     
     @app.errorhandler(400)
@@ -75,6 +91,15 @@ def register_error_handlers(app):
             'message': 'The method is not allowed for the requested URL'
         }), 405
     
+    @app.errorhandler(413)
+    def handle_request_too_large(error):
+        """Handle request bodies over the size limit."""
+        logger.warning(f"Request too large: {error}")
+        return jsonify({
+            'error': 'Payload too large',
+            'message': 'The request body exceeds the size limit'
+        }), 413
+    
     @app.errorhandler(500)
     def handle_internal_error(error):
         """Handle internal server errors."""
@@ -1,11 +1,84 @@
 """Logging configuration for the application."""
 
+import atexit
+import json
 import logging
 import logging.config
+import logging.handlers
 import os
+import queue
+import random
+from datetime import datetime, timezone
+
+from app.metrics import metrics
+
+LOG_RECORDS_DROPPED = metrics.counter(
+    'log_records_dropped_total',
+    'Log records dropped because the logging queue was full'
+)
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RESERVED_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_queue_listener = None
+_access_sample_rate = 1.0
+
+class JSONFormatter(logging.Formatter):
+    """Format records as single-line JSON objects, including ``extra`` fields."""
+    
+    def format(self, record):
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'module': record.module,
+            'message': record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that defers formatting to the listener thread.
+    
+    Only the message is merged on the calling thread (so mutable args are
+    captured as-is); timestamps, JSON encoding and file I/O all happen in the
+    background. Records are dropped and counted when the queue is full rather
+    than blocking the request.
+    """
+    
+    def prepare(self, record):
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+    
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+def _stop_queue_listener():
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+atexit.register(_stop_queue_listener)
 
 def setup_logging(app):
     """Configure logging for the application."""
+    global _access_sample_rate
     
     # Create logs directory if it doesn't exist
     log_dir = os.path.join(os.path.dirname(app.instance_path), 'logs')
@@ -13,6 +86,10 @@ def setup_logging(app):
     
     # Determine log level based on environment
     log_level = logging.DEBUG if app.config.get('DEBUG') else logging.INFO
+    file_formatter = 'json' if app.config.get('LOG_FORMAT') == 'json' else 'detailed'
+    
+    # Flush and stop any listener left over from a previous app instance
+    _stop_queue_listener()
     
     # Configure logging
     logging_config = {
@@ -26,6 +103,9 @@ def setup_logging(app):
             'detailed': {
                 'format': '[%(asctime)s] %(levelname)s in %(module)s [%(pathname)s:%(lineno)d]: %(message)s',
                 'datefmt': '%Y-%m-%d %H:%M:%S'
+            },
+            'json': {
+                '()': JSONFormatter
             }
         },
         'handlers': {
@@ -38,7 +118,7 @@ def setup_logging(app):
             'file': {
                 'class': 'logging.handlers.RotatingFileHandler',
                 'level': logging.INFO,
-                'formatter': 'detailed',
+                'formatter': file_formatter,
                 'filename': os.path.join(log_dir, 'app.log'),
                 'maxBytes': 10485760,  # 10MB
                 'backupCount': 5
@@ -46,7 +126,7 @@ def setup_logging(app):
             'error_file': {
                 'class': 'logging.handlers.RotatingFileHandler',
                 'level': logging.ERROR,
-                'formatter': 'detailed',
+                'formatter': file_formatter,
                 'filename': os.path.join(log_dir, 'errors.log'),
                 'maxBytes': 10485760,  # 10MB
                 'backupCount': 5
@@ -73,6 +153,11 @@ def setup_logging(app):
     # Apply logging configuration
     logging.config.dictConfig(logging_config)
     
+    if app.config.get('LOG_QUEUE_ENABLED'):
+        _enable_queue_logging(app.config.get('LOG_QUEUE_SIZE', 10000))
+    
+    _access_sample_rate = float(app.config.get('ACCESS_LOG_SAMPLE_RATE', 1.0))
+    
     # Set up Flask app logger
     app.logger.setLevel(log_level)
     
@@ -81,16 +166,54 @@ def setup_logging(app):
     
     return logging.getLogger('app')
 
-def log_request_info(app):
-    """Add request logging middleware."""
-    
-    @app.before_request
-    def log_request():
-        from flask import request
-        app.logger.info(f"{request.method} {request.url} - {request.remote_addr}")
-    
-    @app.after_request
-    def log_response(response):
-        from flask import request
-        app.logger.info(f"{request.method} {request.url} - {response.status_code}")
-        return response
+def _enable_queue_logging(queue_size):
+    """
+    Move the app and root handlers behind a single QueueHandler.
+    
+    The configured handlers are handed to a QueueListener thread, so request
+    threads only pay for an enqueue. Handler levels are still respected, which
+    keeps the errors-only file limited to errors.
+    """
+    global _queue_listener
+    
+    app_logger = logging.getLogger('app')
+    root_logger = logging.getLogger()
+    handlers = list(app_logger.handlers)
+    
+    log_queue = queue.Queue(maxsize=queue_size)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    for logger in (app_logger, root_logger):
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        logger.addHandler(queue_handler)
+    
+    _queue_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
+
+access_logger = logging.getLogger('app.access')
+
+def log_access(request, response, duration):
+    """
+    Write one access log line per request (called by the instrumentation middleware).
+    
+    Successful requests are sampled at ACCESS_LOG_SAMPLE_RATE; server errors
+    are always logged.
+    """
+    if not access_logger.isEnabledFor(logging.INFO):
+        return
+    status = response.status_code
+    if status < 500 and _access_sample_rate < 1.0 and random.random() >= _access_sample_rate:
+        return
+    access_logger.info(
+        "%s %s %s %.1fms - %s [%s]",
+        request.method, request.path, status,
+        duration * 1000, request.remote_addr, request.request_id,
+        extra={
+            'request_id': request.request_id,
+            'method': request.method,
+            'path': request.path,
+            'status': status,
+            'duration_ms': round(duration * 1000, 3),
+            'remote_addr': request.remote_addr
+        }
+    )
@@ -0,0 +1,322 @@
+"""
+Background database maintenance.
+
+A ``MaintenanceScheduler`` runs four tasks against the app's database:
+
+- ``purge_orphans``: deletes child rows whose mission no longer exists, and
+  waypoint blocks and KML blobs that no version references any more;
+- ``analyze``: refreshes planner statistics with a bounded ``ANALYZE``;
+- ``vacuum``: returns free pages to the filesystem with
+  ``PRAGMA incremental_vacuum``;
+- ``checkpoint``: copies the WAL back into the database file (WAL mode only).
+
+In the server it runs on a daemon thread, at most every
+``MAINTENANCE_INTERVAL`` seconds. It only runs inside the quiet windows in
+``MAINTENANCE_WINDOWS`` and while no request has been seen for
+``MAINTENANCE_IDLE_SECONDS``. Work is split into small steps: purges delete
+``MAINTENANCE_BATCH_SIZE`` rows and vacuum frees ``MAINTENANCE_VACUUM_PAGES``
+pages per step, each in its own short transaction. The activity check runs
+again before every step, so a request arriving mid-run pauses the scheduler
+after the current step. It resumes when traffic stops, or gives up if the
+window closes first. ``flask maintenance`` runs the same tasks once, e.g. from
+cron or a sidecar.
+"""
+
+import logging
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import delete, event, select, text
+from app.database import db
+from app.metrics import metrics
+from app.middleware import add_request_listener
+
+logger = logging.getLogger(__name__)
+
+TASKS = ('purge_orphans', 'analyze', 'vacuum', 'checkpoint')
+POLL_SECONDS = 15
+ANALYSIS_LIMIT = 1000  # rows sampled per index by ANALYZE
+
+MAINTENANCE_RUNS = metrics.counter('db_maintenance_runs_total', 'Maintenance task runs', ('task', 'result'))
+MAINTENANCE_DURATION = metrics.histogram(
+    'db_maintenance_duration_seconds', 'Time spent in each maintenance task', ('task',),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0)
+)
+MAINTENANCE_RECLAIMED = metrics.counter('db_maintenance_reclaimed_bytes_total', 'Bytes returned to the filesystem', ())
+MAINTENANCE_PURGED = metrics.counter('db_maintenance_purged_rows_total', 'Orphaned rows deleted', ('table',))
+
+# Blocks referenced by no version. ``block_ids`` is a comma-separated list, which
+# reads as a JSON array once bracketed. One statement per batch, so a version
+# written concurrently either commits first (and keeps its blocks) or waits.
+ORPHAN_BLOCKS_SQL = text(
+    "DELETE FROM waypoint_block WHERE id IN ("
+    "SELECT id FROM waypoint_block WHERE id NOT IN ("
+    "SELECT blocks.value FROM mission_version, json_each('[' || mission_version.block_ids || ']') AS blocks"
+    ") LIMIT :limit)"
+)
+
+class Stopped(Exception):
+    """Raised between steps when maintenance has to give way"""
+
+def parse_windows(value: Optional[str]) -> List[Tuple[int, int]]:
+    """
+    Parse ``"HH:MM-HH:MM[,HH:MM-HH:MM...]"`` (local time) into (start, end)
+    minute-of-day pairs. A window may cross midnight. Empty means always.
+    """
+    windows = []
+    for part in (value or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        match = re.fullmatch(r'(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})', part)
+        if not match:
+            raise ValueError(f"Invalid maintenance window '{part}' (expected HH:MM-HH:MM)")
+        start_hour, start_minute, end_hour, end_minute = (int(group) for group in match.groups())
+        if start_hour > 23 or end_hour > 24 or start_minute > 59 or end_minute > 59:
+            raise ValueError(f"Invalid maintenance window '{part}'")
+        windows.append((start_hour * 60 + start_minute, end_hour * 60 + end_minute))
+    return windows
+
+def in_window(windows: Sequence[Tuple[int, int]], now: Optional[datetime] = None) -> bool:
+    if not windows:
+        return True
+    now = now or datetime.now()
+    minute = now.hour * 60 + now.minute
+    for start, end in windows:
+        if start <= end and start <= minute < end:
+            return True
+        if start > end and (minute >= start or minute < end):
+            return True
+    return False
+
+class ActivityTracker:
+    """Counts requests in flight and remembers when the last one finished."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._last_finished = 0.0
+    
+    def begin(self) -> None:
+        with self._lock:
+            self._in_flight += 1
+    
+    def end(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._last_finished = time.monotonic()
+    
+    def is_quiet(self, idle_seconds: float) -> bool:
+        with self._lock:
+            return self._in_flight == 0 and time.monotonic() - self._last_finished >= idle_seconds
+
+class MaintenanceScheduler:
+    """Runs maintenance tasks in quiet windows, stepping aside for requests."""
+    
+    def __init__(self, app, activity: Optional[ActivityTracker] = None, interval: float = 3600,
+                 windows: Sequence[Tuple[int, int]] = (), idle_seconds: float = 5, batch_size: int = 1000,
+                 vacuum_pages: int = 256):
+        self.app = app
+        self.activity = activity
+        self.interval = interval
+        self.windows = list(windows)
+        self.idle_seconds = idle_seconds
+        self.batch_size = batch_size
+        self.vacuum_pages = vacuum_pages
+        self.last_report: Optional[Dict] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._run_lock = threading.Lock()
+    
+    # Scheduling
+    
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name='db-maintenance', daemon=True)
+            self._thread.start()
+    
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+    
+    def _loop(self) -> None:
+        next_run = time.monotonic() + min(self.interval, POLL_SECONDS)
+        while not self._stop.wait(POLL_SECONDS):
+            if time.monotonic() < next_run or not self._may_start():
+                continue
+            try:
+                report = self.run()
+            except Exception:
+                logger.exception("Database maintenance failed")
+                report = None
+            if report is not None and not report['interrupted']:
+                next_run = time.monotonic() + self.interval
+    
+    def _may_start(self) -> bool:
+        return in_window(self.windows) and (self.activity is None or self.activity.is_quiet(self.idle_seconds))
+    
+    def _wait_for_quiet(self) -> None:
+        """Block until the app is quiet again; raise Stopped if the window closes or the scheduler stops"""
+        while not self._may_start():
+            if self._stop.is_set() or not in_window(self.windows):
+                raise Stopped()
+            self._stop.wait(min(self.idle_seconds, 1.0) or 0.1)
+    
+    # Running
+    
+    def run(self, tasks: Sequence[str] = TASKS, yield_to_requests: bool = True) -> Dict:
+        """
+        Run ``tasks`` in order and return a report
+        
+        Returns:
+            Dict: ``duration_s``, ``bytes_reclaimed``, ``interrupted`` and per-task results
+        """
+        unknown = [task for task in tasks if task not in TASKS]
+        if unknown:
+            raise ValueError(f"Unknown maintenance tasks: {', '.join(unknown)}")
+        step = self._wait_for_quiet if yield_to_requests else (lambda: None)
+        report = {'started_at': datetime.utcnow().isoformat() + 'Z', 'tasks': {}, 'interrupted': False}
+        start = time.perf_counter()
+        
+        with self._run_lock, self.app.app_context():
+            sqlite = db.engine.dialect.name == 'sqlite'
+            with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+                size_before = _database_bytes(connection) if sqlite else None
+                for task in tasks:
+                    task_start = time.perf_counter()
+                    try:
+                        if task != 'purge_orphans' and not sqlite:
+                            result = {'skipped': 'SQLite only'}
+                        else:
+                            result = getattr(self, f'_{task}')(connection, step)
+                    except Stopped:
+                        report['interrupted'] = True
+                        MAINTENANCE_RUNS.inc((task, 'interrupted'))
+                        break
+                    duration = time.perf_counter() - task_start
+                    result['duration_s'] = round(duration, 3)
+                    report['tasks'][task] = result
+                    MAINTENANCE_DURATION.observe(duration, (task,))
+                    MAINTENANCE_RUNS.inc((task, 'skipped' if 'skipped' in result else 'completed'))
+                size_after = _database_bytes(connection) if sqlite else None
+        
+        report['duration_s'] = round(time.perf_counter() - start, 3)
+        report['bytes_reclaimed'] = max(size_before - size_after, 0) if sqlite else 0
+        MAINTENANCE_RECLAIMED.inc((), report['bytes_reclaimed'])
+        self.last_report = report
+        logger.info(
+            f"Database maintenance {'interrupted' if report['interrupted'] else 'finished'} in "
+            f"{report['duration_s']}s, reclaimed {report['bytes_reclaimed']} bytes",
+            extra={'maintenance': report}
+        )
+        return report
+    
+    def _purge_orphans(self, connection, step: Callable[[], None]) -> Dict:
+        from app.models.mission import Mission, Waypoint, Annotation, NoFlyZone
+        from app.models.summary import MissionSummary
+        from app.models.version import MissionVersion, KmlBlob
+        
+        rows = {}
+        # Versions go before blocks and blobs, which may only be orphaned once they are gone
+        for model in (Waypoint, Annotation, NoFlyZone, MissionSummary, MissionVersion):
+            key = model.__table__.primary_key.columns.values()[0]
+            orphans = select(key).where(model.mission_id.not_in(select(Mission.id))).limit(self.batch_size)
+            rows[model.__tablename__] = self._purge_batches(
+                connection, step, delete(model).where(key.in_(orphans)), model.__tablename__
+            )
+        if connection.dialect.name == 'sqlite':
+            rows['waypoint_block'] = self._purge_batches(
+                connection, step, ORPHAN_BLOCKS_SQL.bindparams(limit=self.batch_size), 'waypoint_block'
+            )
+        orphan_blobs = select(KmlBlob.id).where(KmlBlob.id.not_in(select(MissionVersion.kml_blob_id))).limit(self.batch_size)
+        rows['kml_blob'] = self._purge_batches(connection, step, delete(KmlBlob).where(KmlBlob.id.in_(orphan_blobs)), 'kml_blob')
+        return {'rows': rows}
+    
+    def _purge_batches(self, connection, step: Callable[[], None], statement, table: str) -> int:
+        total = 0
+        while True:
+            step()
+            deleted = connection.execute(statement).rowcount
+            total += deleted
+            MAINTENANCE_PURGED.inc((table,), deleted)
+            if deleted < self.batch_size:
+                return total
+    
+    def _analyze(self, connection, step: Callable[[], None]) -> Dict:
+        connection.exec_driver_sql(f'PRAGMA analysis_limit={ANALYSIS_LIMIT}')
+        tables = [table.name for table in db.metadata.sorted_tables]
+        for table in tables:
+            step()
+            connection.exec_driver_sql(f'ANALYZE "{table}"')
+        return {'tables': len(tables)}
+    
+    def _vacuum(self, connection, step: Callable[[], None]) -> Dict:
+        if _pragma(connection, 'auto_vacuum') != 2:
+            # Switching an existing file to incremental mode needs one full VACUUM (flask maintenance --full-vacuum)
+            return {'skipped': 'auto_vacuum is not incremental', 'free_bytes': _free_bytes(connection)}
+        before = _database_bytes(connection)
+        while _pragma(connection, 'freelist_count'):
+            step()
+            connection.exec_driver_sql(f'PRAGMA incremental_vacuum({self.vacuum_pages})')
+        return {'bytes_reclaimed': before - _database_bytes(connection)}
+    
+    def _checkpoint(self, connection, step: Callable[[], None]) -> Dict:
+        if str(_pragma(connection, 'journal_mode')).lower() != 'wal':
+            return {'skipped': 'not in WAL mode'}
+        step()
+        # PASSIVE never waits on readers or writers; frames still in use are left for the next run
+        busy, frames, checkpointed = connection.exec_driver_sql('PRAGMA wal_checkpoint(PASSIVE)').one()
+        return {'wal_frames': frames, 'checkpointed_frames': checkpointed, 'busy': bool(busy)}
+
+def _pragma(connection, name: str):
+    return connection.exec_driver_sql(f'PRAGMA {name}').scalar()
+
+def _database_bytes(connection) -> int:
+    return _pragma(connection, 'page_count') * _pragma(connection, 'page_size')
+
+def _free_bytes(connection) -> int:
+    return _pragma(connection, 'freelist_count') * _pragma(connection, 'page_size')
+
+def full_vacuum(app) -> int:
+    """Rebuild the database file in incremental auto-vacuum mode; returns bytes reclaimed. Blocks all writers."""
+    with app.app_context():
+        with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            before = _database_bytes(connection)
+            connection.exec_driver_sql('PRAGMA auto_vacuum=INCREMENTAL')
+            connection.exec_driver_sql('VACUUM')
+            return before - _database_bytes(connection)
+
+def get_maintenance_scheduler(app) -> MaintenanceScheduler:
+    return app.extensions['db_maintenance']
+
+def register_maintenance(app):
+    """Create the app's maintenance scheduler and start it when enabled."""
+    with app.app_context():
+        engine = db.engine
+    
+    if engine.dialect.name == 'sqlite':
+        @event.listens_for(engine, 'connect')
+        def enable_incremental_vacuum(dbapi_connection, connection_record):
+            # Only takes effect for a new database file, before its first table is created
+            dbapi_connection.execute('PRAGMA auto_vacuum=INCREMENTAL')
+    
+    activity = ActivityTracker()
+    scheduler = MaintenanceScheduler(
+        app,
+        activity=activity,
+        interval=app.config.get('MAINTENANCE_INTERVAL', 3600),
+        windows=parse_windows(app.config.get('MAINTENANCE_WINDOWS')),
+        idle_seconds=app.config.get('MAINTENANCE_IDLE_SECONDS', 5),
+        batch_size=app.config.get('MAINTENANCE_BATCH_SIZE', 1000),
+        vacuum_pages=app.config.get('MAINTENANCE_VACUUM_PAGES', 256)
+    )
+    app.extensions['db_maintenance'] = scheduler
+    # Follows the request instrumentation hooks rather than adding another pair
+    add_request_listener(app, activity.begin, activity.end)
+    
+    if app.config.get('MAINTENANCE_ENABLED', False):
+        scheduler.start()
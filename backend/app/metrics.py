@@ -0,0 +1,226 @@
+"""In-process metrics registry with Prometheus text exposition."""
+
+import bisect
+import threading
+
+# Latency buckets in seconds, tuned for an API whose requests sit between
+# sub-millisecond health checks and multi-second KML uploads.
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    body = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + body + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base class for labelled metrics."""
+    metric_type = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def _header(self):
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}"
+        ]
+
+    def render(self):
+        lines = self._header()
+        with self._lock:
+            items = sorted(self._values.items())
+        for labelvalues, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+    metric_type = 'counter'
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels=()):
+        return self._values.get(labels, 0)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, e.g. requests in flight."""
+    metric_type = 'gauge'
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, labels=(), amount=1):
+        self.inc(labels, -amount)
+
+    def set(self, value, labels=()):
+        with self._lock:
+            self._values[labels] = value
+
+    def value(self, labels=()):
+        return self._values.get(labels, 0)
+
+
+class _HistogramSeries:
+    __slots__ = ('bucket_counts', 'count', 'sum')
+
+    def __init__(self, size):
+        self.bucket_counts = [0] * size
+        self.count = 0
+        self.sum = 0.0
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; quantiles are estimated from bucket counts."""
+    metric_type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, labels=()):
+        # bisect_left keeps the Prometheus "le" (less than or equal) semantics
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = _HistogramSeries(len(self.buckets) + 1)
+            series.bucket_counts[position] += 1
+            series.count += 1
+            series.sum += value
+
+    def count(self, labels=()):
+        series = self._values.get(labels)
+        return series.count if series else 0
+
+    def quantile(self, q, labels=()):
+        """Estimate the q-quantile by linear interpolation inside the bucket."""
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None or series.count == 0:
+                return None
+            counts = list(series.bucket_counts)
+            total = series.count
+        rank = q * total
+        cumulative = 0
+        for position, bucket_count in enumerate(counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                if position == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[position - 1] if position else 0.0
+                upper = self.buckets[position]
+                return lower + (upper - lower) * ((rank - cumulative) / bucket_count)
+            cumulative += bucket_count
+        return self.buckets[-1]
+
+    def render(self):
+        lines = self._header()
+        with self._lock:
+            items = sorted(
+                (labels, list(series.bucket_counts), series.count, series.sum)
+                for labels, series in self._values.items()
+            )
+        bounds = self.buckets + (float('inf'),)
+        for labelvalues, counts, count, total in items:
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                label_text = _format_labels(self.labelnames, labelvalues, ('le', _format_value(float(bound))))
+                lines.append(f"{self.name}_bucket{label_text} {cumulative}")
+            label_text = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of named metrics rendered together at /metrics."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.metric_type}")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def reset(self):
+        """Clear recorded values while keeping metric definitions."""
+        for metric in list(self._metrics.values()):
+            metric.clear()
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].render())
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide registry; each worker process exposes its own values.
+metrics = MetricsRegistry()
+
+REQUEST_LATENCY = metrics.histogram(
+    'http_request_duration_seconds',
+    'HTTP request latency in seconds',
+    ('method', 'endpoint')
+)
+REQUEST_COUNT = metrics.counter(
+    'http_requests_total',
+    'Total HTTP requests',
+    ('method', 'endpoint', 'status')
+)
+REQUESTS_IN_FLIGHT = metrics.gauge(
+    'http_requests_in_flight',
+    'HTTP requests currently being processed',
+    ('endpoint',)
+)
@@ -1,7 +1,9 @@
 """Middleware functions for the application."""
 
-from flask import request, g
-import time
+from flask import request, g, Response
+from time import perf_counter_ns
+from app.metrics import metrics, REQUEST_LATENCY, REQUEST_COUNT, REQUESTS_IN_FLIGHT
+from app.compression import register_response_compression
 
 def add_security_headers(app):
     """Add security headers to all responses."""
@@ -37,25 +39,73 @@ def configure_cors(app):
     # Configure CORS with specific settings
     CORS(app, 
          origins=['http://localhost:3000', 'http://127.0.0.1:3000'],  # React dev server
-         methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
+         methods=['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'],
          allow_headers=['Content-Type', 'Authorization', 'X-Requested-With'],
          supports_credentials=True,
          max_age=86400  # 24 hours
     )
 
-def add_request_timing(app):
-    """Add request timing middleware."""
+def add_request_listener(app, on_start, on_end):
+    """
+    Call ``on_start()`` when the instrumentation hooks begin tracking a request
+    and ``on_end()`` once it is torn down, so other components can follow
+    request activity without registering hooks of their own.
+    """
+    app.extensions.setdefault('request_listeners', []).append((on_start, on_end))
+
+def add_request_instrumentation(app):
+    """Add request ID, timing, SQL accounting, metrics and access logging in a single pair of hooks."""
+    from app.utils.api_helpers import generate_request_id
+    from app.logging_config import log_access
+    from app.query_stats import start_request_accounting, finish_request_accounting
+    
+    listeners = app.extensions.setdefault('request_listeners', [])
     
     @app.before_request
-    def start_timer():
-        g.start_time = time.time()
+    def start_request():
+        incoming_id = request.headers.get('X-Request-ID')
+        request.request_id = incoming_id if incoming_id and len(incoming_id) <= 64 else generate_request_id()
+        # Label by URL rule rather than path so cardinality stays bounded
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        g.metrics_endpoint = endpoint
+        REQUESTS_IN_FLIGHT.inc((endpoint,))
+        for on_start, _ in listeners:
+            on_start()
+        start_request_accounting()
+        g.start_ns = perf_counter_ns()
     
     @app.after_request
-    def log_timing(response):
-        if hasattr(g, 'start_time'):
-            duration = time.time() - g.start_time
-            app.logger.debug(f"Request {request.method} {request.path} took {duration:.3f}s")
+    def finish_request(response):
+        start_ns = g.get('start_ns')
+        if start_ns is None:
+            return response
+        duration = (perf_counter_ns() - start_ns) / 1e9
+        endpoint = g.metrics_endpoint
+        
+        response.headers['X-Request-ID'] = request.request_id
+        response.headers['X-Processing-Time'] = f"{duration:.3f}s"
+        finish_request_accounting(response, endpoint)
+        
+        REQUEST_LATENCY.observe(duration, (request.method, endpoint))
+        REQUEST_COUNT.inc((request.method, endpoint, str(response.status_code)))
+        log_access(request, response, duration)
         return response
+    
+    @app.teardown_request
+    def end_request(exc):
+        # Runs even when a response could not be produced, so the gauge never leaks
+        endpoint = g.pop('metrics_endpoint', None)
+        if endpoint is not None:
+            REQUESTS_IN_FLIGHT.dec((endpoint,))
+            for _, on_end in listeners:
+                on_end()
+
+def add_metrics_endpoint(app):
+    """Expose collected metrics in the Prometheus text format."""
+    
+    @app.route('/metrics')
+    def metrics_endpoint():
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 def add_health_check(app):
     """Add a simple health check endpoint."""
@@ -120,12 +170,12 @@ def register_middleware(app):
     configure_cors(app)
     
     # Utility middleware
-    add_request_timing(app)
+    add_request_instrumentation(app)
+    # Registered after instrumentation so its after_request hook runs first
+    # and access logs see the compressed size
+    register_response_compression(app)
     add_health_check(app)
+    add_metrics_endpoint(app)
     add_api_versioning(app)
     
-    # Request/response middleware from utils
-    from app.utils.middleware import add_request_middleware
-    add_request_middleware(app)
-    
     app.logger.info("Middleware registered successfully")
@@ -1,9 +1,25 @@
+import uuid
+from sqlalchemy.orm import object_session
 from app.database import db
 
+def new_revision():
+    return uuid.uuid4().hex
+
+def mark_missions_touched(session, mission_ids):
+    """Record missions whose cached payloads must be dropped when ``session`` commits"""
+    session.info.setdefault('touched_missions', set()).update(mission_ids)
+
 class Mission(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     kml_data = db.Column(db.Text, nullable=False)
+    # Set when waypoints were edited directly; kml_data is regenerated on download
+    kml_stale = db.Column(db.Boolean, nullable=False, default=False, server_default='0')
+    # Opaque token replaced whenever the mission's detail payload changes; used for ETags
+    revision = db.Column(db.String(32), nullable=False, default=new_revision, server_default='')
+    # SHA-256 of the uploaded KML, and the key that makes retried uploads return this mission
+    content_sha256 = db.Column(db.String(64), nullable=True)
+    upload_key = db.Column(db.String(64), nullable=True, unique=True, index=True)
     waypoints = db.relationship('Waypoint', backref='mission', lazy=True, cascade='all, delete-orphan')
     annotations = db.relationship('Annotation', backref='mission', lazy=True)
     no_fly_zones = db.relationship('NoFlyZone', backref='mission', lazy=True)
@@ -13,19 +29,30 @@ class Mission(db.Model):
             'id': self.id,
             'name': self.name,
             'kml_data': self.kml_data,
+            'kml_stale': bool(self.kml_stale),
             'waypoints': [waypoint.to_dict() for waypoint in self.waypoints],
             'waypoint_count': len(self.waypoints),
             'annotations': [annotation.to_dict() for annotation in self.annotations],
             'no_fly_zones': [no_fly_zone.to_dict() for no_fly_zone in self.no_fly_zones]
         }
+    
+    def touch(self):
+        """Mark the mission's detail payload as changed; cached payloads are dropped on commit"""
+        self.revision = new_revision()
+        session = object_session(self)
+        if session is not None and self.id is not None:
+            mark_missions_touched(session, (self.id,))
 
 class Waypoint(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    mission_id = db.Column(db.Integer, db.ForeignKey('mission.id'), nullable=False)
+    mission_id = db.Column(db.Integer, db.ForeignKey('mission.id'), nullable=False, index=True)
     latitude = db.Column(db.Float, nullable=False)
     longitude = db.Column(db.Float, nullable=False)
     altitude = db.Column(db.Float, nullable=True)
     index = db.Column(db.Integer, nullable=False)
+    # While the mission's KML is stale: position of the stored KML placemark this waypoint
+    # came from, or NULL for waypoints inserted since. Unused while the KML is current.
+    source_index = db.Column(db.Integer, nullable=True)
 
     def to_dict(self):
         return {
@@ -39,7 +66,7 @@ class Waypoint(db.Model):
 
 class Annotation(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    mission_id = db.Column(db.Integer, db.ForeignKey('mission.id'), nullable=False)
+    mission_id = db.Column(db.Integer, db.ForeignKey('mission.id'), nullable=False, index=True)
     latitude = db.Column(db.Float, nullable=False)
     longitude = db.Column(db.Float, nullable=False)
     note = db.Column(db.String(255), nullable=True)
@@ -55,14 +82,26 @@ class Annotation(db.Model):
 
 class NoFlyZone(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    mission_id = db.Column(db.Integer, db.ForeignKey('mission.id'), nullable=False)
+    mission_id = db.Column(db.Integer, db.ForeignKey('mission.id'), nullable=False, index=True)
+    # Canonical closed, counter-clockwise ring of [lon, lat] pairs as JSON (see app.utils.polygon)
     coordinates = db.Column(db.Text, nullable=False)
     note = db.Column(db.String(255), nullable=True)
+    # Derived from coordinates at write time; NULL only for rows not yet normalized
+    vertex_count = db.Column(db.Integer, nullable=True)
+    area_m2 = db.Column(db.Float, nullable=True)
+    min_latitude = db.Column(db.Float, nullable=True)
+    min_longitude = db.Column(db.Float, nullable=True)
+    max_latitude = db.Column(db.Float, nullable=True)
+    max_longitude = db.Column(db.Float, nullable=True)
 
     def to_dict(self):
+        has_bbox = self.min_latitude is not None
         return {
             'id': self.id,
             'mission_id': self.mission_id,
             'coordinates': self.coordinates,
-            'note': self.note
+            'note': self.note,
+            'vertex_count': self.vertex_count,
+            'area_m2': self.area_m2,
+            'bbox': [self.min_longitude, self.min_latitude, self.max_longitude, self.max_latitude] if has_bbox else None
         }
@@ -0,0 +1,51 @@
+"""
+SQLite FTS5 index over mission names and annotation / no-fly zone notes.
+
+``search_index`` is created with the other tables by ``db.create_all()`` (on
+SQLite only) and kept in sync by triggers, so every write path - ORM or
+set-based - updates it in the same transaction. Each source row maps to a
+fixed rowid (``id * 4 + kind``), which keeps trigger updates and deletes
+to a single rowid lookup.
+"""
+
+from sqlalchemy import DDL, event
+from app.database import db
+
+KIND_CODES = {'mission': 1, 'annotation': 2, 'no_fly_zone': 3}
+
+SEARCH_TABLE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+    "body, kind UNINDEXED, mission_id UNINDEXED, tokenize = 'porter unicode61')"
+)
+
+def _note_triggers(table: str, kind: str) -> list:
+    rowid = f"{{row}}.id * 4 + {KIND_CODES[kind]}"
+    insert_note = (
+        f"INSERT INTO search_index (rowid, body, kind, mission_id) "
+        f"SELECT {rowid.format(row='new')}, new.note, '{kind}', new.mission_id "
+        f"WHERE new.note IS NOT NULL AND new.note != '';"
+    )
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN {insert_note} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE OF note, mission_id ON {table} BEGIN "
+        f"DELETE FROM search_index WHERE rowid = {rowid.format(row='old')}; {insert_note} END",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN "
+        f"DELETE FROM search_index WHERE rowid = {rowid.format(row='old')}; END",
+    ]
+
+SEARCH_TRIGGERS_DDL = [
+    "CREATE TRIGGER IF NOT EXISTS mission_search_insert AFTER INSERT ON mission BEGIN "
+    "INSERT INTO search_index (rowid, body, kind, mission_id) VALUES (new.id * 4 + 1, new.name, 'mission', new.id); END",
+    "CREATE TRIGGER IF NOT EXISTS mission_search_update AFTER UPDATE OF name ON mission BEGIN "
+    "UPDATE search_index SET body = new.name WHERE rowid = new.id * 4 + 1; END",
+    "CREATE TRIGGER IF NOT EXISTS mission_search_delete AFTER DELETE ON mission BEGIN "
+    "DELETE FROM search_index WHERE rowid = old.id * 4 + 1; END",
+    *_note_triggers('annotation', 'annotation'),
+    *_note_triggers('no_fly_zone', 'no_fly_zone'),
+]
+
+SEARCH_DDL = [SEARCH_TABLE_DDL, *SEARCH_TRIGGERS_DDL]
+
+for statement in SEARCH_DDL:
+    event.listen(db.metadata, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+event.listen(db.metadata, 'before_drop', DDL('DROP TABLE IF EXISTS search_index').execute_if(dialect='sqlite'))
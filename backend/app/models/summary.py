@@ -0,0 +1,43 @@
+from datetime import datetime
+from app.database import db
+
+class MissionSummary(db.Model):
+    """
+    Denormalized per-mission aggregates for list and dashboard views.
+    
+    Maintained by the MissionService write paths in the same transaction as
+    the change it reflects; rebuilt from the source tables with
+    ``flask rebuild-summaries``.
+    """
+    __tablename__ = 'mission_summary'
+    
+    mission_id = db.Column(db.Integer, db.ForeignKey('mission.id'), primary_key=True)
+    name = db.Column(db.String(100), nullable=False, index=True)
+    waypoint_count = db.Column(db.Integer, nullable=False, default=0)
+    annotation_count = db.Column(db.Integer, nullable=False, default=0)
+    no_fly_zone_count = db.Column(db.Integer, nullable=False, default=0)
+    min_latitude = db.Column(db.Float, nullable=True)
+    min_longitude = db.Column(db.Float, nullable=True)
+    max_latitude = db.Column(db.Float, nullable=True)
+    max_longitude = db.Column(db.Float, nullable=True)
+    distance_m = db.Column(db.Float, nullable=False, default=0.0)
+    kml_stale = db.Column(db.Boolean, nullable=False, default=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    
+    mission = db.relationship(
+        'Mission', backref=db.backref('summary', uselist=False, lazy=True, cascade='all, delete-orphan')
+    )
+    
+    def to_dict(self):
+        has_bbox = self.min_latitude is not None
+        return {
+            'mission_id': self.mission_id,
+            'name': self.name,
+            'waypoint_count': self.waypoint_count,
+            'annotation_count': self.annotation_count,
+            'no_fly_zone_count': self.no_fly_zone_count,
+            'bbox': [self.min_longitude, self.min_latitude, self.max_longitude, self.max_latitude] if has_bbox else None,
+            'distance_m': round(self.distance_m, 1),
+            'kml_stale': bool(self.kml_stale),
+            'updated_at': self.updated_at.isoformat() + 'Z' if self.updated_at else None
+        }
@@ -0,0 +1,48 @@
+from datetime import datetime
+from app.database import db
+
+class KmlBlob(db.Model):
+    """Raw KML document stored once per distinct content and shared between versions."""
+    id = db.Column(db.Integer, primary_key=True)
+    sha256 = db.Column(db.String(64), nullable=False, unique=True)
+    content = db.Column(db.Text, nullable=False)
+
+class WaypointBlock(db.Model):
+    """Immutable, content-addressed run of packed waypoints (see app.utils.waypoint_blocks)."""
+    id = db.Column(db.Integer, primary_key=True)
+    sha256 = db.Column(db.String(64), nullable=False, unique=True)
+    count = db.Column(db.Integer, nullable=False)
+    data = db.Column(db.LargeBinary, nullable=False)
+
+class MissionVersion(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    mission_id = db.Column(db.Integer, db.ForeignKey('mission.id'), nullable=False, index=True)
+    parent_id = db.Column(db.Integer, db.ForeignKey('mission_version.id'), nullable=True)
+    number = db.Column(db.Integer, nullable=False)
+    label = db.Column(db.String(100), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    kml_blob_id = db.Column(db.Integer, db.ForeignKey('kml_blob.id'), nullable=False)
+    kml_stale = db.Column(db.Boolean, nullable=False, default=False)
+    # Comma-separated WaypointBlock IDs in path order
+    block_ids = db.Column(db.Text, nullable=False, default='')
+    waypoint_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    mission = db.relationship('Mission', backref=db.backref('versions', lazy=True, cascade='all, delete-orphan'))
+    kml_blob = db.relationship('KmlBlob', lazy=True)
+    
+    __table_args__ = (db.UniqueConstraint('mission_id', 'number'),)
+    
+    def block_id_list(self):
+        return [int(block_id) for block_id in self.block_ids.split(',')] if self.block_ids else []
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'mission_id': self.mission_id,
+            'parent_id': self.parent_id,
+            'number': self.number,
+            'label': self.label,
+            'created_at': self.created_at.isoformat() + 'Z' if self.created_at else None,
+            'waypoint_count': self.waypoint_count,
+            'block_count': len(self.block_id_list())
+        }
@@ -0,0 +1,303 @@
+"""
+Read-through cache for serialized mission payloads.
+
+Two tiers sit in front of the mission payload builders:
+
+- an in-process LRU bounded by payload size and TTL, holding ready-to-use
+  dicts (or JSON text, for payloads built already encoded);
+- an optional SQLite file (``PAYLOAD_CACHE_SHARED_PATH``) shared by every
+  worker on the host, holding the JSON bytes. A local miss that hits the
+  shared tier is promoted into the local one.
+
+Entries are stored with the mission ``revision`` they were built from and only
+returned for a matching revision, so a worker never serves a payload older
+than the database even if another worker's invalidation has not reached it.
+Writes invalidate precisely: ``Mission.touch()`` records the mission in the
+session and, once the transaction commits, its entries are dropped from both
+tiers.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CACHE_REQUESTS = metrics.counter(
+    'payload_cache_requests_total', 'Payload cache lookups', ('tier', 'result')
+)
+CACHE_EVICTIONS = metrics.counter(
+    'payload_cache_evictions_total', 'Payload cache entries removed', ('tier', 'reason')
+)
+CACHE_BYTES = metrics.gauge(
+    'payload_cache_bytes', 'Payload bytes held by the in-process tier', ()
+)
+
+def _encode(payload: Dict) -> bytes:
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+class LocalTier:
+    """Thread-safe LRU of payload dicts, bounded by encoded size in bytes and by age."""
+    
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (revision, payload, size, expires_at)
+        self._size = 0
+        self._lock = threading.Lock()
+    
+    def get(self, key, revision: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != revision or entry[3] <= time.monotonic():
+                self._remove(key)
+                CACHE_EVICTIONS.inc(('local', 'stale' if entry[0] != revision else 'ttl'))
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+    
+    def set(self, key, revision: str, payload: Dict, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        evicted = 0
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (revision, payload, size, time.monotonic() + self.ttl)
+            self._size += size
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                evicted += 1
+        if evicted:
+            CACHE_EVICTIONS.inc(('local', 'size'), evicted)
+    
+    def delete(self, key) -> None:
+        with self._lock:
+            if self._remove(key):
+                CACHE_EVICTIONS.inc(('local', 'invalidated'))
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            CACHE_BYTES.set(0)
+    
+    def _remove(self, key) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._size -= entry[2]
+        CACHE_BYTES.set(self._size)
+        return True
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    @property
+    def size(self) -> int:
+        return self._size
+
+class SharedTier:
+    """
+    SQLite-backed cache file shared by the workers on a host.
+    
+    Each thread uses its own connection in WAL mode with the file memory-mapped,
+    so readers never block each other. When the file grows past ``max_bytes``, expired entries and
+    then the oldest ones are deleted. Errors are logged and treated as misses;
+    the cache must never fail a request.
+    """
+    
+    def __init__(self, path: str, max_bytes: int, ttl: float):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._local = threading.local()
+    
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=1.0, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            # Reads are served from a shared memory mapping of the file
+            connection.execute(f'PRAGMA mmap_size={self.max_bytes * 2}')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS payload_cache ('
+                'key TEXT PRIMARY KEY, revision TEXT NOT NULL, value BLOB NOT NULL, '
+                'size INTEGER NOT NULL, stored_at REAL NOT NULL, expires_at REAL NOT NULL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS ix_payload_cache_stored_at ON payload_cache (stored_at)')
+            self._local.connection = connection
+        return connection
+    
+    def get(self, key: str, revision: str) -> Optional[bytes]:
+        try:
+            row = self._connection().execute(
+                'SELECT value FROM payload_cache WHERE key = ? AND revision = ? AND expires_at > ?',
+                (key, revision, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Shared payload cache read failed: {e}")
+            return None
+        return row[0] if row else None
+    
+    def set(self, key: str, revision: str, value: bytes) -> None:
+        now = time.time()
+        try:
+            connection = self._connection()
+            connection.execute(
+                'INSERT OR REPLACE INTO payload_cache (key, revision, value, size, stored_at, expires_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, revision, value, len(value), now, now + self.ttl)
+            )
+            total = connection.execute('SELECT total(size) FROM payload_cache').fetchone()[0]
+            if total > self.max_bytes:
+                self._trim(connection, total, now)
+        except sqlite3.Error as e:
+            logger.warning(f"Shared payload cache write failed: {e}")
+    
+    def _trim(self, connection: sqlite3.Connection, total: float, now: float) -> None:
+        expired = connection.execute('DELETE FROM payload_cache WHERE expires_at <= ?', (now,)).rowcount
+        if expired > 0:
+            CACHE_EVICTIONS.inc(('shared', 'ttl'), expired)
+            total = connection.execute('SELECT total(size) FROM payload_cache').fetchone()[0]
+        
+        oldest = []
+        for key, size in connection.execute('SELECT key, size FROM payload_cache ORDER BY stored_at'):
+            if total <= self.max_bytes:
+                break
+            oldest.append((key,))
+            total -= size
+        if oldest:
+            connection.executemany('DELETE FROM payload_cache WHERE key = ?', oldest)
+            CACHE_EVICTIONS.inc(('shared', 'size'), len(oldest))
+    
+    def delete(self, key: str) -> None:
+        try:
+            if self._connection().execute('DELETE FROM payload_cache WHERE key = ?', (key,)).rowcount:
+                CACHE_EVICTIONS.inc(('shared', 'invalidated'))
+        except sqlite3.Error as e:
+            logger.warning(f"Shared payload cache delete failed: {e}")
+    
+    def clear(self) -> None:
+        try:
+            self._connection().execute('DELETE FROM payload_cache')
+        except sqlite3.Error as e:
+            logger.warning(f"Shared payload cache clear failed: {e}")
+
+class PayloadCache:
+    """Local tier in front of an optional shared tier."""
+    
+    def __init__(self, local: LocalTier, shared: Optional[SharedTier] = None):
+        self.local = local
+        self.shared = shared
+    
+    def get_or_build(self, key: str, revision: str, build: Callable[[], Dict]) -> Dict:
+        """Return the cached payload for ``key`` at ``revision``, building and storing it on a miss."""
+        payload = self.local.get(key, revision)
+        if payload is not None:
+            CACHE_REQUESTS.inc(('local', 'hit'))
+            return payload
+        CACHE_REQUESTS.inc(('local', 'miss'))
+        
+        if self.shared is not None:
+            encoded = self.shared.get(key, revision)
+            if encoded is not None:
+                CACHE_REQUESTS.inc(('shared', 'hit'))
+                payload = json.loads(encoded)
+                self.local.set(key, revision, payload, len(encoded))
+                return payload
+            CACHE_REQUESTS.inc(('shared', 'miss'))
+        
+        payload = build()
+        encoded = _encode(payload)
+        self.local.set(key, revision, payload, len(encoded))
+        if self.shared is not None:
+            self.shared.set(key, revision, encoded)
+        return payload
+    
+    def get_or_build_json(self, key: str, revision: str, build: Callable[[], str]) -> str:
+        """Like ``get_or_build``, for a payload that is already encoded as JSON text"""
+        text = self.local.get(key, revision)
+        if text is not None:
+            CACHE_REQUESTS.inc(('local', 'hit'))
+            return text
+        CACHE_REQUESTS.inc(('local', 'miss'))
+        
+        if self.shared is not None:
+            encoded = self.shared.get(key, revision)
+            if encoded is not None:
+                CACHE_REQUESTS.inc(('shared', 'hit'))
+                text = bytes(encoded).decode('utf-8')
+                self.local.set(key, revision, text, len(encoded))
+                return text
+            CACHE_REQUESTS.inc(('shared', 'miss'))
+        
+        text = build()
+        encoded = text.encode('utf-8')
+        self.local.set(key, revision, text, len(encoded))
+        if self.shared is not None:
+            self.shared.set(key, revision, encoded)
+        return text
+    
+    def invalidate(self, key: str) -> None:
+        self.local.delete(key)
+        if self.shared is not None:
+            self.shared.delete(key)
+    
+    def clear(self) -> None:
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+# Payloads derived from a mission; each is cached under '<payload>:<mission id>'
+# and dropped when the mission is touched
+MISSION_PAYLOADS = ['mission']
+
+def mission_key(mission_id: int, payload: str = 'mission') -> str:
+    return f'{payload}:{mission_id}'
+
+def register_mission_payload(payload: str) -> None:
+    """Declare another cached per-mission payload so writes invalidate it too"""
+    if payload not in MISSION_PAYLOADS:
+        MISSION_PAYLOADS.append(payload)
+
+def get_payload_cache() -> Optional[PayloadCache]:
+    """The current app's payload cache, or None outside an app context or when disabled."""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('payload_cache')
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_touched_missions(session):
+    touched = session.info.pop('touched_missions', None)
+    cache = get_payload_cache()
+    if touched and cache is not None:
+        for mission_id in touched:
+            for payload in MISSION_PAYLOADS:
+                cache.invalidate(mission_key(mission_id, payload))
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_touched_missions(session):
+    session.info.pop('touched_missions', None)
+
+def register_payload_cache(app):
+    """Create the app's payload cache from configuration."""
+    if not app.config.get('PAYLOAD_CACHE_ENABLED', True):
+        return
+    ttl = app.config.get('PAYLOAD_CACHE_TTL', 300)
+    shared_path = app.config.get('PAYLOAD_CACHE_SHARED_PATH')
+    app.extensions['payload_cache'] = PayloadCache(
+        LocalTier(app.config.get('PAYLOAD_CACHE_MAX_BYTES', 64 * 1024 * 1024), ttl),
+        SharedTier(shared_path, app.config.get('PAYLOAD_CACHE_SHARED_MAX_BYTES', 256 * 1024 * 1024), ttl)
+        if shared_path else None
+    )
@@ -0,0 +1,139 @@
+"""Per-request SQL query accounting and slow-query logging."""
+
+import logging
+from time import perf_counter_ns
+from flask import g, request, has_app_context, has_request_context
+from sqlalchemy import event
+from app.database import db
+from app.metrics import metrics
+
+slow_query_logger = logging.getLogger('app.sql.slow')
+
+# Bounds on what a slow-query log line copies from the bound parameters
+MAX_PARAMETER_CHARS = 100
+MAX_PARAMETER_ROWS = 3
+MAX_PARAMETER_VALUES = 20
+
+QUERIES_PER_REQUEST = metrics.histogram(
+    'db_queries_per_request',
+    'SQL statements executed per HTTP request',
+    ('endpoint',),
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+)
+DB_TIME_PER_REQUEST = metrics.histogram(
+    'db_time_per_request_seconds',
+    'Time spent executing SQL per HTTP request',
+    ('endpoint',)
+)
+SLOW_QUERIES = metrics.counter(
+    'db_slow_queries_total',
+    'SQL statements slower than SQL_SLOW_QUERY_MS'
+)
+
+def register_query_instrumentation(app):
+    """Attach cursor execution hooks to the app's engine."""
+    with app.app_context():
+        engine = db.engine
+    
+    slow_threshold_ns = int(app.config.get('SQL_SLOW_QUERY_MS', 100) * 1_000_000)
+    explain_slow = app.config.get('SQL_EXPLAIN_SLOW_QUERIES', True)
+    
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_ns', []).append(perf_counter_ns())
+    
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ns = perf_counter_ns() - conn.info['query_start_ns'].pop()
+        
+        if has_app_context() and 'db_query_count' in g:
+            g.db_query_count += 1
+            g.db_time_ns += elapsed_ns
+        
+        if elapsed_ns >= slow_threshold_ns:
+            SLOW_QUERIES.inc()
+            plan = _explain(conn, statement, parameters) if explain_slow and not executemany else None
+            slow_query_logger.warning(
+                "Slow query (%.1fms): %s\nParameters: %s\nPlan:\n%s",
+                elapsed_ns / 1e6, statement, summarize_parameters(parameters, executemany), plan or 'n/a',
+                extra={
+                    'duration_ms': round(elapsed_ns / 1e6, 3),
+                    'statement': statement,
+                    'request_id': getattr(request, 'request_id', None) if has_request_context() else None
+                }
+            )
+    
+    @event.listens_for(engine, 'handle_error')
+    def handle_error(context):
+        # after_cursor_execute does not run for a failed statement, so drop its start time here
+        stack = context.connection.info.get('query_start_ns') if context.connection is not None else None
+        if stack:
+            stack.pop()
+
+def summarize_parameters(parameters, executemany: bool = False) -> str:
+    """
+    Describe bound parameters for the log without copying them in full
+    
+    Each value is cut to ``MAX_PARAMETER_CHARS`` characters (with its type and
+    length when cut). Only the first ``MAX_PARAMETER_VALUES`` values of a row
+    and the first ``MAX_PARAMETER_ROWS`` rows of an ``executemany`` batch are
+    shown, with counts of the rest.
+    """
+    if not executemany:
+        return _summarize_row(parameters)
+    rows = list(parameters[:MAX_PARAMETER_ROWS])
+    shown = '; '.join(_summarize_row(row) for row in rows)
+    more = f'; ... {len(parameters) - len(rows)} more' if len(parameters) > len(rows) else ''
+    return f'{len(parameters)} rows: {shown}{more}'
+
+def _summarize_row(row) -> str:
+    if isinstance(row, dict):
+        values = [f'{key}={_summarize_value(value)}' for key, value in list(row.items())[:MAX_PARAMETER_VALUES]]
+    elif isinstance(row, (list, tuple)):
+        values = [_summarize_value(value) for value in row[:MAX_PARAMETER_VALUES]]
+    else:
+        return _summarize_value(row)
+    if len(row) > len(values):
+        values.append(f'... {len(row) - len(values)} more')
+    return f"{len(row)} parameters ({', '.join(values)})"
+
+def _summarize_value(value) -> str:
+    text = repr(value)
+    if len(text) <= MAX_PARAMETER_CHARS:
+        return text
+    size = f' of length {len(value)}' if hasattr(value, '__len__') else ''
+    return f'{text[:MAX_PARAMETER_CHARS]}... ({type(value).__name__}{size})'
+
+def _explain(conn, statement, parameters):
+    """
+    Return the query plan for a read statement.
+    
+    Runs on the raw DBAPI connection so the EXPLAIN itself is not counted or
+    re-logged. Writes are skipped because EXPLAIN may execute them on some backends.
+    """
+    if not statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return None
+    prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+    try:
+        cursor = conn.connection.driver_connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters)
+            return '\n'.join(' | '.join(str(column) for column in row) for row in cursor.fetchall())
+        finally:
+            cursor.close()
+    except Exception as e:
+        return f"EXPLAIN failed: {e}"
+
+def start_request_accounting():
+    """Reset the per-request counters (called from the instrumentation middleware)."""
+    g.db_query_count = 0
+    g.db_time_ns = 0
+
+def finish_request_accounting(response, endpoint):
+    """Expose the request's SQL usage as headers and metrics."""
+    query_count = g.get('db_query_count', 0)
+    db_time = g.get('db_time_ns', 0) / 1e9
+    response.headers['X-DB-Query-Count'] = str(query_count)
+    response.headers['X-DB-Time'] = f"{db_time:.3f}s"
+    QUERIES_PER_REQUEST.observe(query_count, (endpoint,))
+    DB_TIME_PER_REQUEST.observe(db_time, (endpoint,))
@@ -0,0 +1,16 @@
+from flask import Blueprint, request
+from app.services.deconfliction_service import DeconflictionService
+from app.utils.api_helpers import api_response
+
+bp = Blueprint('deconfliction', __name__, url_prefix='/api/deconfliction')
+
+@bp.route('', methods=['POST'])
+def check_schedule():
+    data = request.get_json(silent=True) or {}
+    result = DeconflictionService.check(
+        data.get('flights'),
+        horizontal_m=data.get('horizontal_m'),
+        vertical_m=data.get('vertical_m'),
+        step_s=data.get('step_s')
+    )
+    return api_response(data=result, meta={'conflict_count': len(result['conflicts'])})
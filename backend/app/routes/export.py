@@ -0,0 +1,18 @@
+from flask import Blueprint, request, Response, stream_with_context
+from app.services.export_service import ExportService, FORMATS, DEFAULT_BATCH_SIZE
+from app.utils.api_helpers import parse_id_list
+
+bp = Blueprint('export', __name__, url_prefix='/api/export')
+
+@bp.route('/<table>', methods=['GET'])
+def export_table(table):
+    format = request.args.get('format', 'parquet')
+    batch_size = request.args.get('batch_size', DEFAULT_BATCH_SIZE, type=int)
+    ExportService.validate(table, format, batch_size)
+    mimetype, extension = FORMATS[format]
+    chunks = ExportService.stream(table, format, parse_id_list('mission_ids'), batch_size)
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename="{table}.{extension}"'}
+    )
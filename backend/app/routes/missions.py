@@ -1,21 +1,57 @@
-from flask import Blueprint, request
+from contextlib import nullcontext
+from flask import Blueprint, request, Response, stream_with_context
+from werkzeug.exceptions import RequestEntityTooLarge
 from app.services.mission_service import MissionService
-from app.errors import ValidationError
-from app.utils.api_helpers import api_response
+from app.services.version_service import VersionService
+from app.services.summary_service import SummaryService
+from app.services.terrain_service import TerrainService
+from app.services.playback_service import PlaybackService, FORMATS as PLAYBACK_FORMATS
+from app.services.coverage_service import CoverageService
+from app.services.mission_diff_service import MissionDiffService
+from app.errors import APIError, ValidationError
+from app.utils.api_helpers import api_response, raw_api_response, parse_id_list
+from app.utils import waypoint_codec
+from app.compression import cached_response
+from app.admission import parse_slot, upload_limit
 
 bp = Blueprint('missions', __name__, url_prefix='/api/missions')
 
 @bp.route('/', methods=['GET'])
 def get_missions():
-    missions = MissionService.get_all_missions()
-    return api_response(data=missions)
+    return raw_api_response(MissionService.get_all_missions_json())
+
+@bp.route('/summary', methods=['GET'])
+def list_mission_summaries():
+    page = SummaryService.list_summaries(
+        sort=request.args.get('sort', 'updated_at'),
+        order=request.args.get('order', 'desc'),
+        limit=request.args.get('limit', 100, type=int),
+        offset=request.args.get('offset', 0, type=int)
+    )
+    return api_response(data=page.pop('items'), meta=page)
 
 @bp.route('/<int:id>', methods=['GET'])
 def get_mission(id):
-    mission = MissionService.get_mission_by_id(id)
-    return api_response(data=mission)
+    revision = MissionService.get_mission_revision(id)
+    # JSON unless the client asks for the binary waypoint encoding (JSON wins ties such as */*)
+    mimetype = request.accept_mimetypes.best_match(['application/json', waypoint_codec.MIMETYPE], 'application/json')
+    binary = mimetype == waypoint_codec.MIMETYPE
+    etag = f'mission-{id}-{revision}' + ('-bin' if binary else '')
+    cached = cached_response(etag, mimetype)
+    if cached is None:
+        if binary:
+            payload = MissionService.get_mission_by_id(id, revision)
+            response = Response(waypoint_codec.encode_mission(payload), mimetype=mimetype)
+        else:
+            response = raw_api_response(MissionService.get_mission_json(id, revision))
+        response.set_etag(etag, weak=True)
+    else:
+        response = cached
+    response.vary.add('Accept')
+    return response
 
 @bp.route('/', methods=['POST'])
+@upload_limit
 def create_mission():
     try:
         # Check if request contains file upload
@@ -38,31 +74,127 @@ def create_mission():
         # Read KML file content
         kml_content = file.read().decode('utf-8')
         
+        # Retried uploads are answered from the unique upload key, before waiting for a parse slot
+        keys = MissionService.upload_keys(mission_name, kml_content, request.headers.get('Idempotency-Key'))
+        existing = MissionService.find_upload(keys)
+        if existing is not None:
+            return api_response(data=existing, message="Mission already uploaded")
+        
         # Create mission using service
-        result = MissionService.create_mission_from_kml(mission_name, kml_content)
+        with parse_slot():
+            result = MissionService.create_mission_from_kml(mission_name, kml_content, keys)
         
-        return api_response(data=result, status_code=201)
+        return api_response(data=result, status_code=200 if result.get('replayed') else 201)
         
-    except ValidationError:
+    except (APIError, RequestEntityTooLarge):
         raise
     except Exception as e:
         raise ValidationError(f"Failed to process request: {str(e)}")
 
 @bp.route('/<int:id>', methods=['PUT'])
+@upload_limit
 def update_mission(id):
     data = request.get_json()
-    mission = MissionService.update_mission(
-        id, 
-        name=data.get('name'), 
-        kml_data=data.get('kml_data')
-    )
+    kml_data = data.get('kml_data')
+    # Only a new KML is parsed; renames never wait for a parse slot
+    with parse_slot() if kml_data else nullcontext():
+        mission = MissionService.update_mission(
+            id, 
+            name=data.get('name'), 
+            kml_data=kml_data
+        )
     return api_response(data=mission)
 
+@bp.route('/<int:id>/kml', methods=['GET'])
+def download_mission_kml(id):
+    name, kml = MissionService.get_mission_kml(id)
+    filename = ''.join(c if c.isalnum() or c in '-_' else '_' for c in name) or f'mission_{id}'
+    return Response(
+        kml,
+        mimetype='application/vnd.google-earth.kml+xml',
+        headers={'Content-Disposition': f'attachment; filename="{filename}.kml"'}
+    )
+
+@bp.route('/<int:mission_id>/waypoints', methods=['PATCH'])
+def edit_waypoints(mission_id):
+    data = request.get_json(silent=True) or {}
+    result = MissionService.edit_waypoints(mission_id, data.get('operations'))
+    return api_response(data=result)
+
+@bp.route('/<int:mission_id>/terrain', methods=['GET'])
+def get_terrain_profile(mission_id):
+    profile = TerrainService.get_clearance_profile(mission_id, request.args.get('interval', type=float))
+    return api_response(data=profile)
+
+@bp.route('/<int:mission_id>/playback', methods=['GET'])
+def stream_playback(mission_id):
+    format = request.args.get('format', 'ndjson')
+    messages = PlaybackService.stream(
+        mission_id, format, request.args.get('step', 1.0, type=float), request.args.get('chunk', type=int)
+    )
+    return Response(
+        stream_with_context(messages),
+        mimetype=PLAYBACK_FORMATS[format],
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@bp.route('/<int:mission_id>/diff/<int:other_id>', methods=['GET'])
+def diff_missions(mission_id, other_id):
+    diff = MissionDiffService.diff_missions(mission_id, other_id, request.args.get('radius', type=float))
+    return api_response(data=diff)
+
+@bp.route('/<int:mission_id>/coverage', methods=['GET'])
+def get_coverage(mission_id):
+    footprint = CoverageService.get_coverage(
+        mission_id,
+        fov_deg=request.args.get('fov', type=float),
+        swath_m=request.args.get('swath', type=float),
+        resolution_m=request.args.get('resolution', type=float),
+        target=request.args.get('target')
+    )
+    return api_response(data=footprint)
+
+@bp.route('/<int:mission_id>/versions', methods=['GET'])
+def list_versions(mission_id):
+    return api_response(data=VersionService.list_versions(mission_id))
+
+@bp.route('/<int:mission_id>/versions', methods=['POST'])
+def create_version(mission_id):
+    data = request.get_json(silent=True) or {}
+    version = VersionService.create_version(
+        mission_id,
+        label=data.get('label'),
+        from_version_id=data.get('from_version')
+    )
+    return api_response(data=version, status_code=201)
+
+@bp.route('/<int:mission_id>/versions/<int:from_version>/diff/<int:to_version>', methods=['GET'])
+def diff_versions(mission_id, from_version, to_version):
+    return api_response(data=VersionService.diff_versions(mission_id, from_version, to_version))
+
+@bp.route('/<int:mission_id>/versions/<int:version_id>/restore', methods=['POST'])
+def restore_version(mission_id, version_id):
+    return api_response(data=VersionService.restore_version(mission_id, version_id))
+
+@bp.route('/<int:mission_id>/versions/<int:version_id>/clone', methods=['POST'])
+def clone_version(mission_id, version_id):
+    data = request.get_json(silent=True) or {}
+    clone = VersionService.clone_version(mission_id, version_id, name=data.get('name'))
+    return api_response(data=clone, status_code=201)
+
 @bp.route('/<int:id>', methods=['DELETE'])
 def delete_mission(id):
     MissionService.delete_mission(id)
     return api_response(message='Mission deleted successfully')
 
+@bp.route('/', methods=['DELETE'])
+def delete_missions():
+    mission_ids = parse_id_list('ids')
+    if not mission_ids:
+        raise ValidationError("ids is required (e.g. ?ids=1,2,3)")
+    result = MissionService.delete_missions(mission_ids)
+    return api_response(data=result, message=f"Deleted {len(result['deleted'])} missions")
+
 @bp.route('/<int:mission_id>/annotations', methods=['POST'])
 def create_annotation(mission_id):
     data = request.get_json()
@@ -76,7 +208,9 @@ def create_annotation(mission_id):
 
 @bp.route('/<int:mission_id>/no_fly_zones', methods=['POST'])
 def create_no_fly_zone(mission_id):
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
+    if data.get('coordinates') is None:
+        raise ValidationError("coordinates is required")
     no_fly_zone = MissionService.create_no_fly_zone(
         mission_id=mission_id,
         coordinates=data['coordinates'],
@@ -0,0 +1,14 @@
+from flask import Blueprint, request
+from app.services.search_service import SearchService
+from app.utils.api_helpers import api_response
+
+bp = Blueprint('search', __name__, url_prefix='/api/search')
+
+@bp.route('', methods=['GET'])
+def search():
+    page = SearchService.search(
+        request.args.get('q', ''),
+        limit=request.args.get('limit', 20, type=int),
+        offset=request.args.get('offset', 0, type=int)
+    )
+    return api_response(data=page.pop('items'), meta=page)
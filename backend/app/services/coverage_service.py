@@ -0,0 +1,241 @@
+import json
+import math
+from typing import Dict, Optional
+import numpy as np
+from flask import current_app
+from sqlalchemy import select
+from app.database import db
+from app.models.mission import Waypoint
+from app.payload_cache import get_payload_cache, mission_key, register_mission_payload
+from app.services.mission_service import MissionService
+from app.utils import coverage
+from app.utils.polygon import normalize_ring, GeometryError
+from app.utils.trajectory import project_local
+from app.errors import ValidationError
+import logging
+
+logger = logging.getLogger(__name__)
+
+register_mission_payload('coverage')
+
+MIN_FOV_DEG, MAX_FOV_DEG = 1.0, 170.0
+MAX_SWATH_M = 10000.0
+MIN_RESOLUTION_M, MAX_RESOLUTION_M = 0.1, 100.0
+CELLS_PER_SWATH = 20  # default resolution, as a fraction of the narrowest swath
+
+class CoverageService:
+    """Ground footprints imaged along survey paths"""
+    
+    @staticmethod
+    def get_coverage(mission_id: int, fov_deg: Optional[float] = None, swath_m: Optional[float] = None,
+                     resolution_m: Optional[float] = None, target=None) -> Dict:
+        """
+        Union of the camera footprints along a mission's path, and its gaps over a target area
+        
+        Each leg images a strip ``swath_m`` wide, or ``2 * altitude * tan(fov_deg / 2)``
+        from the mean altitude of its waypoints. Altitudes are taken as heights
+        above the ground. The footprint is cached per mission revision and
+        camera parameters; only the comparison with ``target`` runs per request.
+        
+        Args:
+            mission_id: Mission to cover
+            fov_deg: Across-track camera field of view (``SURVEY_CAMERA_FOV_DEG``)
+            swath_m: Fixed swath width, instead of deriving it from altitude
+            resolution_m: Cell size; by default a twentieth of the narrowest swath,
+                coarsened to stay within ``SURVEY_MAX_CELLS``
+            target: Polygon the survey should cover, in any form accepted for no-fly zones
+        
+        Returns:
+            Dict: ``coverage`` (GeoJSON MultiPolygon) and its ``area_m2``, and with
+            a target, its area, the covered part and the ``gaps`` (MultiPolygon)
+        
+        Raises:
+            NotFoundError: If the mission does not exist
+            ValidationError: If a parameter or the target polygon is invalid
+        """
+        config = current_app.config
+        fov_deg = float(fov_deg if fov_deg is not None else config.get('SURVEY_CAMERA_FOV_DEG', 70))
+        if not MIN_FOV_DEG <= fov_deg <= MAX_FOV_DEG:
+            raise ValidationError(f"Field of view must be between {MIN_FOV_DEG:g} and {MAX_FOV_DEG:g} degrees")
+        if swath_m is not None and not 0 < swath_m <= MAX_SWATH_M:
+            raise ValidationError(f"Swath must be greater than 0 and at most {MAX_SWATH_M:g} metres")
+        if resolution_m is not None and not MIN_RESOLUTION_M <= resolution_m <= MAX_RESOLUTION_M:
+            raise ValidationError(
+                f"Resolution must be between {MIN_RESOLUTION_M:g} and {MAX_RESOLUTION_M:g} metres"
+            )
+        target_ring = None
+        min_resolution_m = None
+        if target is not None:
+            try:
+                target_ring = normalize_ring(target)
+            except GeometryError as e:
+                raise ValidationError(f"Invalid target polygon: {e}")
+            # The target is rasterized at the footprint's resolution, so its extent counts against SURVEY_MAX_CELLS too
+            min_resolution_m = CoverageService._target_resolution(target_ring, resolution_m)
+        
+        revision = MissionService.get_mission_revision(mission_id)
+        build = lambda: CoverageService._build_coverage(mission_id, fov_deg, swath_m, resolution_m, min_resolution_m)
+        cache = get_payload_cache()
+        if cache is None:
+            footprint = build()
+        else:
+            footprint = cache.get_or_build(
+                mission_key(mission_id, 'coverage'),
+                f'{revision}:{fov_deg:g}:{swath_m}:{resolution_m}:{min_resolution_m}', build
+            )
+        
+        result = {key: value for key, value in footprint.items() if key != 'raster'}
+        result['target'] = None if target_ring is None else CoverageService._compare(footprint['raster'], target_ring)
+        return result
+    
+    @staticmethod
+    def _target_resolution(target_ring: Dict, resolution_m: Optional[float]) -> Optional[float]:
+        """
+        Coarsest-needed resolution for the target's bounding box to fit in ``SURVEY_MAX_CELLS``
+        
+        Returns None when the target does not constrain the resolution. Raises
+        ValidationError when an explicit ``resolution_m`` is too fine for the
+        target, or when no resolution up to the maximum is coarse enough.
+        """
+        max_cells = current_app.config.get('SURVEY_MAX_CELLS', 4_000_000)
+        width, height = CoverageService._target_extent(target_ring)
+        cells = lambda resolution: (width / resolution + 2) * (height / resolution + 2)
+        if resolution_m is not None:
+            if cells(resolution_m) > max_cells:
+                raise ValidationError(
+                    f"Target too large: {cells(resolution_m):.0f} cells at {resolution_m:g} m exceeds "
+                    f"the limit of {max_cells}"
+                )
+            return None
+        # Rounded up to the centimetre, like the default resolution, until the target fits
+        resolution = max(math.ceil(math.sqrt(width * height / max_cells) * 100) / 100, MIN_RESOLUTION_M)
+        while cells(resolution) > max_cells and resolution <= MAX_RESOLUTION_M:
+            resolution = math.ceil(resolution * 110) / 100
+        if resolution > MAX_RESOLUTION_M:
+            raise ValidationError(
+                f"Target too large: more than {max_cells} cells even at {MAX_RESOLUTION_M:g} m resolution"
+            )
+        return resolution if cells(MIN_RESOLUTION_M) > max_cells else None
+    
+    @staticmethod
+    def _target_extent(target_ring: Dict):
+        """Width and height in metres of the target's bounding box, projected at its own mean latitude"""
+        points = np.array(json.loads(target_ring['coordinates']), dtype=np.float64)
+        x, y = project_local(points[:, 1], points[:, 0], float(np.mean(points[:, 1])))
+        return float(np.ptp(x)), float(np.ptp(y))
+    
+    @staticmethod
+    def _build_coverage(mission_id: int, fov_deg: float, swath_m: Optional[float],
+                        resolution_m: Optional[float], min_resolution_m: Optional[float] = None) -> Dict:
+        rows = db.session.execute(
+            select(Waypoint.latitude, Waypoint.longitude, Waypoint.altitude)
+            .where(Waypoint.mission_id == mission_id)
+            .order_by(Waypoint.index, Waypoint.id)
+        ).all()
+        latitudes = np.array([row[0] for row in rows], dtype=np.float64)
+        longitudes = np.array([row[1] for row in rows], dtype=np.float64)
+        altitudes = np.array([np.nan if row[2] is None else row[2] for row in rows], dtype=np.float64)
+        
+        if swath_m is not None:
+            swaths = np.full(max(len(rows) - 1, 0), swath_m)
+        else:
+            swaths = coverage.swath_widths((altitudes[:-1] + altitudes[1:]) / 2, fov_deg)
+        unknown = np.isnan(swaths)
+        swaths = np.where(unknown, 0.0, swaths)
+        reference_latitude = float(np.mean(latitudes)) if rows else 0.0
+        resolution_m = CoverageService._resolution(latitudes, longitudes, swaths, reference_latitude, resolution_m)
+        if min_resolution_m is not None:
+            resolution_m = max(resolution_m, min_resolution_m)
+        
+        covered = coverage.path_coverage(latitudes, longitudes, swaths, resolution_m, reference_latitude)
+        bounds, runs = covered['bounds'], covered['runs']
+        if bounds is None:
+            polygons, cell_count = [], 0
+        else:
+            polygons = coverage.trace_polygons(coverage.runs_to_mask(runs, bounds))
+            cell_count = int(np.sum(runs['ends'] - runs['starts'] + 1))
+        imaged = swaths[swaths > 0]
+        
+        return {
+            'mission_id': mission_id,
+            'fov_deg': None if swath_m is not None else fov_deg,
+            'swath_m': {
+                'min': round(float(imaged.min()), 2) if imaged.size else None,
+                'max': round(float(imaged.max()), 2) if imaged.size else None
+            },
+            'resolution_m': resolution_m,
+            'leg_count': int(swaths.size),
+            'legs_without_altitude': int(unknown.sum()),
+            'area_m2': round(cell_count * resolution_m ** 2, 1),
+            'polygon_count': len(polygons),
+            'coverage': coverage.polygons_to_geojson(
+                polygons, bounds[0] if bounds else 0, bounds[2] if bounds else 0, resolution_m, reference_latitude
+            ),
+            'raster': {
+                'reference_latitude': reference_latitude,
+                'resolution_m': resolution_m,
+                'rows': runs['rows'].tolist(),
+                'starts': runs['starts'].tolist(),
+                'ends': runs['ends'].tolist()
+            }
+        }
+    
+    @staticmethod
+    def _resolution(latitudes: np.ndarray, longitudes: np.ndarray, swaths: np.ndarray,
+                    reference_latitude: float, resolution_m: Optional[float]) -> float:
+        """Check an explicit resolution against ``SURVEY_MAX_CELLS``, or pick one within it"""
+        max_cells = current_app.config.get('SURVEY_MAX_CELLS', 4_000_000)
+        imaged = swaths[swaths > 0]
+        if imaged.size == 0:
+            return resolution_m or MAX_RESOLUTION_M
+        x, y = project_local(latitudes, longitudes, reference_latitude)
+        margin = float(imaged.max())
+        extent = (np.ptp(x) + margin) * (np.ptp(y) + margin)
+        if resolution_m is not None:
+            if extent / resolution_m ** 2 > max_cells:
+                raise ValidationError(
+                    f"Resolution too fine: {extent / resolution_m ** 2:.0f} cells exceeds the limit of {max_cells}"
+                )
+            return resolution_m
+        # Rounded up to the centimetre, so equal inputs give the same lattice
+        resolution = max(float(imaged.min()) / CELLS_PER_SWATH, math.sqrt(extent / max_cells), MIN_RESOLUTION_M)
+        return min(math.ceil(resolution * 100) / 100, MAX_RESOLUTION_M)
+    
+    @staticmethod
+    def _compare(raster: Dict, target_ring: Dict) -> Dict:
+        """Covered share of a target polygon, and the gaps left in it"""
+        resolution, reference_latitude = raster['resolution_m'], raster['reference_latitude']
+        points = np.array(json.loads(target_ring['coordinates']), dtype=np.float64)
+        x, y = project_local(points[:, 1], points[:, 0], reference_latitude)
+        # Checked again at the footprint's projection, before anything the size of the target is allocated
+        max_cells = current_app.config.get('SURVEY_MAX_CELLS', 4_000_000)
+        cells = (np.ptp(x) / resolution + 2) * (np.ptp(y) / resolution + 2)
+        if cells > max_cells:
+            raise ValidationError(
+                f"Target too large: {cells:.0f} cells at {resolution:g} m exceeds the limit of {max_cells}"
+            )
+        inside = coverage.rasterize_ring(x, y, resolution)
+        bounds = coverage.run_bounds(inside)
+        if bounds is None:
+            target_cells = covered_cells = 0
+            polygons = []
+        else:
+            target = coverage.runs_to_mask(inside, bounds)
+            covered = coverage.runs_to_mask(
+                {key: np.array(raster[key], dtype=np.int64) for key in ('rows', 'starts', 'ends')}, bounds
+            )
+            target_cells = int(target.sum())
+            covered_cells = int((target & covered).sum())
+            polygons = coverage.trace_polygons(target & ~covered)
+        area = target_cells * resolution ** 2
+        covered_area = covered_cells * resolution ** 2
+        return {
+            'area_m2': round(area, 1),
+            'covered_m2': round(covered_area, 1),
+            'covered_percent': round(100 * covered_area / area, 2) if area else None,
+            'gap_m2': round(area - covered_area, 1),
+            'gap_count': len(polygons),
+            'gaps': coverage.polygons_to_geojson(
+                polygons, bounds[0] if bounds else 0, bounds[2] if bounds else 0, resolution, reference_latitude
+            )
+        }
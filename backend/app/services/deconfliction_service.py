@@ -0,0 +1,133 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from flask import current_app
+from app.services.playback_service import PlaybackService, timeline_arrays
+from app.utils.deconfliction import find_conflicts, GridTooLargeError
+from app.errors import ValidationError
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAX_FLIGHTS = 100
+MIN_STEP_S, MAX_STEP_S = 0.1, 60.0
+MAX_SEPARATION_M = 10000.0
+
+def _number(name: str, value, default: float) -> float:
+    if value is None:
+        return float(default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValidationError(f"{name} must be a number")
+    return float(value)
+
+def _parse_time(value, position: int) -> float:
+    if not isinstance(value, str):
+        raise ValidationError(f"Flight {position}: start_time must be an ISO 8601 string")
+    try:
+        moment = datetime.fromisoformat(value.strip())
+    except ValueError:
+        raise ValidationError(f"Flight {position}: invalid start_time '{value}'")
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+def _format_time(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+class DeconflictionService:
+    """Separation checks between missions flown on a shared schedule"""
+    
+    @staticmethod
+    def check(flights: List[Dict], horizontal_m: Optional[float] = None, vertical_m: Optional[float] = None,
+              step_s: Optional[float] = None) -> Dict:
+        """
+        Find every time window in which two scheduled flights are closer than
+        both separation minimums
+        
+        Args:
+            flights: ``{'mission_id', 'start_time'}`` per flight (ISO 8601; UTC if
+                no offset is given). A mission may be scheduled more than once.
+            horizontal_m: Horizontal minimum (``DECONFLICTION_HORIZONTAL_M``)
+            vertical_m: Vertical minimum (``DECONFLICTION_VERTICAL_M``)
+            step_s: Time bucket length (``DECONFLICTION_STEP_S``)
+        
+        Returns:
+            Dict: The schedule with end times, and ``conflicts`` with their
+            flights, time window and closest approach
+        
+        Raises:
+            ValidationError: If the schedule or a parameter is invalid, or the
+                check would cover more than ``DECONFLICTION_MAX_CELLS`` grid cells
+            NotFoundError: If a mission does not exist
+        """
+        config = current_app.config
+        horizontal_m = _number('horizontal_m', horizontal_m, config.get('DECONFLICTION_HORIZONTAL_M', 50))
+        vertical_m = _number('vertical_m', vertical_m, config.get('DECONFLICTION_VERTICAL_M', 30))
+        step_s = _number('step_s', step_s, config.get('DECONFLICTION_STEP_S', 1))
+        if not isinstance(flights, list) or not 2 <= len(flights) <= MAX_FLIGHTS:
+            raise ValidationError(f"flights must be a list of 2 to {MAX_FLIGHTS} scheduled missions")
+        for name, value in (('horizontal_m', horizontal_m), ('vertical_m', vertical_m)):
+            if not 0 < value <= MAX_SEPARATION_M:
+                raise ValidationError(f"{name} must be greater than 0 and at most {MAX_SEPARATION_M:g}")
+        if not MIN_STEP_S <= step_s <= MAX_STEP_S:
+            raise ValidationError(f"Step must be between {MIN_STEP_S:g} and {MAX_STEP_S:g} seconds")
+        
+        schedule = []
+        for position, flight in enumerate(flights):
+            if not isinstance(flight, dict) or not isinstance(flight.get('mission_id'), int):
+                raise ValidationError(f"Flight {position}: mission_id must be an integer")
+            schedule.append((flight['mission_id'], _parse_time(flight.get('start_time'), position)))
+        
+        # Timelines are cached per mission revision, so repeated checks only redo the geometry
+        timelines = {mission_id: PlaybackService.get_timeline(mission_id) for mission_id, _ in schedule}
+        # Every segment takes at least one cell, so too many segments are rejected before any are built
+        max_cells = config.get('DECONFLICTION_MAX_CELLS', 5_000_000)
+        segment_count = sum(int(timelines[mission_id]['duration_s'] // step_s) + 2 for mission_id, _ in schedule)
+        if segment_count > max_cells:
+            raise ValidationError(
+                f"Step too small: {segment_count} flight segments exceeds the limit of {max_cells} grid cells"
+            )
+        arrays = {mission_id: timeline_arrays(payload) for mission_id, payload in timelines.items()}
+        try:
+            result = find_conflicts(
+                [{'start': start, 'timeline': arrays[mission_id]} for mission_id, start in schedule],
+                horizontal_m, vertical_m, step_s, max_cells
+            )
+        except GridTooLargeError as e:
+            raise ValidationError(f"Schedule too large to check: {e}")
+        
+        conflicts = []
+        for conflict in result['conflicts']:
+            closest = conflict['closest']
+            conflicts.append({
+                'flights': conflict['flights'],
+                'mission_ids': [schedule[position][0] for position in conflict['flights']],
+                'start_time': _format_time(conflict['start']),
+                'end_time': _format_time(conflict['end']),
+                'duration_s': round(conflict['end'] - conflict['start'], 3),
+                'closest': {
+                    'time': _format_time(closest['time']),
+                    'horizontal_m': round(closest['horizontal_m'], 2),
+                    'vertical_m': None if closest['vertical_m'] is None else round(closest['vertical_m'], 2),
+                    'latitude': round(closest['latitude'], 7),
+                    'longitude': round(closest['longitude'], 7)
+                }
+            })
+        logger.info(f"Checked {len(schedule)} flights: {len(conflicts)} conflicts "
+                    f"({result['segments']} segments, {result['candidate_pairs']} candidate pairs)")
+        
+        return {
+            'horizontal_m': horizontal_m,
+            'vertical_m': vertical_m,
+            'step_s': step_s,
+            'flights': [
+                {
+                    'mission_id': mission_id,
+                    'start_time': _format_time(start),
+                    'end_time': _format_time(start + timelines[mission_id]['duration_s']),
+                    'duration_s': timelines[mission_id]['duration_s']
+                }
+                for mission_id, start in schedule
+            ],
+            'conflicts': conflicts,
+            'stats': {'segments': result['segments'], 'candidate_pairs': result['candidate_pairs']}
+        }
@@ -0,0 +1,181 @@
+import os
+from typing import Iterator, List, Optional
+from sqlalchemy import select
+from app.database import db
+from app.models.mission import Mission, Waypoint, Annotation, NoFlyZone
+from app.metrics import metrics
+from app.errors import APIError, ValidationError
+import logging
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; only the export endpoints need it
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+EXPORTED_ROWS = metrics.counter('export_rows_total', 'Rows written by bulk exports', ('table',))
+
+FORMATS = {
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+}
+DEFAULT_BATCH_SIZE = 65536
+MAX_BATCH_SIZE = 1024 * 1024
+
+# Exported tables: (model, sort columns, [(column, arrow type name)]). The first sort
+# column identifies the mission, so filtered exports read rows in mission order.
+EXPORT_TABLES = {
+    'missions': (Mission, ('id',), [
+        ('id', 'int64'), ('name', 'string'), ('kml_stale', 'bool'), ('revision', 'string')
+    ]),
+    'waypoints': (Waypoint, ('mission_id', 'index', 'id'), [
+        ('mission_id', 'int64'), ('index', 'int32'), ('id', 'int64'),
+        ('latitude', 'float64'), ('longitude', 'float64'), ('altitude', 'float64')
+    ]),
+    'annotations': (Annotation, ('mission_id', 'id'), [
+        ('mission_id', 'int64'), ('id', 'int64'), ('latitude', 'float64'), ('longitude', 'float64'), ('note', 'string')
+    ]),
+    'no_fly_zones': (NoFlyZone, ('mission_id', 'id'), [
+        ('mission_id', 'int64'), ('id', 'int64'), ('coordinates', 'string'), ('note', 'string'),
+        ('vertex_count', 'int32'), ('area_m2', 'float64'), ('min_longitude', 'float64'), ('min_latitude', 'float64'),
+        ('max_longitude', 'float64'), ('max_latitude', 'float64')
+    ]),
+}
+
+class _ChunkSink:
+    """Write-only file object that hands out what was written since the last ``drain``"""
+    
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+    
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def flush(self) -> None:
+        pass
+    
+    def close(self) -> None:
+        self.closed = True
+    
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def _arrow_column(values, type: 'pa.DataType') -> 'pa.Array':
+    if pa.types.is_boolean(type):
+        # Raw DB-API rows carry booleans as the integers SQLite stores
+        return pa.array(values, type=pa.int8()).cast(type)
+    return pa.array(values, type=type)
+
+class ExportService:
+    """Columnar bulk export of missions and their child rows (Parquet or Arrow IPC stream)"""
+    
+    @staticmethod
+    def validate(table: str, format: str, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+        """Check an export request up front, so errors surface before any bytes are streamed"""
+        if pa is None:
+            raise APIError("Bulk export requires pyarrow", status_code=501)
+        if table not in EXPORT_TABLES:
+            raise ValidationError(f"Unknown table '{table}' (expected one of {', '.join(EXPORT_TABLES)})")
+        if format not in FORMATS:
+            raise ValidationError(f"Unknown format '{format}' (expected one of {', '.join(FORMATS)})")
+        if not 1 <= batch_size <= MAX_BATCH_SIZE:
+            raise ValidationError(f"Batch size must be between 1 and {MAX_BATCH_SIZE}")
+    
+    @staticmethod
+    def schema(table: str) -> 'pa.Schema':
+        _, _, columns = EXPORT_TABLES[table]
+        return pa.schema([(name, pa.type_for_alias(type_name)) for name, type_name in columns])
+    
+    @staticmethod
+    def iter_batches(table: str, mission_ids: Optional[List[int]] = None,
+                     batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator['pa.RecordBatch']:
+        """
+        Stream a table as Arrow record batches of up to ``batch_size`` rows
+        
+        Rows are read with ``fetchmany`` from a DB-API cursor on the session's
+        connection, skipping SQLAlchemy row objects (most of the cost at
+        millions of rows). Only one batch is held in memory at a time.
+        """
+        model, ordering, columns = EXPORT_TABLES[table]
+        schema = ExportService.schema(table)
+        statement = select(*(getattr(model, name) for name, _ in columns))
+        if mission_ids is not None:
+            statement = statement.where(getattr(model, ordering[0]).in_(mission_ids))
+        statement = statement.order_by(*(getattr(model, name) for name in ordering))
+        
+        connection = db.session.connection()
+        compiled = statement.compile(dialect=connection.dialect, compile_kwargs={'render_postcompile': True})
+        parameters = [compiled.params[name] for name in compiled.positiontup or ()]
+        cursor = connection.connection.cursor()
+        try:
+            cursor.execute(str(compiled), parameters)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                batch = pa.RecordBatch.from_arrays(
+                    [_arrow_column(values, field.type) for values, field in zip(zip(*rows), schema)], schema=schema
+                )
+                EXPORTED_ROWS.inc((table,), batch.num_rows)
+                yield batch
+        finally:
+            cursor.close()
+    
+    @staticmethod
+    def stream(table: str, format: str, mission_ids: Optional[List[int]] = None,
+               batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[bytes]:
+        """
+        Encode a table as a Parquet file (one row group per batch) or an Arrow
+        IPC stream, yielding the bytes produced by each batch
+        """
+        ExportService.validate(table, format, batch_size)
+        sink = _ChunkSink()
+        schema = ExportService.schema(table)
+        if format == 'parquet':
+            writer = pq.ParquetWriter(sink, schema, compression='zstd')
+        else:
+            writer = pa.ipc.new_stream(sink, schema)
+        
+        rows = 0
+        for batch in ExportService.iter_batches(table, mission_ids, batch_size):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+        writer.close()
+        yield sink.drain()
+        logger.info(f"Exported {rows} {table} rows as {format}")
+    
+    @staticmethod
+    def export_to_directory(directory: str, format: str = 'parquet', mission_ids: Optional[List[int]] = None,
+                            batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+        """
+        Write every table to ``<directory>/<table>.<extension>``
+        
+        Returns:
+            dict: Bytes written per file path
+        """
+        written = {}
+        for table in EXPORT_TABLES:
+            ExportService.validate(table, format, batch_size)
+            path = os.path.join(directory, f'{table}.{FORMATS[format][1]}')
+            size = 0
+            with open(path, 'wb') as output:
+                for chunk in ExportService.stream(table, format, mission_ids, batch_size):
+                    output.write(chunk)
+                    size += len(chunk)
+            written[path] = size
+        return written
@@ -0,0 +1,133 @@
+from typing import Dict, Optional
+import numpy as np
+from flask import current_app
+from sqlalchemy import select
+from app.database import db, fetch_tuples
+from app.models.mission import Mission, Waypoint
+from app.utils.kdtree import match_points
+from app.utils.trajectory import haversine_array, project_local, to_json_list
+from app.errors import ValidationError, NotFoundError
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAX_RADIUS_M = 1000.0
+# Coordinates are stored to about a centimetre; smaller differences are not moves
+MOVE_TOLERANCE_M = 0.01
+
+class MissionDiffService:
+    """Waypoint changes between two separately uploaded missions"""
+    
+    @staticmethod
+    def diff_missions(from_mission_id: int, to_mission_id: int, radius_m: Optional[float] = None) -> Dict:
+        """
+        Match the waypoints of two missions by position and report what moved
+        
+        Waypoints are paired one-to-one with their nearest counterpart within
+        ``radius_m`` (mutual nearest neighbours in a KD-tree), so matching does
+        not depend on WPML indexes lining up between the two KML files.
+        Unpaired waypoints are reported as removed (only in the first mission)
+        or added (only in the second).
+        
+        Args:
+            from_mission_id: Mission to compare from (e.g. the original plan)
+            to_mission_id: Mission to compare to (e.g. the re-planned upload)
+            radius_m: Farthest a waypoint can move and still be matched
+                (``MISSION_DIFF_MATCH_RADIUS_M``)
+        
+        Returns:
+            Dict: A ``summary`` with counts, and ``moved``, ``added`` and
+            ``removed`` waypoints as columns
+        
+        Raises:
+            NotFoundError: If either mission does not exist
+            ValidationError: If the radius is out of range
+        """
+        if radius_m is None:
+            radius_m = current_app.config.get('MISSION_DIFF_MATCH_RADIUS_M', 25.0)
+        if not 0 < radius_m <= MAX_RADIUS_M:
+            raise ValidationError(f"Radius must be greater than 0 and at most {MAX_RADIUS_M:g} metres")
+        source = MissionDiffService._load_waypoints(from_mission_id)
+        target = MissionDiffService._load_waypoints(to_mission_id)
+        
+        latitudes = np.concatenate((source['latitude'], target['latitude']))
+        reference_latitude = float(np.mean(latitudes)) if latitudes.size else 0.0
+        source_xy = np.stack(project_local(source['latitude'], source['longitude'], reference_latitude), axis=1)
+        target_xy = np.stack(project_local(target['latitude'], target['longitude'], reference_latitude), axis=1)
+        matched_source, matched_target = match_points(source_xy, target_xy, radius_m)
+        order = np.argsort(matched_source, kind='stable')
+        matched_source, matched_target = matched_source[order], matched_target[order]
+        
+        distance = haversine_array(
+            source['latitude'][matched_source], source['longitude'][matched_source],
+            target['latitude'][matched_target], target['longitude'][matched_target]
+        )
+        from_altitude, to_altitude = source['altitude'][matched_source], target['altitude'][matched_target]
+        climb = to_altitude - from_altitude
+        both_unknown = np.isnan(from_altitude) & np.isnan(to_altitude)
+        climbed = ~both_unknown & ~(np.abs(climb) <= MOVE_TOLERANCE_M)
+        moved = (distance > MOVE_TOLERANCE_M) | climbed
+        known_climb = climbed & ~np.isnan(climb)
+        
+        removed = np.setdiff1d(np.arange(source['index'].size), matched_source)
+        added = np.setdiff1d(np.arange(target['index'].size), matched_target)
+        moved_source, moved_target = matched_source[moved], matched_target[moved]
+        logger.info(f"Diffed missions {from_mission_id} and {to_mission_id}: {int(moved.sum())} moved, "
+                    f"{added.size} added, {removed.size} removed")
+        
+        return {
+            'from_mission': source['mission'],
+            'to_mission': target['mission'],
+            'match_radius_m': radius_m,
+            'summary': {
+                'unchanged': int((~moved).sum()),
+                'moved': int(moved.sum()),
+                'added': int(added.size),
+                'removed': int(removed.size),
+                'max_distance_m': round(float(distance[moved].max()), 3) if moved.any() else 0.0,
+                'max_altitude_delta_m': round(float(np.abs(climb[known_climb]).max()), 3) if known_climb.any() else 0.0
+            },
+            'moved': {
+                'from_index': source['index'][moved_source].tolist(),
+                'to_index': target['index'][moved_target].tolist(),
+                'from_latitude': to_json_list(source['latitude'][moved_source], 7),
+                'from_longitude': to_json_list(source['longitude'][moved_source], 7),
+                'from_altitude': to_json_list(from_altitude[moved], 2),
+                'to_latitude': to_json_list(target['latitude'][moved_target], 7),
+                'to_longitude': to_json_list(target['longitude'][moved_target], 7),
+                'to_altitude': to_json_list(to_altitude[moved], 2),
+                'distance_m': to_json_list(distance[moved], 3),
+                'altitude_delta_m': to_json_list(climb[moved], 2)
+            },
+            'added': MissionDiffService._columns(target, added),
+            'removed': MissionDiffService._columns(source, removed)
+        }
+    
+    @staticmethod
+    def _load_waypoints(mission_id: int) -> Dict:
+        mission = db.session.execute(select(Mission.id, Mission.name).where(Mission.id == mission_id)).first()
+        if mission is None:
+            raise NotFoundError(f"Mission with ID {mission_id} not found")
+        # Plain DB-API tuples go straight into one float array, without building Row objects
+        rows = fetch_tuples(
+            select(Waypoint.index, Waypoint.latitude, Waypoint.longitude, Waypoint.altitude)
+            .where(Waypoint.mission_id == mission_id)
+            .order_by(Waypoint.index, Waypoint.id)
+        )
+        columns = np.array(rows, dtype=np.float64).reshape(-1, 4)
+        return {
+            'mission': {'id': mission.id, 'name': mission.name, 'waypoint_count': len(rows)},
+            'index': columns[:, 0].astype(np.int64),
+            'latitude': columns[:, 1],
+            'longitude': columns[:, 2],
+            'altitude': columns[:, 3]
+        }
+    
+    @staticmethod
+    def _columns(waypoints: Dict, positions: np.ndarray) -> Dict:
+        return {
+            'index': waypoints['index'][positions].tolist(),
+            'latitude': to_json_list(waypoints['latitude'][positions], 7),
+            'longitude': to_json_list(waypoints['longitude'][positions], 7),
+            'altitude': to_json_list(waypoints['altitude'][positions], 2)
+        }
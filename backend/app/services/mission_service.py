@@ -1,37 +1,261 @@
-from typing import Dict, List
-from app.database import db
-from app.models.mission import Mission, Waypoint, Annotation, NoFlyZone
+import hashlib
+import json
+import math
+from typing import Dict, List, Optional
+from sqlalchemy import select, insert, update, delete, func, case
+from sqlalchemy.exc import IntegrityError
+from app.database import db, fetch_tuples
+from app.models.mission import Mission, Waypoint, Annotation, NoFlyZone, mark_missions_touched
+from app.models.summary import MissionSummary
+from app.models.version import MissionVersion
 from app.utils.kml_parser import parse_kml_file, KMLParsingError
-from app.errors import ValidationError, NotFoundError
+from app.utils.waypoint_diff import diff_waypoints
+from app.utils.kml_writer import render_mission_kml
+from app.utils.polygon import normalize_ring, GeometryError
+from app.services.summary_service import SummaryService
+from app.payload_cache import get_payload_cache, mission_key, register_mission_payload
+from app.utils.row_json import ObjectEncoder, array, group_arrays, json_bool, json_number, json_raw, json_string, nullable
+from app.errors import ValidationError, NotFoundError, ConflictError
 import logging
 
 logger = logging.getLogger(__name__)
 
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+DELETE_BATCH_SIZE = 500
+
+register_mission_payload('mission_json')
+
+def _encode_bbox(min_longitude, min_latitude, max_longitude, max_latitude) -> str:
+    if min_latitude is None:
+        return 'null'
+    corners = (min_longitude, min_latitude, max_longitude, max_latitude)
+    return array(['null' if value is None else json_number(value) for value in corners])
+
+# Columns read by the JSON read path, and how each to_dict() key is encoded from them
+MISSION_COLUMNS = (Mission.id, Mission.name, Mission.kml_data, Mission.kml_stale)
+MISSION_JSON = ObjectEncoder(
+    ('id', json_number),
+    ('name', json_string),
+    ('kml_data', json_string),
+    ('kml_stale', json_bool),
+    ('waypoints', json_raw),
+    ('waypoint_count', json_number),
+    ('annotations', json_raw),
+    ('no_fly_zones', json_raw)
+)
+CHILD_JSON = (
+    (
+        Waypoint,
+        (Waypoint.id, Waypoint.mission_id, Waypoint.latitude, Waypoint.longitude, Waypoint.altitude, Waypoint.index),
+        ObjectEncoder(
+            ('id', json_number),
+            ('mission_id', json_number),
+            ('latitude', json_number),
+            ('longitude', json_number),
+            ('altitude', nullable(json_number)),
+            ('index', json_number)
+        )
+    ),
+    (
+        Annotation,
+        (Annotation.id, Annotation.mission_id, Annotation.latitude, Annotation.longitude, Annotation.note),
+        ObjectEncoder(
+            ('id', json_number),
+            ('mission_id', json_number),
+            ('latitude', json_number),
+            ('longitude', json_number),
+            ('note', nullable(json_string))
+        )
+    ),
+    (
+        NoFlyZone,
+        (
+            NoFlyZone.id, NoFlyZone.mission_id, NoFlyZone.coordinates, NoFlyZone.note, NoFlyZone.vertex_count,
+            NoFlyZone.area_m2, NoFlyZone.min_longitude, NoFlyZone.min_latitude, NoFlyZone.max_longitude,
+            NoFlyZone.max_latitude
+        ),
+        ObjectEncoder(
+            ('id', json_number),
+            ('mission_id', json_number),
+            ('coordinates', json_string),
+            ('note', nullable(json_string)),
+            ('vertex_count', nullable(json_number)),
+            ('area_m2', nullable(json_number)),
+            ('bbox', _encode_bbox, 4)
+        )
+    )
+)
+
 class MissionService:
     """Service class for mission-related business logic"""
     
     @staticmethod
     def get_all_missions() -> List[Dict]:
-        """Get all missions"""
-        missions = Mission.query.all()
-        return [mission.to_dict() for mission in missions]
+        """
+        Get all missions
+        
+        Decodes ``get_all_missions_json`` once. Callers that send the payload
+        on should use that directly instead.
+        """
+        return json.loads(MissionService.get_all_missions_json())
     
     @staticmethod
-    def get_mission_by_id(mission_id: int) -> Dict:
-        """Get a mission by ID"""
-        mission = Mission.query.get(mission_id)
-        if not mission:
+    def get_all_missions_json() -> str:
+        """
+        Get all missions as a JSON array, in the shape of ``Mission.to_dict()``
+        
+        Only the returned columns are selected, and rows are encoded straight
+        to JSON text without building ORM objects or per-row dicts.
+        """
+        return array(MissionService._encode_missions())
+    
+    @staticmethod
+    def get_mission_by_id(mission_id: int, revision: str = None) -> Dict:
+        """
+        Get a mission by ID
+        
+        Served through the payload cache when one is configured; ``revision``
+        can be passed when the caller has already looked it up. The dict is
+        cached on its own, so reading it does not also store the JSON text
+        that ``get_mission_json`` caches for callers that send the payload on.
+        """
+        build = lambda: json.loads(MissionService._encode_mission(mission_id))
+        cache = get_payload_cache()
+        if cache is None:
+            return build()
+        if revision is None:
+            revision = MissionService.get_mission_revision(mission_id)
+        return cache.get_or_build(mission_key(mission_id), revision, build)
+    
+    @staticmethod
+    def get_mission_json(mission_id: int, revision: str = None) -> str:
+        """
+        Get a mission by ID as JSON text, encoded like ``get_all_missions_json``
+        
+        Cached as text, so a hit is returned without encoding anything.
+        """
+        build = lambda: MissionService._encode_mission(mission_id)
+        cache = get_payload_cache()
+        if cache is None:
+            return build()
+        if revision is None:
+            revision = MissionService.get_mission_revision(mission_id)
+        return cache.get_or_build_json(mission_key(mission_id, 'mission_json'), revision, build)
+    
+    @staticmethod
+    def _encode_mission(mission_id: int) -> str:
+        missions = MissionService._encode_missions(mission_id)
+        if not missions:
             raise NotFoundError(f"Mission with ID {mission_id} not found")
-        return mission.to_dict()
+        return missions[0]
     
     @staticmethod
-    def create_mission_from_kml(mission_name: str, kml_content: str) -> Dict:
+    def _encode_missions(mission_id: Optional[int] = None) -> List[str]:
+        """Missions (all, or the one with ``mission_id``) as JSON objects, ordered by ID"""
+        statement = select(*MISSION_COLUMNS).order_by(Mission.id)
+        if mission_id is not None:
+            statement = statement.where(Mission.id == mission_id)
+        rows = fetch_tuples(statement)
+        if not rows:
+            return []
+        
+        # Each child table is read in one query, ordered by mission, and cut into one array per mission
+        children = []
+        for model, columns, encoder in CHILD_JSON:
+            statement = select(model.mission_id, *columns).order_by(model.mission_id, model.id)
+            if mission_id is not None:
+                statement = statement.where(model.mission_id == mission_id)
+            child_rows = fetch_tuples(statement)
+            if child_rows:
+                child_columns = list(zip(*child_rows))
+                children.append(group_arrays(child_columns[0], encoder.encode(child_columns[1:])))
+            else:
+                children.append({})
+        waypoints, annotations, no_fly_zones = children
+        
+        columns = list(zip(*rows))
+        ids = columns[0]
+        empty = ('[]', 0)
+        return MISSION_JSON.encode(columns + [
+            [waypoints.get(id, empty)[0] for id in ids],
+            [waypoints.get(id, empty)[1] for id in ids],
+            [annotations.get(id, empty)[0] for id in ids],
+            [no_fly_zones.get(id, empty)[0] for id in ids]
+        ])
+    
+    @staticmethod
+    def get_mission_revision(mission_id: int) -> str:
+        """Return the mission's revision token without loading the mission"""
+        revision = db.session.scalar(select(Mission.revision).where(Mission.id == mission_id))
+        if revision is None:
+            raise NotFoundError(f"Mission with ID {mission_id} not found")
+        return revision
+    
+    @staticmethod
+    def upload_keys(mission_name: str, kml_content: str, idempotency_key: Optional[str] = None) -> Dict:
+        """
+        Identify an upload so that retries of it can be recognised
+        
+        Without an ``Idempotency-Key`` an upload is identified by the mission
+        name and the SHA-256 of its KML, so resending the same form is a retry.
+        With one, the key alone identifies the upload.
+        
+        Returns:
+            Dict: ``content_sha256`` and ``upload_key`` (both hex SHA-256)
+        
+        Raises:
+            ValidationError: If the idempotency key is empty or too long
+        """
+        content_sha256 = hashlib.sha256(kml_content.encode('utf-8')).hexdigest()
+        if idempotency_key is None:
+            scope = f"name:{(mission_name or '').strip()}\0{content_sha256}"
+        else:
+            if not idempotency_key.strip() or len(idempotency_key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+                raise ValidationError(
+                    f"Idempotency-Key must be between 1 and {MAX_IDEMPOTENCY_KEY_LENGTH} characters"
+                )
+            scope = f"key:{idempotency_key}"
+        return {'content_sha256': content_sha256, 'upload_key': hashlib.sha256(scope.encode('utf-8')).hexdigest()}
+    
+    @staticmethod
+    def find_upload(keys: Dict) -> Optional[Dict]:
+        """
+        The mission created by an earlier upload with the same ``upload_key``, if any
+        
+        This is one lookup on the unique ``upload_key`` index, plus the
+        mission's waypoints when it is found. Nothing is parsed or written.
+        
+        Returns:
+            Optional[Dict]: The creation response of the existing mission, with
+            ``replayed`` set, or None
+        
+        Raises:
+            ConflictError: If the idempotency key was used for different KML
+        """
+        existing = db.session.execute(
+            select(Mission.id, Mission.name, Mission.content_sha256).where(Mission.upload_key == keys['upload_key'])
+        ).first()
+        if existing is None:
+            return None
+        if existing.content_sha256 != keys['content_sha256']:
+            raise ConflictError("Idempotency-Key was already used for a different upload")
+        waypoints = Waypoint.query.filter_by(mission_id=existing.id).order_by(Waypoint.index, Waypoint.id).all()
+        logger.info(f"Upload matches mission {existing.id}; returning it without parsing")
+        return {**MissionService._build_mission_response(existing, waypoints), 'replayed': True}
+    
+    @staticmethod
+    def create_mission_from_kml(mission_name: str, kml_content: str, keys: Optional[Dict] = None) -> Dict:
         """
         Create a new mission from KML file content
         
         Args:
             mission_name (str): Name for the mission
             kml_content (str): Raw KML file content
+            keys (Dict): ``upload_keys`` of the upload; a concurrent upload with
+                the same key loses the race on the unique index and gets the
+                winner's mission back
             
         Returns:
             Dict: Mission data with parsed waypoints
@@ -49,7 +273,7 @@ class MissionService:
             
             # Create mission and waypoints in database
             mission, waypoints = MissionService._create_mission_with_waypoints(
-                mission_name.strip(), kml_content, parsed_data
+                mission_name.strip(), kml_content, parsed_data, keys or {}
             )
             
             logger.info(f"Created mission {mission.id} with {len(waypoints)} waypoints saved to database")
@@ -62,6 +286,13 @@ class MissionService:
             raise ValidationError(f"KML parsing failed: {str(e)}")
         except ValidationError:
             raise
+        except IntegrityError as e:
+            db.session.rollback()
+            existing = MissionService.find_upload(keys) if keys else None
+            if existing is None:
+                logger.error(f"Failed to create mission {mission_name}: {str(e)}")
+                raise ValidationError(f"Failed to create mission: {str(e)}")
+            return existing
         except Exception as e:
             logger.error(f"Failed to create mission {mission_name}: {str(e)}")
             db.session.rollback()
@@ -77,12 +308,15 @@ class MissionService:
             raise ValidationError("KML content is required")
     
     @staticmethod
-    def _create_mission_with_waypoints(mission_name: str, kml_content: str, parsed_data: Dict) -> tuple[Mission, List[Waypoint]]:
+    def _create_mission_with_waypoints(mission_name: str, kml_content: str, parsed_data: Dict,
+                                       keys: Dict) -> tuple[Mission, List[Waypoint]]:
         """Create mission and associated waypoints in database"""
         # Create new mission
         new_mission = Mission(
             name=mission_name,
-            kml_data=kml_content
+            kml_data=kml_content,
+            content_sha256=keys.get('content_sha256'),
+            upload_key=keys.get('upload_key')
         )
         
         db.session.add(new_mission)
@@ -101,6 +335,7 @@ class MissionService:
             waypoints.append(waypoint)
             db.session.add(waypoint)
         
+        SummaryService.refresh(new_mission, parsed_data['waypoints'])
         db.session.commit()
         return new_mission, waypoints
     
@@ -118,28 +353,358 @@ class MissionService:
     
     @staticmethod
     def update_mission(mission_id: int, name: str = None, kml_data: str = None) -> Dict:
-        """Update an existing mission"""
+        """
+        Update an existing mission
+        
+        When new KML is supplied it is re-parsed and the stored waypoints are
+        brought in line with it incrementally, in the same transaction.
+        """
         mission = Mission.query.get(mission_id)
         if not mission:
             raise NotFoundError(f"Mission with ID {mission_id} not found")
         
-        if name is not None:
-            mission.name = name
-        if kml_data is not None:
-            mission.kml_data = kml_data
+        try:
+            if name is not None:
+                mission.name = name
+            if kml_data is not None:
+                if not kml_data.strip():
+                    raise ValidationError("KML content is required")
+                parsed_data = parse_kml_file(kml_data)
+                mission.kml_data = kml_data
+                mission.kml_stale = False
+                MissionService._sync_waypoints(mission_id, parsed_data['waypoints'])
+                SummaryService.refresh(mission, parsed_data['waypoints'])
+            elif name is not None:
+                SummaryService.update(mission_id, values={'name': name})
             
-        db.session.commit()
+            mission.touch()
+            db.session.commit()
+        except KMLParsingError as e:
+            db.session.rollback()
+            logger.error(f"KML parsing failed for mission {mission_id}: {str(e)}")
+            raise ValidationError(f"KML parsing failed: {str(e)}")
+        except ValidationError:
+            db.session.rollback()
+            raise
+        except Exception as e:
+            logger.error(f"Failed to update mission {mission_id}: {str(e)}")
+            db.session.rollback()
+            raise ValidationError(f"Failed to update mission: {str(e)}")
+        
         return mission.to_dict()
     
     @staticmethod
-    def delete_mission(mission_id: int) -> None:
-        """Delete a mission"""
+    def _sync_waypoints(mission_id: int, parsed_waypoints: List[Dict]) -> Dict:
+        """
+        Apply only the waypoint writes needed to match the parsed KML
+        
+        Rows matched by content keep their IDs; runs of them that moved are
+        re-indexed with one range UPDATE each (see ``diff_waypoints``).
+        """
+        existing = db.session.execute(
+            select(Waypoint.id, Waypoint.index, Waypoint.latitude, Waypoint.longitude, Waypoint.altitude)
+            .where(Waypoint.mission_id == mission_id)
+            .order_by(Waypoint.index, Waypoint.id)
+        ).all()
+        
+        inserts, updates, deletes, shifts = diff_waypoints(existing, parsed_waypoints)
+        
+        for start in range(0, len(deletes), DELETE_BATCH_SIZE):
+            db.session.execute(
+                delete(Waypoint).where(Waypoint.id.in_(deletes[start:start + DELETE_BATCH_SIZE])),
+                execution_options={'synchronize_session': False}
+            )
+        # Shifts come in index order. Runs moving down go first from the lowest, then runs
+        # moving up from the highest, so no row lands in a range that is still to be shifted
+        shifted = 0
+        ordered = [shift for shift in shifts if shift['offset'] < 0] + [shift for shift in reversed(shifts) if shift['offset'] > 0]
+        for shift in ordered:
+            shifted += db.session.execute(
+                update(Waypoint)
+                .where(Waypoint.mission_id == mission_id, Waypoint.index.between(shift['start'], shift['end']))
+                .values(index=Waypoint.index + shift['offset']),
+                execution_options={'synchronize_session': False}
+            ).rowcount
+        if updates:
+            db.session.execute(update(Waypoint), updates)
+        if inserts:
+            db.session.execute(insert(Waypoint), [
+                {
+                    'mission_id': mission_id,
+                    'latitude': waypoint['latitude'],
+                    'longitude': waypoint['longitude'],
+                    'altitude': waypoint['altitude'],
+                    'index': waypoint['index']
+                }
+                for waypoint in inserts
+            ])
+        
+        changes = {'inserted': len(inserts), 'updated': len(updates), 'deleted': len(deletes), 'shifted': shifted}
+        logger.info(f"Re-ingested waypoints for mission {mission_id}: {changes}")
+        return changes
+    
+    @staticmethod
+    def edit_waypoints(mission_id: int, operations: List[Dict]) -> Dict:
+        """
+        Apply range edits to a mission's waypoints directly in the database
+        
+        Positions are waypoint indexes (0-based, contiguous) and ranges are
+        half-open ``[start, end)``. Operations are applied in order, each
+        against the result of the previous one, in a single transaction:
+        
+        - ``{"op": "move", "start": s, "end": e, "set": {...}}`` sets
+          latitude/longitude/altitude, or ``"offset": {...}`` shifts them
+        - ``{"op": "insert", "index": i, "waypoints": [{...}]}`` inserts before position i
+        - ``{"op": "delete", "start": s, "end": e}``
+        - ``{"op": "reorder", "start": s, "end": e, "to": t}`` moves the block so it starts at t
+        
+        The stored KML is only marked stale; it is regenerated when downloaded.
+        Waypoints keep track of the placemark they came from (``source_index``)
+        so that their actions, speed and turn settings follow them.
+        
+        Raises:
+            NotFoundError: If the mission does not exist
+            ValidationError: If an operation is malformed or out of range
+        """
         mission = Mission.query.get(mission_id)
         if not mission:
             raise NotFoundError(f"Mission with ID {mission_id} not found")
+        if not isinstance(operations, list) or not operations:
+            raise ValidationError("At least one waypoint operation is required")
         
-        db.session.delete(mission)
-        db.session.commit()
+        handlers = {
+            'move': MissionService._move_waypoints,
+            'insert': MissionService._insert_waypoints,
+            'delete': MissionService._delete_waypoints,
+            'reorder': MissionService._reorder_waypoints
+        }
+        
+        try:
+            count = MissionService._normalize_waypoint_indexes(mission_id)
+            if not mission.kml_stale:
+                # Indexes now match the stored KML's placemark order; remember them so the
+                # KML can be regenerated with each waypoint's own placemark settings
+                db.session.execute(
+                    update(Waypoint).where(Waypoint.mission_id == mission_id).values(source_index=Waypoint.index),
+                    execution_options={'synchronize_session': False}
+                )
+            for position, operation in enumerate(operations):
+                if not isinstance(operation, dict):
+                    raise ValidationError(f"Operation {position} must be an object")
+                handler = handlers.get(operation.get('op'))
+                if handler is None:
+                    raise ValidationError(f"Operation {position}: unknown op '{operation.get('op')}'")
+                count = handler(mission_id, operation, count)
+            
+            mission.kml_stale = True
+            SummaryService.refresh(mission)
+            mission.touch()
+            db.session.commit()
+        except ValidationError:
+            db.session.rollback()
+            raise
+        except Exception as e:
+            logger.error(f"Failed to edit waypoints for mission {mission_id}: {str(e)}")
+            db.session.rollback()
+            raise ValidationError(f"Failed to edit waypoints: {str(e)}")
+        
+        logger.info(f"Applied {len(operations)} waypoint operations to mission {mission_id}")
+        return {'mission_id': mission_id, 'waypoint_count': count, 'kml_stale': True}
+    
+    @staticmethod
+    def _normalize_waypoint_indexes(mission_id: int) -> int:
+        """Make indexes contiguous from 0 (only rewrites rows if they are not) and return the count"""
+        count, lowest, highest = db.session.execute(
+            select(func.count(Waypoint.id), func.min(Waypoint.index), func.max(Waypoint.index))
+            .where(Waypoint.mission_id == mission_id)
+        ).one()
+        if count and (lowest != 0 or highest != count - 1):
+            ids = db.session.scalars(
+                select(Waypoint.id).where(Waypoint.mission_id == mission_id).order_by(Waypoint.index, Waypoint.id)
+            ).all()
+            db.session.execute(update(Waypoint), [{'id': id, 'index': i} for i, id in enumerate(ids)])
+        return count
+    
+    @staticmethod
+    def _range(operation: Dict, count: int) -> tuple[int, int]:
+        start = operation.get('start')
+        end = operation.get('end', start + 1 if isinstance(start, int) else None)
+        if not isinstance(start, int) or not isinstance(end, int) or not 0 <= start < end <= count:
+            raise ValidationError(f"Invalid waypoint range [{start}, {end}) for {count} waypoints")
+        return start, end
+    
+    @staticmethod
+    def _in_range(mission_id: int, start: int, end: int):
+        return (Waypoint.mission_id == mission_id) & (Waypoint.index >= start) & (Waypoint.index < end)
+    
+    @staticmethod
+    def _move_waypoints(mission_id: int, operation: Dict, count: int) -> int:
+        start, end = MissionService._range(operation, count)
+        values = {}
+        for key, column in (('latitude', Waypoint.latitude), ('longitude', Waypoint.longitude), ('altitude', Waypoint.altitude)):
+            if key in operation.get('set', {}):
+                values[column] = MissionService._coordinate(operation['set'][key], key, allow_none=key == 'altitude')
+            elif key in operation.get('offset', {}):
+                values[column] = column + MissionService._coordinate(operation['offset'][key], key)
+        if not values:
+            raise ValidationError("Move requires 'set' or 'offset' with latitude, longitude or altitude")
+        db.session.execute(
+            update(Waypoint).where(MissionService._in_range(mission_id, start, end)).values(values),
+            execution_options={'synchronize_session': False}
+        )
+        return count
+    
+    @staticmethod
+    def _insert_waypoints(mission_id: int, operation: Dict, count: int) -> int:
+        index = operation.get('index', count)
+        new_waypoints = operation.get('waypoints')
+        if not isinstance(index, int) or not 0 <= index <= count:
+            raise ValidationError(f"Invalid insert position {index} for {count} waypoints")
+        if not isinstance(new_waypoints, list) or not new_waypoints:
+            raise ValidationError("Insert requires a non-empty 'waypoints' list")
+        rows = [
+            {
+                'mission_id': mission_id,
+                'latitude': MissionService._coordinate(waypoint.get('latitude'), 'latitude'),
+                'longitude': MissionService._coordinate(waypoint.get('longitude'), 'longitude'),
+                'altitude': MissionService._coordinate(waypoint.get('altitude'), 'altitude', allow_none=True),
+                'index': index + offset
+            }
+            for offset, waypoint in enumerate(new_waypoints)
+        ]
+        db.session.execute(
+            update(Waypoint).where(MissionService._in_range(mission_id, index, count))
+            .values(index=Waypoint.index + len(rows)),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.execute(insert(Waypoint), rows)
+        return count + len(rows)
+    
+    @staticmethod
+    def _delete_waypoints(mission_id: int, operation: Dict, count: int) -> int:
+        start, end = MissionService._range(operation, count)
+        db.session.execute(
+            delete(Waypoint).where(MissionService._in_range(mission_id, start, end)),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.execute(
+            update(Waypoint).where(MissionService._in_range(mission_id, end, count))
+            .values(index=Waypoint.index - (end - start)),
+            execution_options={'synchronize_session': False}
+        )
+        return count - (end - start)
+    
+    @staticmethod
+    def _reorder_waypoints(mission_id: int, operation: Dict, count: int) -> int:
+        start, end = MissionService._range(operation, count)
+        length = end - start
+        to = operation.get('to')
+        if not isinstance(to, int) or not 0 <= to <= count - length:
+            raise ValidationError(f"Invalid reorder target {to} for a block of {length} in {count} waypoints")
+        if to == start:
+            return count
+        # One UPDATE over the affected span: the block moves, the rows it passes shift
+        if to < start:
+            span_start, span_end, shift = to, end, length
+        else:
+            span_start, span_end, shift = start, to + length, -length
+        db.session.execute(
+            update(Waypoint).where(MissionService._in_range(mission_id, span_start, span_end)).values(
+                index=case(
+                    ((Waypoint.index >= start) & (Waypoint.index < end), Waypoint.index + (to - start)),
+                    else_=Waypoint.index + shift
+                )
+            ),
+            execution_options={'synchronize_session': False}
+        )
+        return count
+    
+    @staticmethod
+    def _coordinate(value, name: str, allow_none: bool = False):
+        if value is None and allow_none:
+            return None
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValidationError(f"'{name}' must be a finite number")
+        return float(value)
+    
+    @staticmethod
+    def get_mission_kml(mission_id: int) -> tuple[str, str]:
+        """
+        Return (name, kml) for download, regenerating the KML if waypoints were edited
+        
+        The regenerated document replaces ``kml_data`` so later downloads are served as-is.
+        """
+        mission = Mission.query.get(mission_id)
+        if not mission:
+            raise NotFoundError(f"Mission with ID {mission_id} not found")
+        
+        if mission.kml_stale:
+            rows = db.session.execute(
+                select(Waypoint.latitude, Waypoint.longitude, Waypoint.altitude, Waypoint.index, Waypoint.source_index)
+                .where(Waypoint.mission_id == mission_id)
+                .order_by(Waypoint.index, Waypoint.id)
+            ).mappings().all()
+            try:
+                mission.kml_data = render_mission_kml(mission.kml_data, rows)
+            except KMLParsingError as e:
+                raise ValidationError(f"Stored KML cannot be regenerated: {str(e)}")
+            mission.kml_stale = False
+            SummaryService.update(mission_id, values={'kml_stale': False})
+            mission.touch()
+            db.session.commit()
+        
+        return mission.name, mission.kml_data
+    
+    @staticmethod
+    def delete_mission(mission_id: int) -> None:
+        """Delete a mission and everything that belongs to it"""
+        if not MissionService.delete_missions([mission_id])['deleted']:
+            raise NotFoundError(f"Mission with ID {mission_id} not found")
+        
+    @staticmethod
+    def delete_missions(mission_ids: List[int]) -> Dict:
+        """
+        Delete missions with set-based statements, in one transaction
+        
+        Child rows (waypoints, annotations, no-fly zones, summaries and
+        versions) are removed with ``DELETE ... WHERE mission_id IN (...)``
+        per table, so the cost does not depend on loading any rows. Waypoint
+        blocks and KML blobs stay, as other versions may share them.
+        
+        Returns:
+            Dict: ``deleted`` and ``not_found`` mission IDs
+        """
+        if not mission_ids:
+            raise ValidationError("At least one mission ID is required")
+        existing = set()
+        for start in range(0, len(mission_ids), DELETE_BATCH_SIZE):
+            existing.update(db.session.scalars(
+                select(Mission.id).where(Mission.id.in_(mission_ids[start:start + DELETE_BATCH_SIZE]))
+            ))
+        deleted = [mission_id for mission_id in mission_ids if mission_id in existing]
+        
+        try:
+            for start in range(0, len(deleted), DELETE_BATCH_SIZE):
+                batch = deleted[start:start + DELETE_BATCH_SIZE]
+                for model in (Waypoint, Annotation, NoFlyZone, MissionSummary, MissionVersion):
+                    db.session.execute(
+                        delete(model).where(model.mission_id.in_(batch)),
+                        execution_options={'synchronize_session': False}
+                    )
+                db.session.execute(
+                    delete(Mission).where(Mission.id.in_(batch)), execution_options={'synchronize_session': False}
+                )
+            mark_missions_touched(db.session, deleted)
+            db.session.commit()
+        except Exception as e:
+            logger.error(f"Failed to delete missions {deleted}: {str(e)}")
+            db.session.rollback()
+            raise
+        
+        # Objects loaded earlier in this session may describe deleted rows
+        db.session.expire_all()
+        logger.info(f"Deleted {len(deleted)} missions")
+        return {'deleted': deleted, 'not_found': [mission_id for mission_id in mission_ids if mission_id not in existing]}
     
     @staticmethod
     def create_annotation(mission_id: int, latitude: float, longitude: float, note: str = None) -> Dict:
@@ -156,22 +721,70 @@ class MissionService:
         )
         
         db.session.add(new_annotation)
+        SummaryService.update(mission_id, increments={'annotation_count': 1})
+        mission.touch()
         db.session.commit()
         return new_annotation.to_dict()
     
     @staticmethod
-    def create_no_fly_zone(mission_id: int, coordinates: str, note: str = None) -> Dict:
-        """Create a no-fly zone for a mission"""
+    def create_no_fly_zone(mission_id: int, coordinates, note: str = None) -> Dict:
+        """
+        Create a no-fly zone for a mission
+        
+        ``coordinates`` is a ring of [longitude, latitude] pairs (list, JSON,
+        GeoJSON Polygon or KML coordinate string). It is stored in canonical
+        form together with its vertex count, area and bounding box.
+        
+        Raises:
+            NotFoundError: If the mission does not exist
+            ValidationError: If the polygon is malformed or self-intersecting
+        """
         mission = Mission.query.get(mission_id)
         if not mission:
             raise NotFoundError(f"Mission with ID {mission_id} not found")
+        try:
+            geometry = normalize_ring(coordinates)
+        except GeometryError as e:
+            raise ValidationError(f"Invalid no-fly zone: {e}")
         
-        new_no_fly_zone = NoFlyZone(
-            mission_id=mission_id,
-            coordinates=coordinates,
-            note=note
-        )
+        new_no_fly_zone = NoFlyZone(mission_id=mission_id, note=note, **geometry)
         
         db.session.add(new_no_fly_zone)
+        SummaryService.update(mission_id, increments={'no_fly_zone_count': 1})
+        mission.touch()
         db.session.commit()
         return new_no_fly_zone.to_dict()
+    
+    @staticmethod
+    def normalize_no_fly_zones() -> Dict:
+        """
+        Canonicalize no-fly zones stored before write-time validation existed
+        
+        Rows whose polygon cannot be normalized are left unchanged and reported.
+        
+        Returns:
+            Dict: ``normalized`` count and ``invalid`` as a list of {id, error}
+        """
+        rows = db.session.execute(
+            select(NoFlyZone.id, NoFlyZone.mission_id, NoFlyZone.coordinates).where(NoFlyZone.vertex_count.is_(None))
+        ).all()
+        updates, invalid, touched = [], [], set()
+        for zone_id, mission_id, coordinates in rows:
+            try:
+                updates.append({'id': zone_id, **normalize_ring(coordinates)})
+                touched.add(mission_id)
+            except GeometryError as e:
+                invalid.append({'id': zone_id, 'error': str(e)})
+        
+        try:
+            for start in range(0, len(updates), DELETE_BATCH_SIZE):
+                db.session.execute(update(NoFlyZone), updates[start:start + DELETE_BATCH_SIZE])
+            for mission in db.session.scalars(select(Mission).where(Mission.id.in_(touched))):
+                mission.touch()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        
+        logger.info(f"Normalized {len(updates)} no-fly zones ({len(invalid)} invalid)")
+        return {'normalized': len(updates), 'invalid': invalid}
@@ -0,0 +1,168 @@
+import json
+import math
+from typing import Dict, Iterator, Optional
+import numpy as np
+from flask import current_app
+from sqlalchemy import select
+from app.database import db
+from app.models.mission import Mission, Waypoint
+from app.payload_cache import get_payload_cache, mission_key, register_mission_payload
+from app.services.mission_service import MissionService
+from app.utils.kml_parser import parse_flight_speeds, KMLParsingError
+from app.utils.trajectory import build_timeline, sample_timeline, to_json_list, TIMELINE_FIELDS
+from app.errors import ValidationError
+import logging
+
+logger = logging.getLogger(__name__)
+
+register_mission_payload('playback')
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'sse': 'text/event-stream',
+}
+MIN_STEP_S, MAX_STEP_S = 0.05, 60.0
+MAX_CHUNK_FRAMES = 10000
+MAX_FRAMES = 2_000_000
+# Decimal places per frame column
+FRAME_DIGITS = {'time': 3, 'latitude': 7, 'longitude': 7, 'altitude': 2, 'heading': 1, 'speed': 2}
+
+class PlaybackService:
+    """Time-stepped flight replay along mission paths"""
+    
+    @staticmethod
+    def get_timeline(mission_id: int) -> Dict:
+        """
+        Arrival time, heading and speed at every waypoint of a mission
+        
+        Each leg is flown in a straight line at the start waypoint's
+        ``waypointSpeed``, or at the wayline's ``autoFlightSpeed`` when the
+        waypoint has none (``PLAYBACK_DEFAULT_SPEED_MPS`` if neither is set
+        above zero). Per-waypoint speeds are ignored while the stored KML is
+        stale, as its indexes may no longer match the edited waypoints.
+        The timeline is cached per mission revision; frames at any time step
+        are interpolated from it.
+        
+        Raises:
+            NotFoundError: If the mission does not exist
+        """
+        revision = MissionService.get_mission_revision(mission_id)
+        build = lambda: PlaybackService._build_timeline(mission_id)
+        cache = get_payload_cache()
+        if cache is None:
+            return build()
+        return cache.get_or_build(mission_key(mission_id, 'playback'), revision, build)
+    
+    @staticmethod
+    def _build_timeline(mission_id: int) -> Dict:
+        kml_data, kml_stale = db.session.execute(
+            select(Mission.kml_data, Mission.kml_stale).where(Mission.id == mission_id)
+        ).one()
+        rows = db.session.execute(
+            select(Waypoint.index, Waypoint.latitude, Waypoint.longitude, Waypoint.altitude)
+            .where(Waypoint.mission_id == mission_id)
+            .order_by(Waypoint.index, Waypoint.id)
+        ).all()
+        try:
+            speeds = parse_flight_speeds(kml_data)
+        except KMLParsingError as e:
+            logger.warning(f"Using default speeds for mission {mission_id}: {str(e)}")
+            speeds = {'auto_flight_speed': None, 'waypoint_speeds': {}}
+        auto_flight_speed = _flight_speed(speeds['auto_flight_speed']) or current_app.config.get('PLAYBACK_DEFAULT_SPEED_MPS', 10.0)
+        if kml_stale:
+            # Waypoints were edited after the KML was stored, so its wpml:index values
+            # no longer name the same rows; only the wayline speed still applies
+            waypoint_speeds = {}
+        else:
+            waypoint_speeds = {index: speed for index, speed in speeds['waypoint_speeds'].items() if _flight_speed(speed)}
+        
+        timeline = build_timeline(
+            [row[1] for row in rows],
+            [row[2] for row in rows],
+            [np.nan if row[3] is None else row[3] for row in rows],
+            [waypoint_speeds.get(row[0], auto_flight_speed) for row in rows]
+        )
+        duration = float(timeline['time'][-1]) if rows else 0.0
+        return {
+            'mission_id': mission_id,
+            'auto_flight_speed_mps': auto_flight_speed,
+            'waypoint_count': len(rows),
+            'duration_s': round(duration, 3),
+            'waypoints': {field: to_json_list(timeline[field], FRAME_DIGITS[field]) for field in TIMELINE_FIELDS}
+        }
+    
+    @staticmethod
+    def validate(format: str, step_s: float, chunk_frames: int) -> None:
+        """Check playback parameters up front, so errors surface before any frames are streamed"""
+        if format not in FORMATS:
+            raise ValidationError(f"Unknown format '{format}' (expected one of {', '.join(FORMATS)})")
+        if not MIN_STEP_S <= step_s <= MAX_STEP_S:
+            raise ValidationError(f"Step must be between {MIN_STEP_S:g} and {MAX_STEP_S:g} seconds")
+        if not 1 <= chunk_frames <= MAX_CHUNK_FRAMES:
+            raise ValidationError(f"Chunk size must be between 1 and {MAX_CHUNK_FRAMES} frames")
+    
+    @staticmethod
+    def stream(mission_id: int, format: str = 'ndjson', step_s: float = 1.0,
+               chunk_frames: Optional[int] = None) -> Iterator[str]:
+        """
+        Stream a mission's flight as frames every ``step_s`` seconds
+        
+        The first message carries the timeline summary, then each message
+        carries up to ``chunk_frames`` frames as columns (``time``,
+        ``latitude``, ``longitude``, ``altitude``, ``heading``, ``speed``).
+        Frames are interpolated one chunk at a time, so the first chunk goes
+        out as soon as the (cached) timeline is loaded. ``ndjson`` writes one
+        JSON object per line; ``sse`` writes ``meta``, ``frames`` and ``end``
+        events.
+        
+        Raises:
+            NotFoundError: If the mission does not exist
+            ValidationError: If a parameter is out of range
+        """
+        if chunk_frames is None:
+            chunk_frames = current_app.config.get('PLAYBACK_CHUNK_FRAMES', 500)
+        PlaybackService.validate(format, step_s, chunk_frames)
+        payload = PlaybackService.get_timeline(mission_id)
+        frame_count = int(np.floor(payload['duration_s'] / step_s)) + 1 if payload['waypoint_count'] else 0
+        if frame_count > MAX_FRAMES:
+            raise ValidationError(f"Step too small: {frame_count} frames exceeds the limit of {MAX_FRAMES}")
+        
+        timeline = timeline_arrays(payload)
+        meta = {
+            'mission_id': mission_id,
+            'step_s': step_s,
+            'frame_count': frame_count,
+            'duration_s': payload['duration_s'],
+            'waypoint_count': payload['waypoint_count'],
+            'auto_flight_speed_mps': payload['auto_flight_speed_mps']
+        }
+        return PlaybackService._messages(format, meta, timeline, step_s, frame_count, chunk_frames)
+    
+    @staticmethod
+    def _messages(format: str, meta: Dict, timeline: Dict, step_s: float, frame_count: int,
+                  chunk_frames: int) -> Iterator[str]:
+        yield _encode_message(format, 'meta', meta)
+        for start in range(0, frame_count, chunk_frames):
+            times = np.arange(start, min(start + chunk_frames, frame_count)) * step_s
+            frames = sample_timeline(timeline, times)
+            yield _encode_message(format, 'frames', {
+                field: to_json_list(frames[field], FRAME_DIGITS[field]) for field in TIMELINE_FIELDS
+            })
+        yield _encode_message(format, 'end', {'frame_count': frame_count})
+
+def _flight_speed(speed: Optional[float]) -> Optional[float]:
+    """``speed`` if it is a usable flight speed (finite and above zero), else None"""
+    return speed if speed is not None and math.isfinite(speed) and speed > 0 else None
+
+def timeline_arrays(payload: Dict) -> Dict[str, np.ndarray]:
+    """The per-waypoint columns of a ``get_timeline`` payload as float arrays (None as NaN)"""
+    return {
+        field: np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+        for field, values in payload['waypoints'].items()
+    }
+
+def _encode_message(format: str, event: str, data: Dict) -> str:
+    body = json.dumps(data, separators=(',', ':'))
+    if format == 'sse':
+        return f"event: {event}\ndata: {body}\n\n"
+    return f'{{"{event}":{body}}}\n'
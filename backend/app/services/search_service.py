@@ -0,0 +1,122 @@
+import html
+import re
+from typing import Dict
+from sqlalchemy import text
+from app.database import db
+from app.models.search import SEARCH_DDL
+from app.errors import APIError, ValidationError
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAX_PAGE_SIZE = 100
+MAX_QUERY_TERMS = 16
+SNIPPET_TOKENS = 12
+
+# Private-use markers around matches; swapped for <mark> after the text is HTML-escaped
+MATCH_START, MATCH_END = '\ue000', '\ue001'
+
+SEARCH_SQL = text(f"""
+    SELECT s.rowid, s.kind, s.mission_id, m.name AS mission_name, s.rank AS rank,
+           snippet(search_index, 0, '{MATCH_START}', '{MATCH_END}', '…', {SNIPPET_TOKENS}) AS snippet
+    FROM search_index AS s
+    JOIN mission AS m ON m.id = s.mission_id
+    WHERE search_index MATCH :query
+    ORDER BY s.rank
+    LIMIT :limit OFFSET :offset
+""")
+COUNT_SQL = text("SELECT count(*) FROM search_index WHERE search_index MATCH :query")
+
+class SearchService:
+    """Full-text search over mission names and annotation / no-fly zone notes (SQLite FTS5)"""
+    
+    @staticmethod
+    def build_match_query(query: str) -> str:
+        """
+        Turn free text into an FTS5 query
+        
+        Every word must match (implicit AND) and the last word also matches as
+        a prefix, so partially typed input finds results. Words are quoted, so
+        FTS5 operators and punctuation in the input are treated as text.
+        """
+        terms = re.findall(r'\w+', query or '')[:MAX_QUERY_TERMS]
+        if not terms:
+            raise ValidationError("Search query must contain at least one word")
+        quoted = [f'"{term}"' for term in terms]
+        quoted[-1] += '*'
+        return ' '.join(quoted)
+    
+    @staticmethod
+    def search(query: str, limit: int = 20, offset: int = 0) -> Dict:
+        """
+        Ranked search (BM25) with highlighted snippets
+        
+        Returns:
+            Dict: ``items`` (kind, id, mission_id, mission_name, snippet, score)
+            plus ``total``, ``limit`` and ``offset``
+        """
+        SearchService._require_fts()
+        if not 1 <= limit <= MAX_PAGE_SIZE or offset < 0:
+            raise ValidationError(f"Limit must be between 1 and {MAX_PAGE_SIZE} and offset non-negative")
+        match = SearchService.build_match_query(query)
+        
+        rows = db.session.execute(SEARCH_SQL, {'query': match, 'limit': limit, 'offset': offset}).all()
+        total = db.session.scalar(COUNT_SQL, {'query': match})
+        return {
+            'items': [
+                {
+                    'kind': row.kind,
+                    'id': row.rowid // 4,
+                    'mission_id': row.mission_id,
+                    'mission_name': row.mission_name,
+                    'snippet': SearchService._highlight(row.snippet),
+                    'score': round(-row.rank, 4)
+                }
+                for row in rows
+            ],
+            'total': total,
+            'limit': limit,
+            'offset': offset
+        }
+    
+    @staticmethod
+    def _highlight(snippet: str) -> str:
+        return html.escape(snippet).replace(MATCH_START, '<mark>').replace(MATCH_END, '</mark>')
+    
+    @staticmethod
+    def rebuild() -> int:
+        """
+        Create the index if needed and repopulate it from the source tables
+        
+        Returns:
+            int: Number of indexed entries
+        """
+        SearchService._require_fts()
+        try:
+            for statement in SEARCH_DDL:
+                db.session.execute(text(statement))
+            db.session.execute(text("DELETE FROM search_index"))
+            db.session.execute(text(
+                "INSERT INTO search_index (rowid, body, kind, mission_id) "
+                "SELECT id * 4 + 1, name, 'mission', id FROM mission"
+            ))
+            for table, code in (('annotation', 2), ('no_fly_zone', 3)):
+                db.session.execute(text(
+                    f"INSERT INTO search_index (rowid, body, kind, mission_id) "
+                    f"SELECT id * 4 + {code}, note, '{table}', mission_id FROM {table} "
+                    f"WHERE note IS NOT NULL AND note != ''"
+                ))
+            db.session.execute(text("INSERT INTO search_index (search_index) VALUES ('optimize')"))
+            count = db.session.scalar(text("SELECT count(*) FROM search_index"))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        
+        logger.info(f"Rebuilt search index with {count} entries")
+        return count
+    
+    @staticmethod
+    def _require_fts() -> None:
+        if db.engine.dialect.name != 'sqlite':
+            raise APIError("Full-text search requires SQLite FTS5", status_code=501)
@@ -0,0 +1,196 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import select, insert, update, delete, func
+from app.database import db
+from app.models.mission import Mission, Waypoint, Annotation, NoFlyZone
+from app.models.summary import MissionSummary
+from app.utils.geo import path_length_m, haversine_m
+from app.errors import ValidationError
+import logging
+
+logger = logging.getLogger(__name__)
+
+SORT_COLUMNS = {
+    'updated_at': MissionSummary.updated_at,
+    'name': MissionSummary.name,
+    'mission_id': MissionSummary.mission_id,
+}
+MAX_PAGE_SIZE = 500
+REBUILD_BATCH_SIZE = 500
+
+class SummaryService:
+    """
+    Maintains the ``mission_summary`` read model
+    
+    Write paths call ``refresh`` (anything that changes waypoints) or
+    ``update`` (counters and scalar columns) before committing, so the summary
+    always commits or rolls back together with the change it describes.
+    """
+    
+    @staticmethod
+    def refresh(mission: Mission, waypoints: Optional[List[Dict]] = None) -> MissionSummary:
+        """
+        Recompute a mission's summary from the source tables
+        
+        Args:
+            mission (Mission): Mission to summarize
+            waypoints (List[Dict], optional): The mission's waypoints when the
+                caller already has them in memory; read from the database otherwise
+        """
+        mission_id = mission.id
+        if waypoints is None:
+            points = db.session.execute(
+                select(Waypoint.latitude, Waypoint.longitude)
+                .where(Waypoint.mission_id == mission_id)
+                .order_by(Waypoint.index, Waypoint.id)
+            ).all()
+        else:
+            points = [
+                (waypoint['latitude'], waypoint['longitude'])
+                for waypoint in sorted(waypoints, key=lambda waypoint: waypoint['index'])
+            ]
+        
+        summary = db.session.get(MissionSummary, mission_id)
+        if summary is None:
+            summary = MissionSummary(mission_id=mission_id)
+            db.session.add(summary)
+        summary.name = mission.name
+        summary.kml_stale = bool(mission.kml_stale)
+        summary.waypoint_count = len(points)
+        summary.annotation_count = db.session.scalar(
+            select(func.count(Annotation.id)).where(Annotation.mission_id == mission_id)
+        )
+        summary.no_fly_zone_count = db.session.scalar(
+            select(func.count(NoFlyZone.id)).where(NoFlyZone.mission_id == mission_id)
+        )
+        if points:
+            latitudes = [latitude for latitude, _ in points]
+            longitudes = [longitude for _, longitude in points]
+            summary.min_latitude, summary.max_latitude = min(latitudes), max(latitudes)
+            summary.min_longitude, summary.max_longitude = min(longitudes), max(longitudes)
+        else:
+            summary.min_latitude = summary.max_latitude = summary.min_longitude = summary.max_longitude = None
+        summary.distance_m = path_length_m(points)
+        summary.updated_at = datetime.utcnow()
+        return summary
+    
+    @staticmethod
+    def update(mission_id: int, values: Optional[Dict] = None, increments: Optional[Dict] = None) -> None:
+        """
+        Set columns and add to counters of a mission's summary with one UPDATE
+        
+        Falls back to ``refresh`` when the mission has no summary row yet
+        (e.g. a database that has not been backfilled).
+        """
+        changes = dict(values or {})
+        for column, amount in (increments or {}).items():
+            changes[column] = getattr(MissionSummary, column) + amount
+        changes['updated_at'] = datetime.utcnow()
+        
+        result = db.session.execute(
+            update(MissionSummary).where(MissionSummary.mission_id == mission_id).values(**changes),
+            execution_options={'synchronize_session': False}
+        )
+        if result.rowcount == 0:
+            SummaryService.refresh(db.session.get(Mission, mission_id))
+    
+    @staticmethod
+    def list_summaries(sort: str = 'updated_at', order: str = 'desc', limit: int = 100, offset: int = 0) -> Dict:
+        """Page through mission summaries ordered by an indexed column"""
+        column = SORT_COLUMNS.get(sort)
+        if column is None:
+            raise ValidationError(f"Cannot sort by '{sort}' (expected one of {', '.join(SORT_COLUMNS)})")
+        if order not in ('asc', 'desc'):
+            raise ValidationError("Order must be 'asc' or 'desc'")
+        if not 1 <= limit <= MAX_PAGE_SIZE or offset < 0:
+            raise ValidationError(f"Limit must be between 1 and {MAX_PAGE_SIZE} and offset non-negative")
+        
+        ordering = column.desc() if order == 'desc' else column.asc()
+        summaries = db.session.scalars(
+            select(MissionSummary).order_by(ordering, MissionSummary.mission_id).limit(limit).offset(offset)
+        ).all()
+        total = db.session.scalar(select(func.count()).select_from(MissionSummary))
+        return {
+            'items': [summary.to_dict() for summary in summaries],
+            'total': total,
+            'limit': limit,
+            'offset': offset
+        }
+    
+    @staticmethod
+    def rebuild() -> int:
+        """
+        Recreate every summary row from the source tables
+        
+        Uses one grouped query per source table and a single ordered pass over
+        all waypoints for the path lengths, then inserts in batches.
+        
+        Returns:
+            int: Number of summaries written
+        """
+        missions = db.session.execute(select(Mission.id, Mission.name, Mission.kml_stale)).all()
+        annotation_counts = dict(db.session.execute(
+            select(Annotation.mission_id, func.count(Annotation.id)).group_by(Annotation.mission_id)
+        ).all())
+        zone_counts = dict(db.session.execute(
+            select(NoFlyZone.mission_id, func.count(NoFlyZone.id)).group_by(NoFlyZone.mission_id)
+        ).all())
+        bounds = {
+            row.mission_id: row
+            for row in db.session.execute(
+                select(
+                    Waypoint.mission_id,
+                    func.count(Waypoint.id).label('count'),
+                    func.min(Waypoint.latitude).label('min_latitude'),
+                    func.min(Waypoint.longitude).label('min_longitude'),
+                    func.max(Waypoint.latitude).label('max_latitude'),
+                    func.max(Waypoint.longitude).label('max_longitude')
+                ).group_by(Waypoint.mission_id)
+            )
+        }
+        
+        distances = {}
+        previous_mission, previous_point = None, None
+        rows = db.session.execute(
+            select(Waypoint.mission_id, Waypoint.latitude, Waypoint.longitude)
+            .order_by(Waypoint.mission_id, Waypoint.index, Waypoint.id)
+            .execution_options(yield_per=10000)
+        )
+        for mission_id, latitude, longitude in rows:
+            if mission_id == previous_mission:
+                distances[mission_id] += haversine_m(previous_point[0], previous_point[1], latitude, longitude)
+            else:
+                distances[mission_id] = 0.0
+                previous_mission = mission_id
+            previous_point = (latitude, longitude)
+        
+        now = datetime.utcnow()
+        summaries = []
+        for mission_id, name, kml_stale in missions:
+            bound = bounds.get(mission_id)
+            summaries.append({
+                'mission_id': mission_id,
+                'name': name,
+                'waypoint_count': bound.count if bound else 0,
+                'annotation_count': annotation_counts.get(mission_id, 0),
+                'no_fly_zone_count': zone_counts.get(mission_id, 0),
+                'min_latitude': bound.min_latitude if bound else None,
+                'min_longitude': bound.min_longitude if bound else None,
+                'max_latitude': bound.max_latitude if bound else None,
+                'max_longitude': bound.max_longitude if bound else None,
+                'distance_m': distances.get(mission_id, 0.0),
+                'kml_stale': bool(kml_stale),
+                'updated_at': now
+            })
+        
+        try:
+            db.session.execute(delete(MissionSummary), execution_options={'synchronize_session': False})
+            for start in range(0, len(summaries), REBUILD_BATCH_SIZE):
+                db.session.execute(insert(MissionSummary), summaries[start:start + REBUILD_BATCH_SIZE])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        
+        logger.info(f"Rebuilt {len(summaries)} mission summaries")
+        return len(summaries)
@@ -0,0 +1,138 @@
+import os
+import re
+from typing import Dict, Optional
+import numpy as np
+from flask import current_app
+from sqlalchemy import select
+from app.database import db
+from app.models.mission import Mission, Waypoint
+from app.payload_cache import get_payload_cache, mission_key, register_mission_payload
+from app.services.mission_service import MissionService
+from app.utils.dem import get_dem_store, DemStore
+from app.utils.trajectory import haversine_array, to_json_list
+from app.errors import APIError, ValidationError
+import logging
+
+logger = logging.getLogger(__name__)
+
+register_mission_payload('terrain')
+
+HEIGHT_MODE = re.compile(r'<wpml:executeHeightMode>\s*(\w+)\s*<')
+TAKEOFF_REF_POINT = re.compile(r'<wpml:takeOffRefPoint>\s*([^<]+?)\s*<')
+MIN_INTERVAL_M, MAX_INTERVAL_M = 1.0, 1000.0
+
+class TerrainService:
+    """Ground clearance along mission paths from local DEM tiles"""
+    
+    @staticmethod
+    def get_clearance_profile(mission_id: int, interval_m: Optional[float] = None) -> Dict:
+        """
+        Sample terrain along a mission's path and compare it with the flight altitude
+        
+        The path is sampled every ``interval_m`` metres and at every waypoint.
+        Results are cached per mission; the cache entry is tied to the mission
+        revision, the DEM tiles on disk and the interval.
+        
+        Raises:
+            NotFoundError: If the mission does not exist
+            ValidationError: If the interval is out of range
+            APIError: 501 if no DEM directory is configured
+        """
+        config = current_app.config
+        directory = config.get('TERRAIN_DEM_DIR')
+        if not directory or not os.path.isdir(directory):
+            raise APIError("No terrain data configured (set TERRAIN_DEM_DIR)", status_code=501)
+        interval_m = float(interval_m if interval_m is not None else config.get('TERRAIN_SAMPLE_INTERVAL_M', 30))
+        if not MIN_INTERVAL_M <= interval_m <= MAX_INTERVAL_M:
+            raise ValidationError(f"Interval must be between {MIN_INTERVAL_M:g} and {MAX_INTERVAL_M:g} metres")
+        
+        revision = MissionService.get_mission_revision(mission_id)
+        store = get_dem_store(directory)
+        build = lambda: TerrainService._build_profile(mission_id, store, interval_m)
+        cache = get_payload_cache()
+        if cache is None:
+            return build()
+        return cache.get_or_build(
+            mission_key(mission_id, 'terrain'), f'{revision}:{store.fingerprint}:{interval_m:g}', build
+        )
+    
+    @staticmethod
+    def _build_profile(mission_id: int, store: DemStore, interval_m: float) -> Dict:
+        kml_data = db.session.scalar(select(Mission.kml_data).where(Mission.id == mission_id))
+        rows = db.session.execute(
+            select(Waypoint.latitude, Waypoint.longitude, Waypoint.altitude)
+            .where(Waypoint.mission_id == mission_id)
+            .order_by(Waypoint.index, Waypoint.id)
+        ).all()
+        match = HEIGHT_MODE.search(kml_data)
+        height_mode = match.group(1) if match else 'relativeToStartPoint'
+        min_clearance_threshold = current_app.config.get('TERRAIN_MIN_CLEARANCE_M', 30.0)
+        
+        profile = {
+            'mission_id': mission_id,
+            'interval_m': interval_m,
+            'height_mode': height_mode,
+            'min_clearance_threshold_m': min_clearance_threshold
+        }
+        if not rows:
+            return {**profile, 'summary': None, 'samples': {}}
+        
+        points = np.array([(row[0], row[1], np.nan if row[2] is None else row[2]) for row in rows], dtype=np.float64)
+        latitudes, longitudes, altitudes = points[:, 0], points[:, 1], points[:, 2]
+        cumulative = np.concatenate(([0.0], np.cumsum(haversine_array(latitudes[:-1], longitudes[:-1],
+                                                                    latitudes[1:], longitudes[1:]))))
+        
+        # Fixed-interval positions plus every waypoint, so no waypoint is skipped
+        distances = np.union1d(np.arange(0.0, cumulative[-1], interval_m), cumulative)
+        sample_latitudes = np.interp(distances, cumulative, latitudes)
+        sample_longitudes = np.interp(distances, cumulative, longitudes)
+        sample_altitudes = np.interp(distances, cumulative, altitudes)
+        terrain = store.sample(sample_latitudes, sample_longitudes)
+        
+        if height_mode == 'relativeToStartPoint':
+            reference = TerrainService._takeoff_elevation(kml_data, store, latitudes[0], longitudes[0])
+            flight_altitudes = sample_altitudes + reference
+        elif height_mode == 'WGS84':
+            # DEM heights are above the geoid; shift ellipsoidal heights by the local separation
+            flight_altitudes = sample_altitudes - current_app.config.get('TERRAIN_GEOID_SEPARATION_M', 0.0)
+        else:
+            flight_altitudes = sample_altitudes
+        clearance = flight_altitudes - terrain
+        
+        known = ~np.isnan(clearance)
+        summary = {
+            'distance_m': round(float(cumulative[-1]), 1),
+            'samples': int(distances.size),
+            'samples_without_terrain': int((~known).sum()),
+            'min_clearance_m': None,
+            'min_clearance_at_m': None,
+            'below_threshold': int((clearance[known] < min_clearance_threshold).sum())
+        }
+        if known.any():
+            lowest = int(np.nanargmin(clearance))
+            summary['min_clearance_m'] = round(float(clearance[lowest]), 2)
+            summary['min_clearance_at_m'] = round(float(distances[lowest]), 1)
+        
+        return {
+            **profile,
+            'summary': summary,
+            'samples': {
+                'distance_m': to_json_list(distances, 1),
+                'latitude': to_json_list(sample_latitudes, 7),
+                'longitude': to_json_list(sample_longitudes, 7),
+                'terrain_m': to_json_list(terrain, 2),
+                'flight_altitude_m': to_json_list(flight_altitudes, 2),
+                'clearance_m': to_json_list(clearance, 2)
+            }
+        }
+    
+    @staticmethod
+    def _takeoff_elevation(kml_data: str, store: DemStore, latitude: float, longitude: float) -> float:
+        """Ground elevation at the take-off reference point, else below the first waypoint"""
+        match = TAKEOFF_REF_POINT.search(kml_data)
+        if match:
+            try:
+                latitude, longitude = (float(value) for value in match.group(1).split(',')[:2])
+            except ValueError:
+                logger.warning(f"Ignoring malformed takeOffRefPoint '{match.group(1)}'")
+        return float(store.sample(np.array([latitude]), np.array([longitude]))[0])
@@ -0,0 +1,321 @@
+from difflib import SequenceMatcher
+from typing import Dict, List
+import hashlib
+from sqlalchemy import select, insert, update, func
+from app.database import db
+from app.models.mission import Mission, Waypoint
+from app.models.version import MissionVersion, WaypointBlock, KmlBlob
+from app.services.mission_service import MissionService
+from app.services.summary_service import SummaryService
+from app.utils.waypoint_blocks import chunk_points, unpack_block
+from app.errors import ValidationError, NotFoundError
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Keeps IN (...) lists under SQLite's bound-parameter limit
+LOOKUP_BATCH_SIZE = 500
+
+class VersionService:
+    """
+    Copy-on-write mission versions
+    
+    A version is an ordered list of content-addressed waypoint blocks plus a
+    content-addressed KML blob. Snapshots only insert blocks that do not exist
+    yet, and branching from an existing version copies the block list, so
+    unchanged waypoints and KML are stored once however many versions share them.
+    """
+    
+    @staticmethod
+    def list_versions(mission_id: int) -> List[Dict]:
+        """List a mission's versions, newest first"""
+        VersionService._get_mission(mission_id)
+        versions = MissionVersion.query.filter_by(mission_id=mission_id).order_by(MissionVersion.number.desc()).all()
+        return [version.to_dict() for version in versions]
+    
+    @staticmethod
+    def create_version(mission_id: int, label: str = None, from_version_id: int = None) -> Dict:
+        """
+        Create a version of a mission
+        
+        Without ``from_version_id`` the mission's current waypoints and KML are
+        snapshotted. With it, a new version branches from an existing one
+        without touching any waypoint data, so it costs the same for any size.
+        """
+        mission = VersionService._get_mission(mission_id)
+        if label is not None and (not isinstance(label, str) or len(label) > 100):
+            raise ValidationError("Version label must be a string of at most 100 characters")
+        
+        try:
+            latest = db.session.scalar(
+                select(func.max(MissionVersion.number)).where(MissionVersion.mission_id == mission_id)
+            ) or 0
+            
+            if from_version_id is not None:
+                source = VersionService._get_version(mission_id, from_version_id)
+                version = MissionVersion(
+                    mission_id=mission_id,
+                    parent_id=source.id,
+                    number=latest + 1,
+                    label=label,
+                    kml_blob_id=source.kml_blob_id,
+                    kml_stale=source.kml_stale,
+                    block_ids=source.block_ids,
+                    waypoint_count=source.waypoint_count
+                )
+                new_blocks = 0
+            else:
+                parent_id = db.session.scalar(
+                    select(MissionVersion.id).where(
+                        MissionVersion.mission_id == mission_id, MissionVersion.number == latest
+                    )
+                )
+                points = db.session.execute(
+                    select(Waypoint.latitude, Waypoint.longitude, Waypoint.altitude)
+                    .where(Waypoint.mission_id == mission_id)
+                    .order_by(Waypoint.index, Waypoint.id)
+                ).all()
+                block_ids, new_blocks = VersionService._store_blocks(chunk_points(points))
+                version = MissionVersion(
+                    mission_id=mission_id,
+                    parent_id=parent_id,
+                    number=latest + 1,
+                    label=label,
+                    kml_blob_id=VersionService._store_kml(mission.kml_data),
+                    kml_stale=bool(mission.kml_stale),
+                    block_ids=','.join(str(block_id) for block_id in block_ids),
+                    waypoint_count=len(points)
+                )
+            
+            db.session.add(version)
+            db.session.commit()
+        except ValidationError:
+            db.session.rollback()
+            raise
+        except Exception as e:
+            logger.error(f"Failed to create version for mission {mission_id}: {str(e)}")
+            db.session.rollback()
+            raise ValidationError(f"Failed to create version: {str(e)}")
+        
+        logger.info(f"Created version {version.number} of mission {mission_id} ({new_blocks} new blocks)")
+        result = version.to_dict()
+        result['new_blocks'] = new_blocks
+        return result
+    
+    @staticmethod
+    def _store_blocks(blocks) -> tuple[List[int], int]:
+        """Insert blocks that are not stored yet; return the ordered block IDs and how many were new"""
+        hashes = list({digest for digest, _, _ in blocks})
+        known = {}
+        for start in range(0, len(hashes), LOOKUP_BATCH_SIZE):
+            known.update(db.session.execute(
+                select(WaypointBlock.sha256, WaypointBlock.id)
+                .where(WaypointBlock.sha256.in_(hashes[start:start + LOOKUP_BATCH_SIZE]))
+            ).all())
+        
+        missing = {}
+        for digest, count, data in blocks:
+            if digest not in known and digest not in missing:
+                missing[digest] = {'sha256': digest, 'count': count, 'data': data}
+        if missing:
+            db.session.execute(insert(WaypointBlock), list(missing.values()))
+            new_hashes = list(missing)
+            for start in range(0, len(new_hashes), LOOKUP_BATCH_SIZE):
+                known.update(db.session.execute(
+                    select(WaypointBlock.sha256, WaypointBlock.id)
+                    .where(WaypointBlock.sha256.in_(new_hashes[start:start + LOOKUP_BATCH_SIZE]))
+                ).all())
+        
+        return [known[digest] for digest, _, _ in blocks], len(missing)
+    
+    @staticmethod
+    def _store_kml(kml_data: str) -> int:
+        digest = hashlib.sha256(kml_data.encode('utf-8')).hexdigest()
+        blob_id = db.session.scalar(select(KmlBlob.id).where(KmlBlob.sha256 == digest))
+        if blob_id is None:
+            blob = KmlBlob(sha256=digest, content=kml_data)
+            db.session.add(blob)
+            db.session.flush()
+            blob_id = blob.id
+        return blob_id
+    
+    @staticmethod
+    def _load_points(block_ids: List[int]) -> List[tuple]:
+        """Decode an ordered block list into waypoint tuples (each distinct block is read once)"""
+        unique_ids = list(set(block_ids))
+        data_by_id = {}
+        for start in range(0, len(unique_ids), LOOKUP_BATCH_SIZE):
+            data_by_id.update(db.session.execute(
+                select(WaypointBlock.id, WaypointBlock.data)
+                .where(WaypointBlock.id.in_(unique_ids[start:start + LOOKUP_BATCH_SIZE]))
+            ).all())
+        points = []
+        for block_id in block_ids:
+            points.extend(unpack_block(data_by_id[block_id]))
+        return points
+    
+    @staticmethod
+    def diff_versions(mission_id: int, from_version_id: int, to_version_id: int) -> Dict:
+        """
+        Diff two versions of a mission
+        
+        Blocks shared at the start and end of both block lists are skipped
+        without being read; only the differing middle is decoded and compared.
+        """
+        source = VersionService._get_version(mission_id, from_version_id)
+        target = VersionService._get_version(mission_id, to_version_id)
+        source_blocks = source.block_id_list()
+        target_blocks = target.block_id_list()
+        
+        prefix = 0
+        while prefix < min(len(source_blocks), len(target_blocks)) and source_blocks[prefix] == target_blocks[prefix]:
+            prefix += 1
+        suffix = 0
+        while (suffix < min(len(source_blocks), len(target_blocks)) - prefix
+               and source_blocks[-1 - suffix] == target_blocks[-1 - suffix]):
+            suffix += 1
+        
+        offset = 0
+        if prefix:
+            counts = dict(db.session.execute(
+                select(WaypointBlock.id, WaypointBlock.count).where(WaypointBlock.id.in_(set(source_blocks[:prefix])))
+            ).all())
+            offset = sum(counts[block_id] for block_id in source_blocks[:prefix])
+        
+        source_points = VersionService._load_points(source_blocks[prefix:len(source_blocks) - suffix])
+        target_points = VersionService._load_points(target_blocks[prefix:len(target_blocks) - suffix])
+        
+        changes = []
+        summary = {'inserted': 0, 'deleted': 0, 'replaced': 0}
+        matcher = SequenceMatcher(None, source_points, target_points, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                continue
+            summary[{'insert': 'inserted', 'delete': 'deleted', 'replace': 'replaced'}[tag]] += max(i2 - i1, j2 - j1)
+            changes.append({
+                'type': tag,
+                'from_range': [offset + i1, offset + i2],
+                'to_range': [offset + j1, offset + j2],
+                'from_waypoints': [VersionService._point_dict(point) for point in source_points[i1:i2]],
+                'to_waypoints': [VersionService._point_dict(point) for point in target_points[j1:j2]]
+            })
+        
+        return {
+            'from_version': source.to_dict(),
+            'to_version': target.to_dict(),
+            'kml_changed': source.kml_blob_id != target.kml_blob_id,
+            'shared_blocks': prefix + suffix,
+            'compared_waypoints': len(source_points) + len(target_points),
+            'summary': summary,
+            'changes': changes
+        }
+    
+    @staticmethod
+    def restore_version(mission_id: int, version_id: int) -> Dict:
+        """
+        Make a version the mission's current state
+        
+        Waypoint rows are brought in line with the version through the same
+        incremental diff as KML updates: rows are matched by content, so
+        restoring a nearby version writes only the rows that differ plus one
+        index shift per run of rows that moved.
+        """
+        mission = VersionService._get_mission(mission_id)
+        version = VersionService._get_version(mission_id, version_id)
+        
+        try:
+            points = VersionService._load_points(version.block_id_list())
+            changes = MissionService._sync_waypoints(mission_id, [
+                {'latitude': latitude, 'longitude': longitude, 'altitude': altitude, 'index': index}
+                for index, (latitude, longitude, altitude) in enumerate(points)
+            ])
+            mission.kml_data = version.kml_blob.content
+            mission.kml_stale = version.kml_stale
+            if version.kml_stale:
+                # The version does not record which placemark each waypoint came from, so
+                # regenerated placemarks get default settings rather than another waypoint's
+                db.session.execute(
+                    update(Waypoint).where(Waypoint.mission_id == mission_id, Waypoint.source_index.is_not(None))
+                    .values(source_index=None),
+                    execution_options={'synchronize_session': False}
+                )
+            SummaryService.refresh(mission)
+            mission.touch()
+            db.session.commit()
+        except Exception as e:
+            logger.error(f"Failed to restore version {version_id} of mission {mission_id}: {str(e)}")
+            db.session.rollback()
+            raise ValidationError(f"Failed to restore version: {str(e)}")
+        
+        logger.info(f"Restored mission {mission_id} to version {version.number}: {changes}")
+        return {'mission_id': mission_id, 'version': version.to_dict(), 'changes': changes}
+    
+    @staticmethod
+    def clone_version(mission_id: int, version_id: int, name: str = None) -> Dict:
+        """
+        Create a new mission from a version
+        
+        The clone's first version shares the source version's block list and
+        KML blob, so no version storage is copied. Its waypoint rows, which
+        every read endpoint queries, are inserted from the decoded blocks in one
+        batch; that step is linear in the waypoint count.
+        """
+        mission = VersionService._get_mission(mission_id)
+        version = VersionService._get_version(mission_id, version_id)
+        if name is None:
+            name = f"{mission.name[:90]} (v{version.number})"
+        if not isinstance(name, str) or not name.strip() or len(name.strip()) > 100:
+            raise ValidationError("Mission name must be a non-empty string of at most 100 characters")
+        
+        try:
+            clone = Mission(name=name.strip(), kml_data=version.kml_blob.content, kml_stale=version.kml_stale)
+            db.session.add(clone)
+            db.session.flush()
+            waypoints = [
+                {'mission_id': clone.id, 'latitude': latitude, 'longitude': longitude, 'altitude': altitude, 'index': index}
+                for index, (latitude, longitude, altitude) in enumerate(VersionService._load_points(version.block_id_list()))
+            ]
+            if waypoints:
+                db.session.execute(insert(Waypoint), waypoints)
+            cloned_version = MissionVersion(
+                mission_id=clone.id,
+                number=1,
+                label=version.label,
+                kml_blob_id=version.kml_blob_id,
+                kml_stale=version.kml_stale,
+                block_ids=version.block_ids,
+                waypoint_count=version.waypoint_count
+            )
+            db.session.add(cloned_version)
+            SummaryService.refresh(clone, waypoints)
+            db.session.commit()
+        except Exception as e:
+            logger.error(f"Failed to clone version {version_id} of mission {mission_id}: {str(e)}")
+            db.session.rollback()
+            raise ValidationError(f"Failed to clone version: {str(e)}")
+        
+        logger.info(f"Cloned version {version.number} of mission {mission_id} as mission {clone.id}")
+        return {
+            'mission': {'id': clone.id, 'name': clone.name},
+            'version': cloned_version.to_dict(),
+            'waypoint_count': len(waypoints)
+        }
+    
+    @staticmethod
+    def _point_dict(point: tuple) -> Dict:
+        latitude, longitude, altitude = point
+        return {'latitude': latitude, 'longitude': longitude, 'altitude': altitude}
+    
+    @staticmethod
+    def _get_mission(mission_id: int) -> Mission:
+        mission = db.session.get(Mission, mission_id)
+        if not mission:
+            raise NotFoundError(f"Mission with ID {mission_id} not found")
+        return mission
+    
+    @staticmethod
+    def _get_version(mission_id: int, version_id: int) -> MissionVersion:
+        version = db.session.get(MissionVersion, version_id)
+        if not version or version.mission_id != mission_id:
+            raise NotFoundError(f"Version {version_id} of mission {mission_id} not found")
+        return version
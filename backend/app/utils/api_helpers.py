@@ -1,12 +1,29 @@
 # API response helpers and utilities
-from flask import jsonify, request
+import json
+from flask import current_app, jsonify, request
 from datetime import datetime
 import uuid
+from app.errors import ValidationError
 
 def generate_request_id():
     """Generate a unique request ID for tracing."""
     return str(uuid.uuid4())[:8]
 
+def _envelope(message, status_code, meta):
+    envelope = {
+        'success': 200 <= status_code < 400,
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'request_id': getattr(request, 'request_id', generate_request_id())
+    }
+    
+    if message:
+        envelope['message'] = message
+    
+    if meta:
+        envelope['meta'] = meta
+    
+    return envelope
+
 def api_response(data=None, message=None, status_code=200, meta=None):
     """
     Create a standardized API response.
@@ -20,25 +37,35 @@ def api_response(data=None, message=None, status_code=200, meta=None):
     Returns:
         Flask response object
     """
-    response_data = {
-        'success': 200 <= status_code < 400,
-        'timestamp': datetime.utcnow().isoformat() + 'Z',
-        'request_id': getattr(request, 'request_id', generate_request_id())
-    }
+    response_data = _envelope(message, status_code, meta)
     
     if data is not None:
         response_data['data'] = data
     
-    if message:
-        response_data['message'] = message
-    
-    if meta:
-        response_data['meta'] = meta
-    
     response = jsonify(response_data)
     response.status_code = status_code
     return response
 
+def raw_api_response(data_json, message=None, status_code=200, meta=None):
+    """
+    Create a standardized API response around data that is already JSON text.
+    
+    The text is spliced into the envelope as is, so payloads encoded straight
+    from database rows are not parsed and encoded a second time.
+    
+    Args:
+        data_json: The response data as JSON text
+        message: Optional message string
+        status_code: HTTP status code (default: 200)
+        meta: Optional metadata dict
+    
+    Returns:
+        Flask response object
+    """
+    envelope = json.dumps(_envelope(message, status_code, meta), separators=(',', ':'))
+    body = envelope[:-1] + ',"data":' + data_json + '}\n'
+    return current_app.response_class(body, status=status_code, mimetype=current_app.json.mimetype)
+
 def api_error_response(message, status_code=400, details=None):
     """
     Create a standardized API error response.
@@ -106,3 +133,25 @@ def validate_json_request(required_fields=None, optional_fields=None):
     
     # Return only allowed fields
     return {field: data[field] for field in data.keys() if field in allowed_fields}
+
+def parse_id_list(name):
+    """
+    Read a comma-separated list of integer IDs from the query string.
+    
+    Args:
+        name: Query parameter name
+    
+    Returns:
+        list: IDs in the given order without duplicates, or None if the parameter is absent
+    
+    Raises:
+        ValidationError: If any entry is not an integer
+    """
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        ids = [int(part) for part in value.split(',') if part.strip()]
+    except ValueError:
+        raise ValidationError(f"{name} must be a comma-separated list of integers")
+    return list(dict.fromkeys(ids))
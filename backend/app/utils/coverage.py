@@ -0,0 +1,284 @@
+"""
+Survey coverage footprints on a metric raster.
+
+Each leg of the path is buffered by half the camera swath, which gives a
+capsule (a rectangle along the leg with round ends). The union of the
+capsules is rasterized onto a lattice of square cells in a local metric
+projection, with no polygon clipping involved. Every row of cells cuts each
+capsule in one interval, and that interval has a closed form. So every
+(leg, row) pair becomes one run of covered cells. The runs are accumulated
+in a difference array with ``numpy.bincount``. The cost is one array
+operation per chunk of legs, which stays interactive for grids of tens of
+thousands of legs.
+
+Covered cells are turned back into polygons by tracing cell boundaries.
+Every boundary edge is directed with the covered cell on its left, linked to
+the edge that leaves its end vertex (turning left at pinch points), and the
+resulting cycles are split into rings by pointer jumping. Outer rings come
+out counter-clockwise and holes clockwise. Coverage is therefore exact to
+within one cell. Cells are aligned to multiples of the resolution, so a
+target polygon rasterized at the same resolution lines up cell for cell.
+"""
+
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.utils.trajectory import project_local, unproject_local
+
+MAX_PAIRS_PER_CHUNK = 1_000_000
+
+def swath_widths(altitudes, fov_deg: float) -> np.ndarray:
+    """Ground width in metres imaged across track from each altitude (negative altitudes image nothing)"""
+    return 2 * np.maximum(np.asarray(altitudes, dtype=np.float64), 0.0) * np.tan(np.radians(fov_deg) / 2)
+
+def _linear_interval(slope, offset, low, high) -> Tuple[np.ndarray, np.ndarray]:
+    """The ``u`` with ``low <= slope * u + offset <= high``, as (start, end); empty when start > end"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        first, second = (low - offset) / slope, (high - offset) / slope
+    flat = slope == 0
+    inside = (low <= offset) & (offset <= high)
+    start = np.where(flat, np.where(inside, -np.inf, np.inf), np.minimum(first, second))
+    end = np.where(flat, np.where(inside, np.inf, -np.inf), np.maximum(first, second))
+    return start, end
+
+def _capsule_rows(ax, ay, bx, by, radius, row_y) -> Tuple[np.ndarray, np.ndarray]:
+    """x-interval where the line ``y = row_y`` crosses the capsule of radius ``radius`` around A-B"""
+    start = np.full(ax.shape, np.inf)
+    end = np.full(ax.shape, -np.inf)
+    # The capsule is convex, so its cut is the hull of the cuts of its end discs and middle band
+    for cx, cy in ((ax, ay), (bx, by)):
+        squared = radius ** 2 - (row_y - cy) ** 2
+        half = np.sqrt(np.maximum(squared, 0.0))
+        start = np.where(squared >= 0, np.minimum(start, cx - half), start)
+        end = np.where(squared >= 0, np.maximum(end, cx + half), end)
+    length = np.hypot(bx - ax, by - ay)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ux, uy = np.where(length > 0, (bx - ax) / length, 0.0), np.where(length > 0, (by - ay) / length, 0.0)
+    # Along the leg: 0 <= (p - A).u <= length; across it: |(p - A).n| <= radius, with n = (-uy, ux)
+    along_start, along_end = _linear_interval(ux, (row_y - ay) * uy, 0.0, length)
+    across_start, across_end = _linear_interval(-uy, (row_y - ay) * ux, -radius, radius)
+    band_start = ax + np.maximum(along_start, across_start)
+    band_end = ax + np.minimum(along_end, across_end)
+    band = (length > 0) & (band_start <= band_end)
+    return np.where(band, np.minimum(start, band_start), start), np.where(band, np.maximum(end, band_end), end)
+
+def rasterize_legs(x, y, half_widths, resolution: float) -> Dict[str, np.ndarray]:
+    """
+    Cells whose centre lies within ``half_widths[i]`` of leg ``i`` (from point ``i`` to ``i + 1``)
+    
+    Returns:
+        Dict: ``rows``, ``starts`` and ``ends`` (inclusive) of the covered runs
+        in lattice indices, where cell ``(row, column)`` is centred on
+        ``((column + 0.5) * resolution, (row + 0.5) * resolution)``
+    """
+    ax, ay, bx, by = x[:-1], y[:-1], x[1:], y[1:]
+    radius = np.asarray(half_widths, dtype=np.float64)
+    keep = radius > 0
+    ax, ay, bx, by, radius = ax[keep], ay[keep], bx[keep], by[keep], radius[keep]
+    first_row = np.ceil((np.minimum(ay, by) - radius) / resolution - 0.5).astype(np.int64)
+    last_row = np.floor((np.maximum(ay, by) + radius) / resolution - 0.5).astype(np.int64)
+    counts = np.maximum(last_row - first_row + 1, 0)
+    
+    runs = {'rows': [], 'starts': [], 'ends': []}
+    boundaries = np.searchsorted(np.cumsum(counts), np.arange(MAX_PAIRS_PER_CHUNK, counts.sum(), MAX_PAIRS_PER_CHUNK))
+    for chunk in np.split(np.arange(counts.size), np.unique(boundaries) + 1):
+        legs = np.repeat(chunk, counts[chunk])
+        if legs.size == 0:
+            continue
+        offsets = np.arange(legs.size) - np.repeat(np.cumsum(counts[chunk]) - counts[chunk], counts[chunk])
+        rows = first_row[legs] + offsets
+        start, end = _capsule_rows(ax[legs], ay[legs], bx[legs], by[legs], radius[legs], (rows + 0.5) * resolution)
+        with np.errstate(invalid='ignore'):
+            first_column = np.ceil(start / resolution - 0.5)
+            last_column = np.floor(end / resolution - 0.5)
+        hit = first_column <= last_column
+        runs['rows'].append(rows[hit])
+        runs['starts'].append(first_column[hit].astype(np.int64))
+        runs['ends'].append(last_column[hit].astype(np.int64))
+    return {key: np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64) for key, parts in runs.items()}
+
+def rasterize_ring(x, y, resolution: float) -> Dict[str, np.ndarray]:
+    """Runs of cells whose centre lies inside the closed ring ``(x, y)`` (even-odd rule), as in ``rasterize_legs``"""
+    x0, y0, x1, y1 = x[:-1], y[:-1], x[1:], y[1:]
+    first_row = np.ceil(np.minimum(y0, y1) / resolution - 0.5).astype(np.int64)
+    # Half-open in y, so a row through a vertex is crossed once
+    last_row = np.ceil(np.maximum(y0, y1) / resolution - 0.5).astype(np.int64) - 1
+    counts = np.maximum(last_row - first_row + 1, 0)
+    edges = np.repeat(np.arange(counts.size), counts)
+    rows = first_row[edges] + np.arange(edges.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    row_y = (rows + 0.5) * resolution
+    crossing = x0[edges] + (row_y - y0[edges]) * (x1[edges] - x0[edges]) / (y1[edges] - y0[edges])
+    order = np.lexsort((crossing, rows))
+    rows, crossing = rows[order], crossing[order]
+    # Crossings pair up within each row: inside between the 1st and 2nd, the 3rd and 4th, ...
+    entering, leaving = np.arange(0, rows.size, 2), np.arange(1, rows.size, 2)
+    first_column = np.ceil(crossing[entering] / resolution - 0.5).astype(np.int64)
+    last_column = np.floor(crossing[leaving] / resolution - 0.5).astype(np.int64)
+    hit = first_column <= last_column
+    return {'rows': rows[entering][hit], 'starts': first_column[hit], 'ends': last_column[hit]}
+
+def runs_to_mask(runs: Dict[str, np.ndarray], bounds: Tuple[int, int, int, int]) -> np.ndarray:
+    """Boolean raster of the runs over lattice rows ``[row0, row1)`` and columns ``[column0, column1)``"""
+    row0, row1, column0, column1 = bounds
+    height, width = row1 - row0, column1 - column0
+    rows = np.asarray(runs['rows']) - row0
+    starts = np.clip(np.asarray(runs['starts']) - column0, 0, width)
+    ends = np.clip(np.asarray(runs['ends']) - column0 + 1, 0, width)
+    valid = (rows >= 0) & (rows < height) & (starts < ends)
+    rows, starts, ends = rows[valid], starts[valid], ends[valid]
+    delta = (np.bincount(rows * (width + 1) + starts, minlength=height * (width + 1))
+             - np.bincount(rows * (width + 1) + ends, minlength=height * (width + 1)))
+    return np.cumsum(delta.reshape(height, width + 1), axis=1)[:, :width] > 0
+
+def mask_to_runs(mask: np.ndarray, row0: int, column0: int) -> Dict[str, np.ndarray]:
+    """Inverse of ``runs_to_mask``, with runs merged"""
+    padded = np.zeros((mask.shape[0], mask.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    change = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(change == 1)
+    _, ends = np.nonzero(change == -1)
+    return {'rows': rows + row0, 'starts': starts + column0, 'ends': ends - 1 + column0}
+
+def run_bounds(runs: Dict[str, np.ndarray]) -> Optional[Tuple[int, int, int, int]]:
+    if len(runs['rows']) == 0:
+        return None
+    return (int(np.min(runs['rows'])), int(np.max(runs['rows'])) + 1,
+            int(np.min(runs['starts'])), int(np.max(runs['ends'])) + 1)
+
+def _cycle_order(successor: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Label each element of a permutation with its cycle's smallest member, and its position from there"""
+    size = successor.size
+    steps = max(int(size).bit_length(), 1)
+    leader, jump = np.arange(size), successor.copy()
+    for _ in range(steps):
+        leader = np.minimum(leader, leader[jump])
+        jump = jump[jump]
+    # Cut each cycle just before its leader, then rank elements by distance to the cut
+    following = np.where(successor == leader, np.arange(size), successor)
+    distance = (following != np.arange(size)).astype(np.int64)
+    jump = following
+    for _ in range(steps):
+        distance = distance + distance[jump]
+        jump = jump[jump]
+    cycle_length = np.bincount(leader, minlength=size)[leader]
+    return leader, cycle_length - 1 - distance
+
+def trace_polygons(mask: np.ndarray) -> List[List[np.ndarray]]:
+    """
+    Outline the covered cells of a raster as polygons
+    
+    Returns:
+        List[List[np.ndarray]]: Per polygon, its counter-clockwise outer ring
+        and then its clockwise holes, each an ``(n, 2)`` array of closed
+        ``(column, row)`` corner coordinates. Cells that only touch at a
+        corner belong to separate polygons.
+    """
+    padded = np.zeros((mask.shape[0] + 2, mask.shape[1] + 2), dtype=bool)
+    padded[1:-1, 1:-1] = mask
+    covered = padded[1:-1, 1:-1]
+    # Directed edges (x0, y0) -> (x1, y1) with the covered cell on the left, in corner coordinates
+    parts = []
+    for neighbour, corner, direction in (
+        (padded[:-2, 1:-1], (0, 0), (1, 0)),   # bottom, eastwards
+        (padded[1:-1, 2:], (1, 0), (0, 1)),    # right, northwards
+        (padded[2:, 1:-1], (1, 1), (-1, 0)),   # top, westwards
+        (padded[1:-1, :-2], (0, 1), (0, -1)),  # left, southwards
+    ):
+        rows, columns = np.nonzero(covered & ~neighbour)
+        parts.append(np.stack((
+            columns + corner[0], rows + corner[1],
+            np.full(rows.size, direction[0]), np.full(rows.size, direction[1])
+        ), axis=1))
+    edges = np.concatenate(parts)
+    if edges.size == 0:
+        return []
+    
+    # Link each edge to one leaving its end vertex; at a pinch vertex two leave, so take the left turn
+    width = mask.shape[1] + 2
+    start_key = edges[:, 1] * width + edges[:, 0]
+    end_key = (edges[:, 1] + edges[:, 3]) * width + edges[:, 0] + edges[:, 2]
+    order = np.argsort(start_key, kind='stable')
+    first = np.searchsorted(start_key[order], end_key, side='left')
+    count = np.searchsorted(start_key[order], end_key, side='right') - first
+    successor = order[first]
+    pinch = np.flatnonzero(count == 2)
+    if pinch.size:
+        other = order[first[pinch] + 1]
+        left = (-edges[pinch, 3], edges[pinch, 2])
+        takes_other = (edges[other, 2] == left[0]) & (edges[other, 3] == left[1])
+        successor[pinch] = np.where(takes_other, other, successor[pinch])
+    
+    leader, position = _cycle_order(successor)
+    ring_order = np.lexsort((position, leader))
+    edges, leader = edges[ring_order], leader[ring_order]
+    ring_starts = np.flatnonzero(np.r_[True, leader[1:] != leader[:-1]])
+    # Keep only the vertices where the direction changes
+    previous = np.roll(np.arange(leader.size), 1)
+    ring_ends = np.r_[ring_starts[1:], leader.size]
+    previous[ring_starts] = ring_ends - 1
+    corner = np.any(edges[:, 2:] != edges[previous, 2:], axis=1)
+    
+    rings, areas, probes = [], [], []
+    for start, end in zip(ring_starts, ring_ends):
+        members = slice(start, end)
+        vertices = edges[members][corner[members], :2]
+        closed = np.vstack((vertices, vertices[:1]))
+        rings.append(closed)
+        areas.append(float(np.sum(closed[:-1, 0] * closed[1:, 1] - closed[1:, 0] * closed[:-1, 1]) / 2))
+        vertical = np.flatnonzero(closed[:-1, 0] == closed[1:, 0])[0]
+        probes.append((closed[vertical, 0], closed[vertical, 1] + np.sign(closed[vertical + 1, 1] - closed[vertical, 1]) / 2))
+    areas = np.array(areas)
+    
+    outers = np.flatnonzero(areas > 0)
+    polygons = {int(outer): [rings[outer]] for outer in outers}
+    boxes = np.array([[ring[:, 0].min(), ring[:, 0].max(), ring[:, 1].min(), ring[:, 1].max()] for ring in rings])
+    for hole in np.flatnonzero(areas < 0):
+        px, py = probes[hole]
+        candidates = outers[(boxes[outers, 0] < px) & (boxes[outers, 1] > px)
+                            & (boxes[outers, 2] < py) & (boxes[outers, 3] > py)]
+        enclosing = []
+        for outer in candidates:
+            ring = rings[outer]
+            # Ray to the east through the middle of a vertical edge: count vertical edges it crosses
+            sx, sy, ey = ring[:-1, 0], ring[:-1, 1], ring[1:, 1]
+            crossings = np.count_nonzero((sx > px) & (np.minimum(sy, ey) < py) & (np.maximum(sy, ey) > py))
+            if crossings % 2:
+                enclosing.append(outer)
+        if enclosing:
+            polygons[int(min(enclosing, key=lambda outer: areas[outer]))].append(rings[hole])
+    return list(polygons.values())
+
+def polygons_to_geojson(polygons: List[List[np.ndarray]], row0: int, column0: int, resolution: float,
+                        reference_latitude: float) -> Dict:
+    """GeoJSON MultiPolygon of traced raster polygons, in ``[longitude, latitude]``"""
+    coordinates = []
+    for polygon in polygons:
+        rings = []
+        for ring in polygon:
+            latitudes, longitudes = unproject_local(
+                (ring[:, 0] + column0) * resolution, (ring[:, 1] + row0) * resolution, reference_latitude
+            )
+            rings.append(np.round(np.stack((longitudes, latitudes), axis=1), 7).tolist())
+        coordinates.append(rings)
+    return {'type': 'MultiPolygon', 'coordinates': coordinates}
+
+def path_coverage(latitudes, longitudes, swaths, resolution: float, reference_latitude: float) -> Dict:
+    """
+    Cells imaged along a path
+    
+    Args:
+        latitudes, longitudes: Waypoints in path order
+        swaths: Swath width in metres flown on each leg (one per leg)
+        resolution: Cell size in metres
+        reference_latitude: Latitude the projection is true to scale at
+    
+    Returns:
+        Dict: Covered ``runs`` and their ``bounds`` (``None`` if nothing is covered)
+    """
+    x, y = project_local(np.asarray(latitudes, dtype=np.float64), np.asarray(longitudes, dtype=np.float64),
+                         reference_latitude)
+    runs = rasterize_legs(x, y, np.asarray(swaths, dtype=np.float64) / 2, resolution)
+    bounds = run_bounds(runs)
+    if bounds is not None:
+        # Overlapping capsules give overlapping runs; merge them through the raster
+        runs = mask_to_runs(runs_to_mask(runs, bounds), bounds[0], bounds[2])
+    return {'runs': runs, 'bounds': bounds}
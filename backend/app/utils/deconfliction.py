@@ -0,0 +1,242 @@
+"""
+Pairwise separation checks between scheduled flights.
+
+Time is cut into buckets of ``step_s`` seconds on a grid shared by every
+flight. In each bucket a flight is one straight segment, from its position
+at the start of the bucket to its position at the end, in a local metric
+projection. Each segment's bounding box is padded by half the separation
+minimum and hashed into a grid with one cell per bucket, horizontal cell
+and altitude band. Cells are as large as the separation minimums, or as the
+longest distance any segment spans if that is larger, so a segment covers
+at most 27 cells however small the minimums are. Two segments can only
+come within the minimums of each other if their padded boxes share a cell,
+so exact checks only run on segments that share one.
+That keeps the work close to linear in flight time, rather than quadratic
+in legs. The exact check solves for the part of the overlapping time span
+where both the horizontal and the vertical distance are inside their
+minimums (relative motion within a bucket is linear). Conflicting buckets
+are then merged into time windows per pair of flights.
+
+Within a bucket, a flight that turns at a waypoint is modelled as cutting
+the corner. That error is at most ``speed * step_s / 2``.
+"""
+
+from typing import Dict, List, Optional
+import numpy as np
+from app.utils.trajectory import sample_timeline, project_local, unproject_local
+
+def _segments(flights: List[Dict], origin: float, step_s: float, reference_latitude: float) -> Dict[str, np.ndarray]:
+    """One segment per flight per time bucket it is airborne in"""
+    parts = []
+    for number, flight in enumerate(flights):
+        start, timeline = flight['start'], flight['timeline']
+        if timeline['time'].size == 0:
+            continue
+        end = start + float(timeline['time'][-1])
+        first_bucket = np.floor((start - origin) / step_s)
+        buckets = np.arange(first_bucket, max(np.ceil((end - origin) / step_s), first_bucket + 1))
+        begins = np.maximum(origin + buckets * step_s, start)
+        ends = np.minimum(origin + (buckets + 1) * step_s, end)
+        positions = sample_timeline(timeline, np.concatenate((begins, ends)) - start)
+        x, y = project_local(positions['latitude'], positions['longitude'], reference_latitude)
+        count = buckets.size
+        parts.append({
+            'flight': np.full(count, number), 'bucket': buckets.astype(np.int64), 'begin': begins, 'end': ends,
+            'x0': x[:count], 'y0': y[:count], 'z0': positions['altitude'][:count],
+            'x1': x[count:], 'y1': y[count:], 'z1': positions['altitude'][count:]
+        })
+    if not parts:
+        return {}
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+def _cell_ranges(low: np.ndarray, high: np.ndarray, size: float):
+    first = np.floor(low / size).astype(np.int64)
+    return first, np.floor(high / size).astype(np.int64) - first + 1
+
+class GridTooLargeError(ValueError):
+    """The padded segments would cover more grid cells than allowed"""
+
+def _cell_size(low: np.ndarray, high: np.ndarray, separation: float) -> float:
+    """
+    Cells are at least as large as the separation minimum and the widest
+    distance a segment spans, so a padded box covers at most 3 per axis
+    """
+    extent = high - low
+    extent = extent[~np.isnan(extent)]
+    return max(separation, float(extent.max()) if extent.size else 0.0)
+
+def _candidate_pairs(segments: Dict[str, np.ndarray], horizontal_m: float, vertical_m: float,
+                     max_cells: Optional[int] = None) -> np.ndarray:
+    """Index pairs (i < j) of segments of different flights that share a padded grid cell"""
+    pad_x, pad_z = horizontal_m / 2, vertical_m / 2
+    x_low, x_high = np.minimum(segments['x0'], segments['x1']), np.maximum(segments['x0'], segments['x1'])
+    y_low, y_high = np.minimum(segments['y0'], segments['y1']), np.maximum(segments['y0'], segments['y1'])
+    z_low = np.fmin(segments['z0'], segments['z1'])
+    z_high = np.fmax(segments['z0'], segments['z1'])
+    known = ~np.isnan(z_low)
+    # Unknown altitudes could be at any height, so they span every band in use
+    if known.any():
+        z_low = np.where(known, z_low, z_low[known].min())
+        z_high = np.where(known, z_high, z_high[known].max())
+    else:
+        z_low, z_high = np.zeros_like(z_low), np.zeros_like(z_high)
+    
+    # The cell size is not taken from the minimums alone: tiny minimums would spread every segment over many cells
+    cell_xy = _cell_size(np.concatenate((x_low, y_low)), np.concatenate((x_high, y_high)), horizontal_m)
+    cell_z = _cell_size(z_low, z_high, vertical_m)
+    ix, nx = _cell_ranges(x_low - pad_x, x_high + pad_x, cell_xy)
+    iy, ny = _cell_ranges(y_low - pad_x, y_high + pad_x, cell_xy)
+    iz, nz = _cell_ranges(z_low - pad_z, z_high + pad_z, cell_z)
+    counts = nx * ny * nz
+    if max_cells is not None and int(counts.sum()) > max_cells:
+        raise GridTooLargeError(f"{int(counts.sum())} grid cells exceeds the limit of {max_cells}")
+    
+    # Expand each segment into every cell its padded box covers
+    owner = np.repeat(np.arange(counts.size), counts)
+    local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    keys = np.stack((
+        segments['bucket'][owner],
+        ix[owner] + local % nx[owner],
+        iy[owner] + (local // nx[owner]) % ny[owner],
+        iz[owner] + local // (nx[owner] * ny[owner])
+    ))
+    order = np.lexsort(keys[::-1])
+    keys, owner = keys[:, order], owner[order]
+    boundaries = np.flatnonzero(np.any(keys[:, 1:] != keys[:, :-1], axis=0)) + 1
+    starts = np.concatenate(([0], boundaries))
+    sizes = np.diff(np.concatenate((starts, [owner.size])))
+    
+    # Cells holding the same number of segments are paired up together, one array operation per size
+    pairs = []
+    for size in np.unique(sizes[sizes > 1]).tolist():
+        members = owner[starts[sizes == size][:, None] + np.arange(size)]
+        first, second = np.triu_indices(size, 1)
+        pairs.append(np.stack((members[:, first].ravel(), members[:, second].ravel()), axis=1))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    # Segments in one cell share a bucket, so they always belong to different flights
+    return np.unique(np.sort(np.concatenate(pairs), axis=1), axis=0)
+
+def _position(segments: Dict[str, np.ndarray], index: np.ndarray, time: np.ndarray):
+    span = segments['end'][index] - segments['begin'][index]
+    fraction = np.divide(time - segments['begin'][index], span, out=np.zeros_like(time), where=span > 0)
+    return tuple(
+        segments[f'{axis}0'][index] + fraction * (segments[f'{axis}1'][index] - segments[f'{axis}0'][index])
+        for axis in 'xyz'
+    )
+
+def _inside_interval(offset: np.ndarray, rate: np.ndarray, limit: float):
+    """Interval of u in [0, 1] where |offset + rate * u| < limit, as (low, high); empty when low > high"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        first = (-limit - offset) / rate
+        second = (limit - offset) / rate
+    low = np.where(rate != 0, np.minimum(first, second), np.where(np.abs(offset) < limit, 0.0, 2.0))
+    high = np.where(rate != 0, np.maximum(first, second), 1.0)
+    unknown = np.isnan(offset) | np.isnan(rate)
+    return np.where(unknown, 0.0, np.maximum(low, 0.0)), np.where(unknown, 1.0, np.minimum(high, 1.0))
+
+def _check_pairs(segments: Dict[str, np.ndarray], pairs: np.ndarray, horizontal_m: float, vertical_m: float) -> Dict:
+    first, second = pairs[:, 0], pairs[:, 1]
+    low = np.maximum(segments['begin'][first], segments['begin'][second])
+    high = np.minimum(segments['end'][first], segments['end'][second])
+    overlapping = low <= high
+    first, second, low, high = first[overlapping], second[overlapping], low[overlapping], high[overlapping]
+    
+    a0, b0 = _position(segments, first, low), _position(segments, second, low)
+    a1, b1 = _position(segments, first, high), _position(segments, second, high)
+    dx0, dy0, dz0 = (a - b for a, b in zip(a0, b0))
+    dx1, dy1, dz1 = (a - b for a, b in zip(a1, b1))
+    
+    # Horizontal: |d0 + u (d1 - d0)|^2 < H^2 is a quadratic in u
+    ex, ey = dx1 - dx0, dy1 - dy0
+    qa = ex ** 2 + ey ** 2
+    qb = 2 * (dx0 * ex + dy0 * ey)
+    qc = dx0 ** 2 + dy0 ** 2 - horizontal_m ** 2
+    discriminant = qb ** 2 - 4 * qa * qc
+    moving = qa > 0
+    root = np.sqrt(np.maximum(discriminant, 0.0))
+    safe_a = np.where(moving, qa, 1.0)
+    h_low = np.where(moving, (-qb - root) / (2 * safe_a), np.where(qc < 0, 0.0, 2.0))
+    h_high = np.where(moving, (-qb + root) / (2 * safe_a), 1.0)
+    h_low = np.where(moving & (discriminant <= 0), 2.0, h_low)
+    
+    v_low, v_high = _inside_interval(dz0, dz1 - dz0, vertical_m)
+    u_low = np.maximum(np.maximum(h_low, 0.0), v_low)
+    u_high = np.minimum(np.minimum(h_high, 1.0), v_high)
+    conflict = u_low < u_high
+    
+    closest = np.clip(np.where(moving, -qb / (2 * safe_a), u_low), u_low, u_high)
+    index = np.flatnonzero(conflict)
+    u, span = closest[index], (high - low)[index]
+    return {
+        'first': first[index], 'second': second[index],
+        'start': low[index] + u_low[index] * span, 'end': low[index] + u_high[index] * span,
+        'closest_time': low[index] + u * span,
+        'horizontal': np.hypot(dx0[index] + u * ex[index], dy0[index] + u * ey[index]),
+        'vertical': np.abs(dz0[index] + u * (dz1 - dz0)[index]),
+        'x': (a0[0][index] + b0[0][index]) / 2 + u * ((a1[0] + b1[0])[index] - (a0[0] + b0[0])[index]) / 2,
+        'y': (a0[1][index] + b0[1][index]) / 2 + u * ((a1[1] + b1[1])[index] - (a0[1] + b0[1])[index]) / 2
+    }
+
+def find_conflicts(flights: List[Dict], horizontal_m: float, vertical_m: float, step_s: float,
+                   max_cells: Optional[int] = None) -> Dict:
+    """
+    Find where scheduled flights come within both separation minimums
+    
+    Args:
+        flights: ``{'start': epoch seconds, 'timeline': build_timeline(...) arrays}`` per flight
+        horizontal_m: Minimum horizontal separation in metres
+        vertical_m: Minimum vertical separation in metres
+        step_s: Time bucket length in seconds
+        max_cells: Most grid cells the padded segments may cover, or None for no limit
+    
+    Returns:
+        Dict: ``conflicts`` (per pair of flights and time window: ``flights``,
+        ``start``, ``end``, and the ``closest`` approach's ``time``,
+        ``horizontal_m``, ``vertical_m``, ``latitude`` and ``longitude``),
+        ``segments`` and ``candidate_pairs``
+    
+    Raises:
+        GridTooLargeError: If the segments would cover more than ``max_cells`` cells
+    """
+    timelines = [flight['timeline'] for flight in flights if flight['timeline']['time'].size]
+    if len(timelines) < 2:
+        return {'conflicts': [], 'segments': 0, 'candidate_pairs': 0}
+    reference_latitude = float(np.mean(np.concatenate([timeline['latitude'] for timeline in timelines])))
+    origin = min(flight['start'] for flight in flights)
+    segments = _segments(flights, origin, step_s, reference_latitude)
+    pairs = _candidate_pairs(segments, horizontal_m, vertical_m, max_cells)
+    found = _check_pairs(segments, pairs, horizontal_m, vertical_m)
+    
+    if not found['first'].size:
+        return {'conflicts': [], 'segments': int(segments['flight'].size), 'candidate_pairs': int(len(pairs))}
+    
+    # Join conflicts in consecutive buckets of the same pair of flights into one window
+    flight_pairs = np.stack((segments['flight'][found['first']], segments['flight'][found['second']]), axis=1)
+    order = np.lexsort((found['start'], flight_pairs[:, 1], flight_pairs[:, 0]))
+    flight_pairs, found = flight_pairs[order], {key: values[order] for key, values in found.items()}
+    opens = np.ones(order.size, dtype=bool)
+    opens[1:] = np.any(flight_pairs[1:] != flight_pairs[:-1], axis=1) | (found['start'][1:] > found['end'][:-1] + 1e-6)
+    heads = np.flatnonzero(opens)
+    window = np.cumsum(opens) - 1
+    ends = np.maximum.reduceat(found['end'], heads)
+    by_distance = np.lexsort((found['horizontal'], window))
+    closest = by_distance[np.flatnonzero(np.diff(window[by_distance], prepend=-1))]
+    latitudes, longitudes = unproject_local(found['x'][closest], found['y'][closest], reference_latitude)
+    
+    conflicts = []
+    for number, (head, row) in enumerate(zip(heads.tolist(), closest.tolist())):
+        vertical = float(found['vertical'][row])
+        conflicts.append({
+            'flights': flight_pairs[head].tolist(),
+            'start': float(found['start'][head]),
+            'end': float(ends[number]),
+            'closest': {
+                'time': float(found['closest_time'][row]),
+                'horizontal_m': float(found['horizontal'][row]),
+                'vertical_m': None if np.isnan(vertical) else vertical,
+                'latitude': float(latitudes[number]),
+                'longitude': float(longitudes[number])
+            }
+        })
+    return {'conflicts': conflicts, 'segments': int(segments['flight'].size), 'candidate_pairs': int(len(pairs))}
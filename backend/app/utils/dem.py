@@ -0,0 +1,154 @@
+"""
+Local digital elevation model (DEM) tiles, memory-mapped from disk.
+
+Supported formats (single band, north-up):
+
+- SRTM ``.hgt``: big-endian int16 square grid named after its south-west
+  corner (e.g. ``S37E174.hgt``), any resolution (1201 / 3601 samples per side);
+- ESRI ``.bil`` with its ``.hdr`` header (GDAL's ``EHdr`` driver), int16/int32/float32.
+
+Tiles are opened with ``numpy.memmap`` so only the pages around sampled
+points are read, and sampling is vectorized bilinear interpolation. GeoTIFF
+tiles can be converted with ``gdal_translate -of EHdr in.tif out.bil``.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+import numpy as np
+
+HGT_NAME = re.compile(r'^([NS])(\d{2})([EW])(\d{3})\.hgt$', re.IGNORECASE)
+HGT_NODATA = -32768
+
+class DemTile:
+    """A north-up elevation grid; ``north``/``west`` are the centre of the top-left sample."""
+    
+    def __init__(self, path: str, data: np.ndarray, north: float, west: float,
+                 cell_latitude: float, cell_longitude: float, nodata: Optional[float]):
+        self.path = path
+        self.data = data
+        self.north = north
+        self.west = west
+        self.cell_latitude = cell_latitude
+        self.cell_longitude = cell_longitude
+        self.nodata = nodata
+        rows, columns = data.shape
+        self.south = north - (rows - 1) * cell_latitude
+        self.east = west + (columns - 1) * cell_longitude
+    
+    @classmethod
+    def from_hgt(cls, path: str) -> 'DemTile':
+        match = HGT_NAME.match(os.path.basename(path))
+        if not match:
+            raise ValueError(f"Cannot derive tile position from file name: {path}")
+        north_south, latitude, east_west, longitude = match.groups()
+        south = int(latitude) * (-1 if north_south.upper() == 'S' else 1)
+        west = int(longitude) * (-1 if east_west.upper() == 'W' else 1)
+        
+        size = int(round((os.path.getsize(path) / 2) ** 0.5))
+        if size < 2 or size * size * 2 != os.path.getsize(path):
+            raise ValueError(f"Not a square int16 grid: {path}")
+        data = np.memmap(path, dtype='>i2', mode='r', shape=(size, size))
+        cell = 1.0 / (size - 1)
+        return cls(path, data, south + 1.0, float(west), cell, cell, HGT_NODATA)
+    
+    @classmethod
+    def from_bil(cls, path: str) -> 'DemTile':
+        header = {}
+        with open(os.path.splitext(path)[0] + '.hdr') as header_file:
+            for line in header_file:
+                parts = line.split()
+                if len(parts) >= 2:
+                    header[parts[0].upper()] = parts[1]
+        
+        if int(header.get('NBANDS', 1)) != 1:
+            raise ValueError(f"Only single-band .bil tiles are supported: {path}")
+        bits = int(header.get('NBITS', 8))
+        pixel_type = header.get('PIXELTYPE', 'SIGNEDINT').upper()
+        kind = 'f' if pixel_type == 'FLOAT' else ('u' if pixel_type == 'UNSIGNEDINT' else 'i')
+        byte_order = '>' if header.get('BYTEORDER', 'I').upper() == 'M' else '<'
+        dtype = np.dtype(f'{byte_order}{kind}{bits // 8}')
+        
+        rows, columns = int(header['NROWS']), int(header['NCOLS'])
+        data = np.memmap(path, dtype=dtype, mode='r', offset=int(header.get('SKIPBYTES', 0)), shape=(rows, columns))
+        nodata = float(header['NODATA']) if 'NODATA' in header else None
+        return cls(path, data, float(header['ULYMAP']), float(header['ULXMAP']),
+                   float(header['YDIM']), float(header['XDIM']), nodata)
+    
+    def contains(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        return ((latitudes >= self.south) & (latitudes <= self.north)
+                & (longitudes >= self.west) & (longitudes <= self.east))
+    
+    def sample(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        """Bilinear elevations at points inside the tile (NaN where a neighbour is nodata)"""
+        rows, columns = self.data.shape
+        row = (self.north - latitudes) / self.cell_latitude
+        column = (longitudes - self.west) / self.cell_longitude
+        row0 = np.clip(np.floor(row).astype(np.intp), 0, rows - 2)
+        column0 = np.clip(np.floor(column).astype(np.intp), 0, columns - 2)
+        row_fraction = row - row0
+        column_fraction = column - column0
+        
+        corners = [
+            self.data[row0, column0], self.data[row0, column0 + 1],
+            self.data[row0 + 1, column0], self.data[row0 + 1, column0 + 1]
+        ]
+        top_left, top_right, bottom_left, bottom_right = [corner.astype(np.float64) for corner in corners]
+        if self.nodata is not None:
+            for corner, raw in zip((top_left, top_right, bottom_left, bottom_right), corners):
+                corner[raw == self.nodata] = np.nan
+        
+        top = top_left + (top_right - top_left) * column_fraction
+        bottom = bottom_left + (bottom_right - bottom_left) * column_fraction
+        return top + (bottom - top) * row_fraction
+
+DEM_EXTENSIONS = ('.hgt', '.bil')
+
+def directory_fingerprint(directory: str) -> str:
+    """Changes whenever a tile in ``directory`` is added, removed or rewritten"""
+    signature = []
+    for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+        if os.path.splitext(entry.name)[1].lower() in DEM_EXTENSIONS:
+            stat = entry.stat()
+            signature.append(f'{entry.name}:{stat.st_size}:{stat.st_mtime_ns}')
+    return hashlib.sha1('\n'.join(signature).encode('utf-8')).hexdigest()[:12]
+
+class DemStore:
+    """All tiles found in a directory; points are sampled from the first tile that covers them."""
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.fingerprint = directory_fingerprint(directory)
+        self.tiles: List[DemTile] = []
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            extension = os.path.splitext(name)[1].lower()
+            if extension == '.hgt':
+                self.tiles.append(DemTile.from_hgt(path))
+            elif extension == '.bil':
+                self.tiles.append(DemTile.from_bil(path))
+    
+    def sample(self, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+        """Terrain elevation at each point, NaN where no tile has data"""
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        elevations = np.full(latitudes.shape, np.nan)
+        for tile in self.tiles:
+            mask = np.isnan(elevations) & tile.contains(latitudes, longitudes)
+            if mask.any():
+                elevations[mask] = tile.sample(latitudes[mask], longitudes[mask])
+        return elevations
+
+_stores: Dict[str, DemStore] = {}
+_stores_lock = threading.Lock()
+
+def get_dem_store(directory: str) -> DemStore:
+    """Shared store for a directory, reopened when its tiles change"""
+    fingerprint = directory_fingerprint(directory)
+    with _stores_lock:
+        store = _stores.get(directory)
+        if store is None or store.fingerprint != fingerprint:
+            store = _stores[directory] = DemStore(directory)
+        return store
@@ -0,0 +1,22 @@
+import math
+from typing import Iterable, Tuple
+
+EARTH_RADIUS_M = 6371008.8  # mean Earth radius
+
+def haversine_m(latitude1: float, longitude1: float, latitude2: float, longitude2: float) -> float:
+    """Great-circle distance in metres between two WGS84 points"""
+    phi1, phi2 = math.radians(latitude1), math.radians(latitude2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(longitude2 - longitude1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+def path_length_m(points: Iterable[Tuple[float, float]]) -> float:
+    """Length in metres of the path through (latitude, longitude) points, in order"""
+    total = 0.0
+    previous = None
+    for latitude, longitude in points:
+        if previous is not None:
+            total += haversine_m(previous[0], previous[1], latitude, longitude)
+        previous = (latitude, longitude)
+    return total
@@ -0,0 +1,154 @@
+"""
+Static 2-D KD-tree with batched, vectorized queries.
+
+The tree is implicit. Every level splits each node's slice of the point
+order at its median, along the axis where the node is widest. After
+``depth`` levels each leaf holds at most ``leaf_size`` points. Queries do
+not recurse one at a time. All queries descend together, level by level,
+as an array of (query, node) pairs. A pair is dropped as soon as the node's
+bounding box is farther than ``max_distance`` from the query. Only the
+points in the surviving leaves are compared. A query therefore costs about
+``log(n)`` box tests plus the points near it, instead of one comparison per
+point.
+"""
+
+import math
+from typing import Tuple
+import numpy as np
+
+QUERY_BATCH_SIZE = 16384
+
+class KDTree:
+    """Nearest-neighbour search over a fixed set of points in a plane"""
+    
+    def __init__(self, points, leaf_size: int = 8):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        self.size = len(points)
+        self.depth = max(0, math.ceil(math.log2(self.size / leaf_size))) if self.size else 0
+        order = np.arange(self.size)
+        starts, ends = np.array([0]), np.array([self.size])
+        self.boxes = []  # per level: (node count, 4) min x, max x, min y, max y
+        for level in range(self.depth + 1):
+            sizes = ends - starts
+            node_of_point = np.repeat(np.arange(starts.size), sizes)
+            ordered = points[order]
+            box = np.stack((
+                np.minimum.reduceat(ordered[:, 0], starts), np.maximum.reduceat(ordered[:, 0], starts),
+                np.minimum.reduceat(ordered[:, 1], starts), np.maximum.reduceat(ordered[:, 1], starts)
+            ), axis=1) if self.size else np.zeros((1, 4))
+            self.boxes.append(box)
+            if level == self.depth:
+                break
+            # Split along the wider side of each node, at the median
+            axis = (box[:, 3] - box[:, 2] > box[:, 1] - box[:, 0]).astype(np.int64)
+            values = ordered[np.arange(self.size), axis[node_of_point]]
+            order = order[np.lexsort((values, node_of_point))]
+            middles = (starts + ends) // 2
+            starts = np.stack((starts, middles), axis=1).ravel()
+            ends = np.stack((middles, ends), axis=1).ravel()
+        self.order = order
+        self.points = points[order]
+        self.leaf_starts, self.leaf_ends = starts, ends
+    
+    def nearest(self, queries, max_distance: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Nearest point to each query within ``max_distance``
+        
+        Returns:
+            tuple: (distances, indices) per query, ``inf`` and ``-1`` where no
+            point is close enough; ties go to the lowest index
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+        distances = np.full(len(queries), np.inf)
+        indices = np.full(len(queries), -1, dtype=np.int64)
+        if self.size == 0:
+            return distances, indices
+        for start in range(0, len(queries), QUERY_BATCH_SIZE):
+            batch = slice(start, start + QUERY_BATCH_SIZE)
+            distances[batch], indices[batch] = self._nearest_batch(queries[batch], max_distance)
+        return distances, indices
+    
+    def _nearest_batch(self, queries: np.ndarray, max_distance: float) -> Tuple[np.ndarray, np.ndarray]:
+        # Descend to the closest leaf first; its nearest point bounds the search radius of each query
+        node = np.zeros(len(queries), dtype=np.int64)
+        for box in self.boxes[1:]:
+            children = np.stack((2 * node, 2 * node + 1), axis=1)
+            gap = self._box_distance(box[children], queries[:, None, :])
+            node = children[np.arange(len(queries)), np.argmin(gap, axis=1)]
+        radius = np.minimum(self._scan_leaves(queries, np.arange(len(queries)), node, np.inf)[0], max_distance)
+        
+        query = np.arange(len(queries))
+        node = np.zeros(len(queries), dtype=np.int64)
+        for level, box in enumerate(self.boxes):
+            if level:
+                query, node = np.repeat(query, 2), np.stack((2 * node, 2 * node + 1), axis=1).ravel()
+            near = self._box_distance(box[node], queries[query]) <= radius[query]
+            query, node = query[near], node[near]
+        return self._scan_leaves(queries, query, node, max_distance)
+    
+    @staticmethod
+    def _box_distance(box: np.ndarray, points: np.ndarray) -> np.ndarray:
+        dx = np.maximum(np.maximum(box[..., 0] - points[..., 0], points[..., 0] - box[..., 1]), 0.0)
+        dy = np.maximum(np.maximum(box[..., 2] - points[..., 1], points[..., 1] - box[..., 3]), 0.0)
+        return np.hypot(dx, dy)
+    
+    def _scan_leaves(self, queries: np.ndarray, query: np.ndarray, node: np.ndarray,
+                     max_distance: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Nearest point per query among the points of the (query, leaf) pairs, sorted by query"""
+        counts = self.leaf_ends[node] - self.leaf_starts[node]
+        query = np.repeat(query, counts)
+        position = np.repeat(self.leaf_starts[node] - (np.cumsum(counts) - counts), counts) + np.arange(query.size)
+        distance = np.hypot(self.points[position, 0] - queries[query, 0], self.points[position, 1] - queries[query, 1])
+        index = self.order[position]
+        near = distance <= max_distance
+        query, distance, index = query[near], distance[near], index[near]
+        
+        distances = np.full(len(queries), np.inf)
+        indices = np.full(len(queries), -1, dtype=np.int64)
+        if query.size == 0:
+            return distances, indices
+        # Pairs come grouped by query, so each query's best is one reduction over its group
+        starts = np.flatnonzero(np.r_[True, query[1:] != query[:-1]])
+        owners = query[starts]
+        distances[owners] = np.minimum.reduceat(distance, starts)
+        tied = distance == distances[query]
+        indices[owners] = np.minimum.reduceat(np.where(tied, index, self.size), starts)
+        return distances, indices
+
+def match_points(source, target, max_distance: float, max_rounds: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    One-to-one matching of nearby points by mutual nearest neighbours
+    
+    In each round, a source and a target point are paired when each is the
+    other's nearest unmatched point within ``max_distance``. Rounds repeat on
+    the points left over, so a point that lost its nearest neighbour to a
+    closer one can still be matched to its next-nearest.
+    
+    Returns:
+        tuple: (source indices, target indices) of the matched pairs
+    """
+    source = np.asarray(source, dtype=np.float64).reshape(-1, 2)
+    target = np.asarray(target, dtype=np.float64).reshape(-1, 2)
+    free_source, free_target = np.arange(len(source)), np.arange(len(target))
+    matched_source, matched_target = [], []
+    for _ in range(max_rounds):
+        if free_source.size == 0 or free_target.size == 0:
+            break
+        _, nearest_source = KDTree(source[free_source]).nearest(target[free_target], max_distance)
+        found = np.flatnonzero(nearest_source >= 0)
+        if found.size == 0:
+            break
+        candidates = np.unique(nearest_source[found])
+        _, nearest_target = KDTree(target[free_target]).nearest(source[free_source[candidates]], max_distance)
+        back = np.full(free_source.size, -1, dtype=np.int64)
+        back[candidates] = nearest_target
+        mutual = found[back[nearest_source[found]] == found]
+        if mutual.size == 0:
+            break
+        matched_source.append(free_source[nearest_source[mutual]])
+        matched_target.append(free_target[mutual])
+        free_source = np.setdiff1d(free_source, matched_source[-1], assume_unique=True)
+        free_target = np.setdiff1d(free_target, matched_target[-1], assume_unique=True)
+    if not matched_source:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(matched_source), np.concatenate(matched_target)
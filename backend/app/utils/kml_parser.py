@@ -1,9 +1,16 @@
 import xml.etree.ElementTree as ET
 from typing import Dict, List, Optional
 import logging
+import math
 
 logger = logging.getLogger(__name__)
 
+# Namespaces used by DJI Pilot exports (see memory-bank/example.kml)
+NAMESPACES = {
+    'kml': 'http://www.opengis.net/kml/2.2',
+    'wpml': 'http://www.dji.com/wpmz/1.0.6'
+}
+
 class KMLParsingError(Exception):
     """Custom exception for KML parsing errors"""
     pass
@@ -42,15 +49,59 @@ def parse_kml_file(file_content: str) -> Dict:
         logger.error(f"KML parsing error: {str(e)}")
         raise KMLParsingError(f"Failed to parse KML file: {str(e)}")
 
+def parse_flight_speeds(file_content: str) -> Dict:
+    """
+    Extract the wayline and per-waypoint speeds from a DJI WPML mission.
+    
+    Args:
+        file_content (str): Raw KML file content as string
+    
+    Returns:
+        Dict: ``auto_flight_speed`` (m/s, or None) and ``waypoint_speeds``, a map
+        of waypoint index to the speed flown from that waypoint to the next.
+        Placemarks that use the global speed (``useGlobalSpeed``) or have no
+        ``waypointSpeed`` are left out.
+    
+    Raises:
+        KMLParsingError: If the document is not valid XML
+    """
+    try:
+        root = ET.fromstring(file_content)
+    except ET.ParseError as e:
+        raise KMLParsingError(f"Invalid KML file format: {str(e)}")
+    
+    auto_flight_speed = _float_text(root.find('.//wpml:autoFlightSpeed', NAMESPACES))
+    waypoint_speeds = {}
+    for placemark in root.iterfind('.//kml:Placemark', NAMESPACES):
+        if placemark.findtext('wpml:useGlobalSpeed', '', NAMESPACES).strip() == '1':
+            continue
+        speed = _float_text(placemark.find('wpml:waypointSpeed', NAMESPACES))
+        index_text = placemark.findtext('wpml:index', '', NAMESPACES).strip()
+        if speed is not None and speed > 0 and index_text.isdigit():
+            waypoint_speeds[int(index_text)] = speed
+    
+    return {'auto_flight_speed': auto_flight_speed, 'waypoint_speeds': waypoint_speeds}
+
+def _float_text(element: Optional[ET.Element]) -> Optional[float]:
+    if element is None or not element.text:
+        return None
+    try:
+        return float(element.text)
+    except ValueError:
+        return None
+
 def _extract_waypoints(root: ET.Element) -> List[Dict]:
     """Extract waypoints from KML placemarks"""
-    waypoints = []
+    return [waypoint for _, waypoint in waypoint_placemarks(root)]
+
+def waypoint_placemarks(root: ET.Element) -> List[tuple]:
+    """
+    (placemark, waypoint) for every placemark that yields a waypoint, in the
+    order ``parse_kml_file`` returns the waypoints (stable by index)
+    """
+    pairs = []
     
-    # Define namespaces based on the example KML
-    namespaces = {
-        'kml': 'http://www.opengis.net/kml/2.2',
-        'wpml': 'http://www.dji.com/wpmz/1.0.6'
-    }
+    namespaces = NAMESPACES
     
     # Find all Placemark elements
     placemarks = root.findall('.//kml:Placemark', namespaces)
@@ -58,12 +109,12 @@ def _extract_waypoints(root: ET.Element) -> List[Dict]:
     for placemark in placemarks:
         waypoint = _parse_placemark(placemark, namespaces)
         if waypoint:
-            waypoints.append(waypoint)
+            pairs.append((placemark, waypoint))
     
     # Sort waypoints by index to maintain order
-    waypoints.sort(key=lambda x: x.get('index', 0))
+    pairs.sort(key=lambda pair: pair[1].get('index', 0))
     
-    return waypoints
+    return pairs
 
 def _parse_placemark(placemark: ET.Element, namespaces: Dict[str, str]) -> Optional[Dict]:
     """Parse a single placemark element to extract waypoint data"""
@@ -88,6 +139,8 @@ def _parse_placemark(placemark: ET.Element, namespaces: Dict[str, str]) -> Optio
         # Extract execute height (altitude)
         height_elem = placemark.find('wpml:executeHeight', namespaces)
         altitude = float(height_elem.text) if height_elem is not None and height_elem.text else None
+        if altitude is not None and not math.isfinite(altitude):
+            raise ValueError(f"Invalid execute height: {height_elem.text}")
         
         return {
             'latitude': latitude,
@@ -113,7 +166,9 @@ def _parse_coordinates(coords_text: str) -> tuple[float, float]:
         longitude = float(coord_parts[0])
         latitude = float(coord_parts[1])
         
-        return longitude, latitude
-        
     except ValueError as e:
         raise ValueError(f"Invalid coordinate values: {coords_text}") from e
+    
+    if not (math.isfinite(longitude) and math.isfinite(latitude)):
+        raise ValueError(f"Invalid coordinate values: {coords_text}")
+    return longitude, latitude
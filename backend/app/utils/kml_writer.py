@@ -0,0 +1,138 @@
+import copy
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional
+import logging
+from app.utils.kml_parser import KMLParsingError, waypoint_placemarks
+
+logger = logging.getLogger(__name__)
+
+KML_NS = 'http://www.opengis.net/kml/2.2'
+WPML_NS = 'http://www.dji.com/wpmz/1.0.6'
+
+# Keep the default/wpml prefixes when the document is serialized again
+ET.register_namespace('', KML_NS)
+ET.register_namespace('wpml', WPML_NS)
+
+PLACEMARK = f'{{{KML_NS}}}Placemark'
+POINT = f'{{{KML_NS}}}Point'
+COORDINATES = f'{{{KML_NS}}}coordinates'
+FOLDER = f'{{{KML_NS}}}Folder'
+DOCUMENT = f'{{{KML_NS}}}Document'
+WPML_INDEX = f'{{{WPML_NS}}}index'
+WPML_EXECUTE_HEIGHT = f'{{{WPML_NS}}}executeHeight'
+WPML_ACTION_GROUP = f'{{{WPML_NS}}}actionGroup'
+WPML_ACTION_GROUP_START = f'{{{WPML_NS}}}actionGroupStartIndex'
+WPML_ACTION_GROUP_END = f'{{{WPML_NS}}}actionGroupEndIndex'
+
+def render_mission_kml(template_kml: str, waypoints: List[Dict]) -> str:
+    """
+    Regenerate a mission's KML/WPML document from its current waypoints.
+    
+    Document-level content (mission config, wayline parameters) is kept from
+    the stored KML. Placemarks are rebuilt from ``waypoints`` in order; each one
+    carries over the per-waypoint WPML settings (speed, heading, turn mode,
+    action groups) of the original placemark it came from, given by its
+    ``source_index`` (the placemark's position in index order). Action group
+    start and end indexes are renumbered to the waypoint's new index.
+    Waypoints without a source placemark (inserted since) reuse the last
+    placemark's settings without its action groups.
+    
+    Args:
+        template_kml (str): The mission's stored KML document
+        waypoints (List[Dict]): Waypoints with latitude, longitude, altitude,
+            index and source_index (optional)
+    
+    Returns:
+        str: KML document
+    
+    Raises:
+        KMLParsingError: If the stored KML cannot be parsed
+    """
+    try:
+        root = ET.fromstring(template_kml)
+    except ET.ParseError as e:
+        raise KMLParsingError(f"Invalid KML file format: {str(e)}")
+    
+    # In the order the waypoints were parsed, so a waypoint's source_index is its placemark's position
+    sources = [placemark for placemark, _ in waypoint_placemarks(root)]
+    parent, position, templates = _detach_placemarks(root)
+    fallback = _fallback_template(templates)
+    
+    new_placemarks = []
+    for waypoint in waypoints:
+        source = waypoint.get('source_index')
+        template = sources[source] if source is not None and 0 <= source < len(sources) else fallback
+        new_placemarks.append(_build_placemark(template, waypoint))
+    
+    parent[position:position] = new_placemarks
+    ET.indent(root, space='  ')
+    
+    logger.info(f"Regenerated KML with {len(new_placemarks)} placemarks")
+    return '<?xml version="1.0" encoding="UTF-8"?>\n' + ET.tostring(root, encoding='unicode') + '\n'
+
+def _detach_placemarks(root: ET.Element):
+    """Remove placemarks from the tree, returning their parent, insert position and the originals"""
+    for element in root.iter():
+        children = list(element)
+        placemark_positions = [i for i, child in enumerate(children) if child.tag == PLACEMARK]
+        if placemark_positions:
+            for i in reversed(placemark_positions):
+                element.remove(children[i])
+            return element, placemark_positions[0], [children[i] for i in placemark_positions]
+    
+    # No placemarks yet: append to the wayline folder, else the document
+    parent = root.find(f'.//{FOLDER}')
+    if parent is None:
+        parent = root.find(f'.//{DOCUMENT}')
+    if parent is None:
+        parent = root
+    return parent, len(parent), []
+
+def _fallback_template(templates: List[ET.Element]) -> Optional[ET.Element]:
+    if not templates:
+        return None
+    fallback = copy.deepcopy(templates[-1])
+    for group in fallback.findall(WPML_ACTION_GROUP):
+        fallback.remove(group)
+    return fallback
+
+def _build_placemark(template: Optional[ET.Element], waypoint: Dict) -> ET.Element:
+    placemark = copy.deepcopy(template) if template is not None else ET.Element(PLACEMARK)
+    
+    point = placemark.find(POINT)
+    if point is None:
+        point = ET.Element(POINT)
+        placemark.insert(0, point)
+    coordinates = point.find(COORDINATES)
+    if coordinates is None:
+        coordinates = ET.SubElement(point, COORDINATES)
+    coordinates.text = f"{waypoint['longitude']!r},{waypoint['latitude']!r}"
+    
+    # Action groups of a copied placemark refer to its old index
+    shift = waypoint['index'] - _placemark_index(placemark)
+    for group in placemark.findall(WPML_ACTION_GROUP):
+        for tag in (WPML_ACTION_GROUP_START, WPML_ACTION_GROUP_END):
+            bound = group.find(tag)
+            if bound is not None and (bound.text or '').strip().lstrip('-').isdigit():
+                bound.text = str(int(bound.text) + shift)
+    _set_child_text(placemark, WPML_INDEX, str(waypoint['index']))
+    if waypoint.get('altitude') is not None:
+        _set_child_text(placemark, WPML_EXECUTE_HEIGHT, repr(float(waypoint['altitude'])))
+    else:
+        height = placemark.find(WPML_EXECUTE_HEIGHT)
+        if height is not None:
+            placemark.remove(height)
+    return placemark
+
+def _placemark_index(placemark: ET.Element) -> int:
+    """The placemark's ``wpml:index``, read the way ``parse_kml_file`` reads it"""
+    try:
+        return int(placemark.findtext(WPML_INDEX) or 0)
+    except ValueError:
+        return 0
+
+def _set_child_text(parent: ET.Element, tag: str, text: str) -> None:
+    child = parent.find(tag)
+    if child is None:
+        child = ET.SubElement(parent, tag)
+    child.text = text
@@ -0,0 +1,195 @@
+"""
+No-fly-zone polygon parsing and normalization.
+
+``normalize_ring`` turns client input into one canonical form. That form
+is a closed ring of ``[longitude, latitude]`` pairs with consecutive
+duplicate vertices removed, wound counter-clockwise (the RFC 7946 exterior
+ring order). Open, degenerate and self-intersecting rings are rejected.
+Self-intersection is found with a Shamos-Hoey sweep in O(n log n)
+comparisons, instead of testing every pair of edges.
+"""
+
+import bisect
+import json
+import math
+import re
+from typing import List, Sequence, Tuple
+from app.utils.geo import EARTH_RADIUS_M
+
+MAX_VERTICES = 10000
+
+Point = Tuple[float, float]  # (longitude, latitude)
+
+class GeometryError(ValueError):
+    """Raised when a polygon cannot be parsed or is not a simple polygon"""
+
+def parse_ring(value) -> List[Point]:
+    """
+    Read a ring given as a list of ``[lon, lat]`` pairs, as JSON (a pair list or
+    a GeoJSON Polygon, whose exterior ring is used) or as a KML coordinate string
+    (``lon,lat[,alt] lon,lat[,alt] ...``)
+    """
+    if isinstance(value, str):
+        text = value.strip()
+        if text.startswith(('[', '{')):
+            try:
+                value = json.loads(text)
+            except ValueError as e:
+                raise GeometryError(f"Invalid JSON coordinates: {e}")
+        else:
+            value = [tuple_text.split(',') for tuple_text in re.split(r'\s+', text) if tuple_text]
+    if isinstance(value, dict):
+        if value.get('type') != 'Polygon' or not value.get('coordinates'):
+            raise GeometryError("Expected a GeoJSON Polygon")
+        value = value['coordinates'][0]
+    if not isinstance(value, (list, tuple)):
+        raise GeometryError("Coordinates must be a list of [longitude, latitude] pairs")
+    
+    points = []
+    for position, pair in enumerate(value):
+        try:
+            longitude, latitude = float(pair[0]), float(pair[1])
+        except (TypeError, ValueError, IndexError, KeyError):
+            raise GeometryError(f"Vertex {position} is not a [longitude, latitude] pair")
+        if not (-180.0 <= longitude <= 180.0 and -90.0 <= latitude <= 90.0):
+            raise GeometryError(f"Vertex {position} is out of range: [{longitude}, {latitude}]")
+        points.append((longitude, latitude))
+    return points
+
+def signed_area(points: Sequence[Point]) -> float:
+    """Shoelace area in degrees squared of an open ring; positive when counter-clockwise"""
+    total = 0.0
+    for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]):
+        total += x1 * y2 - x2 * y1
+    return total / 2
+
+def geodesic_area_m2(points: Sequence[Point]) -> float:
+    """Area in square metres of an open ring on a spherical Earth"""
+    total = 0.0
+    for (longitude1, latitude1), (longitude2, latitude2) in zip(points, points[1:] + points[:1]):
+        total += math.radians(longitude2 - longitude1) * (
+            2 + math.sin(math.radians(latitude1)) + math.sin(math.radians(latitude2))
+        )
+    return abs(total) * EARTH_RADIUS_M ** 2 / 2
+
+def _orientation(a: Point, b: Point, c: Point) -> int:
+    cross = (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+    return (cross > 0) - (cross < 0)
+
+def _on_segment(a: Point, b: Point, c: Point) -> bool:
+    """Whether c, collinear with a-b, lies within the segment's bounding box"""
+    return min(a[0], b[0]) <= c[0] <= max(a[0], b[0]) and min(a[1], b[1]) <= c[1] <= max(a[1], b[1])
+
+def segments_intersect(a: Point, b: Point, c: Point, d: Point) -> bool:
+    """Whether closed segments a-b and c-d share at least one point"""
+    o1, o2, o3, o4 = _orientation(a, b, c), _orientation(a, b, d), _orientation(c, d, a), _orientation(c, d, b)
+    if o1 != o2 and o3 != o4:
+        return True
+    return ((o1 == 0 and _on_segment(a, b, c)) or (o2 == 0 and _on_segment(a, b, d))
+            or (o3 == 0 and _on_segment(c, d, a)) or (o4 == 0 and _on_segment(c, d, b)))
+
+def find_self_intersection(points: Sequence[Point]):
+    """
+    Return the indexes (i, j) of two crossing or touching edges of the open
+    ring ``points`` (edge i runs from vertex i to i + 1), or None if it is simple
+    
+    Shamos-Hoey: sweep a vertical line over the edge endpoints, keep the edges
+    it crosses ordered by y, and test an edge only against its neighbours when
+    it enters the order and the two edges that become neighbours when one
+    leaves. The first intersection is always found among those tests.
+    """
+    count = len(points)
+    edges = []
+    for i in range(count):
+        start, end = points[i], points[(i + 1) % count]
+        edges.append((start, end) if start <= end else (end, start))
+    
+    def adjacent(i, j):
+        return abs(i - j) in (1, count - 1)
+    
+    def crosses(i, j):
+        (a, b), (c, d) = edges[i], edges[j]
+        if not adjacent(i, j):
+            return segments_intersect(a, b, c, d)
+        # Adjacent edges share a vertex; they only conflict when they fold back over each other
+        shared = points[max(i, j) if abs(i - j) == 1 else 0]
+        other_i = b if a == shared else a
+        other_j = d if c == shared else c
+        same_direction = ((other_i[0] - shared[0]) * (other_j[0] - shared[0])
+                          + (other_i[1] - shared[1]) * (other_j[1] - shared[1])) > 0
+        return _orientation(shared, other_i, other_j) == 0 and same_direction
+    
+    sweep_x = 0.0
+    
+    def order_key(i):
+        (x1, y1), (x2, y2) = edges[i]
+        if x1 == x2:
+            return (y1, math.inf)
+        slope = (y2 - y1) / (x2 - x1)
+        return (y1 + slope * (sweep_x - x1), slope)
+    
+    # Left endpoints sort before right endpoints at the same point, so touching edges are compared
+    events = sorted(
+        [(edge[0], 0, i) for i, edge in enumerate(edges)] + [(edge[1], 1, i) for i, edge in enumerate(edges)]
+    )
+    active: List[int] = []
+    for point, kind, i in events:
+        sweep_x = point[0]
+        if kind == 0:
+            position = bisect.bisect_left(active, order_key(i), key=order_key)
+            for neighbour in active[max(0, position - 1):position + 1]:
+                if crosses(i, neighbour):
+                    return (min(i, neighbour), max(i, neighbour))
+            active.insert(position, i)
+        else:
+            position = active.index(i)
+            del active[position]
+            if 0 < position < len(active):
+                below, above = active[position - 1], active[position]
+                if crosses(below, above):
+                    return (min(below, above), max(below, above))
+    return None
+
+def normalize_ring(value) -> dict:
+    """
+    Validate and canonicalize a no-fly-zone polygon
+    
+    Returns:
+        dict: ``coordinates`` (closed counter-clockwise ring as a JSON string),
+        ``vertex_count`` (distinct vertices), ``area_m2`` and the bounding box
+        (``min_longitude``, ``min_latitude``, ``max_longitude``, ``max_latitude``)
+    
+    Raises:
+        GeometryError: If the ring is malformed, degenerate or self-intersecting
+    """
+    points = []
+    for point in parse_ring(value):
+        if not points or point != points[-1]:
+            points.append(point)
+    if len(points) > 1 and points[0] == points[-1]:
+        points.pop()
+    if len(points) < 3:
+        raise GeometryError("A polygon needs at least 3 distinct vertices")
+    if len(points) > MAX_VERTICES:
+        raise GeometryError(f"A polygon can have at most {MAX_VERTICES} vertices")
+    
+    intersection = find_self_intersection(points)
+    if intersection is not None:
+        raise GeometryError(f"Polygon edges {intersection[0]} and {intersection[1]} intersect")
+    area = signed_area(points)
+    if area == 0:
+        raise GeometryError("Polygon has no area")
+    if area < 0:
+        points.reverse()
+    
+    longitudes = [longitude for longitude, _ in points]
+    latitudes = [latitude for _, latitude in points]
+    return {
+        'coordinates': json.dumps([list(point) for point in points + points[:1]], separators=(',', ':')),
+        'vertex_count': len(points),
+        'area_m2': geodesic_area_m2(points),
+        'min_longitude': min(longitudes),
+        'min_latitude': min(latitudes),
+        'max_longitude': max(longitudes),
+        'max_latitude': max(latitudes)
+    }
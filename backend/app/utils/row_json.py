@@ -0,0 +1,82 @@
+"""
+Encode query result rows straight to JSON text.
+
+Read endpoints select only the columns they return and encode each column in
+one pass, mapping a C-level encoder such as ``repr`` over its values. The
+encoded values of each row are then formatted into an object by a single
+string template. No ORM objects or per-row dicts are built. The result is
+JSON text that can be nested in a larger document (see
+``api_helpers.raw_api_response``) without being parsed again.
+
+Numbers are encoded with ``repr``, which matches ``json.dumps`` for ints and
+finite floats. NaN and infinity have no JSON form and are encoded as ``null``.
+"""
+
+import json
+from bisect import bisect_right
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# ``repr`` of NaN and infinity, which JSON cannot express
+NON_FINITE = frozenset(('nan', 'inf', '-inf'))
+
+json_string = json.encoder.encode_basestring_ascii
+# Values that are already JSON text, such as nested arrays built by ``array``
+json_raw = str
+
+def json_number(value) -> str:
+    text = repr(value)
+    return 'null' if text in NON_FINITE else text
+
+def json_bool(value) -> str:
+    return 'true' if value else 'false'
+
+def nullable(encoder: Callable[..., str]) -> Callable[..., str]:
+    """Wrap ``encoder`` so that None is encoded as ``null``"""
+    return lambda value: 'null' if value is None else encoder(value)
+
+class ObjectEncoder:
+    """
+    Encodes columns of values as JSON objects with fixed keys
+    
+    ``fields`` lists ``(key, encoder)`` pairs in column order. A field given
+    as ``(key, encoder, width)`` takes ``width`` consecutive columns, which
+    are passed to its encoder as separate arguments.
+    """
+    
+    def __init__(self, *fields):
+        self.fields = [(field[0], field[1], field[2] if len(field) > 2 else 1) for field in fields]
+        self.template = '{' + ','.join(
+            json_string(key).replace('%', '%%') + ':%s' for key, _, _ in self.fields
+        ) + '}'
+    
+    def encode(self, columns: Sequence[Sequence]) -> List[str]:
+        """One JSON object per row, from the rows' values laid out as columns"""
+        encoded, position = [], 0
+        for _, encoder, width in self.fields:
+            encoded.append(map(encoder, *columns[position:position + width]))
+            position += width
+        return list(map(self.template.__mod__, zip(*encoded)))
+    
+    def encode_rows(self, rows: Sequence[Sequence]) -> List[str]:
+        """One JSON object per row tuple"""
+        if not rows:
+            return []
+        return self.encode(list(zip(*rows)))
+
+def array(items: Sequence[str]) -> str:
+    """A JSON array of already-encoded values"""
+    return '[' + ','.join(items) + ']'
+
+def group_arrays(keys: Sequence, items: Sequence[str]) -> Dict[object, Tuple[str, int]]:
+    """
+    Split encoded ``items`` into one JSON array per key
+    
+    ``keys`` holds each item's key and must be sorted, so every group is
+    one contiguous slice. Returns ``{key: (array text, item count)}``.
+    """
+    groups, start = {}, 0
+    for key in dict.fromkeys(keys):
+        end = bisect_right(keys, key, start)
+        groups[key] = (array(items[start:end]), end - start)
+        start = end
+    return groups
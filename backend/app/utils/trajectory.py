@@ -0,0 +1,111 @@
+"""
+Vectorized flight timing along a waypoint path.
+
+A mission is flown as straight legs between consecutive waypoints, each at
+the speed set on the waypoint it starts from. ``build_timeline`` turns the
+waypoints and speeds into arrival times. ``sample_timeline`` interpolates
+position, heading and speed at any array of times with ``numpy.interp`` and
+``numpy.searchsorted``, so a chunk of frames costs a few array operations
+however many legs the path has.
+"""
+
+from typing import Dict
+import numpy as np
+from app.utils.geo import EARTH_RADIUS_M
+
+TIMELINE_FIELDS = ('time', 'latitude', 'longitude', 'altitude', 'heading', 'speed')
+
+def haversine_array(latitudes1, longitudes1, latitudes2, longitudes2) -> np.ndarray:
+    """Element-wise great-circle distance in metres"""
+    phi1, phi2 = np.radians(latitudes1), np.radians(latitudes2)
+    a = (np.sin((phi2 - phi1) / 2) ** 2
+         + np.cos(phi1) * np.cos(phi2) * np.sin(np.radians(longitudes2 - longitudes1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+
+def bearing_array(latitudes1, longitudes1, latitudes2, longitudes2) -> np.ndarray:
+    """Element-wise initial bearing in degrees clockwise from north, in [0, 360)"""
+    phi1, phi2 = np.radians(latitudes1), np.radians(latitudes2)
+    d_lambda = np.radians(longitudes2 - longitudes1)
+    y = np.sin(d_lambda) * np.cos(phi2)
+    x = np.cos(phi1) * np.sin(phi2) - np.sin(phi1) * np.cos(phi2) * np.cos(d_lambda)
+    return np.degrees(np.arctan2(y, x)) % 360.0
+
+def project_local(latitudes, longitudes, reference_latitude: float):
+    """Equirectangular ``(x, y)`` in metres east and north, true to scale near ``reference_latitude``"""
+    scale = np.radians(1.0) * EARTH_RADIUS_M
+    return longitudes * scale * np.cos(np.radians(reference_latitude)), latitudes * scale
+
+def unproject_local(x, y, reference_latitude: float):
+    """Inverse of ``project_local``: ``(latitudes, longitudes)``"""
+    scale = np.radians(1.0) * EARTH_RADIUS_M
+    return y / scale, x / (scale * np.cos(np.radians(reference_latitude)))
+
+def _fill_gaps(values: np.ndarray) -> np.ndarray:
+    """Replace NaN with the previous value (or the first known one at the start)"""
+    known = ~np.isnan(values)
+    if not known.any():
+        return values
+    positions = np.where(known, np.arange(values.size), -1)
+    np.maximum.accumulate(positions, out=positions)
+    positions[positions < 0] = np.flatnonzero(known)[0]
+    return values[positions]
+
+def build_timeline(latitudes, longitudes, altitudes, speeds) -> Dict[str, np.ndarray]:
+    """
+    Arrival time at each waypoint of a path flown at the given speeds
+    
+    Args:
+        latitudes, longitudes, altitudes: Waypoints in path order (NaN altitude for unknown)
+        speeds: Speed in m/s flown from each waypoint to the next (the last is unused)
+    
+    Returns:
+        Dict[str, np.ndarray]: Per-waypoint ``time`` (s), position, and the
+        ``heading`` (degrees) and ``speed`` (m/s) of the leg starting there;
+        the last waypoint repeats the final leg's values
+    """
+    latitudes, longitudes, altitudes, speeds = (
+        np.asarray(values, dtype=np.float64) for values in (latitudes, longitudes, altitudes, speeds)
+    )
+    if latitudes.size < 2:
+        return {
+            'time': np.zeros(latitudes.size), 'latitude': latitudes, 'longitude': longitudes,
+            'altitude': altitudes, 'heading': np.full(latitudes.size, np.nan), 'speed': speeds
+        }
+    horizontal = haversine_array(latitudes[:-1], longitudes[:-1], latitudes[1:], longitudes[1:])
+    climb = np.nan_to_num(np.diff(altitudes))
+    durations = np.hypot(horizontal, climb) / speeds[:-1]
+    # Legs without horizontal movement keep the heading flown into them
+    headings = np.where(
+        horizontal > 0, bearing_array(latitudes[:-1], longitudes[:-1], latitudes[1:], longitudes[1:]), np.nan
+    )
+    return {
+        'time': np.concatenate(([0.0], np.cumsum(durations))),
+        'latitude': latitudes,
+        'longitude': longitudes,
+        'altitude': altitudes,
+        'heading': _fill_gaps(np.append(headings, headings[-1])),
+        'speed': np.append(speeds[:-1], speeds[-2])
+    }
+
+def sample_timeline(timeline: Dict[str, np.ndarray], times) -> Dict[str, np.ndarray]:
+    """
+    Position, heading and speed at each of ``times`` (seconds from the first waypoint)
+    
+    Times before the start or after the end are held at the first or last waypoint.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    waypoint_times = timeline['time']
+    leg = np.clip(np.searchsorted(waypoint_times, times, side='right') - 1, 0, max(waypoint_times.size - 2, 0))
+    return {
+        'time': times,
+        'latitude': np.interp(times, waypoint_times, timeline['latitude']),
+        'longitude': np.interp(times, waypoint_times, timeline['longitude']),
+        'altitude': np.interp(times, waypoint_times, timeline['altitude']),
+        'heading': timeline['heading'][leg],
+        'speed': timeline['speed'][leg]
+    }
+
+def to_json_list(values: np.ndarray, digits: int) -> list:
+    """JSON-ready list with NaN as None"""
+    rounded = np.round(values, digits)
+    return [None if value != value else value for value in rounded.tolist()]
@@ -0,0 +1,51 @@
+import hashlib
+import math
+import struct
+import zlib
+from typing import Iterable, List, Optional, Tuple
+
+# One waypoint: latitude, longitude, altitude as little-endian doubles (NaN = no altitude)
+POINT_FORMAT = struct.Struct('<ddd')
+
+# Content-defined chunking: a block ends after a waypoint whose checksum hits
+# the boundary mask, so inserting or deleting points only changes the blocks
+# around the edit instead of shifting every later fixed-size block.
+BOUNDARY_MASK = 0xFF   # ~256 waypoints per block on average
+MIN_BLOCK_SIZE = 64
+MAX_BLOCK_SIZE = 1024
+
+Point = Tuple[float, float, Optional[float]]
+
+def pack_point(latitude: float, longitude: float, altitude: Optional[float]) -> bytes:
+    return POINT_FORMAT.pack(latitude, longitude, math.nan if altitude is None else altitude)
+
+def unpack_block(data: bytes) -> List[Point]:
+    """Decode a block into (latitude, longitude, altitude) tuples"""
+    return [
+        (latitude, longitude, None if math.isnan(altitude) else altitude)
+        for latitude, longitude, altitude in POINT_FORMAT.iter_unpack(data)
+    ]
+
+def chunk_points(points: Iterable[Point]) -> List[Tuple[str, int, bytes]]:
+    """
+    Split a waypoint sequence into content-defined blocks.
+    
+    Returns:
+        List of (sha256 hex digest, waypoint count, packed bytes) per block
+    """
+    blocks = []
+    current = []
+    for latitude, longitude, altitude in points:
+        packed = pack_point(latitude, longitude, altitude)
+        current.append(packed)
+        size = len(current)
+        if size >= MAX_BLOCK_SIZE or (size >= MIN_BLOCK_SIZE and zlib.crc32(packed) & BOUNDARY_MASK == 0):
+            blocks.append(_finish_block(current))
+            current = []
+    if current:
+        blocks.append(_finish_block(current))
+    return blocks
+
+def _finish_block(packed_points: List[bytes]) -> Tuple[str, int, bytes]:
+    data = b''.join(packed_points)
+    return hashlib.sha256(data).hexdigest(), len(packed_points), data
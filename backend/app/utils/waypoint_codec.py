@@ -0,0 +1,88 @@
+"""
+Compact binary encoding of a mission detail payload.
+
+Layout (all little-endian)::
+
+    0   4s   magic b'MWPT'
+    4   u16  format version (1)
+    6   u16  flags (reserved, 0)
+    8   u32  waypoint count N
+    12  u32  metadata length M (multiple of 8)
+    16  M    UTF-8 JSON of the mission without its waypoints, space padded
+    ..  f64  latitude[N]
+    ..  f64  longitude[N]
+    ..  f64  altitude[N]     NaN where the waypoint has no altitude
+    ..  u32  id[N]
+    ..  i32  index[N]
+
+Columns are stored one after another (not per point) and start 8-byte
+aligned, so clients can wrap them in ``Float64Array`` / ``Uint32Array``
+views without copying. Waypoints are ordered by index.
+"""
+
+import json
+import math
+import struct
+import sys
+from array import array
+from typing import Dict
+
+MIMETYPE = 'application/vnd.mission-dashboard.waypoints'
+MAGIC = b'MWPT'
+VERSION = 1
+HEADER = struct.Struct('<4sHHII')
+
+def _column(typecode: str, values) -> bytes:
+    column = array(typecode, values)
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column.tobytes()
+
+def encode_mission(payload: Dict) -> bytes:
+    """Encode a ``Mission.to_dict()`` payload"""
+    waypoints = sorted(payload['waypoints'], key=lambda waypoint: (waypoint['index'], waypoint['id']))
+    metadata = json.dumps(
+        {key: value for key, value in payload.items() if key != 'waypoints'}, separators=(',', ':')
+    ).encode('utf-8')
+    metadata += b' ' * (-len(metadata) % 8)
+    
+    return b''.join((
+        HEADER.pack(MAGIC, VERSION, 0, len(waypoints), len(metadata)),
+        metadata,
+        _column('d', (waypoint['latitude'] for waypoint in waypoints)),
+        _column('d', (waypoint['longitude'] for waypoint in waypoints)),
+        _column('d', (math.nan if waypoint['altitude'] is None else waypoint['altitude'] for waypoint in waypoints)),
+        _column('I', (waypoint['id'] for waypoint in waypoints)),
+        _column('i', (waypoint['index'] for waypoint in waypoints)),
+    ))
+
+def decode_mission(data: bytes) -> Dict:
+    """Inverse of ``encode_mission`` (waypoints come back ordered by index)"""
+    magic, version, _, count, metadata_length = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not a version {VERSION} waypoint payload")
+    payload = json.loads(data[HEADER.size:HEADER.size + metadata_length])
+    
+    offset = HEADER.size + metadata_length
+    columns = []
+    for typecode in ('d', 'd', 'd', 'I', 'i'):
+        column = array(typecode)
+        size = column.itemsize * count
+        column.frombytes(data[offset:offset + size])
+        if sys.byteorder == 'big':
+            column.byteswap()
+        columns.append(column)
+        offset += size
+    
+    payload['waypoints'] = [
+        {
+            'id': id,
+            'mission_id': payload['id'],
+            'latitude': latitude,
+            'longitude': longitude,
+            'altitude': None if math.isnan(altitude) else altitude,
+            'index': index
+        }
+        for latitude, longitude, altitude, id, index in zip(*columns)
+    ]
+    return payload
@@ -0,0 +1,105 @@
+from difflib import SequenceMatcher
+from typing import Dict, List, Sequence, Tuple
+
+# Coordinates parsed from the same text are bit-identical; the tolerance only
+# absorbs float noise from round-tripping through the database.
+POSITION_TOLERANCE = 1e-9
+POSITION_DIGITS = 9
+
+def diff_waypoints(existing: Sequence, parsed: List[Dict]) -> Tuple[List[Dict], List[Dict], List[int], List[Dict]]:
+    """
+    Compute the minimal writes that turn stored waypoints into a parsed sequence.
+    
+    Both sequences are aligned on waypoint content (latitude, longitude,
+    altitude) in index order, so inserting or deleting one waypoint leaves
+    every other row matched. Matched rows whose ``index`` moved are returned
+    as shifts: one per run of consecutive rows that moved by the same
+    offset, to be applied as a single set-based UPDATE on the index range.
+    Within a stretch that changed, rows are paired by WPML ``index`` (by
+    position if either side has duplicate indexes) and updated in place;
+    the rest are inserted or deleted.
+    
+    Args:
+        existing: Rows with ``id``, ``index``, ``latitude``, ``longitude`` and
+            ``altitude`` attributes, ordered by index
+        parsed (List[Dict]): Waypoints from ``parse_kml_file``
+    
+    Returns:
+        tuple: (inserts, updates, deletes, shifts) where inserts are waypoint
+        dicts, updates are dicts keyed by ``id`` with the changed columns,
+        deletes are waypoint IDs, and shifts are ``{'start', 'end', 'offset'}``
+        dicts adding ``offset`` to the stored indexes in ``[start, end]``
+    """
+    parsed = sorted(parsed, key=lambda waypoint: waypoint['index'])
+    existing_indexes = [row.index for row in existing]
+    unique_indexes = (len(set(existing_indexes)) == len(existing_indexes)
+                      and len({waypoint['index'] for waypoint in parsed}) == len(parsed))
+    
+    matcher = SequenceMatcher(
+        None, [_content_key(row.latitude, row.longitude, row.altitude) for row in existing],
+        [_content_key(waypoint['latitude'], waypoint['longitude'], waypoint['altitude']) for waypoint in parsed],
+        autojunk=False
+    )
+    inserts, updates, deletes, shifts = [], [], [], []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            _shift_block(existing[i1:i2], parsed[j1:j2], unique_indexes, updates, shifts)
+        else:
+            _replace_block(existing[i1:i2], parsed[j1:j2], unique_indexes, inserts, updates, deletes)
+    return inserts, updates, deletes, shifts
+
+def _shift_block(rows: Sequence, waypoints: List[Dict], unique_indexes: bool,
+                 updates: List[Dict], shifts: List[Dict]) -> None:
+    """Re-index rows matched to waypoints with the same content"""
+    in_run = False
+    for row, waypoint in zip(rows, waypoints):
+        offset = waypoint['index'] - row.index
+        if not unique_indexes:
+            # Index ranges are ambiguous with duplicate indexes, so each row is re-indexed by ID
+            if offset:
+                updates.append({'id': row.id, 'index': waypoint['index']})
+            continue
+        if in_run and offset == shifts[-1]['offset']:
+            shifts[-1]['end'] = row.index
+            continue
+        in_run = offset != 0
+        if in_run:
+            shifts.append({'start': row.index, 'end': row.index, 'offset': offset})
+
+def _replace_block(rows: Sequence, waypoints: List[Dict], unique_indexes: bool,
+                   inserts: List[Dict], updates: List[Dict], deletes: List[int]) -> None:
+    """Update rows paired with a changed waypoint; insert or delete the unpaired ones"""
+    if unique_indexes:
+        rows_by_index = {row.index: row for row in rows}
+        pairs = [(rows_by_index.pop(waypoint['index'], None), waypoint) for waypoint in waypoints]
+        unpaired = list(rows_by_index.values())
+    else:
+        pairs = [(rows[position] if position < len(rows) else None, waypoint)
+                 for position, waypoint in enumerate(waypoints)]
+        unpaired = list(rows[len(waypoints):])
+    for row, waypoint in pairs:
+        if row is None:
+            inserts.append(waypoint)
+            continue
+        changes = {}
+        for column in ('latitude', 'longitude', 'altitude'):
+            if not _same_value(getattr(row, column), waypoint[column]):
+                changes[column] = waypoint[column]
+        if row.index != waypoint['index']:
+            changes['index'] = waypoint['index']
+        if changes:
+            changes['id'] = row.id
+            updates.append(changes)
+    deletes.extend(row.id for row in unpaired)
+    
+def _content_key(latitude, longitude, altitude) -> Tuple:
+    return (
+        round(latitude, POSITION_DIGITS),
+        round(longitude, POSITION_DIGITS),
+        None if altitude is None else round(altitude, POSITION_DIGITS)
+    )
+
+def _same_value(stored, parsed) -> bool:
+    if stored is None or parsed is None:
+        return stored is parsed
+    return abs(stored - parsed) <= POSITION_TOLERANCE
@@ -0,0 +1,83 @@
+"""
+Benchmark the per-request cost of access logging on the request thread.
+
+Compares the previous behaviour (two synchronous INFO lines with the full URL)
+against the single access line, with and without the queue-based pipeline,
+JSON records and access-log sampling. Requests are simulated back to back, so
+in the queue scenarios the listener thread competes with the caller for the
+GIL; real traffic leaves it idle time and the caller-side cost is lower.
+
+Usage:
+    python -m benchmarks.bench_logging [--requests 20000]
+"""
+
+import argparse
+import contextlib
+import logging
+import os
+import sys
+import tempfile
+from time import perf_counter_ns
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask, Response, request
+from app import logging_config
+from app.logging_config import setup_logging, log_access
+
+SCENARIOS = [
+    # name, config overrides, legacy hooks
+    ('legacy: 2 sync lines', {'LOG_QUEUE_ENABLED': False}, True),
+    ('sync: 1 line', {'LOG_QUEUE_ENABLED': False}, False),
+    ('queue: text', {'LOG_QUEUE_ENABLED': True}, False),
+    ('queue: json', {'LOG_QUEUE_ENABLED': True, 'LOG_FORMAT': 'json'}, False),
+    ('queue: json, 10% sampled', {'LOG_QUEUE_ENABLED': True, 'LOG_FORMAT': 'json', 'ACCESS_LOG_SAMPLE_RATE': 0.1}, False),
+]
+
+def _build_app(workdir, overrides, devnull):
+    app = Flask('app', instance_path=os.path.join(workdir, 'instance'))
+    app.config.update(DEBUG=False, FLASK_ENV='benchmark', **overrides)
+    # The console handler binds sys.stdout at configuration time
+    with contextlib.redirect_stdout(devnull):
+        setup_logging(app)
+    return app
+
+def run_scenario(name, overrides, legacy, requests_count):
+    """Return the mean caller-side cost in microseconds per request."""
+    with tempfile.TemporaryDirectory() as workdir, open(os.devnull, 'w') as devnull:
+        app = _build_app(workdir, overrides, devnull)
+        response = Response(status=200)
+        with app.test_request_context('/api/missions/42?include=waypoints', environ_base={'REMOTE_ADDR': '10.0.0.7'}):
+            request.request_id = 'bench001'
+            start = perf_counter_ns()
+            if legacy:
+                for _ in range(requests_count):
+                    app.logger.info(f"{request.method} {request.url} - {request.remote_addr}")
+                    app.logger.info(f"{request.method} {request.url} - {response.status_code}")
+            else:
+                for _ in range(requests_count):
+                    log_access(request, response, 0.0042)
+            elapsed = perf_counter_ns() - start
+        # Drain the queue outside the timed section and release file handles
+        logging_config._stop_queue_listener()
+        logging.shutdown()
+    return elapsed / requests_count / 1000
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=20000, help='requests to simulate per scenario')
+    args = parser.parse_args(argv)
+    
+    results = []
+    for name, overrides, legacy in SCENARIOS:
+        results.append((name, run_scenario(name, overrides, legacy, args.requests)))
+    
+    baseline = results[0][1]
+    print(f"{'scenario':<28}{'us/request':>12}{'speedup':>10}")
+    for name, cost in results:
+        print(f"{name:<28}{cost:>12.2f}{baseline / cost:>9.1f}x")
+    return results
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""
+Deterministic synthetic DJI WPML mission generator.
+
+Produces KML documents with the same structure as the DJI Pilot exports in
+``memory-bank/example.kml`` (mission config, wayline folder, placemarks with
+heading/turn parameters and action groups), laid out as a lawnmower survey
+grid. The same arguments always produce byte-identical output, so benchmark
+runs on different machines or commits operate on the same input.
+"""
+
+import math
+import random
+from typing import Iterator, List, Tuple
+
+WPML_NAMESPACE = 'http://www.dji.com/wpmz/1.0.6'
+KML_NAMESPACE = 'http://www.opengis.net/kml/2.2'
+
+DEFAULT_ORIGIN = (-36.9034287652454, 174.758269440249)  # lat, lon of the example mission
+METERS_PER_DEGREE_LAT = 111320.0
+
+ACTION_TEMPLATES = [
+    ('gimbalRotate', [
+        ('gimbalHeadingYawBase', 'aircraft'), ('gimbalRotateMode', 'absoluteAngle'),
+        ('gimbalPitchRotateEnable', '1'), ('gimbalPitchRotateAngle', '-90'),
+        ('gimbalRollRotateEnable', '0'), ('gimbalRollRotateAngle', '0'),
+        ('gimbalYawRotateEnable', '0'), ('gimbalYawRotateAngle', '0'),
+        ('gimbalRotateTimeEnable', '0'), ('gimbalRotateTime', '10'),
+        ('payloadPositionIndex', '0')
+    ]),
+    ('takePhoto', [('payloadPositionIndex', '0'), ('useGlobalPayloadLensIndex', '0'), ('payloadLensIndex', 'visable')]),
+    ('hover', [('hoverTime', '1')]),
+    ('startTimeLapse', [('payloadPositionIndex', '0'), ('useGlobalPayloadLensIndex', '0'),
+                        ('payloadLensIndex', 'visable'), ('minShootInterval', '1.2199250459671')]),
+    ('stopTimeLapse', [('payloadPositionIndex', '0'), ('payloadLensIndex', 'visable')]),
+    ('gimbalAngleLock', []),
+    ('gimbalAngleUnlock', []),
+]
+
+def grid_coordinates(waypoint_count: int, spacing_m: float = 40.0, row_length: int = 50,
+                     origin: Tuple[float, float] = DEFAULT_ORIGIN, seed: int = 0) -> List[Tuple[float, float]]:
+    """Return (latitude, longitude) pairs for a back-and-forth survey grid."""
+    rng = random.Random(seed)
+    origin_lat, origin_lon = origin
+    meters_per_degree_lon = METERS_PER_DEGREE_LAT * math.cos(math.radians(origin_lat))
+    coordinates = []
+    for position in range(waypoint_count):
+        row, column = divmod(position, row_length)
+        if row % 2:
+            column = row_length - 1 - column
+        # Small jitter so consecutive rows are not perfectly collinear
+        north = row * spacing_m + rng.uniform(-1.0, 1.0)
+        east = column * spacing_m + rng.uniform(-1.0, 1.0)
+        coordinates.append((
+            origin_lat + north / METERS_PER_DEGREE_LAT,
+            origin_lon + east / meters_per_degree_lon
+        ))
+    return coordinates
+
+def generate_mission_kml(waypoint_count: int, action_density: float = 1.0, seed: int = 0,
+                         origin: Tuple[float, float] = DEFAULT_ORIGIN, spacing_m: float = 40.0,
+                         row_length: int = 50, auto_flight_speed: float = 15.0) -> str:
+    """
+    Generate a DJI WPML KML document.
+    
+    Args:
+        waypoint_count (int): Number of placemarks
+        action_density (float): Mean number of actions per waypoint; the
+            fractional part is the probability of one extra action
+        seed (int): Seed for heights, speeds, jitter and action choice
+        origin (tuple): (latitude, longitude) of the first waypoint
+        spacing_m (float): Grid spacing in meters
+        row_length (int): Waypoints per grid row
+        auto_flight_speed (float): Wayline ``autoFlightSpeed`` in m/s
+    
+    Returns:
+        str: KML document
+    """
+    rng = random.Random(seed)
+    coordinates = grid_coordinates(waypoint_count, spacing_m, row_length, origin, seed)
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        f'<kml xmlns="{KML_NAMESPACE}" xmlns:wpml="{WPML_NAMESPACE}">\n',
+        '  <Document>\n',
+        '    <wpml:missionConfig>\n',
+        '      <wpml:flyToWaylineMode>safely</wpml:flyToWaylineMode>\n',
+        '      <wpml:finishAction>goHome</wpml:finishAction>\n',
+        '      <wpml:exitOnRCLost>goContinue</wpml:exitOnRCLost>\n',
+        '      <wpml:executeRCLostAction>goBack</wpml:executeRCLostAction>\n',
+        '      <wpml:takeOffSecurityHeight>20</wpml:takeOffSecurityHeight>\n',
+        '      <wpml:globalTransitionalSpeed>15</wpml:globalTransitionalSpeed>\n',
+        '      <wpml:globalRTHHeight>100</wpml:globalRTHHeight>\n',
+        '    </wpml:missionConfig>\n',
+        '    <Folder>\n',
+        '      <wpml:templateId>0</wpml:templateId>\n',
+        '      <wpml:executeHeightMode>WGS84</wpml:executeHeightMode>\n',
+        '      <wpml:waylineId>0</wpml:waylineId>\n',
+        f'      <wpml:autoFlightSpeed>{auto_flight_speed:g}</wpml:autoFlightSpeed>\n',
+    ]
+    action_group_id = 0
+    for index, (latitude, longitude) in enumerate(coordinates):
+        height = 150.0 + rng.uniform(-30.0, 30.0)
+        speed = auto_flight_speed + rng.uniform(-1.0, 1.0)
+        parts.append(
+            '      <Placemark>\n'
+            '        <Point>\n'
+            '          <coordinates>\n'
+            f'            {longitude:.12f},{latitude:.12f}\n'
+            '          </coordinates>\n'
+            '        </Point>\n'
+            f'        <wpml:index>{index}</wpml:index>\n'
+            f'        <wpml:executeHeight>{height:.9f}</wpml:executeHeight>\n'
+            f'        <wpml:waypointSpeed>{speed:.9f}</wpml:waypointSpeed>\n'
+            '        <wpml:waypointHeadingParam>\n'
+            '          <wpml:waypointHeadingMode>followWayline</wpml:waypointHeadingMode>\n'
+            '          <wpml:waypointHeadingAngle>0</wpml:waypointHeadingAngle>\n'
+            '          <wpml:waypointPoiPoint>0.000000,0.000000,0.000000</wpml:waypointPoiPoint>\n'
+            '          <wpml:waypointHeadingAngleEnable>0</wpml:waypointHeadingAngleEnable>\n'
+            '          <wpml:waypointHeadingPathMode>followBadArc</wpml:waypointHeadingPathMode>\n'
+            '          <wpml:waypointHeadingPoiIndex>0</wpml:waypointHeadingPoiIndex>\n'
+            '        </wpml:waypointHeadingParam>\n'
+            '        <wpml:waypointTurnParam>\n'
+            '          <wpml:waypointTurnMode>toPointAndStopWithDiscontinuityCurvature</wpml:waypointTurnMode>\n'
+            '          <wpml:waypointTurnDampingDist>0</wpml:waypointTurnDampingDist>\n'
+            '        </wpml:waypointTurnParam>\n'
+            '        <wpml:useStraightLine>1</wpml:useStraightLine>\n'
+        )
+        action_count = int(action_density) + (1 if rng.random() < action_density % 1 else 0)
+        if action_count:
+            parts.append(_action_group(action_group_id, index, action_count, rng))
+            action_group_id += 1
+        parts.append(
+            '        <wpml:isRisky>0</wpml:isRisky>\n'
+            '        <wpml:waypointWorkType>0</wpml:waypointWorkType>\n'
+            '      </Placemark>\n'
+        )
+    parts.append('    </Folder>\n  </Document>\n</kml>\n')
+    return ''.join(parts)
+
+def _action_group(group_id: int, index: int, action_count: int, rng: random.Random) -> str:
+    lines = [
+        '        <wpml:actionGroup>\n',
+        f'          <wpml:actionGroupId>{group_id}</wpml:actionGroupId>\n',
+        f'          <wpml:actionGroupStartIndex>{index}</wpml:actionGroupStartIndex>\n',
+        f'          <wpml:actionGroupEndIndex>{index}</wpml:actionGroupEndIndex>\n',
+        '          <wpml:actionGroupMode>sequence</wpml:actionGroupMode>\n',
+        '          <wpml:actionTrigger>\n',
+        '            <wpml:actionTriggerType>reachPoint</wpml:actionTriggerType>\n',
+        '          </wpml:actionTrigger>\n',
+    ]
+    for action_id in range(action_count):
+        func, params = ACTION_TEMPLATES[rng.randrange(len(ACTION_TEMPLATES))]
+        lines.append('          <wpml:action>\n')
+        lines.append(f'            <wpml:actionId>{action_id}</wpml:actionId>\n')
+        lines.append(f'            <wpml:actionActuatorFunc>{func}</wpml:actionActuatorFunc>\n')
+        if params:
+            lines.append('            <wpml:actionActuatorFuncParam>\n')
+            for name, value in params:
+                lines.append(f'              <wpml:{name}>{value}</wpml:{name}>\n')
+            lines.append('            </wpml:actionActuatorFuncParam>\n')
+        lines.append('          </wpml:action>\n')
+    lines.append('        </wpml:actionGroup>\n')
+    return ''.join(lines)
+
+def generate_missions(mission_count: int, waypoint_count: int, action_density: float = 1.0,
+                      seed: int = 0) -> Iterator[Tuple[str, str]]:
+    """Yield (name, kml) pairs for a fleet of missions with offset origins."""
+    for mission_number in range(mission_count):
+        origin = (
+            DEFAULT_ORIGIN[0] + 0.05 * (mission_number // 10),
+            DEFAULT_ORIGIN[1] + 0.05 * (mission_number % 10)
+        )
+        yield (
+            f'Synthetic mission {mission_number:04d}',
+            generate_mission_kml(waypoint_count, action_density, seed + mission_number, origin)
+        )
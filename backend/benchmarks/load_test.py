@@ -0,0 +1,304 @@
+"""
+Local load-testing harness with mixed workloads.
+
+Drives the API with concurrent worker threads, either in-process through the
+Flask test client (default, against a temporary SQLite database seeded with
+synthetic missions) or over HTTP against a running local server. Reports
+throughput and p50/p95/p99 latency per endpoint. Everything runs offline.
+
+Usage:
+    python -m benchmarks.load_test [--concurrency 8] [--duration 20]
+                                   [--mix list=10,detail=65,annotate=20,upload=5]
+                                   [--url http://127.0.0.1:5000] [--json report.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter, perf_counter_ns
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.kml_generator import generate_mission_kml, generate_missions
+
+DEFAULT_MIX = 'list=10,detail=65,annotate=20,upload=5'
+
+def parse_mix(text):
+    """Parse ``name=weight,...`` into a {name: weight} dict."""
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}' (expected one of {', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(q * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+class InProcessClient:
+    """Calls the app through the Flask test client (one client per thread)."""
+    
+    def __init__(self, app):
+        self._app = app
+        self._local = threading.local()
+    
+    def _client(self):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self._app.test_client()
+        return client
+    
+    def request(self, method, path, json_body=None, upload=None):
+        if upload is not None:
+            name, kml = upload
+            response = self._client().open(path, method=method, content_type='multipart/form-data', data={
+                'name': name,
+                'file': (io.BytesIO(kml.encode('utf-8')), 'mission.kml')
+            })
+        else:
+            response = self._client().open(path, method=method, json=json_body)
+        body = response.get_data()
+        return response.status_code, body
+
+class HTTPClient:
+    """Calls a running server with urllib."""
+    
+    def __init__(self, base_url, timeout=60):
+        self._base_url = base_url.rstrip('/')
+        self._timeout = timeout
+    
+    def request(self, method, path, json_body=None, upload=None):
+        headers = {}
+        data = None
+        if upload is not None:
+            boundary = uuid.uuid4().hex
+            name, kml = upload
+            data = (
+                f'--{boundary}\r\nContent-Disposition: form-data; name="name"\r\n\r\n{name}\r\n'
+                f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="mission.kml"\r\n'
+                f'Content-Type: application/vnd.google-earth.kml+xml\r\n\r\n{kml}\r\n--{boundary}--\r\n'
+            ).encode('utf-8')
+            headers['Content-Type'] = f'multipart/form-data; boundary={boundary}'
+        elif json_body is not None:
+            data = json.dumps(json_body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        http_request = urllib.request.Request(self._base_url + path, data=data, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(http_request, timeout=self._timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+class Workload:
+    """Shared state for operations: known mission IDs and upload payloads."""
+    
+    def __init__(self, mission_ids, upload_waypoints, annotation_burst, seed):
+        self.mission_ids = list(mission_ids)
+        self.upload_kml = generate_mission_kml(upload_waypoints, action_density=1.0, seed=seed)
+        self.annotation_burst = annotation_burst
+        self._lock = threading.Lock()
+    
+    def random_mission(self, rng):
+        with self._lock:
+            return rng.choice(self.mission_ids)
+    
+    def add_mission(self, mission_id):
+        with self._lock:
+            self.mission_ids.append(mission_id)
+
+# Each operation yields (endpoint label, method, path, json body, upload) tuples;
+# annotation bursts yield several requests in a row from one worker.
+def _op_list(workload, rng):
+    yield 'GET /api/missions/', 'GET', '/api/missions/', None, None
+
+def _op_detail(workload, rng):
+    yield 'GET /api/missions/<id>', 'GET', f'/api/missions/{workload.random_mission(rng)}', None, None
+
+def _op_annotate(workload, rng):
+    mission_id = workload.random_mission(rng)
+    for note_number in range(workload.annotation_burst):
+        yield 'POST /api/missions/<id>/annotations', 'POST', f'/api/missions/{mission_id}/annotations', {
+            'latitude': -36.90 + rng.uniform(-0.01, 0.01),
+            'longitude': 174.75 + rng.uniform(-0.01, 0.01),
+            'note': f'load test note {note_number}'
+        }, None
+
+def _op_upload(workload, rng):
+    yield 'POST /api/missions/', 'POST', '/api/missions/', None, (f'Load test {rng.random():.6f}', workload.upload_kml)
+
+OPERATIONS = {
+    'list': _op_list,
+    'detail': _op_detail,
+    'annotate': _op_annotate,
+    'upload': _op_upload,
+}
+
+def run_load(client, workload, mix, concurrency, duration=None, total_operations=None, seed=0):
+    """
+    Run the workload and return the per-endpoint latency report.
+    
+    Stops after ``duration`` seconds or ``total_operations`` operations,
+    whichever comes first.
+    """
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    samples_lock = threading.Lock()
+    counter_lock = threading.Lock()
+    started = [0]
+    deadline = perf_counter() + duration if duration else None
+    
+    def claim():
+        with counter_lock:
+            if total_operations is not None and started[0] >= total_operations:
+                return False
+            started[0] += 1
+            return True
+    
+    def worker(worker_number):
+        rng = random.Random(seed * 1000 + worker_number)
+        local_samples = defaultdict(list)
+        local_errors = defaultdict(int)
+        while (deadline is None or perf_counter() < deadline) and claim():
+            operation = OPERATIONS[rng.choices(names, weights)[0]]
+            for label, method, path, json_body, upload in operation(workload, rng):
+                start = perf_counter_ns()
+                try:
+                    status, body = client.request(method, path, json_body, upload)
+                except Exception:
+                    status, body = None, b''
+                local_samples[label].append((perf_counter_ns() - start) / 1e6)
+                if status is None or status >= 400:
+                    local_errors[label] += 1
+                elif label == 'POST /api/missions/':
+                    workload.add_mission(json.loads(body)['data']['mission']['id'])
+        with samples_lock:
+            for label, values in local_samples.items():
+                samples[label].extend(values)
+            for label, count in local_errors.items():
+                errors[label] += count
+    
+    wall_start = perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(worker, number) for number in range(concurrency)]:
+            future.result()
+    return summarize(samples, errors, perf_counter() - wall_start)
+
+def summarize(samples, errors, elapsed):
+    """Build the report from raw latency samples (milliseconds)."""
+    endpoints = {}
+    total = 0
+    for label in sorted(samples):
+        values = sorted(samples[label])
+        total += len(values)
+        endpoints[label] = {
+            'requests': len(values),
+            'errors': errors.get(label, 0),
+            'throughput_rps': round(len(values) / elapsed, 2) if elapsed else None,
+            'p50_ms': round(percentile(values, 0.50), 3),
+            'p95_ms': round(percentile(values, 0.95), 3),
+            'p99_ms': round(percentile(values, 0.99), 3),
+            'max_ms': round(values[-1], 3)
+        }
+    return {
+        'elapsed_s': round(elapsed, 3),
+        'requests': total,
+        'errors': sum(errors.values()),
+        'throughput_rps': round(total / elapsed, 2) if elapsed else None,
+        'endpoints': endpoints
+    }
+
+def _seed_via_client(client, missions, waypoints):
+    mission_ids = []
+    for name, kml in generate_missions(missions, waypoints):
+        status, body = client.request('POST', '/api/missions/', upload=(name, kml))
+        if status != 201:
+            raise RuntimeError(f"Seeding failed with HTTP {status}: {body[:200]!r}")
+        mission_ids.append(json.loads(body)['data']['mission']['id'])
+    return mission_ids
+
+def print_report(report):
+    print(f"{'endpoint':<40}{'reqs':>7}{'errs':>6}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for label, stats in report['endpoints'].items():
+        print(f"{label:<40}{stats['requests']:>7}{stats['errors']:>6}{stats['throughput_rps']:>9.1f}"
+              f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}")
+    print(f"\n{report['requests']} requests, {report['errors']} errors in {report['elapsed_s']}s "
+          f"({report['throughput_rps']} req/s)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Drive the API with a concurrent mixed workload.')
+    parser.add_argument('--url', help='base URL of a running server (default: in-process app)')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'operation weights (default: {DEFAULT_MIX})')
+    parser.add_argument('--concurrency', type=int, default=8, help='worker threads')
+    parser.add_argument('--duration', type=float, default=20.0, help='seconds to run')
+    parser.add_argument('--operations', type=int, help='stop after this many operations')
+    parser.add_argument('--missions', type=int, default=20, help='missions to seed')
+    parser.add_argument('--waypoints', type=int, default=500, help='waypoints per seeded mission')
+    parser.add_argument('--upload-waypoints', type=int, default=5000, help='waypoints per uploaded mission')
+    parser.add_argument('--annotation-burst', type=int, default=5, help='annotations per annotate operation')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='also write the report as JSON to this path')
+    args = parser.parse_args(argv)
+    
+    mix = parse_mix(args.mix)
+    
+    with contextlib.ExitStack() as stack:
+        if args.url:
+            client = HTTPClient(args.url)
+        else:
+            from app import create_app
+            workdir = stack.enter_context(tempfile.TemporaryDirectory())
+            devnull = stack.enter_context(open(os.devnull, 'w'))
+            # The console log handler binds stdout at configuration time
+            with contextlib.redirect_stdout(devnull):
+                app = create_app('testing', {
+                    'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'load.db')}",
+                    'LOG_QUEUE_ENABLED': True
+                })
+            with app.app_context():
+                from app.database import db
+                db.create_all()
+            client = InProcessClient(app)
+        
+        print(f"Seeding {args.missions} missions x {args.waypoints} waypoints...")
+        workload = Workload(
+            _seed_via_client(client, args.missions, args.waypoints),
+            args.upload_waypoints, args.annotation_burst, args.seed
+        )
+        
+        print(f"Running {args.mix} with {args.concurrency} workers...")
+        report = run_load(client, workload, mix, args.concurrency, args.duration, args.operations, args.seed)
+        
+        if not args.url:
+            from app.logging_config import _stop_queue_listener
+            _stop_queue_listener()
+    
+    report['config'] = {key: value for key, value in vars(args).items() if key != 'json'}
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+    return report
+
+if __name__ == '__main__':
+    main()
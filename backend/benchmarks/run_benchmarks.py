@@ -0,0 +1,269 @@
+"""
+Benchmark the backend hot paths on synthetic missions.
+
+Measures wall time (min/median over repeats) and peak traced memory for KML
+parsing, mission creation, mission reads and serialization against a
+temporary SQLite database. Results are written as JSON; pass ``--compare``
+with an earlier result file to flag regressions.
+
+Usage:
+    python -m benchmarks.run_benchmarks [--quick] [--output results.json]
+                                        [--compare baseline.json] [--threshold 1.25]
+"""
+
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime, timezone
+from time import perf_counter_ns
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.kml_generator import generate_mission_kml, generate_missions
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), 'results', 'latest.json')
+
+# name -> parameters; --quick uses the smaller set so a run takes seconds
+SIZES = {
+    'full': {
+        'parse_waypoints': (100, 1000, 10000),
+        'create_waypoints': (1000, 10000),
+        'fleet': (50, 200),
+        'detail_waypoints': 10000,
+        'search_notes': 50000,
+        'action_density': 2.0,
+        'repeats': 5
+    },
+    'quick': {
+        'parse_waypoints': (100, 1000),
+        'create_waypoints': (1000,),
+        'fleet': (10, 100),
+        'detail_waypoints': 1000,
+        'search_notes': 5000,
+        'action_density': 2.0,
+        'repeats': 3
+    }
+}
+
+def measure(func, repeats, setup=None):
+    """Time ``func`` ``repeats`` times, then trace one extra call for peak memory."""
+    timings = []
+    for _ in range(repeats):
+        if setup:
+            setup()
+        gc.collect()
+        start = perf_counter_ns()
+        func()
+        timings.append((perf_counter_ns() - start) / 1e6)
+    
+    if setup:
+        setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    return {
+        'min_ms': round(min(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'repeats': repeats,
+        'peak_kib': round(peak / 1024, 1)
+    }
+
+def _create_app(database_path, devnull):
+    from app import create_app
+    # The console log handler binds stdout at configuration time
+    with contextlib.redirect_stdout(devnull):
+        return create_app('testing', {
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database_path}',
+            'LOG_QUEUE_ENABLED': True
+        })
+
+@contextlib.contextmanager
+def _without_payload_cache(app):
+    cache = app.extensions.pop('payload_cache', None)
+    try:
+        yield
+    finally:
+        if cache is not None:
+            app.extensions['payload_cache'] = cache
+
+NOTE_WORDS = ('fence', 'gate', 'pylon', 'river', 'tower', 'roof', 'crack', 'erosion', 'nest', 'powerline')
+
+def _seed_notes(mission_id, count):
+    """Insert ``count`` annotations; about 1% mention a bridge inspection."""
+    import random
+    from sqlalchemy import insert
+    from app.database import db
+    from app.models.mission import Annotation
+    
+    rng = random.Random(0)
+    rows = []
+    for number in range(count):
+        words = rng.sample(NOTE_WORDS, 4)
+        if number % 100 == 0:
+            words.insert(1, 'bridge inspection')
+        rows.append({'mission_id': mission_id, 'latitude': -36.9, 'longitude': 174.7, 'note': ' '.join(words)})
+    db.session.execute(insert(Annotation), rows)
+    db.session.commit()
+
+def run_benchmarks(size='full'):
+    """Run all cases and return a results document."""
+    from app.database import db
+    from app.models.mission import Mission
+    from app.services.mission_service import MissionService
+    from app.services.search_service import SearchService
+    from app.services.export_service import ExportService
+    from app.utils.kml_parser import parse_kml_file
+    
+    params = SIZES[size]
+    repeats = params['repeats']
+    density = params['action_density']
+    results = {}
+    
+    for waypoint_count in params['parse_waypoints']:
+        kml = generate_mission_kml(waypoint_count, density)
+        results[f'parse_kml[waypoints={waypoint_count}]'] = measure(lambda: parse_kml_file(kml), repeats)
+    
+    with tempfile.TemporaryDirectory() as workdir, open(os.devnull, 'w') as devnull:
+        app = _create_app(os.path.join(workdir, 'bench.db'), devnull)
+        with app.app_context():
+            db.create_all()
+            
+            for waypoint_count in params['create_waypoints']:
+                kml = generate_mission_kml(waypoint_count, density)
+                results[f'create_mission_from_kml[waypoints={waypoint_count}]'] = measure(
+                    lambda: MissionService.create_mission_from_kml('Benchmark', kml), repeats
+                )
+            
+            # Reads run against a separate, fixed fleet so earlier cases do not skew them
+            db.drop_all()
+            db.create_all()
+            mission_count, waypoint_count = params['fleet']
+            for name, kml in generate_missions(mission_count, waypoint_count, density):
+                MissionService.create_mission_from_kml(name, kml)
+            detail = MissionService.create_mission_from_kml(
+                'Detail', generate_mission_kml(params['detail_waypoints'], density)
+            )
+            detail_id = detail['mission']['id']
+            
+            results[f'get_all_missions[missions={mission_count + 1},waypoints={waypoint_count}]'] = measure(
+                MissionService.get_all_missions, repeats, setup=db.session.expire_all
+            )
+            results[f'get_mission_by_id[waypoints={params["detail_waypoints"]}]'] = measure(
+                lambda: MissionService.get_mission_by_id(detail_id), repeats, setup=db.session.expire_all
+            )
+            
+            # The read endpoints' JSON bodies: ORM objects and to_dict() against Core rows encoded
+            # straight to JSON text, both uncached
+            with _without_payload_cache(app):
+                for path, read_all, read_one in (
+                    (
+                        'orm',
+                        lambda: json.dumps([mission.to_dict() for mission in Mission.query.all()]),
+                        lambda: json.dumps(db.session.get(Mission, detail_id).to_dict())
+                    ),
+                    (
+                        'core',
+                        MissionService.get_all_missions_json,
+                        lambda: MissionService.get_mission_json(detail_id)
+                    )
+                ):
+                    results[
+                        f'read_missions_json[path={path},missions={mission_count + 1},waypoints={waypoint_count}]'
+                    ] = measure(read_all, repeats, setup=db.session.expire_all)
+                    results[f'read_mission_json[path={path},waypoints={params["detail_waypoints"]}]'] = measure(
+                        read_one, repeats, setup=db.session.expire_all
+                    )
+            
+            # Serialization alone: relationships are loaded before timing
+            mission = db.session.get(Mission, detail_id)
+            mission.to_dict()
+            results[f'mission_to_dict[waypoints={params["detail_waypoints"]}]'] = measure(mission.to_dict, repeats)
+            
+            note_count = params['search_notes']
+            _seed_notes(detail_id, note_count)
+            results[f'search[notes={note_count}]'] = measure(lambda: SearchService.search('bridge insp'), repeats)
+            
+            exported = mission_count * waypoint_count + params['detail_waypoints']
+            results[f'export_waypoints[format=parquet,waypoints={exported}]'] = measure(
+                lambda: sum(len(chunk) for chunk in ExportService.stream('waypoints', 'parquet')), repeats
+            )
+            
+            db.session.remove()
+            db.engine.dispose()
+        
+        from app.logging_config import _stop_queue_listener
+        _stop_queue_listener()
+    
+    return {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'size': size,
+            'action_density': density,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'machine': platform.machine()
+        },
+        'results': results
+    }
+
+def compare(current, baseline, threshold):
+    """Return (case, baseline_ms, current_ms, ratio, regressed) rows for shared cases."""
+    rows = []
+    for case, result in current['results'].items():
+        previous = baseline['results'].get(case)
+        if previous is None:
+            continue
+        ratio = result['median_ms'] / previous['median_ms'] if previous['median_ms'] else float('inf')
+        rows.append((case, previous['median_ms'], result['median_ms'], ratio, ratio > threshold))
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark backend hot paths on synthetic missions.')
+    parser.add_argument('--quick', action='store_true', help='use small sizes (seconds instead of minutes)')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='where to write the JSON results')
+    parser.add_argument('--compare', help='baseline JSON to compare medians against')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='median slowdown ratio that counts as a regression (default: 1.25)')
+    args = parser.parse_args(argv)
+    
+    current = run_benchmarks('quick' if args.quick else 'full')
+    
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as output_file:
+        json.dump(current, output_file, indent=2)
+    
+    print(f"{'case':<58}{'median ms':>12}{'min ms':>10}{'peak KiB':>12}")
+    for case, result in current['results'].items():
+        print(f"{case:<58}{result['median_ms']:>12.2f}{result['min_ms']:>10.2f}{result['peak_kib']:>12.1f}")
+    print(f"\nResults written to {args.output}")
+    
+    if not args.compare:
+        return 0
+    
+    with open(args.compare) as baseline_file:
+        baseline = json.load(baseline_file)
+    if baseline['meta'].get('size') != current['meta']['size']:
+        print(f"Warning: baseline size {baseline['meta'].get('size')!r} differs from {current['meta']['size']!r}")
+    
+    rows = compare(current, baseline, args.threshold)
+    print(f"\n{'case':<58}{'baseline':>10}{'current':>10}{'ratio':>8}")
+    for case, previous, now, ratio, regressed in rows:
+        flag = '  REGRESSION' if regressed else ''
+        print(f"{case:<58}{previous:>10.2f}{now:>10.2f}{ratio:>8.2f}{flag}")
+    return 1 if any(row[4] for row in rows) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -12,6 +12,68 @@ class Config:
     # API Configuration
     JSON_SORT_KEYS = False
     JSONIFY_PRETTYPRINT_REGULAR = True
+    
+    # Logging Configuration
+    LOG_FORMAT = os.environ.get('LOG_FORMAT', 'text')  # 'text' or 'json' for log files
+    LOG_QUEUE_ENABLED = os.environ.get('LOG_QUEUE_ENABLED', 'true').lower() == 'true'
+    LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', 10000))
+    ACCESS_LOG_SAMPLE_RATE = float(os.environ.get('ACCESS_LOG_SAMPLE_RATE', 1.0))
+    
+    # SQL Instrumentation
+    SQL_SLOW_QUERY_MS = float(os.environ.get('SQL_SLOW_QUERY_MS', 100))
+    SQL_EXPLAIN_SLOW_QUERIES = os.environ.get('SQL_EXPLAIN_SLOW_QUERIES', 'true').lower() == 'true'
+    
+    # Response Compression
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))  # bytes
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 5))
+    COMPRESSION_CACHE_MAX_BYTES = int(os.environ.get('COMPRESSION_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    
+    # Mission Payload Cache
+    PAYLOAD_CACHE_ENABLED = os.environ.get('PAYLOAD_CACHE_ENABLED', 'true').lower() == 'true'
+    PAYLOAD_CACHE_MAX_BYTES = int(os.environ.get('PAYLOAD_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    PAYLOAD_CACHE_TTL = float(os.environ.get('PAYLOAD_CACHE_TTL', 300))  # seconds
+    PAYLOAD_CACHE_SHARED_PATH = os.environ.get('PAYLOAD_CACHE_SHARED_PATH')  # e.g. /tmp/mission-cache.db
+    PAYLOAD_CACHE_SHARED_MAX_BYTES = int(os.environ.get('PAYLOAD_CACHE_SHARED_MAX_BYTES', 256 * 1024 * 1024))
+    
+    # Upload Admission Control
+    UPLOAD_MAX_BYTES = int(os.environ.get('UPLOAD_MAX_BYTES', 32 * 1024 * 1024))
+    PARSE_MAX_CONCURRENCY = int(os.environ.get('PARSE_MAX_CONCURRENCY', 2))
+    PARSE_QUEUE_SIZE = int(os.environ.get('PARSE_QUEUE_SIZE', 8))
+    PARSE_QUEUE_TIMEOUT = float(os.environ.get('PARSE_QUEUE_TIMEOUT', 10))  # seconds
+    PARSE_RETRY_AFTER = int(os.environ.get('PARSE_RETRY_AFTER', 5))  # seconds
+    
+    # Terrain Clearance
+    TERRAIN_DEM_DIR = os.environ.get('TERRAIN_DEM_DIR')  # directory of .hgt / .bil tiles
+    TERRAIN_SAMPLE_INTERVAL_M = float(os.environ.get('TERRAIN_SAMPLE_INTERVAL_M', 30))
+    TERRAIN_MIN_CLEARANCE_M = float(os.environ.get('TERRAIN_MIN_CLEARANCE_M', 30))
+    TERRAIN_GEOID_SEPARATION_M = float(os.environ.get('TERRAIN_GEOID_SEPARATION_M', 0))  # WGS84 ellipsoid minus geoid
+
+    # Flight Playback
+    PLAYBACK_DEFAULT_SPEED_MPS = float(os.environ.get('PLAYBACK_DEFAULT_SPEED_MPS', 10))  # when the KML sets no speed
+    PLAYBACK_CHUNK_FRAMES = int(os.environ.get('PLAYBACK_CHUNK_FRAMES', 500))  # frames per streamed message
+    
+    # Mission Diff
+    MISSION_DIFF_MATCH_RADIUS_M = float(os.environ.get('MISSION_DIFF_MATCH_RADIUS_M', 25))  # farthest a matched waypoint can move
+    
+    # Survey Coverage
+    SURVEY_CAMERA_FOV_DEG = float(os.environ.get('SURVEY_CAMERA_FOV_DEG', 70))  # across-track field of view
+    SURVEY_MAX_CELLS = int(os.environ.get('SURVEY_MAX_CELLS', 4000000))  # raster size limit per footprint
+    
+    # Multi-mission Deconfliction
+    DECONFLICTION_HORIZONTAL_M = float(os.environ.get('DECONFLICTION_HORIZONTAL_M', 50))  # minimum horizontal separation
+    DECONFLICTION_VERTICAL_M = float(os.environ.get('DECONFLICTION_VERTICAL_M', 30))  # minimum vertical separation
+    DECONFLICTION_STEP_S = float(os.environ.get('DECONFLICTION_STEP_S', 1))  # time bucket length
+    DECONFLICTION_MAX_CELLS = int(os.environ.get('DECONFLICTION_MAX_CELLS', 5_000_000))  # grid cells per check
+    
+    # Database Maintenance
+    MAINTENANCE_ENABLED = os.environ.get('MAINTENANCE_ENABLED', 'false').lower() == 'true'
+    MAINTENANCE_INTERVAL = float(os.environ.get('MAINTENANCE_INTERVAL', 3600))  # seconds between runs
+    MAINTENANCE_WINDOWS = os.environ.get('MAINTENANCE_WINDOWS', '')  # e.g. '02:00-05:00,23:30-00:30' local time; empty = any time
+    MAINTENANCE_IDLE_SECONDS = float(os.environ.get('MAINTENANCE_IDLE_SECONDS', 5))  # quiet period required before each step
+    MAINTENANCE_BATCH_SIZE = int(os.environ.get('MAINTENANCE_BATCH_SIZE', 1000))  # orphaned rows deleted per step
+    MAINTENANCE_VACUUM_PAGES = int(os.environ.get('MAINTENANCE_VACUUM_PAGES', 256))  # pages freed per step
 
 class DevelopmentConfig(Config):
     """Development configuration."""
@@ -23,6 +85,7 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    LOG_QUEUE_ENABLED = False
 
 # Configuration dictionary
 config = {
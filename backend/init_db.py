@@ -1,7 +1,45 @@
 import os
+from sqlalchemy import text
+from sqlalchemy.schema import CreateColumn
 from app import create_app
 from app.database import db
 from app.models.mission import Mission, Annotation, NoFlyZone
+from app.models.version import MissionVersion, WaypointBlock, KmlBlob
+from app.models.summary import MissionSummary
+from app.models.search import SEARCH_DDL  # FTS5 search index and triggers
+
+def upgrade_schema():
+    """
+    Bring tables created by an older version up to the current models.
+    
+    ``db.create_all()`` only creates missing tables. Columns added to the
+    models since are added with ``ALTER TABLE ... ADD COLUMN`` when
+    ``PRAGMA table_info`` does not list them, missing indexes (such as the
+    unique ``upload_key`` index) are created, and missions written before
+    revisions existed get one. Safe to run any number of times; SQLite only.
+    
+    Returns:
+        list: ``table.column`` names that were added
+    """
+    engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return []
+    
+    added = []
+    with engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            existing = {row[1] for row in connection.exec_driver_sql(f'PRAGMA table_info("{table.name}")')}
+            if not existing:
+                continue
+            for column in table.columns:
+                if column.name not in existing:
+                    ddl = CreateColumn(column).compile(dialect=engine.dialect)
+                    connection.exec_driver_sql(f'ALTER TABLE "{table.name}" ADD COLUMN {ddl}')
+                    added.append(f'{table.name}.{column.name}')
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+        connection.execute(text("UPDATE mission SET revision = lower(hex(randomblob(16))) WHERE revision = ''"))
+    return added
 
 def init_db():
     app = create_app()
@@ -14,6 +52,11 @@ def init_db():
                 os.makedirs(os.path.dirname(db_path), exist_ok=True)
         
         db.create_all()
+        added = upgrade_schema()
+        if added:
+            print(f"Added columns: {', '.join(added)}")
+            print("Backfill derived data with: flask rebuild-summaries, flask rebuild-search-index, "
+                  "flask normalize-no-fly-zones")
         print("Database initialized!")
 
 if __name__ == '__main__':
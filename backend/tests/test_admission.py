@@ -0,0 +1,119 @@
+import unittest
+import io
+import os
+import sys
+import threading
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.admission import ParseGate
+from app.database import db
+from app.errors import ServiceUnavailableError
+from app.models.mission import Mission
+from benchmarks.kml_generator import generate_mission_kml
+
+
+class TestParseGate(unittest.TestCase):
+    """Unit tests for the bounded parse gate"""
+    
+    def test_rejects_when_queue_is_full(self):
+        """Test that a request is refused immediately when no slot or queue place is free"""
+        gate = ParseGate(max_concurrency=1, max_queue=0, timeout=5, retry_after=3)
+        
+        with gate.admit():
+            with self.assertRaises(ServiceUnavailableError) as context:
+                with gate.admit():
+                    pass
+        
+        self.assertEqual(context.exception.retry_after, 3)
+    
+    def test_queued_request_times_out(self):
+        """Test that a queued request gives up after the timeout"""
+        gate = ParseGate(max_concurrency=1, max_queue=1, timeout=0.05, retry_after=1)
+        
+        with gate.admit():
+            with self.assertRaises(ServiceUnavailableError):
+                with gate.admit():
+                    pass
+    
+    def test_queued_request_runs_when_slot_frees(self):
+        """Test that a queued request is admitted once the running one finishes"""
+        gate = ParseGate(max_concurrency=1, max_queue=1, timeout=5, retry_after=1)
+        released = threading.Event()
+        admitted = []
+        
+        def queued():
+            with gate.admit():
+                admitted.append(released.is_set())
+        
+        with gate.admit():
+            worker = threading.Thread(target=queued)
+            worker.start()
+            worker.join(0.05)
+            released.set()
+        worker.join(5)
+        
+        self.assertEqual(admitted, [True])
+
+
+class TestUploadAdmission(unittest.TestCase):
+    """Integration tests for admission control on the upload path"""
+    
+    def setUp(self):
+        self.app = create_app('testing', {
+            'UPLOAD_MAX_BYTES': 64 * 1024,
+            'PARSE_MAX_CONCURRENCY': 1,
+            'PARSE_QUEUE_SIZE': 0,
+            'PARSE_RETRY_AFTER': 7
+        })
+        self.client = self.app.test_client()
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+    
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+    
+    def _upload(self, kml):
+        return self.client.post('/api/missions/', content_type='multipart/form-data', data={
+            'name': 'Upload',
+            'file': (io.BytesIO(kml.encode('utf-8')), 'mission.kml')
+        })
+    
+    def test_oversized_upload_is_rejected_before_parsing(self):
+        """Test that uploads over the limit get 413 and create nothing"""
+        response = self._upload(generate_mission_kml(2000))
+        
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(Mission.query.count(), 0)
+    
+    def test_saturated_parser_returns_retry_after(self):
+        """Test backpressure while all parse slots are busy, with reads unaffected"""
+        with self.app.extensions['parse_gate'].admit():
+            rejected = self._upload(generate_mission_kml(10))
+            read = self.client.get('/api/missions/')
+        accepted = self._upload(generate_mission_kml(10))
+        
+        self.assertEqual(rejected.status_code, 503)
+        self.assertEqual(rejected.headers['Retry-After'], '7')
+        self.assertEqual(read.status_code, 200)
+        self.assertEqual(accepted.status_code, 201)
+
+    def test_rename_does_not_take_a_parse_slot(self):
+        """Test that a PUT without KML goes through while every parse slot is busy"""
+        mission_id = self._upload(generate_mission_kml(10)).get_json()['data']['mission']['id']
+        
+        with self.app.extensions['parse_gate'].admit():
+            renamed = self.client.put(f'/api/missions/{mission_id}', json={'name': 'Renamed'})
+            reparsed = self.client.put(f'/api/missions/{mission_id}', json={'kml_data': generate_mission_kml(12)})
+        
+        self.assertEqual(renamed.status_code, 200)
+        self.assertEqual(renamed.get_json()['data']['name'], 'Renamed')
+        self.assertEqual(reparsed.status_code, 503)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,103 @@
+import unittest
+import os
+import sys
+from sqlalchemy import event, select, func, text
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.database import db
+from app.models.mission import Mission, Waypoint, Annotation, NoFlyZone
+from app.models.summary import MissionSummary
+from app.models.version import MissionVersion
+from app.services.mission_service import MissionService
+from app.services.version_service import VersionService
+from benchmarks.kml_generator import generate_mission_kml
+
+TRIANGLE = [[174.0, -36.0], [174.01, -36.0], [174.0, -36.01]]
+
+
+class TestBulkDelete(unittest.TestCase):
+    """Tests for set-based mission deletion"""
+    
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+    
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+    
+    def _create(self, name, waypoint_count):
+        mission_id = MissionService.create_mission_from_kml(name, generate_mission_kml(waypoint_count))['mission']['id']
+        MissionService.create_annotation(mission_id, -36.9, 174.7, f'{name} tower')
+        MissionService.create_no_fly_zone(mission_id, TRIANGLE, f'{name} stadium')
+        VersionService.create_version(mission_id, 'v1')
+        return mission_id
+    
+    def _count(self, model, mission_id):
+        column = model.id if model is Mission else model.mission_id
+        return db.session.scalar(select(func.count()).select_from(model).where(column == mission_id))
+    
+    def _count_statements(self, callback):
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            callback()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        return len(statements)
+    
+    def test_removes_every_child_table(self):
+        """Test that no rows reference a deleted mission, and other missions are untouched"""
+        doomed = self._create('Doomed', 30)
+        kept = self._create('Kept', 30)
+        
+        MissionService.delete_mission(doomed)
+        
+        for model in (Mission, Waypoint, Annotation, NoFlyZone, MissionSummary, MissionVersion):
+            self.assertEqual(self._count(model, doomed), 0, model.__name__)
+            self.assertGreater(self._count(model, kept), 0, model.__name__)
+        search_rows = db.session.execute(
+            text("SELECT count(*) FROM search_index WHERE mission_id = :id"), {'id': doomed}
+        ).scalar()
+        self.assertEqual(search_rows, 0)
+        self.assertEqual(self.client.get(f'/api/missions/{doomed}').status_code, 404)
+    
+    def test_statement_count_does_not_depend_on_size(self):
+        """Test that deleting a large mission issues as many statements as a small one"""
+        small = self._create('Small', 5)
+        large = self._create('Large', 500)
+        db.session.remove()
+        
+        small_statements = self._count_statements(lambda: MissionService.delete_mission(small))
+        large_statements = self._count_statements(lambda: MissionService.delete_mission(large))
+        self.assertEqual(small_statements, large_statements)
+    
+    def test_bulk_endpoint(self):
+        """Test that DELETE /api/missions?ids= reports deleted and missing IDs"""
+        first = self._create('First', 10)
+        second = self._create('Second', 10)
+        
+        response = self.client.delete(f'/api/missions/?ids={first},9999,{second}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['data'], {'deleted': [first, second], 'not_found': [9999]})
+        self.assertEqual(db.session.scalar(select(func.count()).select_from(Mission)), 0)
+        
+        for query in ('', '?ids=', '?ids=1,x'):
+            response = self.client.delete(f'/api/missions/{query}')
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('error', response.get_json())
+    
+    def test_single_delete_not_found(self):
+        """Test that deleting a missing mission is a 404 and leaves nothing half-done"""
+        self.assertEqual(self.client.delete('/api/missions/9999').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
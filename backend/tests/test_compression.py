@@ -0,0 +1,117 @@
+import unittest
+import gzip
+import os
+import sys
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import brotli
+from app import create_app
+from app.database import db
+from app.compression import CompressedBodyCache
+from app.services.mission_service import MissionService
+from benchmarks.kml_generator import generate_mission_kml
+
+
+class TestCompressedBodyCache(unittest.TestCase):
+    """Unit tests for the compressed body LRU"""
+    
+    def test_evicts_least_recently_used_by_size(self):
+        """Test that the cache stays under its byte budget, evicting the oldest entries"""
+        cache = CompressedBodyCache(max_bytes=10)
+        cache.put('a', b'1234')
+        cache.put('b', b'1234')
+        cache.get('a')
+        cache.put('c', b'1234')
+        
+        self.assertEqual(cache.get('a'), b'1234')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(len(cache), 2)
+    
+    def test_skips_bodies_larger_than_budget(self):
+        """Test that a body larger than the whole budget is not cached"""
+        cache = CompressedBodyCache(max_bytes=3)
+        cache.put('a', b'1234')
+        
+        self.assertEqual(len(cache), 0)
+
+
+class TestResponseCompression(unittest.TestCase):
+    """Integration tests for negotiated response compression"""
+    
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.mission_id = MissionService.create_mission_from_kml('Grid', generate_mission_kml(200))['mission']['id']
+        self.path = f'/api/missions/{self.mission_id}'
+    
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+    
+    def test_identity_without_accept_encoding(self):
+        """Test that responses are not compressed unless the client asks"""
+        response = self.client.get(self.path)
+        
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertEqual(response.get_json()['data']['id'], self.mission_id)
+    
+    def test_negotiates_encoding(self):
+        """Test gzip and brotli negotiation, including q-values"""
+        identity = self.client.get(self.path).get_json()['data']
+        
+        gzipped = self.client.get(self.path, headers={'Accept-Encoding': 'gzip'})
+        preferred = self.client.get(self.path, headers={'Accept-Encoding': 'gzip, deflate, br'})
+        refused = self.client.get(self.path, headers={'Accept-Encoding': 'br;q=0, gzip;q=0.5'})
+        
+        self.assertEqual(gzipped.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(int(gzipped.headers['Content-Length']), len(gzipped.get_data()))
+        self.assertEqual(preferred.headers['Content-Encoding'], 'br')
+        self.assertEqual(refused.headers['Content-Encoding'], 'gzip')
+        self.assertIn(b'"waypoints"', gzip.decompress(gzipped.get_data()))
+        self.assertIn(b'"waypoints"', brotli.decompress(preferred.get_data()))
+        self.assertLess(len(gzipped.get_data()), len(self.client.get(self.path).get_data()) / 3)
+        self.assertEqual(identity['waypoint_count'], 200)
+    
+    def test_small_responses_are_not_compressed(self):
+        """Test that payloads under the size threshold are sent as-is"""
+        response = self.client.get('/health', headers={'Accept-Encoding': 'gzip'})
+        
+        self.assertNotIn('Content-Encoding', response.headers)
+    
+    def test_compressed_body_is_reused_until_mission_changes(self):
+        """Test that repeat requests are served from the cache and writes invalidate it"""
+        headers = {'Accept-Encoding': 'gzip'}
+        first = self.client.get(self.path, headers=headers)
+        cache_size = len(self.app.extensions['compression_cache'])
+        second = self.client.get(self.path, headers=headers)
+        
+        self.assertEqual(first.get_data(), second.get_data())
+        self.assertEqual(first.headers['ETag'], second.headers['ETag'])
+        self.assertEqual(len(self.app.extensions['compression_cache']), cache_size)
+        self.assertEqual(second.headers['X-DB-Query-Count'], '1')
+        
+        self.client.post(f'{self.path}/annotations', json={'latitude': -36.9, 'longitude': 174.7, 'note': 'x'})
+        third = self.client.get(self.path, headers=headers)
+        
+        self.assertNotEqual(third.headers['ETag'], first.headers['ETag'])
+        self.assertEqual(len(gzip.decompress(third.get_data()).split(b'"note"')), 2)
+    
+    def test_if_none_match_returns_not_modified(self):
+        """Test conditional requests against the mission ETag"""
+        etag = self.client.get(self.path).headers['ETag']
+        
+        response = self.client.get(self.path, headers={'If-None-Match': etag, 'Accept-Encoding': 'gzip'})
+        
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b'')
+        self.assertEqual(response.headers['ETag'], etag)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,159 @@
+import unittest
+import os
+import sys
+import json
+import math
+import numpy as np
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.database import db
+from app.services.mission_service import MissionService
+from app.payload_cache import get_payload_cache, mission_key
+from app.utils import coverage
+from benchmarks.kml_generator import generate_mission_kml, DEFAULT_ORIGIN, METERS_PER_DEGREE_LAT
+
+def target_ring(south, west, north, east):
+    """[lon, lat] ring of a rectangle given in metres from the grid origin"""
+    latitude, longitude = DEFAULT_ORIGIN
+    per_degree_longitude = METERS_PER_DEGREE_LAT * math.cos(math.radians(latitude))
+    corners = [(west, south), (east, south), (east, north), (west, north)]
+    return json.dumps([[longitude + x / per_degree_longitude, latitude + y / METERS_PER_DEGREE_LAT] for x, y in corners])
+
+
+class TestCoverageRaster(unittest.TestCase):
+    """Unit tests for leg rasterization and polygon tracing"""
+    
+    def test_leg_capsule(self):
+        """Test that one leg covers its rectangle and round ends"""
+        runs = coverage.rasterize_legs(np.array([0.0, 100.0]), np.array([0.0, 0.0]), np.array([10.0]), 0.1)
+        area = np.sum(runs['ends'] - runs['starts'] + 1) * 0.01
+        self.assertAlmostEqual(area, 100 * 20 + math.pi * 100, delta=5)
+        self.assertEqual(coverage.run_bounds(runs), (-100, 100, -100, 1100))
+    
+    def test_trace_polygons(self):
+        """Test outer rings, holes and corner-touching cells"""
+        mask = np.zeros((6, 7), dtype=bool)
+        mask[0:5, 0:5] = True
+        mask[2, 2] = False
+        mask[5, 5] = True
+        polygons = coverage.trace_polygons(mask)
+        self.assertEqual(len(polygons), 2)
+        ring, hole = sorted(polygons, key=len)[1]
+        self.assertEqual(ring.tolist(), [[0, 0], [5, 0], [5, 5], [0, 5], [0, 0]])
+        # Holes run clockwise
+        self.assertEqual(sorted(map(tuple, hole[:-1].tolist())), [(2, 2), (2, 3), (3, 2), (3, 3)])
+        self.assertLess(np.sum(hole[:-1, 0] * hole[1:, 1] - hole[1:, 0] * hole[:-1, 1]), 0)
+        self.assertEqual(sorted(polygons, key=len)[0][0].tolist(), [[5, 5], [6, 5], [6, 6], [5, 6], [5, 5]])
+        self.assertEqual(coverage.trace_polygons(np.zeros((3, 3), dtype=bool)), [])
+    
+    def test_ring_rasterization_round_trip(self):
+        """Test that traced rings rasterize back to the cells they outline"""
+        rng = np.random.default_rng(7)
+        for _ in range(50):
+            mask = rng.random((rng.integers(1, 15), rng.integers(1, 15))) < 0.5
+            rebuilt = np.zeros(mask.shape, dtype=bool)
+            for polygon in coverage.trace_polygons(mask):
+                for ring in polygon:
+                    runs = coverage.rasterize_ring(ring[:, 0].astype(float), ring[:, 1].astype(float), 1.0)
+                    rebuilt ^= coverage.runs_to_mask(runs, (0, mask.shape[0], 0, mask.shape[1]))
+            np.testing.assert_array_equal(rebuilt, mask)
+
+
+class TestCoverageEndpoint(unittest.TestCase):
+    """Integration tests for GET /api/missions/<id>/coverage"""
+    
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        # 10 rows of 10 waypoints, 40 m apart
+        self.mission_id = MissionService.create_mission_from_kml(
+            'Survey', generate_mission_kml(100, row_length=10)
+        )['mission']['id']
+    
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+    
+    def _coverage(self, **parameters):
+        return self.client.get(f'/api/missions/{self.mission_id}/coverage', query_string=parameters)
+    
+    def test_overlapping_swaths(self):
+        """Test that overlapping strips union into one polygon covering the target"""
+        response = self._coverage(swath=50, resolution=0.5, target=target_ring(20, 20, 340, 340))
+        self.assertEqual(response.status_code, 200)
+        footprint = response.get_json()['data']
+        self.assertEqual(footprint['polygon_count'], 1)
+        self.assertEqual(footprint['coverage']['type'], 'MultiPolygon')
+        self.assertEqual(len(footprint['coverage']['coordinates'][0]), 1)
+        self.assertAlmostEqual(footprint['area_m2'], 410 * 410, delta=410 * 410 * 0.02)
+        self.assertEqual(footprint['swath_m'], {'min': 50.0, 'max': 50.0})
+        self.assertEqual(footprint['leg_count'], 99)
+        self.assertEqual(footprint['target']['covered_percent'], 100.0)
+        self.assertEqual(footprint['target']['gaps']['coordinates'], [])
+    
+    def test_gaps_between_strips(self):
+        """Test that narrow strips leave one gap between each pair of rows"""
+        footprint = self._coverage(swath=20, resolution=0.5, target=target_ring(20, 20, 340, 340)).get_json()['data']
+        target = footprint['target']
+        self.assertEqual(target['gap_count'], 9)
+        self.assertEqual(len(target['gaps']['coordinates']), 9)
+        self.assertAlmostEqual(target['covered_percent'], 50, delta=5)
+        self.assertAlmostEqual(target['area_m2'], 320 * 320, delta=320 * 320 * 0.01)
+        self.assertAlmostEqual(target['gap_m2'], target['area_m2'] - target['covered_m2'], places=0)
+    
+    def test_swath_from_altitude(self):
+        """Test swath widths derived from waypoint altitudes and the field of view"""
+        footprint = self._coverage(fov=60).get_json()['data']
+        # Generated heights are 150 +- 30 m
+        self.assertGreaterEqual(footprint['swath_m']['min'], 2 * 120 * math.tan(math.radians(30)) - 0.01)
+        self.assertLessEqual(footprint['swath_m']['max'], 2 * 180 * math.tan(math.radians(30)) + 0.01)
+        self.assertEqual(footprint['fov_deg'], 60.0)
+        self.assertIsNone(footprint['target'])
+        self.assertAlmostEqual(footprint['resolution_m'], footprint['swath_m']['min'] / 20, delta=0.01)
+    
+    def test_footprint_is_cached_until_mission_changes(self):
+        """Test that the footprint is cached per revision and targets are compared per request"""
+        first = self._coverage(swath=30).get_json()['data']
+        cache = get_payload_cache()
+        self.assertIn(mission_key(self.mission_id, 'coverage'), cache.local._entries)
+        with_target = self._coverage(swath=30, target=target_ring(0, 0, 100, 100)).get_json()['data']
+        self.assertEqual(with_target['area_m2'], first['area_m2'])
+        self.assertIsNotNone(with_target['target'])
+        
+        MissionService.edit_waypoints(self.mission_id, [{'op': 'delete', 'start': 50, 'end': 100}])
+        self.assertNotIn(mission_key(self.mission_id, 'coverage'), cache.local._entries)
+        self.assertLess(self._coverage(swath=30).get_json()['data']['area_m2'], first['area_m2'])
+    
+    def test_target_much_larger_than_mission(self):
+        """Test that a huge target coarsens the default resolution and is rejected at a fine one"""
+        huge = target_ring(-80000, -80000, 80000, 80000)
+        footprint = self._coverage(swath=50, target=huge)
+        self.assertEqual(footprint.status_code, 200)
+        data = footprint.get_json()['data']
+        cells = (160000 / data['resolution_m'] + 2) ** 2
+        self.assertLessEqual(cells, self.app.config['SURVEY_MAX_CELLS'])
+        self.assertLess(data['target']['covered_percent'], 1)
+        
+        response = self._coverage(swath=50, resolution=1, target=huge)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Target too large', response.get_json()['error'])
+        self.assertEqual(self._coverage(swath=50, target=target_ring(-2e6, -2e6, 2e6, 2e6)).status_code, 400)
+    
+    def test_invalid_requests(self):
+        """Test parameter and target validation"""
+        for parameters in ({'fov': 0}, {'swath': -5}, {'resolution': 0.01}, {'target': '[[0, 0], [1, 1]]'},
+                           {'resolution': 0.1, 'swath': 5000}):
+            response = self._coverage(**parameters)
+            self.assertEqual(response.status_code, 400, parameters)
+            self.assertIn('error', response.get_json())
+        self.assertEqual(self.client.get('/api/missions/9999/coverage').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
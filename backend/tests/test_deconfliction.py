@@ -0,0 +1,160 @@
+import unittest
+import os
+import sys
+import numpy as np
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.database import db
+from app.services.mission_service import MissionService
+from app.utils import deconfliction
+from app.utils.deconfliction import find_conflicts
+from app.utils.geo import EARTH_RADIUS_M
+from app.utils.trajectory import build_timeline
+from benchmarks.kml_generator import generate_mission_kml
+
+KILOMETRE = 1000 / (np.radians(1.0) * EARTH_RADIUS_M)  # in degrees of latitude
+
+def crossing(altitude_a=100.0, altitude_b=110.0, start_b=0.0):
+    """Two 2 km legs at 10 m/s crossing at the origin after 100 s"""
+    north = build_timeline([-KILOMETRE, KILOMETRE], [0.0, 0.0], [altitude_a] * 2, [10.0, 10.0])
+    east = build_timeline([0.0, 0.0], [-KILOMETRE, KILOMETRE], [altitude_b] * 2, [10.0, 10.0])
+    return [{'start': 0.0, 'timeline': north}, {'start': start_b, 'timeline': east}]
+
+
+class TestConflictDetection(unittest.TestCase):
+    """Unit tests for the spatio-temporal hash grid and the exact check"""
+    
+    def test_crossing_window(self):
+        """Test the conflict window of two perpendicular legs"""
+        result = find_conflicts(crossing(), 50, 30, 1.0)
+        self.assertEqual(len(result['conflicts']), 1)
+        conflict = result['conflicts'][0]
+        # Separation is 10 * sqrt(2) * |t - 100| metres
+        half_width = 50 / (10 * np.sqrt(2))
+        self.assertEqual(conflict['flights'], [0, 1])
+        self.assertAlmostEqual(conflict['start'], 100 - half_width, places=6)
+        self.assertAlmostEqual(conflict['end'], 100 + half_width, places=6)
+        self.assertAlmostEqual(conflict['closest']['time'], 100.0, places=6)
+        self.assertAlmostEqual(conflict['closest']['horizontal_m'], 0.0, places=6)
+        self.assertAlmostEqual(conflict['closest']['vertical_m'], 10.0, places=6)
+    
+    def test_separated_flights(self):
+        """Test that vertical or time separation clears the crossing, unknown altitude does not"""
+        self.assertEqual(find_conflicts(crossing(altitude_b=140.0), 50, 30, 1.0)['conflicts'], [])
+        self.assertEqual(find_conflicts(crossing(start_b=10.0), 50, 30, 1.0)['conflicts'], [])
+        unknown = find_conflicts(crossing(altitude_b=np.nan), 50, 30, 1.0)['conflicts']
+        self.assertEqual(len(unknown), 1)
+        self.assertIsNone(unknown[0]['closest']['vertical_m'])
+    
+    def test_grid_matches_pairwise_check(self):
+        """Test that hashing finds the same conflicts as checking every pair of segments"""
+        rng = np.random.default_rng(4)
+        for _ in range(100):
+            flights = []
+            for _ in range(rng.integers(2, 6)):
+                count = rng.integers(2, 8)
+                flights.append({'start': float(rng.integers(0, 60)), 'timeline': build_timeline(
+                    -36.9 + rng.random(count) * 0.004, 174.7 + rng.random(count) * 0.004,
+                    100 + rng.random(count) * 60, rng.uniform(5, 15, count)
+                )})
+            horizontal, vertical, step = float(rng.choice([20, 50])), float(rng.choice([10, 30])), float(rng.choice([0.5, 2]))
+            reference = float(np.mean(np.concatenate([flight['timeline']['latitude'] for flight in flights])))
+            segments = deconfliction._segments(flights, min(flight['start'] for flight in flights), step, reference)
+            first, second = np.triu_indices(segments['flight'].size, 1)
+            same_bucket = ((segments['flight'][first] != segments['flight'][second])
+                           & (segments['bucket'][first] == segments['bucket'][second]))
+            everything = deconfliction._check_pairs(
+                segments, np.stack((first[same_bucket], second[same_bucket]), axis=1), horizontal, vertical
+            )
+            hashed = deconfliction._check_pairs(
+                segments, deconfliction._candidate_pairs(segments, horizontal, vertical), horizontal, vertical
+            )
+            self.assertEqual(set(zip(everything['first'].tolist(), everything['second'].tolist())),
+                             set(zip(hashed['first'].tolist(), hashed['second'].tolist())))
+
+
+    def test_small_minimums_keep_the_grid_bounded(self):
+        """Test that cells grow with the distance flown per step, not shrink with the minimums"""
+        diagonal = build_timeline([0.0, 3 * KILOMETRE], [0.0, 3 * KILOMETRE], [100.0, 100.0], [25.0, 25.0])
+        flights = [{'start': 0.0, 'timeline': diagonal}, {'start': 30.0, 'timeline': diagonal}]
+        for horizontal in (5.0, 1.0, 0.01):
+            result = find_conflicts(flights, horizontal, 1.0, 60.0, max_cells=27 * 8)
+            self.assertEqual(len(result['conflicts']), 0)
+        with self.assertRaises(deconfliction.GridTooLargeError):
+            find_conflicts(flights, 1.0, 1.0, 60.0, max_cells=5)
+
+
+class TestDeconflictionEndpoint(unittest.TestCase):
+    """Integration tests for POST /api/deconfliction"""
+    
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.first = MissionService.create_mission_from_kml('North', generate_mission_kml(40))['mission']['id']
+        self.second = MissionService.create_mission_from_kml(
+            'Far', generate_mission_kml(40, origin=(-36.8, 174.758269440249))
+        )['mission']['id']
+    
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+    
+    def _check(self, flights, **parameters):
+        return self.client.post('/api/deconfliction', json={'flights': flights, **parameters})
+    
+    def test_same_mission_twice(self):
+        """Test that two flights of one mission at once conflict for the whole flight"""
+        response = self._check([
+            {'mission_id': self.first, 'start_time': '2024-05-01T09:00:00Z'},
+            {'mission_id': self.first, 'start_time': '2024-05-01T09:00:00+00:00'},
+            {'mission_id': self.second, 'start_time': '2024-05-01T09:00:00'}
+        ])
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual(body['meta']['conflict_count'], 1)
+        flights, conflict = body['data']['flights'], body['data']['conflicts'][0]
+        self.assertEqual(conflict['flights'], [0, 1])
+        self.assertEqual(conflict['mission_ids'], [self.first, self.first])
+        self.assertEqual(conflict['start_time'], '2024-05-01T09:00:00.000Z')
+        self.assertEqual(conflict['end_time'], flights[0]['end_time'])
+        self.assertEqual(conflict['closest']['horizontal_m'], 0.0)
+    
+    def test_staggered_start(self):
+        """Test that starting after the first flight lands is conflict-free"""
+        response = self._check([
+            {'mission_id': self.first, 'start_time': '2024-05-01T09:00:00Z'},
+            {'mission_id': self.first, 'start_time': '2024-05-01T11:00:00Z'}
+        ], horizontal_m=100, step_s=5)
+        self.assertEqual(response.get_json()['data']['conflicts'], [])
+        self.assertEqual(response.get_json()['data']['horizontal_m'], 100.0)
+    
+    def test_invalid_requests(self):
+        """Test schedule and parameter validation"""
+        valid = [{'mission_id': self.first, 'start_time': '2024-05-01T09:00:00Z'}] * 2
+        for flights, parameters in (
+            (valid[:1], {}), ('x', {}), ([{'mission_id': 'a', 'start_time': '2024-05-01T09:00:00Z'}] * 2, {}),
+            ([{'mission_id': self.first, 'start_time': 'tomorrow'}] * 2, {}),
+            (valid, {'step_s': 0}), (valid, {'horizontal_m': -1}), (valid, {'vertical_m': 'high'})
+        ):
+            response = self._check(flights, **parameters)
+            self.assertEqual(response.status_code, 400, (flights, parameters))
+            self.assertIn('error', response.get_json())
+        self.assertEqual(self._check([valid[0], {'mission_id': 9999, 'start_time': '2024-05-01T09:00:00Z'}]).status_code, 404)
+
+    def test_cell_budget(self):
+        """Test that a check over DECONFLICTION_MAX_CELLS is rejected before the grid is built"""
+        flights = [{'mission_id': self.first, 'start_time': '2024-05-01T09:00:00Z'}] * 2
+        self.app.config['DECONFLICTION_MAX_CELLS'] = 100
+        response = self._check(flights, step_s=0.1)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('limit of 100', response.get_json()['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
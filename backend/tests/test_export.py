@@ -0,0 +1,100 @@
+import unittest
+import os
+import sys
+import io
+import tempfile
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.database import db
+from app.metrics import metrics
+from app.services.mission_service import MissionService
+from app.services.export_service import ExportService, EXPORTED_ROWS
+from benchmarks.kml_generator import generate_mission_kml
+
+
+class TestBulkExport(unittest.TestCase):
+    """Tests for the columnar bulk export endpoint and CLI"""
+    
+    def setUp(self):
+        metrics.reset()
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.first = MissionService.create_mission_from_kml('Alpha', generate_mission_kml(120))['mission']['id']
+        self.second = MissionService.create_mission_from_kml('Bravo', generate_mission_kml(80, seed=1))['mission']['id']
+        MissionService.create_annotation(self.first, -36.9, 174.7, 'Tower')
+    
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+    
+    def _waypoints(self, mission_id):
+        waypoints = MissionService.get_mission_by_id(mission_id)['waypoints']
+        return sorted(waypoints, key=lambda waypoint: waypoint['index'])
+    
+    def test_parquet_export_writes_one_row_group_per_batch(self):
+        """Test that waypoints stream in mission and index order, one row group per batch"""
+        response = self.client.get('/api/export/waypoints?format=parquet&batch_size=50')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/vnd.apache.parquet')
+        self.assertIn('waypoints.parquet', response.headers['Content-Disposition'])
+        
+        parquet = pq.ParquetFile(io.BytesIO(response.data))
+        self.assertEqual(parquet.metadata.num_rows, 200)
+        self.assertEqual(parquet.metadata.num_row_groups, 4)
+        table = parquet.read()
+        expected = self._waypoints(self.first) + self._waypoints(self.second)
+        self.assertEqual(table.column('id').to_pylist(), [waypoint['id'] for waypoint in expected])
+        self.assertEqual(table.column('latitude').to_pylist(), [waypoint['latitude'] for waypoint in expected])
+        self.assertEqual(EXPORTED_ROWS.value(('waypoints',)), 200)
+    
+    def test_arrow_stream_filtered_by_mission(self):
+        """Test the Arrow IPC stream format and the mission filter"""
+        response = self.client.get(f'/api/export/waypoints?format=arrow&mission_ids={self.second}')
+        self.assertEqual(response.mimetype, 'application/vnd.apache.arrow.stream')
+        table = pa.ipc.open_stream(response.data).read_all()
+        
+        self.assertEqual(table.num_rows, 80)
+        self.assertEqual(set(table.column('mission_id').to_pylist()), {self.second})
+        self.assertEqual(table.column('index').to_pylist(), list(range(80)))
+        
+        annotations = pa.ipc.open_stream(self.client.get('/api/export/annotations?format=arrow').data).read_all()
+        self.assertEqual(annotations.column('note').to_pylist(), ['Tower'])
+    
+    def test_invalid_requests(self):
+        """Test that bad parameters fail with JSON errors before streaming"""
+        for query in ('/api/export/users', '/api/export/waypoints?format=csv',
+                      '/api/export/waypoints?batch_size=0', '/api/export/waypoints?mission_ids=1,x'):
+            response = self.client.get(query)
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('error', response.get_json())
+    
+    def test_cli_exports_every_table(self):
+        """Test that the export command writes one file per table"""
+        with tempfile.TemporaryDirectory() as directory:
+            result = self.app.test_cli_runner().invoke(args=['export', directory, '--mission-id', str(self.first)])
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertEqual(
+                sorted(os.listdir(directory)),
+                ['annotations.parquet', 'missions.parquet', 'no_fly_zones.parquet', 'waypoints.parquet']
+            )
+            missions = pq.read_table(os.path.join(directory, 'missions.parquet'))
+            self.assertEqual(missions.column('name').to_pylist(), ['Alpha'])
+            self.assertEqual(pq.read_metadata(os.path.join(directory, 'waypoints.parquet')).num_rows, 120)
+            self.assertEqual(pq.read_metadata(os.path.join(directory, 'no_fly_zones.parquet')).num_rows, 0)
+    
+    def test_batches_are_bounded(self):
+        """Test that iter_batches never materializes more than batch_size rows"""
+        sizes = [batch.num_rows for batch in ExportService.iter_batches('waypoints', batch_size=64)]
+        self.assertEqual(sizes, [64, 64, 64, 8])
+
+
+if __name__ == '__main__':
+    unittest.main()
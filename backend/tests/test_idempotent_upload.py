@@ -0,0 +1,101 @@
+import unittest
+import os
+import sys
+import io
+from unittest.mock import patch
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.database import db
+from app.models.mission import Mission
+from app.services.mission_service import MissionService
+from app.utils.kml_parser import parse_kml_file
+from benchmarks.kml_generator import generate_mission_kml
+
+
+class TestIdempotentUpload(unittest.TestCase):
+    """Integration tests for retried uploads on POST /api/missions"""
+    
+    def setUp(self):
+        self.app = create_app('testing', {'PARSE_MAX_CONCURRENCY': 1, 'PARSE_QUEUE_SIZE': 0})
+        self.client = self.app.test_client()
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.kml = generate_mission_kml(20)
+    
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+    
+    def _upload(self, kml=None, name='Field upload', key=None):
+        return self.client.post(
+            '/api/missions/',
+            content_type='multipart/form-data',
+            headers={'Idempotency-Key': key} if key is not None else {},
+            data={'name': name, 'file': (io.BytesIO((kml or self.kml).encode('utf-8')), 'mission.kml')}
+        )
+    
+    def test_retry_returns_existing_mission_without_parsing(self):
+        """Test that resending an upload returns the first mission and parses nothing"""
+        first = self._upload()
+        with patch('app.services.mission_service.parse_kml_file', wraps=parse_kml_file) as parse:
+            retry = self._upload()
+        
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry.get_json()['data']['mission'], first.get_json()['data']['mission'])
+        self.assertEqual(retry.get_json()['data']['waypoint_count'], 20)
+        self.assertTrue(retry.get_json()['data']['replayed'])
+        parse.assert_not_called()
+        self.assertEqual(Mission.query.count(), 1)
+    
+    def test_retry_skips_the_parse_gate(self):
+        """Test that a retry is answered while every parse slot is busy"""
+        self._upload()
+        with self.app.extensions['parse_gate'].admit():
+            retry = self._upload()
+            fresh = self._upload(generate_mission_kml(20, seed=1))
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(fresh.status_code, 503)
+    
+    def test_new_name_or_content_is_a_new_mission(self):
+        """Test that only identical name and KML are treated as a retry"""
+        self._upload()
+        self.assertEqual(self._upload(name='Second survey').status_code, 201)
+        self.assertEqual(self._upload(generate_mission_kml(20, seed=1)).status_code, 201)
+        self.assertEqual(Mission.query.count(), 3)
+    
+    def test_idempotency_key(self):
+        """Test that an Idempotency-Key scopes retries, and cannot be reused for different KML"""
+        first = self._upload(key='tablet-7/upload-1')
+        renamed_retry = self._upload(name='Renamed', key='tablet-7/upload-1')
+        second = self._upload(key='tablet-7/upload-2')
+        reused = self._upload(generate_mission_kml(20, seed=1), key='tablet-7/upload-1')
+        
+        self.assertEqual(renamed_retry.status_code, 200)
+        self.assertEqual(renamed_retry.get_json()['data']['mission']['id'], first.get_json()['data']['mission']['id'])
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(reused.status_code, 409)
+        self.assertEqual(self._upload(key='x' * 256).status_code, 400)
+        self.assertEqual(Mission.query.count(), 2)
+    
+    def test_concurrent_duplicate_loses_on_unique_index(self):
+        """Test that an upload racing past the lookup gets the winner's mission back"""
+        keys = MissionService.upload_keys('Race', self.kml)
+        winner = MissionService.create_mission_from_kml('Race', self.kml, keys)
+        loser = MissionService.create_mission_from_kml('Race', self.kml, keys)
+        
+        self.assertNotIn('replayed', winner)
+        self.assertTrue(loser['replayed'])
+        self.assertEqual(loser['mission']['id'], winner['mission']['id'])
+        self.assertEqual(Mission.query.count(), 1)
+        # Without upload keys the service still creates every mission it is given
+        MissionService.create_mission_from_kml('Race', self.kml)
+        self.assertEqual(Mission.query.count(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
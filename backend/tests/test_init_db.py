@@ -0,0 +1,100 @@
+import unittest
+import os
+import sqlite3
+import sys
+import tempfile
+from sqlalchemy.exc import IntegrityError
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.database import db
+from app.models.mission import Mission
+from app.services.mission_service import MissionService
+from benchmarks.kml_generator import generate_mission_kml
+from init_db import upgrade_schema
+
+# Tables as created by the first release, before any columns were added
+BASELINE_SCHEMA = """
+CREATE TABLE mission (id INTEGER NOT NULL, name VARCHAR(100) NOT NULL, kml_data TEXT NOT NULL, PRIMARY KEY (id));
+CREATE TABLE waypoint (
+    id INTEGER NOT NULL, mission_id INTEGER NOT NULL, latitude FLOAT NOT NULL, longitude FLOAT NOT NULL,
+    altitude FLOAT, "index" INTEGER NOT NULL, PRIMARY KEY (id), FOREIGN KEY(mission_id) REFERENCES mission (id)
+);
+CREATE TABLE annotation (
+    id INTEGER NOT NULL, mission_id INTEGER NOT NULL, latitude FLOAT NOT NULL, longitude FLOAT NOT NULL,
+    note VARCHAR(255), PRIMARY KEY (id), FOREIGN KEY(mission_id) REFERENCES mission (id)
+);
+CREATE TABLE no_fly_zone (
+    id INTEGER NOT NULL, mission_id INTEGER NOT NULL, coordinates TEXT NOT NULL, note VARCHAR(255),
+    PRIMARY KEY (id), FOREIGN KEY(mission_id) REFERENCES mission (id)
+);
+INSERT INTO mission (id, name, kml_data) VALUES (1, 'Legacy', '<kml/>');
+INSERT INTO waypoint (mission_id, latitude, longitude, altitude, "index") VALUES (1, -36.8, 174.7, 50.0, 0);
+"""
+
+
+class TestUpgradeSchema(unittest.TestCase):
+    """Integration tests for upgrading a database created by the first release"""
+    
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, 'missions.db')
+        connection = sqlite3.connect(path)
+        connection.executescript(BASELINE_SCHEMA)
+        connection.close()
+        self.app = create_app('testing', {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}'})
+        self.context = self.app.app_context()
+        self.context.push()
+    
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.context.pop()
+        self.directory.cleanup()
+    
+    def _columns(self, table):
+        with db.engine.connect() as connection:
+            return {row[1] for row in connection.exec_driver_sql(f'PRAGMA table_info("{table}")')}
+    
+    def test_adds_missing_columns_and_indexes_once(self):
+        """Test that the upgrade adds every new column, then finds nothing to do"""
+        db.create_all()
+        
+        added = upgrade_schema()
+        
+        self.assertEqual(sorted(added), sorted([
+            'mission.kml_stale', 'mission.revision', 'mission.content_sha256', 'mission.upload_key',
+            'no_fly_zone.vertex_count', 'no_fly_zone.area_m2', 'no_fly_zone.min_latitude',
+            'no_fly_zone.min_longitude', 'no_fly_zone.max_latitude', 'no_fly_zone.max_longitude',
+            'waypoint.source_index'
+        ]))
+        self.assertTrue({'kml_stale', 'revision', 'content_sha256', 'upload_key'} <= self._columns('mission'))
+        self.assertEqual(upgrade_schema(), [])
+        with db.engine.connect() as connection:
+            indexes = {row[1]: row[2] for row in connection.exec_driver_sql('PRAGMA index_list("mission")')}
+        self.assertEqual(indexes.get('ix_mission_upload_key'), 1)
+    
+    def test_upgraded_database_serves_old_and_new_missions(self):
+        """Test reads of a pre-upgrade mission and idempotent uploads after the upgrade"""
+        db.create_all()
+        upgrade_schema()
+        
+        legacy = MissionService.get_mission_by_id(1)
+        revision = MissionService.get_mission_revision(1)
+        keys = MissionService.upload_keys('Survey', generate_mission_kml(5), None)
+        first = MissionService.create_mission_from_kml('Survey', generate_mission_kml(5), keys)
+        
+        self.assertEqual(legacy['waypoint_count'], 1)
+        self.assertFalse(legacy['kml_stale'])
+        self.assertEqual(len(revision), 32)
+        self.assertEqual(MissionService.find_upload(keys)['mission']['id'], first['mission']['id'])
+        db.session.add(Mission(name='Copy', kml_data='<kml/>', upload_key=keys['upload_key']))
+        with self.assertRaises(IntegrityError):
+            db.session.commit()
+        db.session.rollback()
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,43 @@
+import unittest
+import os
+import sys
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.kml_generator import generate_mission_kml, generate_missions
+from app.utils.kml_parser import parse_kml_file
+
+
+class TestKMLGenerator(unittest.TestCase):
+    """Tests for the synthetic benchmark KML generator"""
+    
+    def test_generated_kml_parses(self):
+        """Test that generated missions parse into the requested waypoint count"""
+        result = parse_kml_file(generate_mission_kml(250, action_density=1.5))
+        
+        self.assertEqual(result['waypoint_count'], 250)
+        self.assertEqual([waypoint['index'] for waypoint in result['waypoints']], list(range(250)))
+        self.assertTrue(all(waypoint['altitude'] is not None for waypoint in result['waypoints']))
+    
+    def test_generation_is_deterministic(self):
+        """Test that the same arguments produce identical documents"""
+        self.assertEqual(generate_mission_kml(100, seed=7), generate_mission_kml(100, seed=7))
+        self.assertNotEqual(generate_mission_kml(100, seed=7), generate_mission_kml(100, seed=8))
+    
+    def test_action_density(self):
+        """Test that action density controls the number of actions"""
+        self.assertNotIn('<wpml:action>', generate_mission_kml(20, action_density=0))
+        self.assertEqual(generate_mission_kml(20, action_density=3).count('<wpml:action>'), 60)
+    
+    def test_generate_missions(self):
+        """Test fleet generation yields distinct named missions"""
+        missions = list(generate_missions(3, 10))
+        
+        self.assertEqual(len(missions), 3)
+        self.assertEqual(len({name for name, _ in missions}), 3)
+        self.assertEqual(len({kml for _, kml in missions}), 3)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -128,6 +128,24 @@ class TestKMLParser(unittest.TestCase):
         self.assertEqual(result['waypoint_count'], 0)
         self.assertEqual(len(result['waypoints']), 0)
 
+    def test_non_finite_values_skip_the_placemark(self):
+        """Test that placemarks with NaN or infinite coordinates or heights are skipped"""
+        placemark = '''
+            <Placemark>
+              <Point><coordinates>{coordinates}</coordinates></Point>
+              <wpml:index>{index}</wpml:index>
+              <wpml:executeHeight>{height}</wpml:executeHeight>
+            </Placemark>'''
+        placemarks = [('174.7,-36.8', 0, '50'), ('nan,-36.8', 1, '50'), ('174.7,-36.8', 2, 'inf'),
+                      ('174.7,-36.8', 3, '-Infinity'), ('174.8,-36.9', 4, '60')]
+        kml = ('<kml xmlns="http://www.opengis.net/kml/2.2" xmlns:wpml="http://www.dji.com/wpmz/1.0.6">'
+               '<Document>' + ''.join(placemark.format(coordinates=coordinates, index=index, height=height)
+                                      for coordinates, index, height in placemarks) + '</Document></kml>')
+        
+        result = parse_kml_file(kml)
+        
+        self.assertEqual([waypoint['index'] for waypoint in result['waypoints']], [0, 4])
+
 
 if __name__ == '__main__':
     # Create tests directory if it doesn't exist
@@ -0,0 +1,53 @@
+import unittest
+import os
+import sys
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.database import db
+from benchmarks.load_test import InProcessClient, Workload, parse_mix, percentile, run_load, _seed_via_client
+
+
+class TestLoadTest(unittest.TestCase):
+    """Tests for the load-testing harness"""
+    
+    def test_parse_mix(self):
+        """Test workload mix parsing"""
+        self.assertEqual(parse_mix('list=1,detail=3'), {'list': 1.0, 'detail': 3.0})
+        with self.assertRaises(ValueError):
+            parse_mix('list=1,explode=2')
+    
+    def test_percentile_nearest_rank(self):
+        """Test nearest-rank percentiles"""
+        values = list(range(1, 101))
+        
+        self.assertEqual(percentile(values, 0.50), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile(values, 1.0), 100)
+        self.assertIsNone(percentile([], 0.5))
+    
+    def test_in_process_run_reports_each_endpoint(self):
+        """Test a short in-process run against a seeded database"""
+        app = create_app('testing')
+        with app.app_context():
+            db.create_all()
+        client = InProcessClient(app)
+        workload = Workload(_seed_via_client(client, 2, 20), upload_waypoints=20, annotation_burst=2, seed=0)
+        
+        # A single worker keeps the shared in-memory connection single-threaded
+        report = run_load(client, workload, parse_mix('list=1,detail=1,annotate=1,upload=1'),
+                          concurrency=1, total_operations=40)
+        
+        self.assertEqual(report['errors'], 0)
+        self.assertEqual(set(report['endpoints']), {
+            'GET /api/missions/', 'GET /api/missions/<id>',
+            'POST /api/missions/<id>/annotations', 'POST /api/missions/'
+        })
+        for stats in report['endpoints'].values():
+            self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,99 @@
+import unittest
+import os
+import sys
+import json
+import logging
+import tempfile
+from unittest.mock import MagicMock
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask
+from app import logging_config
+from app.logging_config import JSONFormatter, setup_logging, log_access
+
+
+class TestJSONFormatter(unittest.TestCase):
+    """Unit tests for structured log records"""
+    
+    def test_format_includes_extra_fields(self):
+        """Test that extra fields are emitted as JSON keys"""
+        record = logging.LogRecord('app.access', logging.INFO, __file__, 1, '%s %s', ('GET', '/health'), None)
+        record.request_id = 'abc12345'
+        record.status = 200
+        
+        entry = json.loads(JSONFormatter().format(record))
+        
+        self.assertEqual(entry['message'], 'GET /health')
+        self.assertEqual(entry['level'], 'INFO')
+        self.assertEqual(entry['logger'], 'app.access')
+        self.assertEqual(entry['request_id'], 'abc12345')
+        self.assertEqual(entry['status'], 200)
+        self.assertNotIn('args', entry)
+
+
+class TestLoggingPipeline(unittest.TestCase):
+    """Tests for queue-based logging and access log sampling"""
+    
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.devnull = open(os.devnull, 'w')
+    
+    def tearDown(self):
+        logging_config._stop_queue_listener()
+        logging_config._access_sample_rate = 1.0
+        logging.shutdown()
+        self.devnull.close()
+        self.workdir.cleanup()
+    
+    def _setup(self, **overrides):
+        app = Flask('app', instance_path=os.path.join(self.workdir.name, 'instance'))
+        app.config.update(overrides)
+        original_stdout = sys.stdout
+        sys.stdout = self.devnull
+        try:
+            setup_logging(app)
+        finally:
+            sys.stdout = original_stdout
+        return app
+    
+    def _read_log(self):
+        with open(os.path.join(self.workdir.name, 'logs', 'app.log')) as log_file:
+            return log_file.read().splitlines()
+    
+    def _fake_exchange(self, status):
+        request = MagicMock(method='GET', path='/api/missions/', remote_addr='127.0.0.1', request_id='req00001')
+        response = MagicMock(status_code=status)
+        return request, response
+    
+    def test_queue_mode_writes_json_records_in_background(self):
+        """Test that queued records reach the file as JSON once the listener drains"""
+        self._setup(LOG_QUEUE_ENABLED=True, LOG_FORMAT='json')
+        
+        self.assertIsInstance(logging.getLogger('app').handlers[0], logging_config.NonBlockingQueueHandler)
+        log_access(*self._fake_exchange(200), 0.0123)
+        logging_config._stop_queue_listener()
+        
+        entries = [json.loads(line) for line in self._read_log()]
+        access = [entry for entry in entries if entry['logger'] == 'app.access']
+        self.assertEqual(len(access), 1)
+        self.assertEqual(access[0]['status'], 200)
+        self.assertEqual(access[0]['duration_ms'], 12.3)
+        self.assertEqual(access[0]['request_id'], 'req00001')
+    
+    def test_sampling_keeps_server_errors(self):
+        """Test that sampling drops successful requests but never 5xx responses"""
+        self._setup(LOG_QUEUE_ENABLED=False, ACCESS_LOG_SAMPLE_RATE=0.0)
+        
+        for _ in range(10):
+            log_access(*self._fake_exchange(200), 0.001)
+        log_access(*self._fake_exchange(500), 0.001)
+        
+        access_lines = [line for line in self._read_log() if 'GET /api/missions/' in line]
+        self.assertEqual(len(access_lines), 1)
+        self.assertIn(' 500 ', access_lines[0])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
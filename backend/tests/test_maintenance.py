@@ -0,0 +1,150 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import select, func, insert
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.database import db
+from app.models.mission import Waypoint, Annotation
+from app.models.version import MissionVersion, WaypointBlock, KmlBlob
+from app.maintenance import get_maintenance_scheduler, parse_windows, in_window
+from app.services.mission_service import MissionService
+from app.services.version_service import VersionService
+from benchmarks.kml_generator import generate_mission_kml
+
+
+class TestMaintenanceWindows(unittest.TestCase):
+    """Unit tests for quiet-window parsing"""
+    
+    def test_windows(self):
+        """Test plain and midnight-crossing windows"""
+        windows = parse_windows('02:00-05:00, 23:30-00:30')
+        self.assertEqual(windows, [(120, 300), (1410, 30)])
+        for hour, minute, expected in ((3, 0, True), (5, 0, False), (23, 45, True), (0, 15, True), (12, 0, False)):
+            self.assertEqual(in_window(windows, datetime(2024, 1, 1, hour, minute)), expected, (hour, minute))
+        self.assertTrue(in_window(parse_windows(''), datetime(2024, 1, 1, 12, 0)))
+        for value in ('2-5', '25:00-01:00', '02:00'):
+            with self.assertRaises(ValueError):
+                parse_windows(value)
+
+
+class TestMaintenanceTasks(unittest.TestCase):
+    """Integration tests for the maintenance tasks on a database file"""
+    
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.app = create_app('testing', test_config={
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(self.directory.name, 'missions.db')}",
+            'MAINTENANCE_IDLE_SECONDS': 0,
+            'MAINTENANCE_BATCH_SIZE': 100,
+            'MAINTENANCE_VACUUM_PAGES': 16
+        })
+        self.client = self.app.test_client()
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.scheduler = get_maintenance_scheduler(self.app)
+    
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.context.pop()
+        self.directory.cleanup()
+    
+    def _count(self, model):
+        return db.session.scalar(select(func.count()).select_from(model))
+    
+    def test_purges_orphans_and_unreferenced_blocks(self):
+        """Test that orphans go while blocks shared with a surviving mission stay"""
+        kml = generate_mission_kml(300)
+        kept = MissionService.create_mission_from_kml('Kept', kml)['mission']['id']
+        doomed = MissionService.create_mission_from_kml('Doomed', generate_mission_kml(300, seed=5))['mission']['id']
+        VersionService.create_version(kept, 'v1')
+        VersionService.create_version(doomed, 'v1')
+        MissionService.delete_mission(doomed)
+        # Rows left behind by deletes that predate set-based deletion
+        db.session.execute(insert(Waypoint), [
+            {'mission_id': 9999, 'latitude': 0.0, 'longitude': 0.0, 'index': index} for index in range(250)
+        ])
+        db.session.execute(insert(Annotation), [{'mission_id': 9999, 'latitude': 0.0, 'longitude': 0.0}])
+        db.session.commit()
+        blocks_before = self._count(WaypointBlock)
+        
+        report = self.scheduler.run(['purge_orphans'], yield_to_requests=False)
+        
+        rows = report['tasks']['purge_orphans']['rows']
+        self.assertEqual(rows['waypoint'], 250)
+        self.assertEqual(rows['annotation'], 1)
+        self.assertEqual(rows['kml_blob'], 1)
+        self.assertGreater(rows['waypoint_block'], 0)
+        self.assertEqual(self._count(WaypointBlock), blocks_before - rows['waypoint_block'])
+        self.assertEqual(self._count(KmlBlob), 1)
+        self.assertEqual(self._count(Waypoint), 300)
+        version = db.session.get(MissionVersion, VersionService.list_versions(kept)[0]['id'])
+        self.assertEqual(len(VersionService._load_points(version.block_id_list())), 300)
+    
+    def test_vacuum_analyze_and_checkpoint(self):
+        """Test that a full run reclaims freed pages and reports every task"""
+        with db.engine.connect() as connection:
+            self.assertEqual(connection.exec_driver_sql('PRAGMA auto_vacuum').scalar(), 2)
+            connection.exec_driver_sql('PRAGMA journal_mode=WAL')
+        mission_ids = [
+            MissionService.create_mission_from_kml(f'Mission {n}', generate_mission_kml(500, seed=n))['mission']['id']
+            for n in range(4)
+        ]
+        MissionService.delete_missions(mission_ids[1:])
+        
+        result = self.app.test_cli_runner().invoke(args=['maintenance'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        report = self.scheduler.last_report
+        
+        self.assertFalse(report['interrupted'])
+        self.assertEqual(list(report['tasks']), ['purge_orphans', 'analyze', 'vacuum', 'checkpoint'])
+        self.assertGreater(report['tasks']['vacuum']['bytes_reclaimed'], 0)
+        self.assertEqual(report['bytes_reclaimed'], report['tasks']['vacuum']['bytes_reclaimed'])
+        self.assertIn('checkpointed_frames', report['tasks']['checkpoint'])
+        self.assertIn(f"Reclaimed {report['bytes_reclaimed']} bytes", result.output)
+        with db.engine.connect() as connection:
+            self.assertEqual(connection.exec_driver_sql('PRAGMA freelist_count').scalar(), 0)
+            self.assertGreater(connection.exec_driver_sql('SELECT count(*) FROM sqlite_stat1').scalar(), 0)
+    
+    def test_yields_to_requests(self):
+        """Test that a run waits for in-flight requests and stops when its window closes"""
+        self.scheduler.activity.begin()
+        threading.Timer(0.3, self.scheduler.activity.end).start()
+        start = time.monotonic()
+        report = self.scheduler.run(['analyze'])
+        self.assertGreaterEqual(time.monotonic() - start, 0.3)
+        self.assertFalse(report['interrupted'])
+        
+        self.scheduler.activity.begin()
+        self.scheduler.windows = parse_windows('00:00-00:00')
+        try:
+            report = self.scheduler.run(['analyze', 'vacuum'])
+        finally:
+            self.scheduler.activity.end()
+        self.assertTrue(report['interrupted'])
+        self.assertEqual(report['tasks'], {})
+
+    def test_activity_follows_request_instrumentation(self):
+        """Test that requests reach the scheduler through the middleware hooks, not hooks of its own"""
+        hooks = [hook.__name__ for hook in self.app.before_request_funcs[None] + self.app.teardown_request_funcs[None]]
+        self.scheduler.idle_seconds = 60
+        self.assertTrue(self.scheduler._may_start())
+        
+        self.client.get('/health')
+        
+        self.assertFalse(self.scheduler._may_start())
+        self.assertNotIn('track_request_start', hooks)
+        self.assertEqual(hooks.count('start_request'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
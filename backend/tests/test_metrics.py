@@ -0,0 +1,106 @@
+import unittest
+import os
+import sys
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.database import db
+from app.metrics import MetricsRegistry, metrics
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Unit tests for the metrics registry"""
+    
+    def setUp(self):
+        self.registry = MetricsRegistry()
+    
+    def test_counter_render(self):
+        """Test counter exposition with labels"""
+        counter = self.registry.counter('jobs_total', 'Jobs run', ('kind',))
+        counter.inc(('parse',))
+        counter.inc(('parse',), amount=2)
+        
+        output = self.registry.render()
+        
+        self.assertIn('# TYPE jobs_total counter', output)
+        self.assertIn('jobs_total{kind="parse"} 3', output)
+    
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram bucket, sum and count lines"""
+        histogram = self.registry.histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5.0)
+        
+        output = self.registry.render()
+        
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1', output)
+        self.assertIn('latency_seconds_bucket{le="1"} 2', output)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 3', output)
+        self.assertIn('latency_seconds_count 3', output)
+    
+    def test_histogram_quantile_estimate(self):
+        """Test quantile estimation from buckets"""
+        histogram = self.registry.histogram('q_seconds', 'Latency', buckets=(0.01, 0.1, 1.0))
+        for _ in range(99):
+            histogram.observe(0.005)
+        histogram.observe(0.5)
+        
+        self.assertLessEqual(histogram.quantile(0.5), 0.01)
+        self.assertGreater(histogram.quantile(0.999), 0.1)
+        self.assertIsNone(self.registry.histogram('empty_seconds', 'Empty').quantile(0.5))
+    
+    def test_register_same_name_returns_same_metric(self):
+        """Test that re-registering a metric returns the existing instance"""
+        first = self.registry.gauge('in_flight', 'In flight')
+        second = self.registry.gauge('in_flight', 'In flight')
+        
+        self.assertIs(first, second)
+        with self.assertRaises(ValueError):
+            self.registry.counter('in_flight', 'In flight')
+
+
+class TestRequestInstrumentation(unittest.TestCase):
+    """Tests for the request instrumentation middleware"""
+    
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            db.create_all()
+        metrics.reset()
+    
+    def test_response_headers(self):
+        """Test request ID and processing time headers"""
+        response = self.client.get('/health')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.headers['X-Request-ID']), 8)
+        self.assertTrue(response.headers['X-Processing-Time'].endswith('s'))
+        self.assertEqual(response.get_json()['request_id'], response.headers['X-Request-ID'])
+    
+    def test_incoming_request_id_is_propagated(self):
+        """Test that a caller-supplied request ID is reused"""
+        response = self.client.get('/health', headers={'X-Request-ID': 'trace-42'})
+        
+        self.assertEqual(response.headers['X-Request-ID'], 'trace-42')
+    
+    def test_metrics_endpoint_reports_requests_by_rule(self):
+        """Test that /metrics exposes per-endpoint counts and latency"""
+        self.client.get('/api/missions/1')
+        self.client.get('/api/missions/2')
+        
+        response = self.client.get('/metrics')
+        body = response.get_data(as_text=True)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        self.assertIn('http_requests_total{method="GET",endpoint="/api/missions/<int:id>",status="404"} 2', body)
+        self.assertIn('http_request_duration_seconds_count{method="GET",endpoint="/api/missions/<int:id>"} 2', body)
+        self.assertIn('http_requests_in_flight{endpoint="/api/missions/<int:id>"} 0', body)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
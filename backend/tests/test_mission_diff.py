@@ -0,0 +1,119 @@
+import unittest
+import os
+import sys
+import numpy as np
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.database import db
+from app.services.mission_service import MissionService
+from app.utils.kdtree import KDTree, match_points
+from benchmarks.kml_generator import generate_mission_kml
+
+
+class TestKDTree(unittest.TestCase):
+    """Unit tests for batched nearest-neighbour queries and point matching"""
+    
+    def test_nearest_matches_brute_force(self):
+        """Test nearest points, radius cut-off and lowest-index ties against a full scan"""
+        rng = np.random.default_rng(3)
+        for _ in range(50):
+            # Rounded coordinates give duplicate points, so ties are exercised
+            points = np.round(rng.random((rng.integers(1, 400), 2)) * 100)
+            queries = rng.random((40, 2)) * 100
+            radius = rng.uniform(1, 20)
+            distances, indices = KDTree(points, leaf_size=int(rng.integers(1, 10))).nearest(queries, radius)
+            for query, distance, index in zip(queries, distances, indices):
+                all_distances = np.hypot(*(points - query).T)
+                if all_distances.min() > radius:
+                    self.assertEqual(index, -1)
+                    self.assertEqual(distance, np.inf)
+                else:
+                    self.assertEqual(index, np.flatnonzero(all_distances == all_distances.min())[0])
+                    self.assertAlmostEqual(distance, all_distances.min())
+    
+    def test_empty_tree(self):
+        """Test that queries against no points find nothing"""
+        distances, indices = KDTree(np.zeros((0, 2))).nearest([[0.0, 0.0]], 10)
+        self.assertEqual(indices.tolist(), [-1])
+    
+    def test_match_points_is_one_to_one(self):
+        """Test that a point that loses its nearest neighbour is matched to its next-nearest"""
+        source = [[0.0, 0.0], [10.0, 0.0], [100.0, 0.0]]
+        target = [[9.0, 0.0], [1.0, 0.0], [4.0, 0.0]]
+        matched_source, matched_target = match_points(source, target, 20)
+        self.assertEqual(sorted(zip(matched_source.tolist(), matched_target.tolist())), [(0, 1), (1, 0)])
+        # Target 2 is nearest to source 0, which is taken, and too far from source 2
+        matched_source, matched_target = match_points(source, target[2:] + target[:2], 5)
+        self.assertEqual(sorted(zip(matched_source.tolist(), matched_target.tolist())), [(0, 2), (1, 1)])
+
+
+class TestMissionDiffEndpoint(unittest.TestCase):
+    """Integration tests for GET /api/missions/<a>/diff/<b>"""
+    
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        kml = generate_mission_kml(50)
+        self.original = MissionService.create_mission_from_kml('Plan', kml)['mission']['id']
+        self.replanned = MissionService.create_mission_from_kml('Re-plan', kml)['mission']['id']
+        MissionService.edit_waypoints(self.replanned, [
+            {'op': 'insert', 'index': 30, 'waypoints': [{'latitude': -36.95, 'longitude': 174.8, 'altitude': 90}]}
+        ])
+        MissionService.edit_waypoints(self.replanned, [{'op': 'delete', 'start': 20}])
+        MissionService.edit_waypoints(self.replanned, [
+            {'op': 'move', 'start': 3, 'offset': {'latitude': 0.00005}},
+            {'op': 'move', 'start': 7, 'set': {'altitude': 500.0}}
+        ])
+    
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+    
+    def _diff(self, **parameters):
+        return self.client.get(f'/api/missions/{self.original}/diff/{self.replanned}', query_string=parameters)
+    
+    def test_moved_added_and_removed(self):
+        """Test that a re-planned mission reports each kind of change"""
+        response = self._diff()
+        self.assertEqual(response.status_code, 200)
+        diff = response.get_json()['data']
+        self.assertEqual(diff['from_mission']['waypoint_count'], 50)
+        self.assertEqual(diff['to_mission']['name'], 'Re-plan')
+        summary = diff['summary']
+        self.assertEqual((summary['unchanged'], summary['moved'], summary['added'], summary['removed']), (47, 2, 1, 1))
+        
+        moved = diff['moved']
+        self.assertEqual(moved['from_index'], [3, 7])
+        self.assertEqual(moved['to_index'], [3, 7])
+        self.assertAlmostEqual(moved['distance_m'][0], 5.56, delta=0.01)
+        self.assertEqual(moved['distance_m'][1], 0.0)
+        self.assertEqual(moved['altitude_delta_m'][0], 0.0)
+        self.assertAlmostEqual(moved['altitude_delta_m'][1], 500.0 - moved['from_altitude'][1], places=2)
+        self.assertEqual(summary['max_distance_m'], moved['distance_m'][0])
+        self.assertEqual(diff['removed']['index'], [20])
+        self.assertEqual(diff['added']['latitude'], [-36.95])
+    
+    def test_radius_limits_moves(self):
+        """Test that a waypoint moved farther than the radius is removed and added instead"""
+        summary = self._diff(radius=2).get_json()['data']['summary']
+        self.assertEqual((summary['moved'], summary['added'], summary['removed']), (1, 2, 2))
+        identical = self.client.get(f'/api/missions/{self.original}/diff/{self.original}').get_json()['data']
+        self.assertEqual(identical['summary']['unchanged'], 50)
+        self.assertEqual(identical['moved']['from_index'], [])
+    
+    def test_invalid_requests(self):
+        """Test radius validation and unknown missions"""
+        self.assertEqual(self._diff(radius=0).status_code, 400)
+        self.assertEqual(self._diff(radius=5000).status_code, 400)
+        self.assertEqual(self.client.get(f'/api/missions/{self.original}/diff/9999').status_code, 404)
+        self.assertEqual(self.client.get(f'/api/missions/9999/diff/{self.original}').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
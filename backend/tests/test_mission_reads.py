@@ -0,0 +1,130 @@
+import unittest
+import json
+import os
+import sys
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.database import db
+from app.models.mission import Mission, NoFlyZone
+from app.services.mission_service import MissionService
+from app.utils.row_json import ObjectEncoder, group_arrays, json_number, json_string, nullable
+from app.errors import NotFoundError
+from benchmarks.kml_generator import generate_mission_kml
+
+
+class TestRowJSON(unittest.TestCase):
+    """Unit tests for encoding columns of values as JSON objects"""
+    
+    def test_encoded_objects_match_json_dumps(self):
+        """Test numbers, escaped strings, nulls and multi-column fields"""
+        encoder = ObjectEncoder(
+            ('id', json_number),
+            ('name', json_string),
+            ('altitude', nullable(json_number)),
+            ('span', lambda low, high: f'[{low!r},{high!r}]', 2),
+            ('100%', json_number)
+        )
+        rows = [(1, 'Süd "Ridge"\n', 12.5, 0.1, 2, 7), (2, '', None, -1e-07, 3.0, 8)]
+        
+        objects = [json.loads(text) for text in encoder.encode_rows(rows)]
+        
+        self.assertEqual(objects, [
+            {'id': 1, 'name': 'Süd "Ridge"\n', 'altitude': 12.5, 'span': [0.1, 2], '100%': 7},
+            {'id': 2, 'name': '', 'altitude': None, 'span': [-1e-07, 3.0], '100%': 8}
+        ])
+        self.assertEqual(encoder.encode_rows([]), [])
+    
+    def test_non_finite_numbers_are_encoded_as_null(self):
+        """Test that NaN and infinity, which JSON cannot express, become null"""
+        encoder = ObjectEncoder(('latitude', json_number), ('altitude', nullable(json_number)))
+        
+        text = encoder.encode_rows([(float('nan'), float('inf')), (-36.8, float('-inf'))])
+        
+        self.assertEqual([json.loads(item) for item in text], [
+            {'latitude': None, 'altitude': None}, {'latitude': -36.8, 'altitude': None}
+        ])
+    
+    def test_group_arrays_splits_sorted_keys(self):
+        """Test that each key gets the array of its contiguous items"""
+        groups = group_arrays([1, 1, 3, 4, 4, 4], ['1', '2', '3', '4', '5', '6'])
+        
+        self.assertEqual(groups, {1: ('[1,2]', 2), 3: ('[3]', 1), 4: ('[4,5,6]', 3)})
+
+
+class TestMissionReads(unittest.TestCase):
+    """Integration tests for the ORM-free mission read path"""
+    
+    def setUp(self):
+        self.app = create_app('testing')
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.mission_id = MissionService.create_mission_from_kml(
+            'Süd "Ridge" 100%', generate_mission_kml(30)
+        )['mission']['id']
+        self.second_id = MissionService.create_mission_from_kml('Second', generate_mission_kml(5))['mission']['id']
+        MissionService.edit_waypoints(self.mission_id, [{'op': 'move', 'start': 0, 'end': 1, 'set': {'altitude': None}}])
+        MissionService.create_annotation(self.mission_id, 45.5, -122.5, None)
+        MissionService.create_annotation(self.mission_id, 45.6, -122.6, 'Tower')
+        MissionService.create_no_fly_zone(
+            self.mission_id, [[-122.5, 45.5], [-122.4, 45.5], [-122.4, 45.6], [-122.5, 45.5]], 'Airfield'
+        )
+        # A zone written before bounding boxes were stored
+        db.session.add(NoFlyZone(mission_id=self.second_id, coordinates='[]'))
+        db.session.commit()
+    
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.context.pop()
+    
+    def _orm_payloads(self):
+        db.session.expire_all()
+        return [mission.to_dict() for mission in Mission.query.order_by(Mission.id)]
+    
+    def test_all_missions_match_orm_payloads(self):
+        """Test that the JSON read path returns exactly what Mission.to_dict() did"""
+        expected = self._orm_payloads()
+        
+        self.assertEqual(json.loads(MissionService.get_all_missions_json()), expected)
+        self.assertIsNone(expected[0]['waypoints'][0]['altitude'])
+        self.assertIsNone(expected[1]['no_fly_zones'][0]['bbox'])
+    
+    def test_mission_detail_matches_orm_payload(self):
+        """Test the detail JSON, its cached copy and the dict view of it"""
+        expected = self._orm_payloads()[0]
+        
+        self.assertEqual(json.loads(MissionService.get_mission_json(self.mission_id)), expected)
+        self.assertEqual(json.loads(MissionService.get_mission_json(self.mission_id)), expected)
+        self.assertEqual(MissionService.get_mission_by_id(self.mission_id), expected)
+        with self.assertRaises(NotFoundError):
+            MissionService.get_mission_json(9999)
+    
+    def test_routes_embed_encoded_payloads(self):
+        """Test that the endpoints splice the encoded JSON into the standard envelope"""
+        expected = self._orm_payloads()
+        client = self.app.test_client()
+        
+        listing = client.get('/api/missions/')
+        detail = client.get(f'/api/missions/{self.mission_id}')
+        
+        self.assertEqual(listing.status_code, 200)
+        self.assertEqual(listing.mimetype, 'application/json')
+        self.assertTrue(listing.get_json()['success'])
+        self.assertEqual(listing.get_json()['data'], expected)
+        self.assertEqual(detail.get_json()['data'], expected[0])
+        self.assertIn('request_id', detail.get_json())
+    
+    def test_no_missions(self):
+        """Test that an empty database lists no missions"""
+        db.session.query(NoFlyZone).delete()
+        MissionService.delete_missions([self.mission_id, self.second_id])
+        
+        self.assertEqual(MissionService.get_all_missions(), [])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
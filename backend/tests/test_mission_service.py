@@ -123,22 +123,27 @@ class TestMissionService(unittest.TestCase):
         # Verify rollback was called
         mock_db_session.rollback.assert_called_once()
     
-    @patch('app.services.mission_service.Mission')
-    def test_get_all_missions(self, mock_mission_model):
+    @patch('app.services.mission_service.fetch_tuples')
+    def test_get_all_missions(self, mock_fetch_tuples):
         """Test getting all missions"""
-        # Mock missions
-        mock_mission1 = MagicMock()
-        mock_mission1.to_dict.return_value = {'id': 1, 'name': 'Mission 1'}
-        mock_mission2 = MagicMock()
-        mock_mission2.to_dict.return_value = {'id': 2, 'name': 'Mission 2'}
-        
-        mock_mission_model.query.all.return_value = [mock_mission1, mock_mission2]
+        # Mission rows, then waypoints, annotations and no-fly zones
+        mock_fetch_tuples.side_effect = [
+            [(1, 'Mission 1', '<kml/>', 0), (2, 'Mission 2', '<kml/>', 1)],
+            [(1, 10, 1, 45.5, -122.5, None, 0)],
+            [],
+            []
+        ]
         
         result = MissionService.get_all_missions()
         
         self.assertEqual(len(result), 2)
         self.assertEqual(result[0]['id'], 1)
         self.assertEqual(result[1]['id'], 2)
+        self.assertEqual(result[0]['waypoints'], [
+            {'id': 10, 'mission_id': 1, 'latitude': 45.5, 'longitude': -122.5, 'altitude': None, 'index': 0}
+        ])
+        self.assertEqual(result[1]['waypoint_count'], 0)
+        self.assertTrue(result[1]['kml_stale'])
     
     
     @patch('app.services.mission_service.db.session')
@@ -171,12 +176,24 @@ class TestMissionService(unittest.TestCase):
         mock_mission = MagicMock()
         mock_mission_model.query.get.return_value = mock_mission
         
-        coordinates = '174.7633,-36.8485 174.7634,-36.8486 174.7635,-36.8487'
+        coordinates = '174.7633,-36.8485 174.7634,-36.8486 174.7635,-36.8484'
         result = MissionService.create_no_fly_zone(1, coordinates, 'Test zone')
         
         # Verify no-fly zone was added to database
         mock_db_session.add.assert_called()
         mock_db_session.commit.assert_called_once()
+        self.assertEqual(result['vertex_count'], 3)
+    
+    @patch('app.services.mission_service.db.session')
+    @patch('app.services.mission_service.Mission')
+    def test_create_no_fly_zone_degenerate_polygon_raises_error(self, mock_mission_model, mock_db_session):
+        """Test that a polygon without area is rejected before anything is written"""
+        mock_mission_model.query.get.return_value = MagicMock()
+        
+        coordinates = '174.7633,-36.8485 174.7634,-36.8486 174.7635,-36.8487'
+        with self.assertRaises(ValidationError):
+            MissionService.create_no_fly_zone(1, coordinates, 'Test zone')
+        mock_db_session.add.assert_not_called()
     
     @patch('app.services.mission_service.Mission')
     def test_create_no_fly_zone_mission_not_found_raises_error(self, mock_mission_model):
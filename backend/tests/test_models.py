@@ -89,7 +89,10 @@ class TestModelSerialization(unittest.TestCase):
             'id': 1,
             'mission_id': 5,
             'coordinates': '174.7633,-36.8485 174.7634,-36.8486',
-            'note': 'Restricted area'
+            'note': 'Restricted area',
+            'vertex_count': None,
+            'area_m2': None,
+            'bbox': None
         }
         
         self.assertEqual(result, expected)
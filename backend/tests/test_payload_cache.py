@@ -0,0 +1,160 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.database import db
+from app.metrics import metrics
+from app.payload_cache import LocalTier, SharedTier, CACHE_REQUESTS, mission_key
+from app.services.mission_service import MissionService
+from benchmarks.kml_generator import generate_mission_kml
+
+
+class TestCacheTiers(unittest.TestCase):
+    """Unit tests for the local and shared cache tiers"""
+    
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        self.workdir.cleanup()
+    
+    def test_local_tier_evicts_by_size(self):
+        """Test that the least recently used entries go first when over budget"""
+        tier = LocalTier(max_bytes=10, ttl=60)
+        tier.set('a', 'r1', {'id': 1}, 4)
+        tier.set('b', 'r1', {'id': 2}, 4)
+        tier.get('a', 'r1')
+        tier.set('c', 'r1', {'id': 3}, 4)
+        
+        self.assertEqual(tier.get('a', 'r1'), {'id': 1})
+        self.assertIsNone(tier.get('b', 'r1'))
+        self.assertEqual(tier.size, 8)
+    
+    def test_local_tier_rejects_expired_and_stale_entries(self):
+        """Test TTL expiry and revision mismatches"""
+        expiring = LocalTier(max_bytes=100, ttl=0)
+        expiring.set('a', 'r1', {'id': 1}, 4)
+        tier = LocalTier(max_bytes=100, ttl=60)
+        tier.set('a', 'r1', {'id': 1}, 4)
+        
+        self.assertIsNone(expiring.get('a', 'r1'))
+        self.assertIsNone(tier.get('a', 'r2'))
+        self.assertEqual(len(tier), 0)
+    
+    def test_shared_tier_round_trip_and_trim(self):
+        """Test that the shared file stores bytes per revision and trims the oldest entries"""
+        path = os.path.join(self.workdir.name, 'cache.db')
+        tier = SharedTier(path, max_bytes=250, ttl=60)
+        tier.set('a', 'r1', b'x' * 100)
+        tier.set('b', 'r1', b'y' * 100)
+        
+        self.assertEqual(SharedTier(path, max_bytes=250, ttl=60).get('a', 'r1'), b'x' * 100)
+        self.assertIsNone(tier.get('a', 'r2'))
+        
+        tier.set('c', 'r1', b'z' * 100)
+        
+        self.assertIsNone(tier.get('a', 'r1'))
+        self.assertEqual(tier.get('c', 'r1'), b'z' * 100)
+
+
+class TestMissionPayloadCache(unittest.TestCase):
+    """Integration tests for cached mission detail payloads"""
+    
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        settings = {
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(self.workdir.name, 'missions.db')}",
+            'PAYLOAD_CACHE_SHARED_PATH': os.path.join(self.workdir.name, 'cache.db')
+        }
+        # Two apps over the same database and cache file stand in for two workers
+        self.app = create_app('testing', settings)
+        self.other_app = create_app('testing', settings)
+        with self.app.app_context():
+            db.create_all()
+            self.mission_id = MissionService.create_mission_from_kml('Grid', generate_mission_kml(50))['mission']['id']
+            db.session.remove()
+        self.path = f'/api/missions/{self.mission_id}'
+        metrics.reset()
+    
+    def tearDown(self):
+        for app in (self.app, self.other_app):
+            with app.app_context():
+                db.session.remove()
+                db.engine.dispose()
+        self.workdir.cleanup()
+    
+    def test_repeat_reads_skip_serialization(self):
+        """Test that a cached payload costs only the revision lookup"""
+        client = self.app.test_client()
+        first = client.get(self.path)
+        second = client.get(self.path)
+        
+        self.assertEqual(first.get_json()['data'], second.get_json()['data'])
+        self.assertGreater(int(first.headers['X-DB-Query-Count']), 1)
+        self.assertEqual(second.headers['X-DB-Query-Count'], '1')
+        self.assertEqual(CACHE_REQUESTS.value(('local', 'hit')), 1)
+    
+    def test_shared_tier_serves_other_workers(self):
+        """Test that a payload built by one worker is reused by another"""
+        self.app.test_client().get(self.path)
+        
+        response = self.other_app.test_client().get(self.path)
+        
+        self.assertEqual(response.get_json()['data']['waypoint_count'], 50)
+        self.assertEqual(CACHE_REQUESTS.value(('shared', 'hit')), 1)
+        self.assertEqual(response.headers['X-DB-Query-Count'], '1')
+    
+    def test_writes_invalidate_every_tier(self):
+        """Test that a write in one worker is visible to both"""
+        client, other_client = self.app.test_client(), self.other_app.test_client()
+        client.get(self.path)
+        other_client.get(self.path)
+        
+        other_client.post(f'{self.path}/annotations', json={'latitude': -36.9, 'longitude': 174.7, 'note': 'new'})
+        
+        self.assertEqual(len(self.other_app.extensions['payload_cache'].local), 0)
+        self.assertEqual(client.get(self.path).get_json()['data']['annotations'][0]['note'], 'new')
+        # Only the second worker's first read came from the shared tier
+        self.assertEqual(CACHE_REQUESTS.value(('shared', 'hit')), 1)
+        
+        edited = client.patch(f'{self.path}/waypoints', json={
+            'operations': [{'op': 'delete', 'start': 0, 'end': 10}]
+        })
+        self.assertEqual(edited.status_code, 200)
+        self.assertEqual(other_client.get(self.path).get_json()['data']['waypoint_count'], 40)
+    
+    def test_failed_write_keeps_cache(self):
+        """Test that a rolled back write does not invalidate cached payloads"""
+        client = self.app.test_client()
+        client.get(self.path)
+        
+        response = client.patch(f'{self.path}/waypoints', json={'operations': [{'op': 'delete', 'start': 0, 'end': 999}]})
+        
+        self.assertEqual(response.status_code, 400)
+        with self.app.app_context():
+            self.assertEqual(len(self.app.extensions['payload_cache'].local), 1)
+            self.assertIsNotNone(self.app.extensions['payload_cache'].local.get(
+                mission_key(self.mission_id, 'mission_json'), MissionService.get_mission_revision(self.mission_id)
+            ))
+
+    def test_each_read_path_caches_one_entry(self):
+        """Test that dict and JSON reads each store a single entry of their own"""
+        with self.app.app_context():
+            cache = self.app.extensions['payload_cache']
+            
+            payload = MissionService.get_mission_by_id(self.mission_id)
+            self.assertEqual(list(cache.local._entries), [mission_key(self.mission_id)])
+            
+            text = MissionService.get_mission_json(self.mission_id)
+            self.assertEqual(list(cache.local._entries), [mission_key(self.mission_id), mission_key(self.mission_id, 'mission_json')])
+            self.assertEqual(json.loads(text), payload)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
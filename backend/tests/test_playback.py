@@ -0,0 +1,160 @@
+import unittest
+import os
+import sys
+import json
+import math
+import re
+import numpy as np
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.database import db
+from app.services.mission_service import MissionService
+from app.services.playback_service import PlaybackService
+from app.utils.geo import haversine_m
+from app.utils.kml_parser import parse_flight_speeds
+from app.utils.trajectory import build_timeline, sample_timeline
+from benchmarks.kml_generator import generate_mission_kml
+
+METERS_PER_DEGREE = 111195.08  # on the mean-radius sphere
+
+
+class TestTrajectory(unittest.TestCase):
+    """Unit tests for waypoint timing and frame interpolation"""
+    
+    def test_timeline(self):
+        """Test leg times, climb distance, headings and per-leg speeds"""
+        step = 100 / METERS_PER_DEGREE
+        timeline = build_timeline(
+            [0.0, step, step, step], [0.0, 0.0, 0.0, step], [10.0, 10.0, 40.0, 40.0], [10.0, 5.0, 20.0, 1.0]
+        )
+        np.testing.assert_allclose(timeline['time'], [0.0, 10.0, 16.0, 21.0], atol=1e-3)
+        # The vertical leg keeps heading north, then the path turns east
+        np.testing.assert_allclose(timeline['heading'], [0.0, 0.0, 90.0, 90.0], atol=1e-3)
+        np.testing.assert_allclose(timeline['speed'], [10.0, 5.0, 20.0, 20.0])
+        
+        frames = sample_timeline(timeline, [-1.0, 5.0, 13.0, 18.5, 30.0])
+        np.testing.assert_allclose(frames['latitude'], [0.0, step / 2, step, step, step], atol=1e-12)
+        np.testing.assert_allclose(frames['longitude'], [0.0, 0.0, 0.0, step / 2, step], atol=1e-12)
+        np.testing.assert_allclose(frames['altitude'], [10.0, 10.0, 25.0, 40.0, 40.0])
+        np.testing.assert_allclose(frames['speed'], [10.0, 10.0, 5.0, 20.0, 20.0])
+    
+    def test_single_waypoint(self):
+        """Test that a one-point path has a single frame at time zero"""
+        timeline = build_timeline([1.0], [2.0], [np.nan], [15.0])
+        frames = sample_timeline(timeline, [0.0])
+        self.assertEqual(frames['latitude'].tolist(), [1.0])
+        self.assertTrue(np.isnan(frames['heading'][0]))
+    
+    def test_parse_flight_speeds(self):
+        """Test wayline and per-waypoint speeds, skipping placemarks on the global speed"""
+        kml = generate_mission_kml(3, auto_flight_speed=12)
+        kml = kml.replace('<wpml:index>1</wpml:index>', '<wpml:index>1</wpml:index><wpml:useGlobalSpeed>1</wpml:useGlobalSpeed>')
+        speeds = parse_flight_speeds(kml)
+        
+        self.assertEqual(speeds['auto_flight_speed'], 12.0)
+        self.assertEqual(sorted(speeds['waypoint_speeds']), [0, 2])
+        for speed in speeds['waypoint_speeds'].values():
+            self.assertLessEqual(abs(speed - 12.0), 1.0)
+
+
+class TestPlaybackEndpoint(unittest.TestCase):
+    """Integration tests for GET /api/missions/<id>/playback"""
+    
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.kml = generate_mission_kml(60)
+        self.mission_id = MissionService.create_mission_from_kml('Replay', self.kml)['mission']['id']
+    
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+    
+    def _expected_duration(self, waypoints):
+        speeds = parse_flight_speeds(self.kml)['waypoint_speeds']
+        total = 0.0
+        for first, second in zip(waypoints, waypoints[1:]):
+            horizontal = haversine_m(first['latitude'], first['longitude'], second['latitude'], second['longitude'])
+            total += math.hypot(horizontal, second['altitude'] - first['altitude']) / speeds[first['index']]
+        return total
+    
+    def test_ndjson_stream(self):
+        """Test that frames cover the flight in order, chunked, with KML speeds"""
+        response = self.client.get(f'/api/missions/{self.mission_id}/playback?step=2&chunk=100')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        messages = [json.loads(line) for line in response.data.decode().splitlines()]
+        
+        meta = messages[0]['meta']
+        waypoints = sorted(MissionService.get_mission_by_id(self.mission_id)['waypoints'], key=lambda w: w['index'])
+        self.assertAlmostEqual(meta['duration_s'], self._expected_duration(waypoints), delta=0.01)
+        self.assertEqual(meta['frame_count'], math.floor(meta['duration_s'] / 2) + 1)
+        
+        chunks = [message['frames'] for message in messages[1:-1]]
+        self.assertEqual(messages[-1], {'end': {'frame_count': meta['frame_count']}})
+        self.assertEqual([len(chunk['time']) for chunk in chunks[:-1]], [100] * (len(chunks) - 1))
+        times = [time for chunk in chunks for time in chunk['time']]
+        self.assertEqual(times, [round(2.0 * frame, 3) for frame in range(meta['frame_count'])])
+        self.assertAlmostEqual(chunks[0]['latitude'][0], waypoints[0]['latitude'], places=6)
+        self.assertAlmostEqual(chunks[0]['speed'][0], parse_flight_speeds(self.kml)['waypoint_speeds'][0], places=2)
+    
+    def test_sse_stream(self):
+        """Test the server-sent events framing"""
+        response = self.client.get(f'/api/missions/{self.mission_id}/playback?format=sse&step=10')
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        events = [block.split('\n') for block in response.data.decode().strip().split('\n\n')]
+        self.assertEqual(events[0][0], 'event: meta')
+        self.assertEqual(events[-1][0], 'event: end')
+        self.assertTrue(all(event[0] == 'event: frames' for event in events[1:-1]))
+        self.assertTrue(events[1][1].startswith('data: {"time":[0.0,'))
+    
+    def test_timeline_follows_edits(self):
+        """Test that the cached timeline is rebuilt when the waypoints change"""
+        before = self.client.get(f'/api/missions/{self.mission_id}/playback?step=60').data
+        self.client.patch(f'/api/missions/{self.mission_id}/waypoints',
+                          json={'operations': [{'op': 'delete', 'start': 30, 'end': 60}]})
+        after = self.client.get(f'/api/missions/{self.mission_id}/playback?step=60').data
+        first_meta = json.loads(before.splitlines()[0])['meta']
+        second_meta = json.loads(after.splitlines()[0])['meta']
+        self.assertEqual(second_meta['waypoint_count'], 30)
+        self.assertLess(second_meta['duration_s'], first_meta['duration_s'])
+    
+    def test_stale_kml_speeds_are_not_applied_by_index(self):
+        """Test that after an edit, legs fly at the wayline speed instead of speeds keyed by old indexes"""
+        self.client.patch(f'/api/missions/{self.mission_id}/waypoints',
+                          json={'operations': [{'op': 'delete', 'start': 0, 'end': 3}]})
+        
+        timeline = PlaybackService.get_timeline(self.mission_id)
+        
+        self.assertEqual(timeline['waypoint_count'], 57)
+        self.assertEqual(set(timeline['waypoints']['speed']), {timeline['auto_flight_speed_mps']})
+    
+    def test_unusable_wayline_speed_falls_back_to_default(self):
+        """Test that a zero or negative autoFlightSpeed is replaced by PLAYBACK_DEFAULT_SPEED_MPS"""
+        for speed in (0, -5):
+            kml = re.sub(r'<wpml:waypointSpeed>[^<]*</wpml:waypointSpeed>', '', generate_mission_kml(5, auto_flight_speed=speed))
+            mission_id = MissionService.create_mission_from_kml(f'Speed {speed}', kml)['mission']['id']
+            
+            timeline = PlaybackService.get_timeline(mission_id)
+            
+            self.assertEqual(timeline['auto_flight_speed_mps'], self.app.config['PLAYBACK_DEFAULT_SPEED_MPS'])
+            self.assertTrue(all(value > 0 for value in timeline['waypoints']['speed']), speed)
+            self.assertGreater(timeline['duration_s'], 0)
+    
+    def test_invalid_requests(self):
+        """Test that bad parameters fail with JSON errors before streaming"""
+        for query in ('step=0', 'step=1000', 'format=csv', 'chunk=0', 'step=0.05&chunk=10001'):
+            response = self.client.get(f'/api/missions/{self.mission_id}/playback?{query}')
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('error', response.get_json())
+        self.assertEqual(self.client.get('/api/missions/9999/playback').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import unittest
+import os
+import sys
+import json
+import math
+import random
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.database import db
+from app.models.mission import NoFlyZone
+from app.services.mission_service import MissionService
+from app.utils.polygon import (
+    normalize_ring, parse_ring, find_self_intersection, segments_intersect, signed_area, GeometryError, MAX_VERTICES
+)
+from benchmarks.kml_generator import generate_mission_kml
+
+SQUARE = [[174.0, -36.0], [174.01, -36.0], [174.01, -36.01], [174.0, -36.01]]  # clockwise
+
+def brute_force_intersection(points):
+    """O(n^2) reference: any non-adjacent edges touching, or adjacent edges folding back"""
+    count = len(points)
+    edge = lambda i: (points[i], points[(i + 1) % count])
+    for i in range(count):
+        for j in range(i + 2, count):
+            if (i, j) != (0, count - 1) and segments_intersect(*edge(i), *edge(j)):
+                return True
+    for i in range(count):
+        previous, vertex, following = points[i - 1], points[i], points[(i + 1) % count]
+        cross = (previous[0] - vertex[0]) * (following[1] - vertex[1]) - (previous[1] - vertex[1]) * (following[0] - vertex[0])
+        dot = (previous[0] - vertex[0]) * (following[0] - vertex[0]) + (previous[1] - vertex[1]) * (following[1] - vertex[1])
+        if cross == 0 and dot > 0:
+            return True
+    return False
+
+
+class TestPolygonNormalization(unittest.TestCase):
+    """Unit tests for no-fly-zone ring parsing and normalization"""
+    
+    def test_input_formats(self):
+        """Test pair lists, JSON, GeoJSON and KML coordinate strings"""
+        kml = ' '.join(f'{longitude},{latitude},0' for longitude, latitude in SQUARE)
+        geojson = json.dumps({'type': 'Polygon', 'coordinates': [SQUARE + SQUARE[:1]]})
+        expected = [tuple(point) for point in SQUARE]
+        
+        for value in (SQUARE, json.dumps(SQUARE), kml):
+            self.assertEqual(parse_ring(value), expected)
+        self.assertEqual(parse_ring(geojson), expected + expected[:1])
+    
+    def test_canonical_ring(self):
+        """Test closure, duplicate removal and counter-clockwise winding"""
+        messy = [SQUARE[0], SQUARE[0], SQUARE[1], SQUARE[2], SQUARE[2], SQUARE[3], SQUARE[0]]
+        result = normalize_ring(messy)
+        ring = json.loads(result['coordinates'])
+        
+        self.assertEqual(ring[0], ring[-1])
+        self.assertEqual(result['vertex_count'], 4)
+        self.assertGreater(signed_area([tuple(point) for point in ring[:-1]]), 0)
+        self.assertEqual(normalize_ring(list(reversed(SQUARE)))['coordinates'], result['coordinates'])
+        self.assertEqual(
+            (result['min_longitude'], result['min_latitude'], result['max_longitude'], result['max_latitude']),
+            (174.0, -36.01, 174.01, -36.0)
+        )
+        # 0.01 degrees of latitude by 0.01 degrees of longitude at 36 degrees south
+        self.assertAlmostEqual(result['area_m2'], 1111.95 ** 2 * math.cos(math.radians(36.005)), delta=500)
+    
+    def test_rejects_invalid_rings(self):
+        """Test malformed, degenerate and self-intersecting input"""
+        bowtie = [[0, 0], [1, 1], [1, 0], [0, 1]]
+        pinched = [[0, 0], [2, 0], [1, 1], [2, 2], [0, 2], [1, 1]]
+        spike = [[0, 0], [2, 0], [2, 2], [2, 1]]
+        for value in ('not coordinates', '[[0, 0], [1]]', [[0, 0], [200, 0], [0, 1]], [[0, 0], [1, 1]],
+                      [[0, 0], [1, 1], [2, 2]], bowtie, pinched, spike, {'type': 'Point'}):
+            with self.assertRaises(GeometryError, msg=value):
+                normalize_ring(value)
+        with self.assertRaises(GeometryError):
+            normalize_ring([[math.cos(k / MAX_VERTICES), math.sin(k / MAX_VERTICES)] for k in range(MAX_VERTICES + 1)])
+    
+    def test_sweep_matches_brute_force(self):
+        """Test the sweep against pairwise checks on random and grid-aligned rings"""
+        rng = random.Random(7)
+        checked = 0
+        while checked < 3000:
+            if rng.random() < 0.5:
+                points = [(float(rng.randint(0, 4)), float(rng.randint(0, 4))) for _ in range(rng.randint(3, 9))]
+            else:
+                points = [(rng.random(), rng.random()) for _ in range(rng.randint(3, 9))]
+            distinct = [point for position, point in enumerate(points) if point != points[position - 1]]
+            if len(distinct) < 3:
+                continue
+            checked += 1
+            self.assertEqual(find_self_intersection(distinct) is not None, brute_force_intersection(distinct), distinct)
+    
+    def test_large_simple_polygon(self):
+        """Test that a large star-shaped ring validates"""
+        rng = random.Random(3)
+        count = 5000
+        points = []
+        for k in range(count):
+            radius = 0.01 * (1 + 0.3 * rng.random())
+            points.append([174 + radius * math.cos(2 * math.pi * k / count), -36 + radius * math.sin(2 * math.pi * k / count)])
+        self.assertEqual(normalize_ring(points)['vertex_count'], count)
+
+
+class TestNoFlyZoneWrites(unittest.TestCase):
+    """Integration tests for no-fly-zone creation and backfill"""
+    
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.mission_id = MissionService.create_mission_from_kml('Zones', generate_mission_kml(10))['mission']['id']
+    
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+    
+    def test_endpoint_stores_canonical_geometry(self):
+        """Test that the API accepts a pair list and rejects a bowtie"""
+        response = self.client.post(f'/api/missions/{self.mission_id}/no_fly_zones',
+                                    json={'coordinates': SQUARE, 'note': 'Stadium'})
+        self.assertEqual(response.status_code, 201)
+        zone = response.get_json()['data']
+        self.assertEqual(zone['vertex_count'], 4)
+        self.assertEqual(zone['bbox'], [174.0, -36.01, 174.01, -36.0])
+        self.assertEqual(len(json.loads(zone['coordinates'])), 5)
+        
+        response = self.client.post(f'/api/missions/{self.mission_id}/no_fly_zones',
+                                    json={'coordinates': '0,0 1,1 1,0 0,1'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('intersect', response.get_json()['error'])
+        self.assertEqual(self.client.post(f'/api/missions/{self.mission_id}/no_fly_zones', json={}).status_code, 400)
+    
+    def test_cli_normalizes_legacy_rows(self):
+        """Test that rows stored as raw strings are canonicalized and invalid ones reported"""
+        db.session.add_all([
+            NoFlyZone(mission_id=self.mission_id, coordinates='174.0,-36.0 174.0,-36.01 174.01,-36.01 174.01,-36.0'),
+            NoFlyZone(mission_id=self.mission_id, coordinates='0,0 1,1 1,0 0,1')
+        ])
+        db.session.commit()
+        
+        result = self.app.test_cli_runner().invoke(args=['normalize-no-fly-zones'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('Normalized 1 no-fly zones', result.output)
+        db.session.expire_all()
+        zones = NoFlyZone.query.order_by(NoFlyZone.id).all()
+        self.assertEqual(zones[0].vertex_count, 4)
+        self.assertTrue(zones[0].coordinates.startswith('[['))
+        self.assertIsNone(zones[1].vertex_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+import os
+import sys
+from sqlalchemy.exc import OperationalError
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.database import db
+from app.metrics import metrics
+from app.models.mission import Mission, Waypoint
+from app.query_stats import summarize_parameters
+
+
+class TestQueryStats(unittest.TestCase):
+    """Tests for per-request SQL accounting"""
+    
+    def _create_app(self):
+        app = create_app('testing')
+        with app.app_context():
+            db.create_all()
+            for mission_number in range(3):
+                mission = Mission(name=f'Mission {mission_number}', kml_data='<kml/>')
+                mission.waypoints = [
+                    Waypoint(latitude=-36.8, longitude=174.7, altitude=50.0, index=index)
+                    for index in range(2)
+                ]
+                db.session.add(mission)
+            db.session.commit()
+        return app
+    
+    def setUp(self):
+        metrics.reset()
+    
+    def test_query_count_headers(self):
+        """Test that SQL usage is reported next to X-Processing-Time"""
+        client = self._create_app().test_client()
+        
+        response = client.get('/api/missions/')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('X-Processing-Time', response.headers)
+        self.assertGreaterEqual(int(response.headers['X-DB-Query-Count']), 1)
+        self.assertTrue(response.headers['X-DB-Time'].endswith('s'))
+        
+        body = client.get('/metrics').get_data(as_text=True)
+        self.assertIn('db_queries_per_request_count{endpoint="/api/missions/"} 1', body)
+    
+    def test_requests_without_sql_report_zero(self):
+        """Test that requests that never touch the database report no queries"""
+        client = self._create_app().test_client()
+        
+        response = client.get('/health')
+        
+        self.assertEqual(response.headers['X-DB-Query-Count'], '0')
+    
+    def test_slow_queries_are_logged_with_plan(self):
+        """Test that statements over the threshold are logged with EXPLAIN output"""
+        app = create_app('testing', {'SQL_SLOW_QUERY_MS': 0})
+        with app.app_context():
+            db.create_all()
+            with self.assertLogs('app.sql.slow', level='WARNING') as captured:
+                Mission.query.filter_by(name='missing').all()
+        
+        output = '\n'.join(captured.output)
+        self.assertIn('SELECT', output)
+        self.assertIn('SCAN mission', output)
+        self.assertGreaterEqual(metrics.get('db_slow_queries_total').value(), 1)
+
+    def test_slow_query_log_truncates_parameters(self):
+        """Test that large values and executemany batches are summarized, not copied into the log"""
+        app = create_app('testing', {'SQL_SLOW_QUERY_MS': 0, 'SQL_EXPLAIN_SLOW_QUERIES': False})
+        with app.app_context():
+            db.create_all()
+            with self.assertLogs('app.sql.slow', level='WARNING') as captured:
+                mission = Mission(name='Large', kml_data='<kml>' + 'x' * 1_000_000 + '</kml>')
+                mission.waypoints = [Waypoint(latitude=-36.8, longitude=174.7, altitude=50.0, index=i) for i in range(500)]
+                db.session.add(mission)
+                db.session.commit()
+        
+        output = '\n'.join(captured.output)
+        self.assertTrue(all(len(line) < 2000 for line in output.splitlines() if line.startswith('Parameters:')))
+        self.assertIn('(str of length 1000011)', output)
+        self.assertIn('500 rows: ', output)
+        self.assertIn('; ... 497 more', output)
+        self.assertTrue(summarize_parameters(tuple(range(50))).endswith(', 19, ... 30 more)'))
+    
+    def test_failed_statement_releases_its_timer(self):
+        """Test that a statement that raises leaves no start time behind on the connection"""
+        app = self._create_app()
+        with app.app_context():
+            with db.engine.connect() as connection:
+                for _ in range(3):
+                    with self.assertRaises(OperationalError):
+                        connection.exec_driver_sql('SELECT * FROM missing_table')
+                
+                self.assertEqual(connection.info.get('query_start_ns'), [])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
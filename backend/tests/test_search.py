@@ -0,0 +1,115 @@
+import unittest
+import os
+import sys
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import text
+from app import create_app
+from app.database import db
+from app.errors import ValidationError
+from app.models.mission import Annotation
+from app.services.mission_service import MissionService
+from app.services.search_service import SearchService
+from benchmarks.kml_generator import generate_mission_kml
+
+
+class TestMatchQuery(unittest.TestCase):
+    """Unit tests for turning user input into FTS5 queries"""
+    
+    def test_words_are_quoted_and_last_is_prefix(self):
+        """Test that FTS5 syntax in the input is treated as text"""
+        self.assertEqual(SearchService.build_match_query('bridge OR "pyl'), '"bridge" "OR" "pyl"*')
+    
+    def test_query_without_words_is_rejected(self):
+        """Test that empty or punctuation-only queries are rejected"""
+        with self.assertRaises(ValidationError):
+            SearchService.build_match_query(' -*" ')
+
+
+class TestSearch(unittest.TestCase):
+    """Integration tests for full-text search"""
+    
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        kml = generate_mission_kml(5)
+        self.bridge_id = MissionService.create_mission_from_kml('Harbour bridge survey', kml)['mission']['id']
+        self.farm_id = MissionService.create_mission_from_kml('Farm boundary', kml)['mission']['id']
+        self.note_id = MissionService.create_annotation(
+            self.farm_id, -36.9, 174.7, 'Bridge inspection needed at the <north> pylon'
+        )['id']
+        MissionService.create_annotation(self.farm_id, -36.9, 174.7, 'Fence line damaged')
+        MissionService.create_no_fly_zone(self.bridge_id, '174.7,-36.9 174.8,-36.9 174.8,-36.8', 'Bridge traffic')
+    
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+    
+    def _search(self, query, **params):
+        response = self.client.get('/api/search', query_string={'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+    
+    def test_search_spans_names_and_notes(self):
+        """Test that mission names, annotation notes and no-fly zone notes are all found"""
+        body = self._search('bridge')
+        
+        self.assertEqual(body['meta']['total'], 3)
+        self.assertEqual(
+            sorted((item['kind'], item['mission_id']) for item in body['data']),
+            [('annotation', self.farm_id), ('mission', self.bridge_id), ('no_fly_zone', self.bridge_id)]
+        )
+        scores = [item['score'] for item in body['data']]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+    
+    def test_snippets_are_highlighted_and_escaped(self):
+        """Test that matches are marked and note text is HTML-escaped"""
+        item = self._search('inspection nor')['data'][0]
+        
+        self.assertEqual(item['id'], self.note_id)
+        self.assertEqual(item['mission_name'], 'Farm boundary')
+        self.assertIn('<mark>inspection</mark>', item['snippet'])
+        self.assertIn('&lt;<mark>north</mark>&gt;', item['snippet'])
+    
+    def test_pagination(self):
+        """Test limit and offset"""
+        first = self._search('bridge', limit=2)
+        rest = self._search('bridge', limit=2, offset=2)
+        
+        self.assertEqual(len(first['data']), 2)
+        self.assertEqual(len(rest['data']), 1)
+        self.assertEqual(rest['meta'], {'total': 3, 'limit': 2, 'offset': 2})
+        self.assertEqual(self.client.get('/api/search?q=').status_code, 400)
+    
+    def test_index_follows_writes(self):
+        """Test that renames, note edits and deletes are reflected immediately"""
+        MissionService.update_mission(self.farm_id, name='Farm orchard')
+        annotation = db.session.get(Annotation, self.note_id)
+        annotation.note = 'Orchard netting torn'
+        db.session.commit()
+        
+        self.assertEqual(self._search('orchard')['meta']['total'], 2)
+        self.assertEqual(self._search('inspection')['meta']['total'], 0)
+        
+        db.session.delete(annotation)
+        db.session.commit()
+        self.assertEqual(self._search('orchard')['meta']['total'], 1)
+    
+    def test_rebuild_command_repopulates_index(self):
+        """Test backfilling the index"""
+        db.session.execute(text('DELETE FROM search_index'))
+        db.session.commit()
+        
+        result = self.app.test_cli_runner().invoke(args=['rebuild-search-index'])
+        
+        self.assertIn('Indexed 5 search entries', result.output)
+        self.assertEqual(self._search('bridge')['meta']['total'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,138 @@
+import unittest
+import os
+import sys
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.database import db
+from app.models.summary import MissionSummary
+from app.services.mission_service import MissionService
+from app.utils.geo import path_length_m, haversine_m
+from benchmarks.kml_generator import generate_mission_kml
+
+
+class TestGeo(unittest.TestCase):
+    """Unit tests for distance helpers"""
+    
+    def test_haversine_one_degree_of_latitude(self):
+        """Test a known distance"""
+        self.assertAlmostEqual(haversine_m(0, 0, 1, 0), 111195, delta=1)
+    
+    def test_path_length_sums_segments(self):
+        """Test that path length follows the points in order"""
+        self.assertAlmostEqual(path_length_m([(0, 0), (1, 0), (0, 0)]), 2 * haversine_m(0, 0, 1, 0))
+        self.assertEqual(path_length_m([(0, 0)]), 0.0)
+
+
+class TestMissionSummaries(unittest.TestCase):
+    """Integration tests for the mission_summary read model"""
+    
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.mission_id = MissionService.create_mission_from_kml('Bravo', generate_mission_kml(100))['mission']['id']
+    
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+    
+    def _summary(self, mission_id=None):
+        db.session.expire_all()
+        summary = db.session.get(MissionSummary, mission_id or self.mission_id)
+        return summary.to_dict() if summary else None
+    
+    def _summaries(self):
+        return {
+            summary['mission_id']: {key: value for key, value in summary.items() if key != 'updated_at'}
+            for summary in (row.to_dict() for row in MissionSummary.query.all())
+        }
+    
+    def test_created_mission_is_summarized(self):
+        """Test counts, bounding box and path length of a new mission"""
+        summary = self._summary()
+        waypoints = sorted(MissionService.get_mission_by_id(self.mission_id)['waypoints'], key=lambda w: w['index'])
+        points = [(waypoint['latitude'], waypoint['longitude']) for waypoint in waypoints]
+        
+        self.assertEqual(summary['name'], 'Bravo')
+        self.assertEqual(summary['waypoint_count'], 100)
+        self.assertEqual(summary['annotation_count'], 0)
+        self.assertEqual(summary['bbox'], [
+            min(p[1] for p in points), min(p[0] for p in points), max(p[1] for p in points), max(p[0] for p in points)
+        ])
+        self.assertAlmostEqual(summary['distance_m'], path_length_m(points), delta=0.1)
+    
+    def test_writes_update_summary(self):
+        """Test that each write path keeps the summary current"""
+        self.client.post(f'/api/missions/{self.mission_id}/annotations', json={'latitude': -36.9, 'longitude': 174.7})
+        self.client.post(f'/api/missions/{self.mission_id}/annotations', json={'latitude': -36.9, 'longitude': 174.7})
+        self.client.post(f'/api/missions/{self.mission_id}/no_fly_zones', json={'coordinates': '174.7,-36.9 174.8,-36.9 174.8,-36.8'})
+        MissionService.update_mission(self.mission_id, name='Renamed')
+        MissionService.edit_waypoints(self.mission_id, [{'op': 'delete', 'start': 50, 'end': 100}])
+        
+        summary = self._summary()
+        
+        self.assertEqual(summary['annotation_count'], 2)
+        self.assertEqual(summary['no_fly_zone_count'], 1)
+        self.assertEqual(summary['name'], 'Renamed')
+        self.assertEqual(summary['waypoint_count'], 50)
+        self.assertTrue(summary['kml_stale'])
+        
+        MissionService.get_mission_kml(self.mission_id)
+        self.assertFalse(self._summary()['kml_stale'])
+    
+    def test_failed_write_leaves_summary_unchanged(self):
+        """Test that the summary rolls back together with the write"""
+        before = self._summary()
+        
+        with self.assertRaises(Exception):
+            MissionService.edit_waypoints(self.mission_id, [
+                {'op': 'delete', 'start': 0, 'end': 10},
+                {'op': 'delete', 'start': 0, 'end': 1000}
+            ])
+        
+        self.assertEqual(self._summary(), before)
+    
+    def test_deleting_mission_removes_summary(self):
+        """Test that the summary row is deleted with its mission"""
+        MissionService.delete_mission(self.mission_id)
+        
+        self.assertIsNone(self._summary())
+    
+    def test_rebuild_command_backfills(self):
+        """Test that a rebuild reproduces the maintained summaries"""
+        MissionService.create_mission_from_kml('Alpha', generate_mission_kml(10, seed=1))
+        self.client.post(f'/api/missions/{self.mission_id}/annotations', json={'latitude': -36.9, 'longitude': 174.7})
+        maintained = self._summaries()
+        MissionSummary.query.delete()
+        db.session.commit()
+        
+        result = self.app.test_cli_runner().invoke(args=['rebuild-summaries'])
+        
+        self.assertIn('Rebuilt 2 mission summaries', result.output)
+        db.session.expire_all()
+        rebuilt = self._summaries()
+        self.assertEqual(rebuilt.keys(), maintained.keys())
+        for mission_id, summary in maintained.items():
+            self.assertAlmostEqual(rebuilt[mission_id].pop('distance_m'), summary.pop('distance_m'), delta=0.1)
+            self.assertEqual(rebuilt[mission_id], summary)
+    
+    def test_list_endpoint_pages_and_sorts(self):
+        """Test listing summaries"""
+        MissionService.create_mission_from_kml('Alpha', generate_mission_kml(10, seed=1))
+        
+        response = self.client.get('/api/missions/summary?sort=name&order=asc&limit=1')
+        body = response.get_json()
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([summary['name'] for summary in body['data']], ['Alpha'])
+        self.assertEqual(body['meta'], {'total': 2, 'limit': 1, 'offset': 0})
+        self.assertEqual(self.client.get('/api/missions/summary?sort=kml_data').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,154 @@
+import unittest
+import os
+import sys
+import tempfile
+import numpy as np
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.database import db
+from app.payload_cache import get_payload_cache, mission_key
+from app.services.mission_service import MissionService
+from app.utils.dem import DemTile, DemStore, get_dem_store
+from benchmarks.kml_generator import generate_mission_kml
+
+SIZE = 101  # 0.01 degree cells
+
+def plane(latitudes, longitudes):
+    """Elevation of the synthetic tiles; bilinear interpolation reproduces it exactly"""
+    rows = (-36.0 - np.asarray(latitudes)) / 0.01
+    columns = (np.asarray(longitudes) - 174.0) / 0.01
+    return 10.0 + 0.5 * rows + 0.25 * columns
+
+def write_hgt(directory):
+    rows, columns = np.mgrid[0:SIZE, 0:SIZE]
+    path = os.path.join(directory, 'S37E174.hgt')
+    (10 + 2 * rows + columns).astype('>i2').tofile(path)
+    return path
+
+def write_bil(directory, name='tile', nodata_at=None):
+    rows, columns = np.mgrid[0:SIZE, 0:SIZE]
+    grid = (10.0 + 0.5 * rows + 0.25 * columns).astype('<f4')
+    if nodata_at is not None:
+        grid[nodata_at] = -9999
+    grid.tofile(os.path.join(directory, f'{name}.bil'))
+    with open(os.path.join(directory, f'{name}.hdr'), 'w') as header:
+        header.write(
+            f"BYTEORDER I\nLAYOUT BIL\nNROWS {SIZE}\nNCOLS {SIZE}\nNBANDS 1\nNBITS 32\nPIXELTYPE FLOAT\n"
+            f"ULXMAP 174.0\nULYMAP -36.0\nXDIM 0.01\nYDIM 0.01\nNODATA -9999\n"
+        )
+
+
+class TestDemTiles(unittest.TestCase):
+    """Unit tests for memory-mapped DEM tiles"""
+    
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        self.workdir.cleanup()
+    
+    def test_hgt_position_from_file_name(self):
+        """Test that an SRTM tile is placed by its south-west corner"""
+        tile = DemTile.from_hgt(write_hgt(self.workdir.name))
+        
+        self.assertEqual((tile.south, tile.north, tile.west, tile.east), (-37.0, -36.0, 174.0, 175.0))
+        self.assertEqual(tile.sample(np.array([-36.0]), np.array([174.0]))[0], 10.0)
+        self.assertEqual(tile.sample(np.array([-37.0]), np.array([175.0]))[0], 10.0 + 200 + 100)
+        self.assertAlmostEqual(tile.sample(np.array([-36.005]), np.array([174.005]))[0], 11.5)
+    
+    def test_bil_bilinear_sampling(self):
+        """Test that interpolation between samples is exact on a planar surface"""
+        write_bil(self.workdir.name)
+        store = DemStore(self.workdir.name)
+        latitudes = np.array([-36.0, -36.123, -36.5555, -36.999])
+        longitudes = np.array([174.0, 174.777, 174.3333, 174.001])
+        
+        np.testing.assert_allclose(store.sample(latitudes, longitudes), plane(latitudes, longitudes), atol=1e-3)
+        self.assertTrue(np.isnan(store.sample(np.array([-35.5]), np.array([174.5]))[0]))
+    
+    def test_nodata_yields_nan(self):
+        """Test that points next to a nodata sample have no elevation"""
+        write_bil(self.workdir.name, nodata_at=(50, 50))
+        store = DemStore(self.workdir.name)
+        elevations = store.sample(np.array([-36.505, -36.2]), np.array([174.505, 174.2]))
+        
+        self.assertTrue(np.isnan(elevations[0]))
+        self.assertAlmostEqual(elevations[1], plane(-36.2, 174.2), places=3)
+    
+    def test_store_reopens_when_tiles_change(self):
+        """Test that the shared store follows files added to the directory"""
+        first = get_dem_store(self.workdir.name)
+        write_bil(self.workdir.name)
+        second = get_dem_store(self.workdir.name)
+        
+        self.assertEqual(first.tiles, [])
+        self.assertIsNot(first, second)
+        self.assertEqual(len(second.tiles), 1)
+        self.assertIs(get_dem_store(self.workdir.name), second)
+
+
+class TestTerrainProfile(unittest.TestCase):
+    """Integration tests for GET /api/missions/<id>/terrain"""
+    
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        write_bil(self.workdir.name)
+        self.app = create_app('testing')
+        self.app.config['TERRAIN_DEM_DIR'] = self.workdir.name
+        self.client = self.app.test_client()
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.mission_id = MissionService.create_mission_from_kml('Terrain', generate_mission_kml(60))['mission']['id']
+    
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+        self.workdir.cleanup()
+    
+    def test_profile_samples_path_and_waypoints(self):
+        """Test clearance at fixed intervals plus every waypoint"""
+        response = self.client.get(f'/api/missions/{self.mission_id}/terrain?interval=25')
+        self.assertEqual(response.status_code, 200)
+        profile = response.get_json()['data']
+        samples = profile['samples']
+        waypoints = MissionService.get_mission_by_id(self.mission_id)['waypoints']
+        
+        self.assertEqual(profile['height_mode'], 'WGS84')
+        self.assertEqual(profile['summary']['samples'], len(samples['distance_m']))
+        self.assertEqual(samples['distance_m'], sorted(samples['distance_m']))
+        self.assertGreater(len(samples['distance_m']), len(waypoints))
+        self.assertLessEqual(max(np.diff(samples['distance_m'])), 25.1)
+        np.testing.assert_allclose(samples['terrain_m'], plane(samples['latitude'], samples['longitude']), atol=0.01)
+        np.testing.assert_allclose(
+            samples['clearance_m'], np.subtract(samples['flight_altitude_m'], samples['terrain_m']), atol=0.02
+        )
+        self.assertEqual(profile['summary']['min_clearance_m'], min(samples['clearance_m']))
+        self.assertEqual(profile['summary']['samples_without_terrain'], 0)
+    
+    def test_profile_is_cached_until_mission_changes(self):
+        """Test that the profile is served from the payload cache and invalidated on write"""
+        first = self.client.get(f'/api/missions/{self.mission_id}/terrain').get_json()['data']
+        cache = get_payload_cache()
+        self.assertIn(mission_key(self.mission_id, 'terrain'), cache.local._entries)
+        
+        MissionService.edit_waypoints(self.mission_id, [
+            {'op': 'move', 'start': 0, 'set': {'altitude': 5000.0}}
+        ])
+        self.assertNotIn(mission_key(self.mission_id, 'terrain'), cache.local._entries)
+        second = self.client.get(f'/api/missions/{self.mission_id}/terrain').get_json()['data']
+        self.assertGreater(second['samples']['flight_altitude_m'][0], first['samples']['flight_altitude_m'][0])
+    
+    def test_interval_validation_and_missing_dem(self):
+        """Test 400 for out-of-range intervals and 501 without terrain data"""
+        self.assertEqual(self.client.get(f'/api/missions/{self.mission_id}/terrain?interval=0').status_code, 400)
+        self.assertEqual(self.client.get('/api/missions/9999/terrain').status_code, 404)
+        self.app.config['TERRAIN_DEM_DIR'] = None
+        self.assertEqual(self.client.get(f'/api/missions/{self.mission_id}/terrain').status_code, 501)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+import unittest
+import os
+import sys
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.database import db
+from app.errors import NotFoundError
+from app.models.mission import Waypoint
+from app.models.version import KmlBlob, WaypointBlock
+from app.services.mission_service import MissionService
+from app.services.version_service import VersionService
+from app.utils.waypoint_blocks import chunk_points, unpack_block
+from benchmarks.kml_generator import generate_mission_kml
+
+
+class TestWaypointBlocks(unittest.TestCase):
+    """Unit tests for content-defined waypoint blocks"""
+    
+    def setUp(self):
+        self.points = [(-36.9 + i * 1e-5, 174.7 + (i % 50) * 1e-4, 100.0 + i % 7) for i in range(5000)]
+    
+    def test_blocks_round_trip(self):
+        """Test that decoding all blocks restores the sequence, including missing altitudes"""
+        points = self.points[:100] + [(-36.0, 174.0, None)]
+        
+        decoded = [point for _, _, data in chunk_points(points) for point in unpack_block(data)]
+        
+        self.assertEqual(decoded, points)
+    
+    def test_insert_only_changes_nearby_blocks(self):
+        """Test that an insertion does not shift the boundaries of later blocks"""
+        original = {digest for digest, _, _ in chunk_points(self.points)}
+        edited = self.points[:1000] + [(-35.0, 175.0, 42.0)] + self.points[1000:]
+        
+        changed = {digest for digest, _, _ in chunk_points(edited)} - original
+        
+        self.assertGreater(len(original), 4)
+        self.assertLessEqual(len(changed), 2)
+
+
+class TestVersionService(unittest.TestCase):
+    """Integration tests for copy-on-write mission versions"""
+    
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.kml = generate_mission_kml(3000, action_density=0)
+        self.mission_id = MissionService.create_mission_from_kml('Grid', self.kml)['mission']['id']
+    
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+    
+    def _waypoints(self):
+        waypoints = MissionService.get_mission_by_id(self.mission_id)['waypoints']
+        return [(w['latitude'], w['longitude'], w['altitude']) for w in sorted(waypoints, key=lambda w: w['index'])]
+    
+    def _edit(self, *operations):
+        MissionService.edit_waypoints(self.mission_id, list(operations))
+    
+    def test_snapshots_share_unchanged_blocks(self):
+        """Test that only changed blocks are stored for a new version"""
+        first = VersionService.create_version(self.mission_id, label='baseline')
+        unchanged = VersionService.create_version(self.mission_id)
+        self._edit({'op': 'move', 'start': 1500, 'offset': {'altitude': 5}})
+        edited = VersionService.create_version(self.mission_id, label='raised')
+        
+        self.assertEqual(first['new_blocks'], first['block_count'])
+        self.assertEqual(unchanged['new_blocks'], 0)
+        self.assertEqual(edited['new_blocks'], 1)
+        self.assertEqual(edited['parent_id'], unchanged['id'])
+        self.assertEqual(WaypointBlock.query.count(), first['block_count'] + 1)
+    
+    def test_branch_from_version_copies_no_data(self):
+        """Test that branching from a version stores nothing new"""
+        first = VersionService.create_version(self.mission_id)
+        blocks_before = WaypointBlock.query.count()
+        
+        branch = self.client.post(f'/api/missions/{self.mission_id}/versions',
+                                  json={'label': 'variant', 'from_version': first['id']}).get_json()['data']
+        
+        self.assertEqual(branch['parent_id'], first['id'])
+        self.assertEqual(branch['number'], 2)
+        self.assertEqual(branch['waypoint_count'], 3000)
+        self.assertEqual(WaypointBlock.query.count(), blocks_before)
+        listed = self.client.get(f'/api/missions/{self.mission_id}/versions').get_json()['data']
+        self.assertEqual([version['number'] for version in listed], [2, 1])
+    
+    def test_diff_reports_changed_ranges(self):
+        """Test diffing two versions"""
+        first = VersionService.create_version(self.mission_id)
+        self._edit(
+            {'op': 'move', 'start': 10, 'set': {'altitude': 300.0}},
+            {'op': 'insert', 'index': 2000, 'waypoints': [{'latitude': -36.0, 'longitude': 174.0, 'altitude': 50.0}]}
+        )
+        second = VersionService.create_version(self.mission_id)
+        
+        response = self.client.get(f"/api/missions/{self.mission_id}/versions/{first['id']}/diff/{second['id']}")
+        diff = response.get_json()['data']
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(diff['summary'], {'inserted': 1, 'deleted': 0, 'replaced': 1})
+        self.assertEqual([change['from_range'] for change in diff['changes']], [[10, 11], [2000, 2000]])
+        self.assertEqual(diff['changes'][0]['to_waypoints'][0]['altitude'], 300.0)
+        self.assertGreater(diff['shared_blocks'], 0)
+        self.assertLess(diff['compared_waypoints'], 6001)
+        self.assertFalse(diff['kml_changed'])
+    
+    def test_restore_returns_mission_to_version(self):
+        """Test restoring waypoints and KML from a version"""
+        original = self._waypoints()
+        first = VersionService.create_version(self.mission_id)
+        self._edit({'op': 'delete', 'start': 100, 'end': 110}, {'op': 'move', 'start': 0, 'set': {'latitude': -35.0}})
+        
+        response = self.client.post(f"/api/missions/{self.mission_id}/versions/{first['id']}/restore")
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._waypoints(), original)
+        mission = MissionService.get_mission_by_id(self.mission_id)
+        self.assertEqual(mission['kml_data'], self.kml)
+        self.assertFalse(mission['kml_stale'])
+    
+    def test_restore_rewrites_only_changed_rows(self):
+        """Test that undoing an insertion deletes one row and shifts the tail in one statement"""
+        first = VersionService.create_version(self.mission_id)
+        self._edit(
+            {'op': 'insert', 'index': 1500, 'waypoints': [{'latitude': -36.0, 'longitude': 174.0, 'altitude': 50.0}]},
+            {'op': 'move', 'start': 10, 'set': {'altitude': 300.0}}
+        )
+        ids_before = [waypoint.id for waypoint in Waypoint.query.filter_by(mission_id=self.mission_id)
+                      .order_by(Waypoint.index) if waypoint.index != 1500]
+        
+        result = VersionService.restore_version(self.mission_id, first['id'])
+        
+        self.assertEqual(result['changes'], {'inserted': 0, 'updated': 1, 'deleted': 1, 'shifted': 1500})
+        ids_after = [waypoint.id for waypoint in Waypoint.query.filter_by(mission_id=self.mission_id)
+                     .order_by(Waypoint.index)]
+        self.assertEqual(ids_after, ids_before)
+    
+    def test_clone_shares_version_storage(self):
+        """Test that a clone gets the version's waypoints and KML without storing new blocks or blobs"""
+        first = VersionService.create_version(self.mission_id, label='baseline')
+        original = self._waypoints()
+        self._edit({'op': 'delete', 'start': 0, 'end': 100})
+        blocks_before, blobs_before = WaypointBlock.query.count(), KmlBlob.query.count()
+        
+        response = self.client.post(f"/api/missions/{self.mission_id}/versions/{first['id']}/clone",
+                                    json={'name': 'Grid variant'})
+        clone = response.get_json()['data']
+        
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(clone['mission']['name'], 'Grid variant')
+        self.assertEqual(clone['waypoint_count'], 3000)
+        self.assertEqual(clone['version']['number'], 1)
+        self.assertEqual(clone['version']['label'], 'baseline')
+        copied = MissionService.get_mission_by_id(clone['mission']['id'])
+        self.assertEqual([(w['latitude'], w['longitude'], w['altitude']) for w in copied['waypoints']], original)
+        self.assertEqual(copied['kml_data'], self.kml)
+        self.assertEqual((WaypointBlock.query.count(), KmlBlob.query.count()), (blocks_before, blobs_before))
+        self.assertEqual(len(self._waypoints()), 2900)
+    
+    def test_version_of_other_mission_is_not_found(self):
+        """Test that versions are scoped to their mission"""
+        first = VersionService.create_version(self.mission_id)
+        other_id = MissionService.create_mission_from_kml('Other', generate_mission_kml(10))['mission']['id']
+        
+        with self.assertRaises(NotFoundError):
+            VersionService.restore_version(other_id, first['id'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
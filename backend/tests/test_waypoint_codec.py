@@ -0,0 +1,107 @@
+import unittest
+import os
+import sys
+import gzip
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.database import db
+from app.services.mission_service import MissionService
+from app.utils.waypoint_codec import MIMETYPE, HEADER, encode_mission, decode_mission
+from benchmarks.kml_generator import generate_mission_kml
+
+
+class TestWaypointCodec(unittest.TestCase):
+    """Unit tests for the binary mission encoding"""
+    
+    def test_round_trip(self):
+        """Test that decoding restores the payload with waypoints in index order"""
+        payload = {
+            'id': 7,
+            'name': 'Codec',
+            'kml_stale': False,
+            'waypoints': [
+                {'id': 12, 'mission_id': 7, 'latitude': -36.9, 'longitude': 174.7, 'altitude': None, 'index': 1},
+                {'id': 11, 'mission_id': 7, 'latitude': -36.8, 'longitude': 174.6, 'altitude': 120.5, 'index': 0}
+            ],
+            'waypoint_count': 2,
+            'annotations': []
+        }
+        decoded = decode_mission(encode_mission(payload))
+        
+        self.assertEqual(decoded['waypoints'], sorted(payload['waypoints'], key=lambda waypoint: waypoint['index']))
+        self.assertEqual({key: value for key, value in decoded.items() if key != 'waypoints'},
+                         {key: value for key, value in payload.items() if key != 'waypoints'})
+    
+    def test_columns_are_aligned(self):
+        """Test that the waypoint columns start on an 8-byte boundary"""
+        for name in ('a', 'ab', 'abcdefgh'):
+            data = encode_mission({'id': 1, 'name': name, 'waypoints': []})
+            _, _, _, count, metadata_length = HEADER.unpack_from(data)
+            self.assertEqual(count, 0)
+            self.assertEqual((HEADER.size + metadata_length) % 8, 0)
+            self.assertEqual(len(data), HEADER.size + metadata_length)
+    
+    def test_rejects_unknown_format(self):
+        """Test that other payloads are not misread"""
+        with self.assertRaises(ValueError):
+            decode_mission(b'{"success": true, "data": {}}')
+
+
+class TestBinaryMissionDetail(unittest.TestCase):
+    """Integration tests for content negotiation on GET /api/missions/<id>"""
+    
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.mission_id = MissionService.create_mission_from_kml('Binary', generate_mission_kml(500))['mission']['id']
+    
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+    
+    def test_binary_matches_json(self):
+        """Test that both representations carry the same mission"""
+        json_response = self.client.get(f'/api/missions/{self.mission_id}')
+        binary_response = self.client.get(f'/api/missions/{self.mission_id}', headers={'Accept': MIMETYPE})
+        
+        self.assertEqual(json_response.mimetype, 'application/json')
+        self.assertEqual(binary_response.mimetype, MIMETYPE)
+        self.assertIn('Accept', binary_response.headers['Vary'])
+        expected = json_response.get_json()['data']
+        decoded = decode_mission(binary_response.data)
+        self.assertEqual(decoded['waypoints'], sorted(expected['waypoints'], key=lambda waypoint: waypoint['index']))
+        self.assertEqual(decoded['kml_data'], expected['kml_data'])
+        self.assertLess(len(binary_response.data) - len(expected['kml_data']),
+                        (len(json_response.data) - len(expected['kml_data'])) / 2)
+    
+    def test_json_is_default(self):
+        """Test that wildcard and unrelated Accept headers get JSON"""
+        for accept in ('*/*', f'application/json, {MIMETYPE}', 'text/html'):
+            response = self.client.get(f'/api/missions/{self.mission_id}', headers={'Accept': accept})
+            self.assertEqual(response.mimetype, 'application/json', accept)
+    
+    def test_representations_have_separate_etags(self):
+        """Test conditional and compressed-cache hits per representation"""
+        headers = {'Accept': MIMETYPE, 'Accept-Encoding': 'gzip'}
+        first = self.client.get(f'/api/missions/{self.mission_id}', headers=headers)
+        second = self.client.get(f'/api/missions/{self.mission_id}', headers=headers)
+        json_etag = self.client.get(f'/api/missions/{self.mission_id}').headers['ETag']
+        
+        self.assertEqual(first.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(second.mimetype, MIMETYPE)
+        self.assertEqual(gzip.decompress(second.data), gzip.decompress(first.data))
+        self.assertNotEqual(first.headers['ETag'], json_etag)
+        not_modified = self.client.get(
+            f'/api/missions/{self.mission_id}', headers={**headers, 'If-None-Match': first.headers['ETag']}
+        )
+        self.assertEqual(not_modified.status_code, 304)
+
+
+if __name__ == '__main__':
+    unittest.main()
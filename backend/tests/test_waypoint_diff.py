@@ -0,0 +1,159 @@
+import unittest
+import os
+import sys
+from types import SimpleNamespace
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.database import db
+from app.errors import ValidationError
+from app.models.mission import Waypoint
+from app.services.mission_service import MissionService
+from app.utils.waypoint_diff import diff_waypoints
+
+
+def make_kml(points):
+    """Build a minimal WPML document from (index, lon, lat, height) tuples"""
+    placemarks = ''.join(
+        f'<Placemark><wpml:index>{index}</wpml:index><wpml:executeHeight>{height}</wpml:executeHeight>'
+        f'<Point><coordinates>{lon},{lat}</coordinates></Point></Placemark>'
+        for index, lon, lat, height in points
+    )
+    return (
+        '<kml xmlns="http://www.opengis.net/kml/2.2" xmlns:wpml="http://www.dji.com/wpmz/1.0.6">'
+        f'<Document>{placemarks}</Document></kml>'
+    )
+
+
+class TestDiffWaypoints(unittest.TestCase):
+    """Unit tests for the waypoint diff"""
+    
+    def _row(self, id, index, lat, lon, alt=50.0):
+        return SimpleNamespace(id=id, index=index, latitude=lat, longitude=lon, altitude=alt)
+    
+    def _parsed(self, index, lat, lon, alt=50.0):
+        return {'index': index, 'latitude': lat, 'longitude': lon, 'altitude': alt}
+    
+    def test_unchanged_sequence_produces_no_writes(self):
+        """Test that identical sequences need no writes"""
+        existing = [self._row(10 + i, i, -36.0 - i, 174.0) for i in range(5)]
+        parsed = [self._parsed(i, -36.0 - i, 174.0) for i in range(5)]
+        
+        self.assertEqual(diff_waypoints(existing, parsed), ([], [], [], []))
+    
+    def test_moved_appended_and_removed_waypoints(self):
+        """Test that only changed columns of changed waypoints are updated"""
+        existing = [self._row(10 + i, i, -36.0 - i, 174.0) for i in range(3)]
+        parsed = [
+            self._parsed(0, -36.0, 174.0),
+            self._parsed(1, -37.0, 174.5, alt=80.0),
+            self._parsed(3, -39.0, 174.0)
+        ]
+        
+        inserts, updates, deletes, shifts = diff_waypoints(existing, parsed)
+        
+        self.assertEqual(inserts, [parsed[2]])
+        self.assertEqual(updates, [{'id': 11, 'longitude': 174.5, 'altitude': 80.0}])
+        self.assertEqual(deletes, [12])
+        self.assertEqual(shifts, [])
+    
+    def test_duplicate_indexes_fall_back_to_position(self):
+        """Test ordinal matching when indexes are not unique"""
+        existing = [self._row(1, 0, -36.0, 174.0), self._row(2, 0, -36.1, 174.0)]
+        parsed = [self._parsed(0, -36.0, 174.0), self._parsed(0, -36.2, 174.0)]
+        
+        inserts, updates, deletes, shifts = diff_waypoints(existing, parsed)
+        
+        self.assertEqual((inserts, deletes, shifts), ([], [], []))
+        self.assertEqual(updates, [{'id': 2, 'latitude': -36.2}])
+    
+    def test_insert_in_the_middle_shifts_the_tail(self):
+        """Test that one inserted waypoint is one insert and one index shift, not an update per row"""
+        existing = [self._row(i, i, -36.0 - i * 0.001, 174.0) for i in range(1000)]
+        parsed = [self._parsed(i, -36.0 - i * 0.001, 174.0) for i in range(500)]
+        parsed.append(self._parsed(500, -36.5, 175.0))
+        parsed += [self._parsed(i + 1, -36.0 - i * 0.001, 174.0) for i in range(500, 1000)]
+        
+        inserts, updates, deletes, shifts = diff_waypoints(existing, parsed)
+        
+        self.assertEqual(inserts, [parsed[500]])
+        self.assertEqual((updates, deletes), ([], []))
+        self.assertEqual(shifts, [{'start': 500, 'end': 999, 'offset': 1}])
+    
+    def test_delete_in_the_middle_shifts_the_tail(self):
+        """Test that removing a waypoint deletes its row and shifts the rest down once"""
+        existing = [self._row(i, i, -36.0 - i * 0.001, 174.0) for i in range(1000)]
+        parsed = [self._parsed(i if i < 300 else i - 1, -36.0 - i * 0.001, 174.0) for i in range(1000) if i != 300]
+        
+        inserts, updates, deletes, shifts = diff_waypoints(existing, parsed)
+        
+        self.assertEqual((inserts, updates), ([], []))
+        self.assertEqual(deletes, [300])
+        self.assertEqual(shifts, [{'start': 301, 'end': 999, 'offset': -1}])
+
+
+class TestIncrementalReingest(unittest.TestCase):
+    """Integration tests for KML updates through MissionService"""
+    
+    def setUp(self):
+        self.app = create_app('testing')
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        self.points = [(i, 174.7 + i * 0.001, -36.8, 50.0) for i in range(20)]
+        self.mission_id = MissionService.create_mission_from_kml('Survey', make_kml(self.points))['mission']['id']
+    
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+    
+    def _waypoint_ids(self):
+        return {
+            waypoint.index: (waypoint.id, waypoint.altitude)
+            for waypoint in Waypoint.query.filter_by(mission_id=self.mission_id)
+        }
+    
+    def test_small_edit_keeps_unchanged_rows(self):
+        """Test that editing one waypoint rewrites only that row"""
+        before = self._waypoint_ids()
+        points = list(self.points)
+        points[5] = (5, points[5][1], points[5][2], 120.0)
+        points = points[:-1]
+        
+        result = MissionService.update_mission(self.mission_id, kml_data=make_kml(points))
+        after = self._waypoint_ids()
+        
+        self.assertEqual(result['waypoint_count'], 19)
+        self.assertEqual(after[5], (before[5][0], 120.0))
+        self.assertNotIn(19, after)
+        self.assertEqual({index: ids for index, ids in after.items() if index != 5},
+                         {index: ids for index, ids in before.items() if index not in (5, 19)})
+    
+    def test_insert_in_the_middle_keeps_row_ids(self):
+        """Test that inserting a waypoint re-indexes the tail in place"""
+        before = self._waypoint_ids()
+        points = [(i if i < 8 else i + 1, lon, lat, height) for i, lon, lat, height in self.points]
+        points.insert(8, (8, 175.0, -36.9, 60.0))
+        
+        result = MissionService.update_mission(self.mission_id, kml_data=make_kml(points))
+        after = self._waypoint_ids()
+        
+        self.assertEqual(result['waypoint_count'], 21)
+        self.assertEqual(after[8][1], 60.0)
+        self.assertEqual({index: after[index if index < 8 else index + 1] for index in before}, before)
+    
+    def test_invalid_kml_leaves_mission_untouched(self):
+        """Test that a parse failure rolls back the whole update"""
+        before = self._waypoint_ids()
+        
+        with self.assertRaises(ValidationError):
+            MissionService.update_mission(self.mission_id, name='Renamed', kml_data='<kml><broken')
+        
+        self.assertEqual(self._waypoint_ids(), before)
+        self.assertEqual(MissionService.get_mission_by_id(self.mission_id)['name'], 'Survey')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
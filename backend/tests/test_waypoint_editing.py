@@ -0,0 +1,192 @@
+import unittest
+import os
+import sys
+import xml.etree.ElementTree as ET
+
+# Add the backend directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.database import db
+from app.models.mission import Mission
+from app.services.mission_service import MissionService
+from app.utils.kml_parser import NAMESPACES, parse_kml_file
+from benchmarks.kml_generator import generate_mission_kml
+
+
+class TestWaypointEditing(unittest.TestCase):
+    """Tests for PATCH /api/missions/<id>/waypoints and lazy KML regeneration"""
+    
+    def setUp(self):
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.context = self.app.app_context()
+        self.context.push()
+        db.create_all()
+        
+        example_path = os.path.join(os.path.dirname(__file__), '..', '..', 'memory-bank', 'example-shortened.kml')
+        with open(example_path, 'r', encoding='utf-8') as file:
+            self.kml = file.read()
+        self.original = parse_kml_file(self.kml)['waypoints']
+        self.mission_id = MissionService.create_mission_from_kml('Survey', self.kml)['mission']['id']
+    
+    def tearDown(self):
+        db.session.remove()
+        self.context.pop()
+    
+    def _patch(self, *operations):
+        return self.client.patch(f'/api/missions/{self.mission_id}/waypoints', json={'operations': list(operations)})
+    
+    def _positions(self):
+        waypoints = MissionService.get_mission_by_id(self.mission_id)['waypoints']
+        return [(w['index'], w['latitude'], w['longitude'], w['altitude']) for w in sorted(waypoints, key=lambda w: w['index'])]
+    
+    def _original_positions(self):
+        return [(w['index'], w['latitude'], w['longitude'], w['altitude']) for w in self.original]
+    
+    def test_move_sets_and_offsets_a_range(self):
+        """Test absolute and relative moves over a range"""
+        response = self._patch(
+            {'op': 'move', 'start': 0, 'set': {'altitude': 120.0}},
+            {'op': 'move', 'start': 1, 'end': 3, 'offset': {'latitude': 0.001}}
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.get_json()['data']['kml_stale'])
+        positions = self._positions()
+        original = self._original_positions()
+        self.assertEqual(positions[0][3], 120.0)
+        self.assertAlmostEqual(positions[1][1], original[1][1] + 0.001)
+        self.assertAlmostEqual(positions[2][1], original[2][1] + 0.001)
+        self.assertEqual(positions[3], original[3])
+    
+    def test_insert_and_delete_keep_indexes_contiguous(self):
+        """Test that inserts and deletes renumber following waypoints"""
+        count = len(self.original)
+        
+        response = self._patch(
+            {'op': 'insert', 'index': 2, 'waypoints': [{'latitude': -36.9, 'longitude': 174.7, 'altitude': 90}]},
+            {'op': 'delete', 'start': 0, 'end': 2}
+        )
+        
+        self.assertEqual(response.get_json()['data']['waypoint_count'], count - 1)
+        positions = self._positions()
+        self.assertEqual([p[0] for p in positions], list(range(count - 1)))
+        self.assertEqual(positions[0][1:], (-36.9, 174.7, 90.0))
+        self.assertEqual(positions[1][1:], self._original_positions()[2][1:])
+    
+    def test_reorder_moves_block_in_both_directions(self):
+        """Test moving a block forwards and back"""
+        original = [p[1:] for p in self._original_positions()]
+        
+        self._patch({'op': 'reorder', 'start': 0, 'end': 2, 'to': 3})
+        expected = original[2:5] + original[0:2] + original[5:]
+        self.assertEqual([p[1:] for p in self._positions()], expected)
+        
+        self._patch({'op': 'reorder', 'start': 3, 'end': 5, 'to': 0})
+        self.assertEqual([p[1:] for p in self._positions()], original)
+    
+    def test_invalid_operation_rolls_back(self):
+        """Test that a bad operation rejects the whole batch"""
+        before = self._positions()
+        
+        response = self._patch(
+            {'op': 'delete', 'start': 0},
+            {'op': 'delete', 'start': 5, 'end': 500}
+        )
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self._positions(), before)
+        self.assertFalse(db.session.get(Mission, self.mission_id).kml_stale)
+    
+    def test_non_finite_coordinates_are_rejected(self):
+        """Test that NaN and infinity, which JSON bodies may carry, are rejected"""
+        before = self._positions()
+        
+        responses = [
+            self.client.patch(f'/api/missions/{self.mission_id}/waypoints', data=body,
+                              content_type='application/json')
+            for body in (
+                '{"operations": [{"op": "move", "start": 0, "set": {"altitude": NaN}}]}',
+                '{"operations": [{"op": "insert", "index": 0, "waypoints": '
+                '[{"latitude": -36.8, "longitude": Infinity}]}]}'
+            )
+        ]
+        
+        self.assertEqual([response.status_code for response in responses], [400, 400])
+        self.assertIn('finite', responses[0].get_json()['error'])
+        self.assertEqual(self._positions(), before)
+    
+    def test_kml_is_regenerated_once_on_download(self):
+        """Test that downloads regenerate stale KML and cache it"""
+        self._patch({'op': 'move', 'start': 4, 'set': {'latitude': -36.95, 'longitude': 174.8}})
+        
+        response = self.client.get(f'/api/missions/{self.mission_id}/kml')
+        kml = response.get_data(as_text=True)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/vnd.google-earth.kml+xml')
+        self.assertIn('filename="Survey.kml"', response.headers['Content-Disposition'])
+        reparsed = [(w['index'], w['latitude'], w['longitude'], w['altitude']) for w in parse_kml_file(kml)['waypoints']]
+        self.assertEqual(reparsed, self._positions())
+        self.assertEqual(kml.count('<wpml:actionGroup>'), self.kml.count('<wpml:actionGroup>'))
+        self.assertIn('<wpml:missionConfig>', kml)
+        
+        mission = db.session.get(Mission, self.mission_id)
+        self.assertFalse(mission.kml_stale)
+        self.assertEqual(mission.kml_data, kml)
+    
+    def test_unedited_mission_downloads_original_kml(self):
+        """Test that KML is served untouched when nothing was edited"""
+        response = self.client.get(f'/api/missions/{self.mission_id}/kml')
+        
+        self.assertEqual(response.get_data(as_text=True), self.kml)
+
+    def test_regenerated_placemarks_keep_their_own_settings(self):
+        """Test that actions and speeds follow their waypoint through delete, insert and reorder"""
+        kml = generate_mission_kml(8, action_density=1.0, seed=3)
+        mission_id = MissionService.create_mission_from_kml('Actions', kml)['mission']['id']
+        original = _placemark_settings(kml)
+        path = f'/api/missions/{mission_id}/waypoints'
+        
+        self.client.patch(path, json={'operations': [
+            {'op': 'delete', 'start': 0},
+            {'op': 'insert', 'index': 2, 'waypoints': [{'latitude': -36.5, 'longitude': 174.5, 'altitude': 80.0}]}
+        ]})
+        # A second edit while the KML is already stale
+        self.client.patch(path, json={'operations': [{'op': 'reorder', 'start': 4, 'end': 6, 'to': 0}]})
+        regenerated = _placemark_settings(self.client.get(f'/api/missions/{mission_id}/kml').get_data(as_text=True))
+        
+        self.assertEqual(len(regenerated), 8)
+        for position, (key, (index, speed, groups)) in enumerate(sorted(regenerated.items(), key=lambda item: item[1][0])):
+            self.assertEqual(index, position)
+            if key == (174.5, -36.5):
+                self.assertEqual(groups, [])
+                continue
+            self.assertEqual(speed, original[key][1])
+            self.assertEqual([group_id for group_id, _, _ in groups], [group_id for group_id, _, _ in original[key][2]])
+            self.assertTrue(all(start == end == index for _, start, end in groups))
+
+
+def _placemark_settings(kml):
+    """{(lon, lat): (index, waypointSpeed, [(actionGroupId, start, end)])} for each placemark"""
+    root = ET.fromstring(kml)
+    settings = {}
+    for placemark in root.iter(f"{{{NAMESPACES['kml']}}}Placemark"):
+        lon, lat = placemark.findtext('kml:Point/kml:coordinates', namespaces=NAMESPACES).strip().split(',')[:2]
+        groups = [
+            (group.findtext('wpml:actionGroupId', namespaces=NAMESPACES),
+             int(group.findtext('wpml:actionGroupStartIndex', namespaces=NAMESPACES)),
+             int(group.findtext('wpml:actionGroupEndIndex', namespaces=NAMESPACES)))
+            for group in placemark.findall('wpml:actionGroup', NAMESPACES)
+        ]
+        settings[(round(float(lon), 9), round(float(lat), 9))] = (
+            int(placemark.findtext('wpml:index', namespaces=NAMESPACES)),
+            placemark.findtext('wpml:waypointSpeed', namespaces=NAMESPACES),
+            groups
+        )
+    return settings
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -43,7 +43,7 @@ export interface AnnotationData {
 }
 
 export interface NoFlyZoneData {
-  coordinates: string;
+  coordinates: string | [number, number][];  // ring of [longitude, latitude] pairs
   note?: string;
 }
 
@@ -68,6 +68,71 @@ export const uploadKMLFile = async (file: File, missionName: string): Promise<Mi
   return response.json();
 };
 
+/**
+ * Content type of the binary mission encoding (see backend/app/utils/waypoint_codec.py)
+ */
+export const WAYPOINT_MIMETYPE = 'application/vnd.mission-dashboard.waypoints';
+
+/**
+ * Decode a binary mission payload: a 16-byte header, the mission as JSON,
+ * then latitude / longitude / altitude (Float64) and id / index (Uint32 / Int32)
+ * columns. Columns are 8-byte aligned little-endian arrays, so they are read as
+ * typed-array views without parsing each number.
+ */
+export const decodeMission = (buffer: ArrayBuffer): Mission => {
+  const header = new DataView(buffer, 0, 16);
+  const magic = String.fromCharCode(
+    header.getUint8(0), header.getUint8(1), header.getUint8(2), header.getUint8(3)
+  );
+  if (magic !== 'MWPT' || header.getUint16(4, true) !== 1) {
+    throw new Error('Unsupported waypoint payload');
+  }
+  const count = header.getUint32(8, true);
+  const metadataLength = header.getUint32(12, true);
+  const mission: Mission = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 16, metadataLength)));
+
+  const start = 16 + metadataLength;
+  const latitudes = new Float64Array(buffer, start, count);
+  const longitudes = new Float64Array(buffer, start + 8 * count, count);
+  const altitudes = new Float64Array(buffer, start + 16 * count, count);
+  const ids = new Uint32Array(buffer, start + 24 * count, count);
+  const indexes = new Int32Array(buffer, start + 28 * count, count);
+
+  const waypoints: Waypoint[] = new Array(count);
+  for (let i = 0; i < count; i++) {
+    waypoints[i] = {
+      id: ids[i],
+      mission_id: mission.id,
+      latitude: latitudes[i],
+      longitude: longitudes[i],
+      altitude: isNaN(altitudes[i]) ? null : altitudes[i],
+      index: indexes[i],
+    };
+  }
+  mission.waypoints = waypoints;
+  return mission;
+};
+
+/**
+ * Get a mission with its waypoints, transferred in the binary encoding
+ */
+export const getMission = async (missionId: number): Promise<Mission> => {
+  const response = await fetch(`${API_BASE_URL}/missions/${missionId}`, {
+    headers: { Accept: `${WAYPOINT_MIMETYPE}, application/json;q=0.5` },
+  });
+
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => ({}));
+    throw new Error(errorData.message || `HTTP error! status: ${response.status}`);
+  }
+
+  if (response.headers.get('Content-Type') === WAYPOINT_MIMETYPE) {
+    return decodeMission(await response.arrayBuffer());
+  }
+  const body: ApiResponse<Mission> = await response.json();
+  return body.data;
+};
+
 /**
  * Get all missions
  */